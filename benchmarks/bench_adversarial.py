@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Benchmark the parser on adversarial inputs.
+
+Parses each input in tests/fixtures/adversarial.py at 2 KB to 32 KB:
+unmatched emphasis delimiters, brackets and backticks, deep blockquote
+nesting and wide tables. A linear parser's cost per KB stays flat as the
+input grows; a quadratic one's doubles with each doubling of the input.
+tests/test_parser.py asserts the same growth.
+
+Run with: python benchmarks/bench_adversarial.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# Add src (and the repository, for the test corpus) to path for development
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mdsvg.parser import MarkdownParser
+from tests.fixtures.adversarial import ADVERSARIAL_INPUTS
+
+SIZES_KB = (2, 8, 32)
+REPEAT = 3
+
+
+def main() -> None:
+    """Print the parse time per KB of each adversarial input at each size."""
+    parser = MarkdownParser()
+    print(f"{'input':<22}" + "".join(f" {size:>5} KB" for size in SIZES_KB) + "   (us/KB)")
+    for name, make in ADVERSARIAL_INPUTS.items():
+        row = []
+        for size in SIZES_KB:
+            text = make(size * 1024)
+            best = min(timeit.repeat(lambda text=text: parser.parse(text), number=1, repeat=REPEAT))
+            row.append(best * 1e6 / size)
+        print(f"{name:<22}" + "".join(f" {cost:8.1f}" for cost in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark what the parser backends cost.
+
+Backends are used for CommonMark compatibility, and parse more slowly than
+the built-in parser. This parses every file in examples/ repeated 100
+times with MarkdownParser and with each installed third-party backend. For
+those, the library's own parse (to its token stream) and the conversion of
+its tokens to mdsvg nodes are also timed separately.
+
+Run with: python benchmarks/bench_backends.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# Add src to path for development
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mdsvg.backends import MarkdownItBackend, MistuneBackend
+from mdsvg.parser import MarkdownParser
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+SCALE = 100
+REPEAT = 3
+
+
+def bench(label: str, func) -> float:
+    """Time func and print the best cost per call."""
+    best = min(timeit.repeat(func, number=1, repeat=REPEAT))
+    print(f"  {label:<28} {best * 1e3:9.1f} ms")
+    return best
+
+
+def best_of(backend, text: str) -> float:
+    """Get the best time for a backend to parse text."""
+    return min(timeit.repeat(lambda: backend.parse(text), number=1, repeat=2))
+
+
+def main() -> None:
+    """Compare the backends on each example file and on all of them together."""
+    sources = {
+        path.stem: path.read_text(encoding="utf-8") for path in sorted(EXAMPLES.glob("*.md"))
+    }
+    text = "\n\n".join(sources.values()) * SCALE
+    print(f"examples/*.md x {SCALE} ({len(text) // 1024} KB):")
+
+    builtin = bench("MarkdownParser", lambda: MarkdownParser().parse(text))
+    # Each backend, how its library tokenizes text, and how tokens become nodes
+    backends = {
+        "MarkdownItBackend": (
+            MarkdownItBackend(),
+            lambda backend: backend._load().parse(text),
+            lambda backend, tokens: backend._document(tokens, text, False),
+        ),
+        "MistuneBackend": (
+            MistuneBackend(),
+            lambda backend: backend._load()(text),
+            lambda backend, tokens: backend._blocks(tokens),
+        ),
+    }
+    for name, (backend, tokenize, convert) in backends.items():
+        if not backend.is_available:
+            print(f"  {name:<28} not installed")
+            continue
+        total = bench(name, lambda backend=backend: backend.parse(text))
+        tokens = tokenize(backend)
+        bench("  library parse only", lambda b=backend, t=tokenize: t(b))
+        bench("  conversion to nodes", lambda b=backend, c=convert, t=tokens: c(b, t))
+        print(f"  {'  relative to MarkdownParser':<28} {total / builtin:9.2f}x")
+
+    available = [backend for backend, _, _ in backends.values() if backend.is_available]
+    print(f"\nPer file x {SCALE} (MarkdownParser, then each installed backend):")
+    for stem, source in sources.items():
+        scaled = "\n\n".join([source] * SCALE)
+        timings = [best_of(MarkdownParser(), scaled)]
+        timings.extend(best_of(backend, scaled) for backend in available)
+        print(f"  {stem:<16}" + "".join(f" {t * 1e3:9.1f} ms" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
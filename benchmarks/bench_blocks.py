@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark block structure parsing on large documents.
+
+Times the block layer alone (MarkdownParser.parse with inline parsing
+stubbed out) and the full parse of the same documents. With --baseline, the
+same timings are taken for the parser at another git revision, such as the
+commit before the line classifier, so the comparison is against the real
+previous parser. Each parser runs in its own process.
+
+Run with: python benchmarks/bench_blocks.py [--baseline REV]
+"""
+
+import argparse
+import io
+import json
+import subprocess
+import sys
+import tarfile
+import tempfile
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+README = ROOT / "README.md"
+SECTION = (
+    "## Section\n\n"
+    + "The quick brown fox jumps over the lazy dog, again and again.\n" * 8
+    + "\n- one\n- two\n  continued\n\n> quoted\n> lines\n\n"
+    + "| a | b |\n|---|---|\n| 1 | 2 |\n\n"
+)
+REPEAT = 7
+
+
+def documents() -> dict:
+    """Get the documents to parse, by name."""
+    return {
+        "README x 20": README.read_text(encoding="utf-8") * 20,
+        "sections x 500": SECTION * 500,
+    }
+
+
+def best_time(func) -> float:
+    """Get the best time per call of func, in milliseconds."""
+    return min(timeit.repeat(func, number=3, repeat=REPEAT)) / 3 * 1e3
+
+
+def measure(src: str) -> None:
+    """Time the parser in src and print the results as JSON."""
+    sys.path.insert(0, src)
+    from mdsvg.parser import MarkdownParser
+
+    parser = MarkdownParser()
+    results = {}
+    for name, text in documents().items():
+        full = best_time(lambda text=text: parser.parse(text))
+        results[name] = {"full": full}
+    # Inline parsing is stubbed out afterwards, leaving the block layer
+    MarkdownParser._parse_inline = lambda self, text: []  # type: ignore[method-assign]
+    for name, text in documents().items():
+        results[name]["blocks"] = best_time(lambda text=text: parser.parse(text))
+    print(json.dumps(results))
+
+
+def run(src: str) -> dict:
+    """Time the parser in src in a fresh process."""
+    output = subprocess.run(
+        [sys.executable, __file__, "--measure", src],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def extract(revision: str, directory: str) -> str:
+    """Extract src/ at a git revision into directory and return its path."""
+    archive = subprocess.run(
+        ["git", "-C", str(ROOT), "archive", revision, "src"],
+        check=True,
+        capture_output=True,
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+    return str(Path(directory) / "src")
+
+
+def main() -> None:
+    """Time block and full parsing, next to a baseline revision if one is given."""
+    args = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    args.add_argument("--baseline", help="git revision of the parser to compare with")
+    args.add_argument("--measure", help=argparse.SUPPRESS)
+    options = args.parse_args()
+    if options.measure:
+        measure(options.measure)
+        return
+
+    current = run(str(ROOT / "src"))
+    baseline = None
+    if options.baseline:
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = run(extract(options.baseline, directory))
+
+    for name, text in documents().items():
+        print(f"{name} ({len(text) // 1024} KB, {text.count(chr(10)) + 1} lines):")
+        for stage in ("blocks", "full"):
+            label = "block layer" if stage == "blocks" else "full parse"
+            line = f"  {label:<12} {current[name][stage]:8.2f} ms"
+            if baseline:
+                before = baseline[name][stage]
+                line += (
+                    f"   baseline {before:8.2f} ms   speedup {before / current[name][stage]:.2f}x"
+                )
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark the parsed document cache.
+
+For each file in examples/ and for the README, times parsing with
+MarkdownParser against a DocumentCache memory hit, a disk hit (reading the
+file and loading the serialized document) and loading from bytes alone,
+and compares the serialized size with the Markdown.
+
+Run with: python benchmarks/bench_doccache.py
+"""
+
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+# Add src to path for development
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mdsvg.doccache import DocumentCache, dump_document, load_document
+from mdsvg.parser import MarkdownParser
+
+ROOT = Path(__file__).parent.parent
+REPEAT = 5
+NUMBER = 20
+
+
+def best(func) -> float:
+    """Get the best time per call of func, in microseconds."""
+    return min(timeit.repeat(func, number=NUMBER, repeat=REPEAT)) / NUMBER * 1e6
+
+
+def main() -> None:
+    """Compare parsing with each cache tier on the example documents."""
+    paths = sorted((ROOT / "examples").glob("*.md")) + [ROOT / "README.md"]
+    parser = MarkdownParser()
+    print(
+        f"{'document':<18} {'text':>8} {'binary':>8} {'parse':>9} {'memory':>9} "
+        f"{'disk':>9} {'load':>9} {'speedup':>8}"
+    )
+    print(f"{'':<18} {'bytes':>8} {'bytes':>8} {'us':>9} {'us':>9} {'us':>9} {'us':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for path in paths:
+            text = path.read_text(encoding="utf-8")
+            data = dump_document(parser.parse(text))
+
+            memory = DocumentCache()
+            memory.parse(text, parser)
+            disk = DocumentCache(maxsize=0, directory=directory)
+            disk.parse(text, parser)
+
+            parse_time = best(lambda text=text: parser.parse(text))
+            memory_time = best(lambda text=text, cache=memory: cache.parse(text, parser))
+            disk_time = best(lambda text=text, cache=disk: cache.parse(text, parser))
+            load_time = best(lambda data=data: load_document(data))
+            print(
+                f"{path.name:<18} {len(text.encode()):8d} {len(data):8d} {parse_time:9.1f} "
+                f"{memory_time:9.1f} {disk_time:9.1f} {load_time:9.1f} "
+                f"{parse_time / disk_time:7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
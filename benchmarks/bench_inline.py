@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark inline parsing on long paragraphs.
+
+Times MarkdownParser._parse_inline on paragraphs from 1 KB to 64 KB, next to
+the previous approach of searching all six inline patterns on every step and
+slicing off the consumed text. Cost per KB stays flat for a linear parser
+and grows with paragraph length for a quadratic one. An ordinary document,
+short paragraphs of mostly plain prose, checks that the common case didn't
+get slower.
+
+Run with: python benchmarks/bench_inline.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# Add src to path for development
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mdsvg.parser import MarkdownParser
+
+SENTENCE = "Plain words with **bold**, *italic*, `code` and a [link](https://example.com). "
+PLAIN_SENTENCE = "Most paragraphs in a typical document are plain prose like this one. "
+SIZES_KB = (1, 4, 16, 64)
+REPEAT = 3
+
+
+def six_pass_inline(text: str) -> int:
+    """The previous algorithm's scanning work: six searches per token, then slice."""
+    patterns = (
+        MarkdownParser.INLINE_CODE,
+        MarkdownParser.IMAGE,
+        MarkdownParser.LINK,
+        MarkdownParser.BOLD_ITALIC,
+        MarkdownParser.BOLD,
+        MarkdownParser.ITALIC,
+    )
+    tokens = 0
+    remaining = text
+    while remaining:
+        matches = [m for m in (pattern.search(remaining) for pattern in patterns) if m]
+        if not matches:
+            break
+        earliest = min(matches, key=lambda m: m.start())
+        tokens += 1
+        remaining = remaining[earliest.end() :]
+    return tokens
+
+
+def bench(label: str, func, kb: int) -> float:
+    """Time func and print the best cost per call and per KB."""
+    number = max(1, 64 // kb)
+    best = min(timeit.repeat(func, number=number, repeat=REPEAT)) / number
+    print(f"  {label:<20} {best * 1e3:9.2f} ms  {best * 1e3 / kb:7.3f} ms/KB")
+    return best
+
+
+def main() -> None:
+    """Show how inline parsing cost scales with paragraph length."""
+    parser = MarkdownParser()
+    for kb in SIZES_KB:
+        text = (SENTENCE * (kb * 1024 // len(SENTENCE) + 1))[: kb * 1024]
+        print(f"{kb} KB paragraph:")
+        single = bench("single pass", lambda text=text: parser._parse_inline(text), kb)
+        previous = bench("six searches", lambda text=text: six_pass_inline(text), kb)
+        print(f"  speedup: {previous / single:.1f}x")
+
+    # 500 paragraphs of four sentences, one sentence in eight formatted
+    sentences = [PLAIN_SENTENCE] * 7 + [SENTENCE]
+    paragraphs = [
+        "".join(sentences[(i * 4 + j) % len(sentences)] for j in range(4)).strip()
+        for i in range(500)
+    ]
+    kb = max(1, sum(map(len, paragraphs)) // 1024)
+    print(f"Ordinary document ({len(paragraphs)} paragraphs, {kb} KB):")
+    single = bench("single pass", lambda: [parser._parse_inline(text) for text in paragraphs], kb)
+    previous = bench("six searches", lambda: [six_pass_inline(text) for text in paragraphs], kb)
+    print(f"  speedup: {previous / single:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cost of kerning-aware measurement against plain advance sums.
+
+Run with: python benchmarks/bench_kerning.py [font_path]
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# Add src to path for development
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mdsvg.fonts import FontMeasurer, get_system_font
+
+HEADINGS = [
+    "Quarterly Revenue Overview",
+    "AVAWAY: Typography, Kerning & Tracking",
+    "Why We Moved To A Faster Layout Engine",
+    "Yearly Targets vs. Actual Volume",
+    "Frequently Asked Questions",
+]
+WORDS = " ".join(HEADINGS).split()
+REPEAT = 5
+
+
+def bench(label: str, func, number: int) -> float:
+    """Time func and print the best per-call cost in microseconds."""
+    best = min(timeit.repeat(func, number=number, repeat=REPEAT)) / number
+    print(f"  {label:<28} {best * 1e6:8.2f} us")
+    return best
+
+
+def main() -> None:
+    """Compare measure() with and without kerning."""
+    font_path = sys.argv[1] if len(sys.argv) > 1 else get_system_font()
+    if not font_path:
+        sys.exit("No font found; pass a font path")
+
+    measurer = FontMeasurer(font_path)
+    if not measurer.is_available:
+        sys.exit(f"Can't load {font_path}; is fonttools installed?")
+    kerning = measurer.kerning
+    print(f"Font: {font_path} ({len(kerning)} kerning pairs)")
+
+    for name, texts in (("headings", HEADINGS), ("words", WORDS)):
+        number = 20000 // len(texts)
+        print(f"{name} ({len(texts)} strings per call):")
+        plain = bench(
+            "advances only",
+            lambda texts=texts: [measurer.measure(text, 16) for text in texts],
+            number,
+        )
+        kerned = bench(
+            "advances + kerning",
+            lambda texts=texts: [measurer.measure(text, 16, kerning=True) for text in texts],
+            number,
+        )
+        print(f"  kerning overhead: {kerned / plain:.2f}x")
+
+    drift = [
+        measurer.measure(text, 32, kerning=True) - measurer.measure(text, 32) for text in HEADINGS
+    ]
+    print(f"Width change from kerning at 32px: {min(drift):.1f} to {max(drift):.1f} px")
+
+
+if __name__ == "__main__":
+    main()
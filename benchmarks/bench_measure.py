@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark measure() against rendering.
+
+For each file in examples/ and for the README, times SVGRenderer.measure()
+against render_content() at a few widths, after a warm-up so that font
+loading and the width cache don't count. Both report the same height;
+measure() only computes line breaks and block heights.
+
+Run with: python benchmarks/bench_measure.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# Add src to path for development
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mdsvg.parser import MarkdownParser
+from mdsvg.renderer import SVGRenderer
+
+ROOT = Path(__file__).parent.parent
+WIDTHS = (300, 800)
+REPEAT = 5
+NUMBER = 10
+
+
+def best(func) -> float:
+    """Get the best time per call of func, in microseconds."""
+    return min(timeit.repeat(func, number=NUMBER, repeat=REPEAT)) / NUMBER * 1e6
+
+
+def main() -> None:
+    """Compare measure() with render_content() on the example documents."""
+    paths = sorted((ROOT / "examples").glob("*.md")) + [ROOT / "README.md"]
+    parser = MarkdownParser()
+    renderer = SVGRenderer()
+    print(f"{'document':<18} {'width':>6} {'render':>10} {'measure':>10} {'speedup':>8}")
+    print(f"{'':<18} {'px':>6} {'us':>10} {'us':>10}")
+    for path in paths:
+        blocks = parser.parse(path.read_text(encoding="utf-8"))
+        for width in WIDTHS:
+            size = renderer.measure(blocks, width=width, padding=20)
+            result = renderer.render_content(blocks, width=width, padding=20)
+            assert size.height == result.height
+
+            render_time = best(lambda w=width, b=blocks: renderer.render_content(b, w, 20))
+            measure_time = best(lambda w=width, b=blocks: renderer.measure(b, w, 20))
+            print(
+                f"{path.name:<18} {width:6d} {render_time:10.1f} {measure_time:10.1f} "
+                f"{render_time / measure_time:7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
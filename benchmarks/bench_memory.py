@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory held by parsed documents.
+
+Parses a set of template-like documents and measures the bytes allocated
+for the retained ASTs with tracemalloc, per block. For comparison, the
+same trees are rebuilt the way they were stored before the AST was
+slotted: every node a __dict__-backed dataclass instance, and no spans or
+cells shared between occurrences.
+
+Run with: python benchmarks/bench_memory.py
+"""
+
+import gc
+import sys
+import tracemalloc
+from dataclasses import fields, is_dataclass, make_dataclass
+from pathlib import Path
+
+# Add src to path for development
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mdsvg import parse
+
+README = Path(__file__).parent.parent / "README.md"
+TEMPLATE = """# Invoice {n}
+
+Thank you for your order, **customer {n}**. Items are listed below.
+
+| Item | Qty | Shipped | Notes |
+|------|----:|:-------:|-------|
+| Widget | 2 | Yes | N/A |
+| Gadget | 1 | No | Back-ordered |
+| Cable | 4 | Yes | N/A |
+| Manual | 1 | Yes | - |
+
+- Status: *pending*
+- Payment: *received*
+- Contact: [support](https://example.com/support)
+
+---
+
+Questions? Reply to this email.
+"""
+TEMPLATES = 2000
+
+_plain_classes: dict = {}
+
+
+def plain_copy(node):
+    """Rebuild an AST as __dict__-backed dataclasses with no shared nodes or text."""
+    if isinstance(node, (list, tuple)):
+        return type(node)(plain_copy(item) for item in node)
+    if isinstance(node, str):
+        # A fresh string per occurrence, as the parser used to produce
+        return node.encode().decode()
+    if not is_dataclass(node):
+        return node
+    cls = type(node)
+    plain = _plain_classes.get(cls)
+    if plain is None:
+        plain = make_dataclass(cls.__name__, [f.name for f in fields(cls)], frozen=True)
+        _plain_classes[cls] = plain
+    copy = object.__new__(plain)
+    for f in fields(cls):
+        object.__setattr__(copy, f.name, plain_copy(getattr(node, f.name)))
+    return copy
+
+
+def measure(build) -> tuple:
+    """Get the bytes still allocated after build() returns, and its result."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def report(name: str, sources: list) -> None:
+    """Print bytes per block for the plain and slotted, shared representations."""
+    size, documents = measure(lambda: [list(parse(source)) for source in sources])
+    blocks = sum(len(document) for document in documents)
+    plain_size, _ = measure(lambda: [plain_copy(document) for document in documents])
+    print(f"{name} ({len(sources)} documents, {blocks} blocks):")
+    print(f"  dict, unshared     {plain_size / blocks:9.0f} bytes/block")
+    print(f"  slotted, interned  {size / blocks:9.0f} bytes/block")
+    print(f"  saving: {1 - size / plain_size:.0%}")
+
+
+def main() -> None:
+    """Measure parsed templates and a large prose document."""
+    report("templates", [TEMPLATE.format(n=n) for n in range(TEMPLATES)])
+    report("README x 20", [README.read_text(encoding="utf-8") * 20])
+
+
+if __name__ == "__main__":
+    main()
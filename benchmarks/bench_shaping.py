@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark HarfBuzz shaping against plain advance sums.
+
+Compares FontMeasurer with HarfBuzzMeasurer with a cold shaped-run cache
+(every run shaped) and a warm one (every run a cache hit), and shows how far
+the two disagree on text that needs shaping.
+
+Run with: python benchmarks/bench_shaping.py [font_path]
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# Add src to path for development
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mdsvg.fonts import FontMeasurer, get_system_font
+from mdsvg.measure import WidthCache
+from mdsvg.shaping import HarfBuzzMeasurer
+
+SAMPLES = {
+    "latin": "The office affiliate shuffled the final AVAWAY typography proofs",
+    "arabic": "مرحبا بالعالم، هذه فقرة قصيرة لاختبار تشكيل النص العربي",
+    "devanagari": "नमस्ते दुनिया, यह पाठ आकार देने की जाँच के लिए है",
+}
+REPEAT = 5
+
+
+def bench(label: str, func, number: int) -> float:
+    """Time func and print the best per-call cost in microseconds."""
+    best = min(timeit.repeat(func, number=number, repeat=REPEAT)) / number
+    print(f"  {label:<28} {best * 1e6:8.2f} us")
+    return best
+
+
+def main() -> None:
+    """Compare per-word measurement cost and widths for each sample script."""
+    font_path = sys.argv[1] if len(sys.argv) > 1 else get_system_font()
+    if not font_path:
+        sys.exit("No font found; pass a font path")
+
+    plain = FontMeasurer(font_path)
+    if not plain.is_available:
+        sys.exit(f"Can't load {font_path}; is fonttools installed?")
+    cold_cache = WidthCache(maxsize=0)  # Counts misses but never stores: always shapes
+    cold = HarfBuzzMeasurer(font_path, cache=cold_cache)
+    warm = HarfBuzzMeasurer(font_path, cache=WidthCache())
+    if not cold.is_available:
+        sys.exit("uharfbuzz is not installed: pip install uharfbuzz")
+    print(f"Font: {font_path}")
+
+    for name, text in SAMPLES.items():
+        words = text.split()
+        number = 20000 // len(words)
+        print(f"{name} ({len(words)} words per call):")
+        base = bench(
+            "FontMeasurer",
+            lambda words=words: [plain.measure(word, 16) for word in words],
+            number,
+        )
+        shaped = bench(
+            "HarfBuzz, cold cache",
+            lambda words=words: [cold.measure(word, 16) for word in words],
+            number,
+        )
+        cached = bench(
+            "HarfBuzz, warm cache",
+            lambda words=words: [warm.measure(word, 16) for word in words],
+            number,
+        )
+        print(f"  shaping cost: {shaped / base:.1f}x uncached, {cached / base:.1f}x cached")
+        difference = warm.measure(text, 16) - plain.measure(text, 16)
+        print(f"  shaped minus summed width of the line at 16px: {difference:+.1f} px")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,13 +15,13 @@ import json
 import sys
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 from pathlib import Path
-from typing import Any
+from typing import Any, Tuple
 from urllib.parse import urlparse
 
 # Add src to path for development
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from mdsvg import Style, render
+from mdsvg import Document, Style, TextEdit, parse, render_blocks, reparse
 
 PLAYGROUND_DIR = Path(__file__).parent
 ROOT_DIR = PLAYGROUND_DIR.parent
@@ -81,6 +81,20 @@ def build_style(data: dict[str, Any]) -> Style:
     return Style(**style_kwargs)
 
 
+# The last text rendered and its document, so a keystroke only re-parses the
+# blocks it touched
+_last_parsed: Tuple[str, Document] = ("", parse("", incremental=True))
+
+
+def parse_incremental(markdown: str) -> Document:
+    """Parse markdown, reusing the blocks unchanged since the previous request."""
+    global _last_parsed
+    old_text, old_document = _last_parsed
+    document = reparse(old_document, old_text, TextEdit.between(old_text, markdown))
+    _last_parsed = (markdown, document)
+    return document
+
+
 def list_examples() -> list[dict[str, str]]:
     """List all example markdown files."""
     examples = []
@@ -149,8 +163,8 @@ class PlaygroundHandler(SimpleHTTPRequestHandler):
 
                 style = build_style(data)
 
-                svg = render(
-                    markdown,
+                svg = render_blocks(
+                    parse_incremental(markdown),
                     width=width,
                     padding=padding,
                     style=style,
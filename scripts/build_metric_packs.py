@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Regenerate the metric packs bundled in src/mdsvg/metrics.
+
+Each pack in mdsvg.metricpacks.METRIC_PACKS is extracted from the font file
+named in FONT_FILES, looked up in the font directories given on the command
+line (or the standard font directories).
+
+Run with: python scripts/build_metric_packs.py [font_dir ...]
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add src to path for development
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mdsvg.fontindex import get_font_directories
+from mdsvg.metricpacks import METRIC_PACKS, write_metric_pack
+
+OUTPUT_DIR = Path(__file__).parent.parent / "src" / "mdsvg" / "metrics"
+
+# Font file for each pack file stem
+FONT_FILES = {
+    "dejavu-sans": "DejaVuSans.ttf",
+    "dejavu-sans-bold": "DejaVuSans-Bold.ttf",
+    "dejavu-serif": "DejaVuSerif.ttf",
+    "dejavu-serif-bold": "DejaVuSerif-Bold.ttf",
+    "dejavu-sans-mono": "DejaVuSansMono.ttf",
+    "dejavu-sans-mono-bold": "DejaVuSansMono-Bold.ttf",
+}
+
+
+def find_font(file_name: str, directories: list) -> str:
+    """Find a font file by name anywhere under the given directories."""
+    for directory in directories:
+        for root, _dirs, files in os.walk(directory):
+            if file_name in files:
+                return os.path.join(root, file_name)
+    return ""
+
+
+def main() -> None:
+    """Write every pack whose font file can be found."""
+    directories = sys.argv[1:] or get_font_directories()
+    stems = [
+        stem
+        for pack in METRIC_PACKS
+        for stem in (pack.regular, pack.bold, pack.italic, pack.bold_italic)
+        if stem
+    ]
+    missing = []
+    for stem in stems:
+        font_path = find_font(FONT_FILES[stem], directories)
+        if not font_path:
+            missing.append(FONT_FILES[stem])
+            continue
+        for path in write_metric_pack(font_path, str(OUTPUT_DIR), stem):
+            print(f"Wrote {os.path.relpath(path)} ({os.path.getsize(path):,} bytes)")
+    if missing:
+        sys.exit(f"Fonts not found: {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    main()
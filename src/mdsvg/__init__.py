@@ -26,15 +26,29 @@ Get structured result for composing into larger SVGs:
     >>> result.to_svg() # Full SVG with wrapper
 """
 
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
 # Precise text measurement
 from .fonts import (
+    FallbackMeasurer,
+    FontFamilyMeasurer,
     FontMeasurer,
+    FontRegistry,
+    FontRegistryStats,
+    KerningTable,
+    TextMeasurer,
+    calibrate_char_widths,
     calibrate_heuristic,
     create_precise_wrapper,
     download_google_font,
     get_font_cache_dir,
+    get_font_registry,
+    get_measurer,
+    get_metrics_cache_dir,
     get_system_font,
     list_cached_fonts,
+    warmup,
 )
 from .images import (
     ImageSize,
@@ -43,9 +57,42 @@ from .images import (
     create_prefix_mapper,
     get_image_size,
 )
-from .measure import Size, TextMetrics, estimate_text_width, measure_spans, wrap_text
-from .parser import MarkdownParser, parse
-from .renderer import RenderResult, SVGRenderer, measure, render, render_blocks, render_content
+
+# Positioned layout tree
+from .layout import LayoutBox, LayoutLine, LayoutRun, LayoutTree
+from .measure import (
+    CharWidthTable,
+    Size,
+    TextMetrics,
+    WidthCache,
+    WidthCacheInfo,
+    estimate_text_width,
+    get_default_width_cache,
+    heuristic_table,
+    measure_spans,
+    wrap_text,
+)
+from .parser import (
+    MarkdownParser,
+    ParserBackend,
+    TextEdit,
+    get_document_cache,
+    get_parser_backend,
+    parse,
+    parse_iter,
+    reparse,
+    set_document_cache,
+    set_parser_backend,
+)
+from .renderer import (
+    RenderResult,
+    SVGRenderer,
+    layout,
+    measure,
+    render,
+    render_blocks,
+    render_content,
+)
 from .style import (
     COMPACT_PRESET,
     DARK_THEME,
@@ -72,6 +119,9 @@ from .types import (
     ListItem,
     OrderedList,
     Paragraph,
+    ParsedDocument,
+    SourceMap,
+    SourcePosition,
     Span,
     SpanType,
     Table,
@@ -80,6 +130,62 @@ from .types import (
     UnorderedList,
 )
 
+if TYPE_CHECKING:
+    from .backends import MarkdownItBackend, MistuneBackend
+    from .doccache import DocumentCache, DocumentCacheInfo, get_document_cache_dir
+    from .fontindex import FontFace, FontIndex, get_font_index, resolve_font_family
+    from .metricpacks import MetricPack, PackMeasurer, get_pack_measurer
+    from .shaping import HarfBuzzMeasurer, get_shaped_run_cache
+    from .sharedmetrics import (
+        SharedMetrics,
+        SharedMetricsHandle,
+        attach_shared_metrics,
+        publish_shared_metrics,
+    )
+
+# Optional subsystems are imported on first access, so `import mdsvg` only
+# loads what parsing, measuring and rendering need
+_LAZY_IMPORTS = {
+    # Parser backends (need markdown-it-py or mistune)
+    "MarkdownItBackend": "backends",
+    "MistuneBackend": "backends",
+    # Parsed document cache
+    "DocumentCache": "doccache",
+    "DocumentCacheInfo": "doccache",
+    "get_document_cache_dir": "doccache",
+    # Installed font lookup
+    "FontFace": "fontindex",
+    "FontIndex": "fontindex",
+    "get_font_index": "fontindex",
+    "resolve_font_family": "fontindex",
+    # Bundled font metrics
+    "MetricPack": "metricpacks",
+    "PackMeasurer": "metricpacks",
+    "get_pack_measurer": "metricpacks",
+    # Text shaping (needs uharfbuzz)
+    "HarfBuzzMeasurer": "shaping",
+    "get_shaped_run_cache": "shaping",
+    # Font metrics shared with worker processes
+    "SharedMetrics": "sharedmetrics",
+    "SharedMetricsHandle": "sharedmetrics",
+    "attach_shared_metrics": "sharedmetrics",
+    "publish_shared_metrics": "sharedmetrics",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *_LAZY_IMPORTS})
+
+
 __version__ = "1.0.0"
 
 __all__ = [
@@ -88,12 +194,32 @@ __all__ = [
     "render_content",
     "render_blocks",
     "measure",
+    "layout",
     "parse",
+    "parse_iter",
+    "reparse",
     # Classes
     "Style",
     "RenderResult",
     "MarkdownParser",
     "SVGRenderer",
+    # Layout tree
+    "LayoutTree",
+    "LayoutBox",
+    "LayoutLine",
+    "LayoutRun",
+    # Parser backends
+    "ParserBackend",
+    "MarkdownItBackend",
+    "MistuneBackend",
+    "get_parser_backend",
+    "set_parser_backend",
+    # Parsed document cache
+    "DocumentCache",
+    "DocumentCacheInfo",
+    "get_document_cache",
+    "set_document_cache",
+    "get_document_cache_dir",
     # Themes
     "LIGHT_THEME",
     "DARK_THEME",
@@ -111,6 +237,10 @@ __all__ = [
     "Size",
     "TextMetrics",
     "Document",
+    "ParsedDocument",
+    "SourceMap",
+    "SourcePosition",
+    "TextEdit",
     "AnyBlock",
     "Block",
     "BlockType",
@@ -130,16 +260,49 @@ __all__ = [
     "ImageBlock",
     # Utilities
     "estimate_text_width",
+    "heuristic_table",
+    "CharWidthTable",
     "wrap_text",
     "measure_spans",
+    "WidthCache",
+    "WidthCacheInfo",
+    "get_default_width_cache",
     # Precise text measurement
     "FontMeasurer",
+    "FontFamilyMeasurer",
+    "FallbackMeasurer",
+    "KerningTable",
+    "TextMeasurer",
+    "FontRegistry",
+    "FontRegistryStats",
+    "get_font_registry",
+    "get_measurer",
     "get_system_font",
     "create_precise_wrapper",
     "calibrate_heuristic",
+    "calibrate_char_widths",
     "download_google_font",
     "get_font_cache_dir",
+    "get_metrics_cache_dir",
     "list_cached_fonts",
+    "warmup",
+    # Installed font lookup
+    "FontFace",
+    "FontIndex",
+    "get_font_index",
+    "resolve_font_family",
+    # Bundled font metrics
+    "MetricPack",
+    "PackMeasurer",
+    "get_pack_measurer",
+    # Font metrics shared with worker processes
+    "SharedMetrics",
+    "SharedMetricsHandle",
+    "publish_shared_metrics",
+    "attach_shared_metrics",
+    # Text shaping
+    "HarfBuzzMeasurer",
+    "get_shaped_run_cache",
     # Image utilities
     "ImageSize",
     "ImageUrlMapper",
@@ -0,0 +1,553 @@
+"""Parse Markdown with a third-party parser, for CommonMark compatibility.
+
+MarkdownParser is a small regex parser with no dependencies. It doesn't
+follow CommonMark in every detail, and it drops nested lists. A parser
+backend is a compatibility adapter: it parses with a spec-compliant library
+instead, and converts that
+library's token stream straight into the nodes in mdsvg.types, so the
+renderer sees the same Paragraph, Heading, Table and Span objects. Nested
+lists come through as ListItem.nested_list.
+
+## Basic Usage
+
+    from mdsvg import parse, render, set_parser_backend
+    from mdsvg.backends import MarkdownItBackend
+
+    doc = parse(text, backend=MarkdownItBackend())
+
+    set_parser_backend(MarkdownItBackend())  # parse() and render() use it from now on
+    svg = render(text)
+
+Install markdown-it-py with `pip install markdown-svg[markdown-it]`, or
+mistune with `pip install markdown-svg[mistune]`.
+
+Use a backend for its syntax support, not for speed. Both libraries are
+pure Python and parse 3-5x more slowly than MarkdownParser, which stays the
+default; benchmarks/bench_backends.py shows what a backend costs.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .parser import PARSER_VERSION, MarkdownParser, _block_positions, _image_size, _plain_span
+from .types import (
+    AnyBlock,
+    Blockquote,
+    CodeBlock,
+    Heading,
+    HorizontalRule,
+    ImageBlock,
+    ListItem,
+    OrderedList,
+    Paragraph,
+    ParsedDocument,
+    SourceMap,
+    Span,
+    SpanType,
+    Table,
+    TableCell,
+    TableRow,
+    UnorderedList,
+)
+from .utils import split_lines
+
+# {width=X height=Y} after a standalone image, which CommonMark parsers leave as text
+_IMAGE_ATTRS = re.compile(r"\s*\{([^}]+)\}\s*")
+# Runs of whitespace in text are collapsed, as MarkdownParser does
+_WHITESPACE = re.compile(r"\s{2,}")
+
+_STYLES = {
+    (False, False): SpanType.TEXT,
+    (True, False): SpanType.BOLD,
+    (False, True): SpanType.ITALIC,
+    (True, True): SpanType.BOLD_ITALIC,
+}
+
+
+class _SpanBuilder:
+    """Collects inline text into spans, merging adjacent text of the same style."""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self.bold = 0
+        self.italic = 0
+        self._parts: List[str] = []
+        self._type = SpanType.TEXT
+        self._link: Optional[Tuple[str, Optional[str], List[str]]] = None
+
+    def text(self, text: str) -> None:
+        """Add text in the current style (or to the open link)."""
+        if self._link is not None:
+            self._link[2].append(text)
+            return
+        span_type = _STYLES[self.bold > 0, self.italic > 0]
+        if span_type is not self._type:
+            self._flush()
+            self._type = span_type
+        self._parts.append(text)
+
+    def add(self, span: Span) -> None:
+        """Add a finished span."""
+        self._flush()
+        self.spans.append(span)
+
+    def code(self, code: str) -> None:
+        """Add inline code."""
+        if self._link is not None:
+            self._link[2].append(code)
+        else:
+            self.add(Span(text=code, span_type=SpanType.CODE))
+
+    def image(self, url: str, alt: str, title: Optional[str]) -> None:
+        """Add an inline image; inside a link, only its alt text is kept."""
+        if self._link is not None or not url:
+            self.text(alt)
+        else:
+            self.add(Span(text=alt or url, span_type=SpanType.IMAGE, url=url, title=title))
+
+    def open_link(self, url: str, title: Optional[str]) -> None:
+        """Start collecting the text of a link."""
+        self._flush()
+        self._link = (url, title, [])
+
+    def close_link(self) -> None:
+        """Finish the open link; links without a URL become plain text."""
+        if self._link is None:
+            return
+        url, title, parts = self._link
+        self._link = None
+        text = "".join(parts)
+        if url and text:
+            self.add(Span(text=text, span_type=SpanType.LINK, url=url, title=title))
+        else:
+            self.text(text)
+
+    def build(self) -> Tuple[Span, ...]:
+        """Get the spans collected so far."""
+        self.close_link()
+        self._flush()
+        return tuple(self.spans)
+
+    def _flush(self) -> None:
+        text = _WHITESPACE.sub(" ", "".join(self._parts))
+        self._parts.clear()
+        if text:
+            span_type = self._type
+            self.spans.append(
+                _plain_span(text) if span_type is SpanType.TEXT else Span(text, span_type)
+            )
+
+
+def _image_block(url: str, alt: str, title: Optional[str], rest: str) -> Optional[ImageBlock]:
+    """Make an ImageBlock for a paragraph holding only an image and its attributes."""
+    width = height = None
+    if rest.strip():
+        match = _IMAGE_ATTRS.fullmatch(rest)
+        if match is None:
+            return None
+        width, height = _image_size(match.group(1), MarkdownParser.IMAGE_ATTR)
+    if not url:
+        return None
+    return ImageBlock(url=url, alt=alt, title=title or None, width=width, height=height)
+
+
+def _list_item(blocks: Sequence[AnyBlock]) -> ListItem:
+    """Flatten a list item's blocks into its text and its first nested list."""
+    spans: List[Span] = []
+    nested_list = None
+    for block in blocks:
+        if isinstance(block, (UnorderedList, OrderedList)):
+            nested_list = nested_list or block
+        elif isinstance(block, (Paragraph, Heading)):
+            if spans and block.spans:
+                spans.append(_plain_span(" "))
+            spans.extend(block.spans)
+        elif isinstance(block, CodeBlock):
+            if spans:
+                spans.append(_plain_span(" "))
+            spans.append(Span(text=block.code, span_type=SpanType.CODE))
+    return ListItem(spans=tuple(spans), nested_list=nested_list)
+
+
+def _table(rows: List[Tuple[List[Tuple[Span, ...]], List[Optional[str]]]]) -> Table:
+    """Make a Table from (cell spans, cell alignments) rows, the header first."""
+    header_spans, alignments = rows[0]
+
+    def row(cells: List[Tuple[Span, ...]], is_header: bool) -> TableRow:
+        return TableRow(
+            cells=tuple(
+                TableCell(
+                    spans=spans,
+                    is_header=is_header,
+                    align=alignments[idx] if idx < len(alignments) else None,
+                )
+                for idx, spans in enumerate(cells)
+            )
+        )
+
+    return Table(
+        header=row(header_spans, True),
+        rows=tuple(row(cells, False) for cells, _ in rows[1:]),
+        alignments=tuple(alignments),
+    )
+
+
+class MarkdownItBackend:
+    """
+    Parse with markdown-it-py, a CommonMark-compliant parser.
+
+    Uses the CommonMark rules plus GitHub-style tables. markdown-it-py
+    produces a flat stream of open, close and inline tokens, which is read
+    once, front to back, into mdsvg nodes. It reports each block's source
+    lines, so parse(text, source_map=True) works with this backend.
+
+    Example:
+        >>> doc = parse("- item\\n  - nested", backend=MarkdownItBackend())
+        >>> doc[0].items[0].nested_list.items[0].spans[0].text
+        'nested'
+    """
+
+    def __init__(self) -> None:
+        self._md: Any = None
+
+    def _load(self) -> Any:
+        """Create the markdown-it parser on first use."""
+        if self._md is None:
+            from markdown_it import MarkdownIt
+
+            self._md = MarkdownIt("commonmark").enable("table")
+        return self._md
+
+    @property
+    def cache_key(self) -> str:
+        """Identify this backend's output for DocumentCache: library and parser versions."""
+        import markdown_it
+
+        return f"markdown-it-py/{markdown_it.__version__}/{PARSER_VERSION}"
+
+    @property
+    def is_available(self) -> bool:
+        """Check if markdown-it-py is installed."""
+        try:
+            self._load()
+        except ImportError:
+            return False
+        return True
+
+    def parse(self, text: str, source_map: bool = False) -> ParsedDocument:
+        """
+        Parse Markdown text into a document AST.
+
+        Args:
+            text: Markdown text to parse.
+            source_map: Also record the line and character positions of each
+                block, in the document's source_map.
+
+        Returns:
+            List of Block objects representing the document.
+
+        Raises:
+            ImportError: If markdown-it-py is not installed.
+        """
+        return self._document(self._load().parse(text), text, source_map)
+
+    def _document(self, tokens: List[Any], text: str, source_map: bool) -> ParsedDocument:
+        """Convert the token stream of text to a document."""
+        blocks: List[AnyBlock] = []
+        ranges: List[Tuple[int, int]] = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            block, i = self._block(tokens, i)
+            if block is not None:
+                blocks.append(block)
+                ranges.append((token.map[0], token.map[1]))
+        document = ParsedDocument(blocks)
+        if source_map:
+            lines = split_lines(text)
+            kinds = MarkdownParser()._classify_lines(lines)
+            document.source_map = SourceMap(_block_positions(text, lines, kinds, ranges))
+        return document
+
+    def _blocks(self, tokens: List[Any], i: int, close: str) -> Tuple[List[AnyBlock], int]:
+        """Read blocks up to the close token; returns them and the index after it."""
+        blocks: List[AnyBlock] = []
+        while tokens[i].type != close:
+            block, i = self._block(tokens, i)
+            if block is not None:
+                blocks.append(block)
+        return blocks, i + 1
+
+    def _block(self, tokens: List[Any], i: int) -> Tuple[Optional[AnyBlock], int]:
+        """Read the block starting at tokens[i]; returns it and the index after it."""
+        token = tokens[i]
+        kind = token.type
+        if kind == "paragraph_open":
+            return self._paragraph(tokens[i + 1].children or []), i + 3
+        if kind == "heading_open":
+            spans = self._spans(tokens[i + 1].children or [])
+            return Heading(level=int(token.tag[1]), spans=spans), i + 3
+        if kind in ("fence", "code_block"):
+            language = token.info.split()[0] if token.info.strip() else None
+            return CodeBlock(code=token.content.rstrip("\n"), language=language), i + 1
+        if kind == "hr":
+            return HorizontalRule(), i + 1
+        if kind == "blockquote_open":
+            blocks, i = self._blocks(tokens, i + 1, "blockquote_close")
+            return Blockquote(blocks=tuple(blocks)), i
+        if kind in ("bullet_list_open", "ordered_list_open"):
+            return self._list(tokens, i)
+        if kind == "table_open":
+            return self._table(tokens, i)
+        if kind == "html_block" and token.content.strip():
+            return Paragraph(spans=(_plain_span(token.content.strip()),)), i + 1
+        return None, i + 1
+
+    def _paragraph(self, children: List[Any]) -> AnyBlock:
+        """Make a paragraph, or an ImageBlock if it holds only an image."""
+        if children and children[0].type == "image":
+            rest = children[1:]
+            if all(child.type == "text" for child in rest):
+                image = children[0]
+                block = _image_block(
+                    image.attrGet("src") or "",
+                    image.content,
+                    image.attrGet("title"),
+                    "".join(child.content for child in rest),
+                )
+                if block is not None:
+                    return block
+        return Paragraph(spans=self._spans(children))
+
+    def _list(self, tokens: List[Any], i: int) -> Tuple[AnyBlock, int]:
+        """Read a list and its items."""
+        ordered = tokens[i].type == "ordered_list_open"
+        start = int(tokens[i].attrGet("start") or 1)
+        close = "ordered_list_close" if ordered else "bullet_list_close"
+        items: List[ListItem] = []
+        i += 1
+        while tokens[i].type != close:
+            blocks, i = self._blocks(tokens, i + 1, "list_item_close")
+            items.append(_list_item(blocks))
+        if ordered:
+            return OrderedList(items=tuple(items), start=start), i + 1
+        return UnorderedList(items=tuple(items)), i + 1
+
+    def _table(self, tokens: List[Any], i: int) -> Tuple[AnyBlock, int]:
+        """Read a table's rows."""
+        rows: List[Tuple[List[Tuple[Span, ...]], List[Optional[str]]]] = []
+        i += 1
+        while tokens[i].type != "table_close":
+            if tokens[i].type == "tr_open":
+                cells: List[Tuple[Span, ...]] = []
+                alignments: List[Optional[str]] = []
+                i += 1
+                while tokens[i].type != "tr_close":
+                    style = tokens[i].attrGet("style") or ""
+                    alignments.append(style.partition("text-align:")[2] or None)
+                    cells.append(self._spans(tokens[i + 1].children or []))
+                    i += 3
+                rows.append((cells, alignments))
+            i += 1
+        return _table(rows), i + 1
+
+    def _spans(self, children: List[Any]) -> Tuple[Span, ...]:
+        """Convert an inline token's children to spans."""
+        if len(children) == 1 and children[0].type == "text":
+            # Plain text, the usual case for table cells and list items
+            text = _WHITESPACE.sub(" ", children[0].content)
+            return (_plain_span(text),) if text else ()
+        spans = _SpanBuilder()
+        for child in children:
+            kind = child.type
+            if kind in ("text", "html_inline"):
+                spans.text(child.content)
+            elif kind in ("softbreak", "hardbreak"):
+                spans.text(" ")
+            elif kind == "strong_open":
+                spans.bold += 1
+            elif kind == "strong_close":
+                spans.bold -= 1
+            elif kind == "em_open":
+                spans.italic += 1
+            elif kind == "em_close":
+                spans.italic -= 1
+            elif kind == "code_inline":
+                spans.code(child.content)
+            elif kind == "link_open":
+                spans.open_link(child.attrGet("href") or "", child.attrGet("title"))
+            elif kind == "link_close":
+                spans.close_link()
+            elif kind == "image":
+                spans.image(child.attrGet("src") or "", child.content, child.attrGet("title"))
+        return spans.build()
+
+
+class MistuneBackend:
+    """
+    Parse with mistune 3, a fast CommonMark-style parser.
+
+    Tables are enabled. mistune produces a token list of plain dicts, which
+    is converted into mdsvg nodes. It doesn't report source lines, so
+    source_map=True is not supported.
+
+    Example:
+        >>> doc = parse("1. one\\n   1. nested", backend=MistuneBackend())
+        >>> doc[0].items[0].nested_list.items[0].spans[0].text
+        'nested'
+    """
+
+    def __init__(self) -> None:
+        self._md: Any = None
+
+    def _load(self) -> Any:
+        """Create the mistune parser on first use."""
+        if self._md is None:
+            import mistune
+
+            self._md = mistune.create_markdown(renderer=None, plugins=["table"])
+        return self._md
+
+    @property
+    def cache_key(self) -> str:
+        """Identify this backend's output for DocumentCache: library and parser versions."""
+        import mistune
+
+        return f"mistune/{mistune.__version__}/{PARSER_VERSION}"
+
+    @property
+    def is_available(self) -> bool:
+        """Check if mistune is installed."""
+        try:
+            self._load()
+        except ImportError:
+            return False
+        return True
+
+    def parse(self, text: str, source_map: bool = False) -> ParsedDocument:
+        """
+        Parse Markdown text into a document AST.
+
+        Args:
+            text: Markdown text to parse.
+            source_map: Not supported by this backend.
+
+        Returns:
+            List of Block objects representing the document.
+
+        Raises:
+            ImportError: If mistune is not installed.
+            ValueError: If source_map is requested.
+        """
+        if source_map:
+            raise ValueError("MistuneBackend does not report source positions")
+        return ParsedDocument(self._blocks(self._load()(text)))
+
+    def _blocks(self, tokens: List[Dict[str, Any]]) -> List[AnyBlock]:
+        """Convert block tokens, skipping the ones with no mdsvg equivalent."""
+        blocks = []
+        for token in tokens:
+            block = self._block(token)
+            if block is not None:
+                blocks.append(block)
+        return blocks
+
+    def _block(self, token: Dict[str, Any]) -> Optional[AnyBlock]:
+        """Convert one block token."""
+        kind = token["type"]
+        if kind in ("paragraph", "block_text"):
+            return self._paragraph(token["children"])
+        if kind == "heading":
+            return Heading(level=token["attrs"]["level"], spans=self._spans(token["children"]))
+        if kind == "block_code":
+            info = token.get("attrs", {}).get("info") or ""
+            language = info.split()[0] if info.strip() else None
+            return CodeBlock(code=token["raw"].rstrip("\n"), language=language)
+        if kind == "thematic_break":
+            return HorizontalRule()
+        if kind == "block_quote":
+            return Blockquote(blocks=tuple(self._blocks(token["children"])))
+        if kind == "list":
+            items = tuple(_list_item(self._blocks(item["children"])) for item in token["children"])
+            attrs = token["attrs"]
+            if attrs["ordered"]:
+                return OrderedList(items=items, start=attrs.get("start", 1))
+            return UnorderedList(items=items)
+        if kind == "table":
+            return self._table(token["children"])
+        if kind == "block_html" and token["raw"].strip():
+            return Paragraph(spans=(_plain_span(token["raw"].strip()),))
+        return None
+
+    def _paragraph(self, children: List[Dict[str, Any]]) -> AnyBlock:
+        """Make a paragraph, or an ImageBlock if it holds only an image."""
+        if children and children[0]["type"] == "image":
+            rest = children[1:]
+            if all(child["type"] == "text" for child in rest):
+                image = children[0]
+                block = _image_block(
+                    image["attrs"]["url"],
+                    self._plain_text(image["children"]),
+                    image["attrs"].get("title"),
+                    "".join(child["raw"] for child in rest),
+                )
+                if block is not None:
+                    return block
+        return Paragraph(spans=self._spans(children))
+
+    def _table(self, sections: List[Dict[str, Any]]) -> AnyBlock:
+        """Convert a table's head and body."""
+        rows = []
+        for section in sections:
+            section_rows = [section] if section["type"] == "table_head" else section["children"]
+            for row in section_rows:
+                cells = row["children"]
+                rows.append(
+                    (
+                        [self._spans(cell["children"]) for cell in cells],
+                        [cell["attrs"].get("align") for cell in cells],
+                    )
+                )
+        return _table(rows)
+
+    def _plain_text(self, children: List[Dict[str, Any]]) -> str:
+        """Get the text of inline tokens without their formatting."""
+        return "".join(
+            child.get("raw") or self._plain_text(child.get("children", [])) for child in children
+        )
+
+    def _spans(self, children: List[Dict[str, Any]]) -> Tuple[Span, ...]:
+        """Convert inline tokens to spans."""
+        spans = _SpanBuilder()
+        self._inline(children, spans)
+        return spans.build()
+
+    def _inline(self, children: List[Dict[str, Any]], spans: _SpanBuilder) -> None:
+        """Add inline tokens (and their nested children) to a span builder."""
+        for child in children:
+            kind = child["type"]
+            if kind in ("text", "inline_html"):
+                spans.text(child["raw"])
+            elif kind in ("softbreak", "linebreak"):
+                spans.text(" ")
+            elif kind == "strong":
+                spans.bold += 1
+                self._inline(child["children"], spans)
+                spans.bold -= 1
+            elif kind == "emphasis":
+                spans.italic += 1
+                self._inline(child["children"], spans)
+                spans.italic -= 1
+            elif kind == "codespan":
+                spans.code(child["raw"])
+            elif kind == "link":
+                spans.open_link(child["attrs"]["url"], child["attrs"].get("title"))
+                self._inline(child["children"], spans)
+                spans.close_link()
+            elif kind == "image":
+                attrs = child["attrs"]
+                spans.image(attrs["url"], self._plain_text(child["children"]), attrs.get("title"))
+            elif "children" in child:
+                self._inline(child["children"], spans)
@@ -0,0 +1,689 @@
+"""Index of installed fonts for resolving CSS font stacks to font files.
+
+The index scans the standard font directories once, reads each font's
+family, weight and style, and saves the result to `font-index.json` in the
+mdsvg cache directory. Later processes load that file and only rescan
+directories whose modification time has changed, so resolving a stack like
+`Style.font_family` is a few dict lookups.
+
+## Basic Usage
+
+    from mdsvg.fontindex import get_font_index
+
+    index = get_font_index()
+    face = index.resolve("'Segoe UI', Roboto, sans-serif", weight=700)
+    if face:
+        print(face.path)
+
+    family = index.resolve_family("Inter, sans-serif")  # FontFamilyMeasurer
+"""
+
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .fonts import FontFamilyMeasurer, _get_cache_root, _write_atomic
+
+_INDEX_VERSION = 1
+_INDEX_FILE = "font-index.json"
+_FONT_EXTENSIONS = (".ttf", ".otf", ".ttc", ".otc")
+
+# Concrete families tried, in order, for CSS generic and system font keywords
+_SANS_SERIF = (
+    "SF Pro Text",
+    "SF Pro",
+    "Helvetica Neue",
+    "Segoe UI",
+    "Roboto",
+    "Noto Sans",
+    "Ubuntu",
+    "Cantarell",
+    "DejaVu Sans",
+    "Liberation Sans",
+    "Arial",
+    "Helvetica",
+)
+_SERIF = (
+    "Times New Roman",
+    "Times",
+    "Georgia",
+    "Noto Serif",
+    "DejaVu Serif",
+    "Liberation Serif",
+)
+_MONOSPACE = (
+    "SF Mono",
+    "Menlo",
+    "Consolas",
+    "Cascadia Mono",
+    "Ubuntu Mono",
+    "Noto Sans Mono",
+    "DejaVu Sans Mono",
+    "Liberation Mono",
+    "Courier New",
+)
+_GENERIC_FAMILIES: Dict[str, Tuple[str, ...]] = {
+    "sans-serif": _SANS_SERIF,
+    "system-ui": _SANS_SERIF,
+    "ui-sans-serif": _SANS_SERIF,
+    "-apple-system": ("SF Pro Text", "SF Pro", "Helvetica Neue"),
+    "blinkmacsystemfont": ("SF Pro Text", "SF Pro", "Helvetica Neue"),
+    "serif": _SERIF,
+    "ui-serif": _SERIF,
+    "monospace": _MONOSPACE,
+    "ui-monospace": _MONOSPACE,
+}
+
+
+# Standard install locations of common families, as directories and the
+# (regular, bold, italic, bold italic) file names, "" for a face the family
+# doesn't ship. Stacks of these families resolve with a few stat calls,
+# without loading or building the index.
+_LINUX_FONT_ROOT = "/usr/share/fonts"
+_LINUX_FONTS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, str, str, str]]] = {
+    "dejavu sans": (
+        ("truetype/dejavu", "TTF", "dejavu", "dejavu-sans-fonts"),
+        (
+            "DejaVuSans.ttf",
+            "DejaVuSans-Bold.ttf",
+            "DejaVuSans-Oblique.ttf",
+            "DejaVuSans-BoldOblique.ttf",
+        ),
+    ),
+    "dejavu serif": (
+        ("truetype/dejavu", "TTF", "dejavu", "dejavu-serif-fonts"),
+        (
+            "DejaVuSerif.ttf",
+            "DejaVuSerif-Bold.ttf",
+            "DejaVuSerif-Italic.ttf",
+            "DejaVuSerif-BoldItalic.ttf",
+        ),
+    ),
+    "dejavu sans mono": (
+        ("truetype/dejavu", "TTF", "dejavu", "dejavu-sans-mono-fonts"),
+        (
+            "DejaVuSansMono.ttf",
+            "DejaVuSansMono-Bold.ttf",
+            "DejaVuSansMono-Oblique.ttf",
+            "DejaVuSansMono-BoldOblique.ttf",
+        ),
+    ),
+    "liberation sans": (
+        ("truetype/liberation", "truetype/liberation2", "TTF", "liberation-sans"),
+        (
+            "LiberationSans-Regular.ttf",
+            "LiberationSans-Bold.ttf",
+            "LiberationSans-Italic.ttf",
+            "LiberationSans-BoldItalic.ttf",
+        ),
+    ),
+    "liberation serif": (
+        ("truetype/liberation", "truetype/liberation2", "TTF", "liberation-serif"),
+        (
+            "LiberationSerif-Regular.ttf",
+            "LiberationSerif-Bold.ttf",
+            "LiberationSerif-Italic.ttf",
+            "LiberationSerif-BoldItalic.ttf",
+        ),
+    ),
+    "liberation mono": (
+        ("truetype/liberation", "truetype/liberation2", "TTF", "liberation-mono"),
+        (
+            "LiberationMono-Regular.ttf",
+            "LiberationMono-Bold.ttf",
+            "LiberationMono-Italic.ttf",
+            "LiberationMono-BoldItalic.ttf",
+        ),
+    ),
+    "noto sans": (
+        ("truetype/noto", "noto", "google-noto"),
+        (
+            "NotoSans-Regular.ttf",
+            "NotoSans-Bold.ttf",
+            "NotoSans-Italic.ttf",
+            "NotoSans-BoldItalic.ttf",
+        ),
+    ),
+    "noto serif": (
+        ("truetype/noto", "noto", "google-noto"),
+        (
+            "NotoSerif-Regular.ttf",
+            "NotoSerif-Bold.ttf",
+            "NotoSerif-Italic.ttf",
+            "NotoSerif-BoldItalic.ttf",
+        ),
+    ),
+    "noto sans mono": (
+        ("truetype/noto", "noto", "google-noto"),
+        ("NotoSansMono-Regular.ttf", "NotoSansMono-Bold.ttf", "", ""),
+    ),
+    "roboto": (
+        ("truetype/roboto/unhinted/RobotoTTF", "TTF"),
+        ("Roboto-Regular.ttf", "Roboto-Bold.ttf", "Roboto-Italic.ttf", "Roboto-BoldItalic.ttf"),
+    ),
+    "ubuntu": (
+        ("truetype/ubuntu",),
+        ("Ubuntu-R.ttf", "Ubuntu-B.ttf", "Ubuntu-RI.ttf", "Ubuntu-BI.ttf"),
+    ),
+    "ubuntu mono": (
+        ("truetype/ubuntu",),
+        ("UbuntuMono-R.ttf", "UbuntuMono-B.ttf", "UbuntuMono-RI.ttf", "UbuntuMono-BI.ttf"),
+    ),
+    "cantarell": (
+        ("opentype/cantarell", "cantarell"),
+        ("Cantarell-Regular.otf", "Cantarell-Bold.otf", "", ""),
+    ),
+    "cascadia mono": (("truetype/cascadia-code",), ("CascadiaMono.ttf", "", "", "")),
+    "arial": (
+        ("truetype/msttcorefonts",),
+        ("Arial.ttf", "Arial_Bold.ttf", "Arial_Italic.ttf", "Arial_Bold_Italic.ttf"),
+    ),
+    "times new roman": (
+        ("truetype/msttcorefonts",),
+        (
+            "Times_New_Roman.ttf",
+            "Times_New_Roman_Bold.ttf",
+            "Times_New_Roman_Italic.ttf",
+            "Times_New_Roman_Bold_Italic.ttf",
+        ),
+    ),
+    "georgia": (
+        ("truetype/msttcorefonts",),
+        ("Georgia.ttf", "Georgia_Bold.ttf", "Georgia_Italic.ttf", "Georgia_Bold_Italic.ttf"),
+    ),
+    "courier new": (
+        ("truetype/msttcorefonts",),
+        (
+            "Courier_New.ttf",
+            "Courier_New_Bold.ttf",
+            "Courier_New_Italic.ttf",
+            "Courier_New_Bold_Italic.ttf",
+        ),
+    ),
+}
+_WINDOWS_FONTS: Dict[str, Tuple[str, str, str, str]] = {
+    "segoe ui": ("segoeui.ttf", "segoeuib.ttf", "segoeuii.ttf", "segoeuiz.ttf"),
+    "arial": ("arial.ttf", "arialbd.ttf", "ariali.ttf", "arialbi.ttf"),
+    "times new roman": ("times.ttf", "timesbd.ttf", "timesi.ttf", "timesbi.ttf"),
+    "georgia": ("georgia.ttf", "georgiab.ttf", "georgiai.ttf", "georgiaz.ttf"),
+    "consolas": ("consola.ttf", "consolab.ttf", "consolai.ttf", "consolaz.ttf"),
+    "courier new": ("cour.ttf", "courbd.ttf", "couri.ttf", "courbi.ttf"),
+    "cascadia mono": ("CascadiaMono.ttf", "", "", ""),
+}
+# Apple and Microsoft system fonts, which only ship on their own platform
+_VENDOR_FONTS = (
+    "sf pro text",
+    "sf pro",
+    "sf mono",
+    "sfmono-regular",
+    "helvetica neue",
+    "helvetica",
+    "times",
+    "menlo",
+    "segoe ui",
+    "consolas",
+)
+
+
+class FontFace(NamedTuple):
+    """An installed font face found by the index."""
+
+    family: str
+    path: str
+    font_number: int  # Index within a .ttc collection
+    weight: int  # CSS weight (OS/2 usWeightClass), e.g. 400 or 700
+    italic: bool
+    stretch: int = 5  # OS/2 usWidthClass; 5 is normal width
+
+
+def get_font_directories() -> List[str]:
+    """
+    Get the standard font directories for this platform.
+
+    Includes the mdsvg font cache, so fonts fetched with
+    download_google_font() are indexed too. Directories that don't exist
+    are included; the index skips them.
+
+    Returns:
+        List of directory paths.
+    """
+    system = platform.system()
+    if system == "Darwin":
+        directories = [
+            "/System/Library/Fonts",
+            "/Library/Fonts",
+            os.path.expanduser("~/Library/Fonts"),
+        ]
+    elif system == "Windows":
+        windir = os.environ.get("WINDIR", "C:\\Windows")
+        directories = [os.path.join(windir, "Fonts")]
+        local = os.environ.get("LOCALAPPDATA")
+        if local:
+            directories.append(os.path.join(local, "Microsoft", "Windows", "Fonts"))
+    else:
+        data_home = os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share"))
+        directories = [
+            "/usr/share/fonts",
+            "/usr/local/share/fonts",
+            os.path.join(data_home, "fonts"),
+            os.path.expanduser("~/.fonts"),
+        ]
+    directories.append(os.path.join(_get_cache_root(), "fonts"))
+    return directories
+
+
+@lru_cache(maxsize=1)
+def _standard_fonts() -> Dict[str, List[Tuple[str, str, str, str]]]:
+    """
+    Get the standard (regular, bold, italic, bold italic) files of common families.
+
+    Keys are casefolded family names; families that don't ship on this
+    platform map to an empty list. macOS ships its system fonts in
+    collections whose face order varies between releases, so there every
+    stack resolves through the index.
+    """
+    system = platform.system()
+    if system == "Darwin":
+        return {}
+    fonts: Dict[str, List[Tuple[str, str, str, str]]] = {family: [] for family in _VENDOR_FONTS}
+    if system == "Windows":
+        fonts_dir = os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts")
+        for family, names in _WINDOWS_FONTS.items():
+            fonts[family] = [_join_faces(fonts_dir, names)]
+    else:
+        for family, (directories, names) in _LINUX_FONTS.items():
+            fonts[family] = [
+                _join_faces(os.path.join(_LINUX_FONT_ROOT, directory), names)
+                for directory in directories
+            ]
+    return fonts
+
+
+def _join_faces(directory: str, names: Tuple[str, str, str, str]) -> Tuple[str, str, str, str]:
+    """Join face file names onto a directory, keeping "" for missing faces."""
+    a, b, c, d = (os.path.join(directory, name) if name else "" for name in names)
+    return (a, b, c, d)
+
+
+def find_standard_faces(
+    stack: str,
+) -> Optional[Tuple[str, Optional[str], Optional[str], Optional[str]]]:
+    """
+    Resolve a CSS font-family stack from the standard locations of common fonts.
+
+    This doesn't load the font index, so resolving the default stacks
+    costs a few stat calls instead of a directory walk. A family that ships
+    on the platform but isn't at its standard location counts as not
+    installed.
+
+    Returns:
+        Tuple of (regular, bold, italic, bold italic) font paths, with None
+        for styled faces that aren't installed. None if the stack reaches a family
+        with no standard location before an installed one, so only the
+        index can resolve it.
+    """
+    fonts = _standard_fonts()
+    for name in parse_font_stack(stack):
+        for family in _GENERIC_FAMILIES.get(name.casefold(), (name,)):
+            candidates = fonts.get(family.casefold())
+            if candidates is None:
+                return None
+            for faces in candidates:
+                regular, *styled = faces
+                if os.path.isfile(regular):
+                    bold, italic, bold_italic = (
+                        path if path and os.path.isfile(path) else None for path in styled
+                    )
+                    return (regular, bold, italic, bold_italic)
+    return None
+
+
+def parse_font_stack(stack: str) -> List[str]:
+    """
+    Split a CSS font-family value into family names.
+
+    Example:
+        >>> parse_font_stack("system-ui, 'Segoe UI', sans-serif")
+        ['system-ui', 'Segoe UI', 'sans-serif']
+    """
+    families = []
+    for part in stack.split(","):
+        name = part.strip().strip("'\"").strip()
+        if name:
+            families.append(name)
+    return families
+
+
+def _read_faces(path: str) -> List[FontFace]:
+    """Read the family, weight and style of every face in a font file."""
+    from fontTools.ttLib import TTCollection, TTFont
+
+    if path.lower().endswith((".ttc", ".otc")):
+        collection = TTCollection(path, lazy=True)
+        fonts = list(collection.fonts)
+    else:
+        fonts = [TTFont(path, lazy=True)]
+
+    faces = []
+    for font_number, font in enumerate(fonts):
+        try:
+            names = font["name"]
+            family = names.getDebugName(16) or names.getDebugName(1)
+            if not family or "cmap" not in font:
+                continue
+            os2 = font.get("OS/2")
+            weight = os2.usWeightClass if os2 else 400
+            stretch = os2.usWidthClass if os2 else 5
+            # fsSelection bit 0 is ITALIC and bit 9 is OBLIQUE
+            italic = bool(os2.fsSelection & 0x201) if os2 else False
+            italic = italic or bool(font["head"].macStyle & 0b10)
+        except Exception:
+            continue
+        finally:
+            font.close()
+        # Some older fonts report weights on a 1-9 scale
+        if weight < 10:
+            weight *= 100
+        faces.append(FontFace(family, path, font_number, weight, italic, stretch))
+    return faces
+
+
+def _weight_order(weights: Sequence[int], desired: int) -> List[int]:
+    """
+    Order available weights by preference for a desired weight, as CSS does.
+
+    Between 400 and 500, lighter weights up to the desired one come first
+    (starting with 500 when 400 is asked for); above 500 heavier weights come
+    first; below 400 lighter weights come first.
+    """
+    lighter = sorted((w for w in weights if w < desired), reverse=True)
+    heavier = sorted(w for w in weights if w > desired)
+    exact = [w for w in weights if w == desired]
+    if desired == 400 and 500 in heavier:
+        heavier.remove(500)
+        return [*exact, 500, *lighter, *heavier]
+    if desired > 500:
+        return [*exact, *heavier, *lighter]
+    return [*exact, *lighter, *heavier]
+
+
+class FontIndex:
+    """
+    Persistent index of installed fonts by family, weight and style.
+
+    The index is loaded lazily. The first use reads the saved index (or
+    scans the font directories if there isn't one), and rescans only the
+    directories whose modification time changed since the index was saved.
+    Reading font names requires fonttools; without it the index is empty.
+
+    Example:
+        >>> index = FontIndex()
+        >>> index.resolve("Inter, 'Helvetica Neue', sans-serif", weight=700)
+        FontFace(family='Inter', path='/Users/me/Library/Fonts/Inter-Bold.ttf', ...)
+    """
+
+    def __init__(
+        self,
+        directories: Optional[Sequence[str]] = None,
+        index_path: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the index.
+
+        Args:
+            directories: Font directories to scan (recursively). Defaults to
+                get_font_directories().
+            index_path: Where to save the index. Defaults to font-index.json
+                in the mdsvg cache directory. Pass "" to keep it in memory only.
+        """
+        self.directories = tuple(
+            os.path.abspath(d) for d in (directories or get_font_directories())
+        )
+        self._index_path = (
+            index_path if index_path is not None else os.path.join(_get_cache_root(), _INDEX_FILE)
+        )
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._families: Dict[str, Dict[Tuple[int, bool], FontFace]] = {}
+        self._resolved: Dict[Tuple[str, int, bool], Optional[FontFace]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        """Load the saved index and rescan stale directories, once."""
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._refresh(self._read_saved())
+                self._loaded = True
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Rescan directories that changed since the index was built.
+
+        Args:
+            force: Rescan every directory, even unchanged ones.
+        """
+        with self._lock:
+            self._refresh({} if force else self._records)
+            self._loaded = True
+
+    def _read_saved(self) -> Dict[str, Dict[str, Any]]:
+        """Read per-directory records from the saved index, if it's compatible."""
+        if not self._index_path:
+            return {}
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != _INDEX_VERSION:
+            return {}
+        records = data.get("directories")
+        return records if isinstance(records, dict) else {}
+
+    def _refresh(self, previous: Dict[str, Dict[str, Any]]) -> None:
+        """Walk the font directories, reusing records of unchanged directories."""
+        # Only check that fonttools is installed: importing it is only needed
+        # when a directory has to be rescanned
+        if importlib.util.find_spec("fontTools") is None:
+            # Can't read font names; keep what we have but don't overwrite the saved index
+            self._records = dict(previous)
+            self._rebuild()
+            return
+
+        records: Dict[str, Dict[str, Any]] = {}
+        pending = [d for d in self.directories if os.path.isdir(d)]
+        while pending:
+            directory = pending.pop()
+            if directory in records:
+                continue
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            record = previous.get(directory)
+            if record is None or record.get("mtime_ns") != mtime_ns:
+                record = self._scan_directory(directory, mtime_ns)
+            records[directory] = record
+            pending.extend(record["subdirs"])
+
+        changed = records != previous
+        self._records = records
+        self._rebuild()
+        if changed and self._index_path:
+            self._save()
+
+    @staticmethod
+    def _scan_directory(directory: str, mtime_ns: int) -> Dict[str, Any]:
+        """Read the fonts directly inside a directory and list its subdirectories."""
+        faces: List[List[Any]] = []
+        subdirs: List[str] = []
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            entries = []
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    subdirs.append(entry.path)
+                elif entry.name.lower().endswith(_FONT_EXTENSIONS):
+                    faces.extend(list(face) for face in _read_faces(entry.path))
+            except Exception:
+                # Unreadable or malformed font files are left out of the index
+                continue
+        return {"mtime_ns": mtime_ns, "subdirs": subdirs, "faces": faces}
+
+    def _save(self) -> None:
+        """Write the index to disk (best effort)."""
+        data = {"version": _INDEX_VERSION, "directories": self._records}
+        with contextlib.suppress(OSError):
+            os.makedirs(os.path.dirname(self._index_path) or ".", exist_ok=True)
+            _write_atomic(self._index_path, json.dumps(data).encode("utf-8"))
+
+    def _rebuild(self) -> None:
+        """Rebuild the in-memory family lookup from the directory records."""
+        families: Dict[str, Dict[Tuple[int, bool], FontFace]] = {}
+        for record in self._records.values():
+            for fields in record.get("faces", ()):
+                face = FontFace(*fields)
+                styles = families.setdefault(face.family.casefold(), {})
+                key = (face.weight, face.italic)
+                current = styles.get(key)
+                # Prefer normal-width faces over condensed or expanded ones
+                if current is None or abs(face.stretch - 5) < abs(current.stretch - 5):
+                    styles[key] = face
+        self._families = families
+        self._resolved = {}
+
+    def families(self) -> List[str]:
+        """Get the names of all indexed families."""
+        self._load()
+        return sorted(
+            {next(iter(styles.values())).family for styles in self._families.values() if styles}
+        )
+
+    def faces(self, family: str) -> List[FontFace]:
+        """Get every indexed face of a family (case-insensitive)."""
+        self._load()
+        return sorted(
+            self._families.get(family.casefold(), {}).values(),
+            key=lambda face: (face.weight, face.italic),
+        )
+
+    def find(self, family: str, weight: int = 400, italic: bool = False) -> Optional[FontFace]:
+        """
+        Find the face of a single family closest to a weight and style.
+
+        Faces in the requested style are preferred; within a style, weights
+        are matched the way CSS does.
+
+        Returns:
+            The face, or None if the family isn't installed.
+        """
+        self._load()
+        styles = self._families.get(family.casefold())
+        if not styles:
+            return None
+        for style in (italic, not italic):
+            weights = [w for (w, i) in styles if i == style]
+            if weights:
+                return styles[(_weight_order(weights, weight)[0], style)]
+        return None
+
+    def resolve(self, stack: str, weight: int = 400, italic: bool = False) -> Optional[FontFace]:
+        """
+        Resolve a CSS font-family stack to the first installed face.
+
+        Generic families (sans-serif, serif, monospace, system-ui, ...) map
+        to common platform fonts. Results are memoized per stack.
+
+        Args:
+            stack: CSS font-family value, e.g. Style.font_family.
+            weight: CSS font weight.
+            italic: Whether an italic face is wanted.
+
+        Returns:
+            The face, or None if no family in the stack is installed.
+        """
+        self._load()
+        key = (stack, weight, italic)
+        if key in self._resolved:
+            return self._resolved[key]
+        face = None
+        for name in parse_font_stack(stack):
+            for family in _GENERIC_FAMILIES.get(name.casefold(), (name,)):
+                face = self.find(family, weight, italic)
+                if face:
+                    break
+            if face:
+                break
+        self._resolved[key] = face
+        return face
+
+    def resolve_family(self, stack: str) -> Optional[FontFamilyMeasurer]:
+        """
+        Resolve a CSS font-family stack to a measurer with the family's real faces.
+
+        Bold and italic faces are only included when the family actually
+        has them, so FontFamilyMeasurer falls back (and the renderer
+        approximates) for styles it lacks.
+
+        Returns:
+            A FontFamilyMeasurer, or None if no family in the stack is installed.
+        """
+        regular = self.resolve(stack)
+        if regular is None:
+            return None
+        faces: Dict[Tuple[bool, bool], Optional[Tuple[str, int]]] = {}
+        for bold, italic in ((True, False), (False, True), (True, True)):
+            face = self.find(regular.family, 700 if bold else 400, italic)
+            real = (
+                face is not None
+                and face.italic == italic
+                and (face.weight >= 600) == bold
+                and face != regular
+            )
+            faces[(bold, italic)] = (face.path, face.font_number) if face and real else None
+        return FontFamilyMeasurer(
+            (regular.path, regular.font_number),
+            bold=faces[(True, False)],
+            italic=faces[(False, True)],
+            bold_italic=faces[(True, True)],
+        )
+
+    def __len__(self) -> int:
+        self._load()
+        return sum(len(styles) for styles in self._families.values())
+
+
+_font_index: Optional[FontIndex] = None
+_font_index_lock = threading.Lock()
+
+
+def get_font_index() -> FontIndex:
+    """Get the process-wide font index (loaded on first use)."""
+    global _font_index
+    if _font_index is None:
+        with _font_index_lock:
+            if _font_index is None:
+                _font_index = FontIndex()
+    return _font_index
+
+
+def resolve_font_family(stack: str) -> Optional[FontFamilyMeasurer]:
+    """
+    Resolve a CSS font-family stack with the process-wide font index.
+
+    Example:
+        >>> family = resolve_font_family(Style().font_family)
+        >>> family.measure("Hello", 14, bold=True) if family else None
+    """
+    return get_font_index().resolve_family(stack)
@@ -36,22 +36,586 @@ Download fonts from Google Fonts automatically:
     measurer = FontMeasurer(font_path)
 
 Or download manually from https://fonts.google.com and place in your project.
+
+## Metrics Cache
+
+The first time a font is loaded, its advance widths are saved to
+`get_metrics_cache_dir()`. Later loads (in any process) memory-map that
+file instead of parsing the font with fonttools. Pass
+`FontMeasurer(path, use_metrics_cache=False)` to bypass the cache.
 """
 
 from __future__ import annotations
 
+import contextlib
+import importlib.util
+import mmap
 import os
 import platform
+import struct
+import sys
+import threading
+from array import array
 from dataclasses import dataclass, field
-from functools import lru_cache
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from functools import lru_cache, partial
+from itertools import repeat
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+from .measure import CharWidthTable, heuristic_table
+
+# Codepoints are grouped into 256-entry pages. Only pages that the font
+# actually covers get storage; every other page shares one page of fallbacks.
+_PAGE_SHIFT = 8
+_PAGE_SIZE = 1 << _PAGE_SHIFT
+_PAGE_MASK = _PAGE_SIZE - 1
+_PAGE_COUNT = 0x110000 >> _PAGE_SHIFT
+
+# Width charged for codepoints the font has no glyph for, as a fraction of the em
+_FALLBACK_EM_RATIO = 0.25
+
+# Tables built from a font are backed by arrays; tables loaded from the
+# metrics cache are memoryviews over the mapped file.
+_IntBuffer = Union["array[int]", "memoryview[int]"]
+_FloatBuffer = Union["array[float]", "memoryview[float]"]
+_ByteBuffer = Union[bytes, bytearray, "memoryview[int]"]
+
+# Metrics file layout: a 32-byte header followed by the int32 page offsets,
+# the float32 advances and the coverage bitmap, all in the byte order of the
+# machine that wrote the file. Files written in the other byte order (such as
+# the bundled metric packs on a big-endian host) are byteswapped on load.
+_METRICS_MAGIC = b"MDSVGMET"
+_METRICS_VERSION = 2
+_METRICS_HEADER = struct.Struct("=8sHHIfII4x")
+_BYTE_ORDER_FLAG = 1 if sys.byteorder == "little" else 2
+_SWAPPED_BYTE_ORDER_FLAG = 3 - _BYTE_ORDER_FLAG
+_SWAPPED_PREFIX = ">" if sys.byteorder == "little" else "<"
+
+
+def _unpack_header(header: struct.Struct, view: memoryview) -> Optional[Tuple[Any, ...]]:
+    """
+    Unpack a metrics or kerning file header in whichever byte order it was written.
+
+    Returns:
+        The header fields (the byte order flag is the third), or None if the
+        flag matches neither byte order.
+    """
+    fields = header.unpack_from(view)
+    if fields[2] == _BYTE_ORDER_FLAG:
+        return fields
+    fields = struct.Struct(_SWAPPED_PREFIX + header.format[1:]).unpack_from(view)
+    return fields if fields[2] == _SWAPPED_BYTE_ORDER_FLAG else None
+
+
+def _swapped_array(view: memoryview, typecode: str) -> array[Any]:
+    """Copy a buffer written in the other byte order into a native array."""
+    values = array(typecode)
+    values.frombytes(view)
+    values.byteswap()
+    return values
+
+
+@dataclass(frozen=True, eq=False)
+class AdvanceTable:
+    """
+    Per-codepoint advance widths (in font units) stored as a two-level page table.
+
+    `page_offsets[cp >> 8]` gives the start of the codepoint's page in
+    `advances`. Offset 0 is a page filled with the fallback width, shared by
+    all codepoints the font does not cover.
+
+    `coverage` is a bitmap in the same layout as `advances`: bit `i` is set
+    when `advances[i]` belongs to a real glyph. If it isn't given, every
+    codepoint outside the shared fallback page counts as covered.
+    """
+
+    units_per_em: int
+    fallback: float
+    page_offsets: _IntBuffer
+    advances: _FloatBuffer
+    coverage: _ByteBuffer = field(default=b"", repr=False)
+    _ascii: Tuple[float, ...] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        base = self.page_offsets[0]
+        object.__setattr__(self, "_ascii", tuple(self.advances[base : base + 128]))
+        if not self.coverage:
+            coverage = bytearray(b"\xff") * (len(self.advances) >> 3)
+            coverage[: _PAGE_SIZE >> 3] = bytes(_PAGE_SIZE >> 3)
+            object.__setattr__(self, "coverage", coverage)
+
+    @classmethod
+    def from_font(cls, font: Any) -> AdvanceTable:
+        """Build a table from a fontTools TTFont (only cmap, hmtx and head are read)."""
+        cmap = font.getBestCmap() or {}
+        metrics = font["hmtx"].metrics
+        units_per_em = font["head"].unitsPerEm
+        fallback = units_per_em * _FALLBACK_EM_RATIO
+
+        pages: Dict[int, array[float]] = {}
+        coverage: Dict[int, bytearray] = {}
+        for codepoint, glyph_name in cmap.items():
+            entry = metrics.get(glyph_name)
+            if entry is None:
+                continue
+            page_number = codepoint >> _PAGE_SHIFT
+            page = pages.get(page_number)
+            if page is None:
+                page = pages[page_number] = array("f", [fallback]) * _PAGE_SIZE
+                coverage[page_number] = bytearray(_PAGE_SIZE >> 3)
+            index = codepoint & _PAGE_MASK
+            page[index] = entry[0]
+            coverage[page_number][index >> 3] |= 1 << (index & 7)
+
+        return cls.from_pages(units_per_em, fallback, pages, coverage)
+
+    @classmethod
+    def from_pages(
+        cls,
+        units_per_em: int,
+        fallback: float,
+        pages: Dict[int, array[float]],
+        coverage: Optional[Dict[int, bytearray]] = None,
+    ) -> AdvanceTable:
+        """
+        Assemble a table from a mapping of page number to 256 advances.
+
+        coverage maps page numbers to 32-byte coverage bitmaps; pages
+        without one are fully covered.
+        """
+        coverage = coverage or {}
+        full_page = b"\xff" * (_PAGE_SIZE >> 3)
+        page_offsets = array("i", [0]) * _PAGE_COUNT
+        advances = array("f", [fallback]) * _PAGE_SIZE
+        bitmap = bytearray(_PAGE_SIZE >> 3)
+        for page_number in sorted(pages):
+            page_offsets[page_number] = len(advances)
+            advances.extend(pages[page_number])
+            bitmap += coverage.get(page_number, full_page)
+        return cls(units_per_em, fallback, page_offsets, advances, bitmap)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the table in the metrics file format."""
+        header = _METRICS_HEADER.pack(
+            _METRICS_MAGIC,
+            _METRICS_VERSION,
+            _BYTE_ORDER_FLAG,
+            self.units_per_em,
+            self.fallback,
+            len(self.page_offsets),
+            len(self.advances),
+        )
+        return header + self.page_offsets.tobytes() + self.advances.tobytes() + bytes(self.coverage)
+
+    def save(self, path: str) -> None:
+        """Atomically write the table to path."""
+        _write_atomic(path, self.to_bytes())
+
+    @classmethod
+    def from_buffer(cls, buffer: Any) -> Optional[AdvanceTable]:
+        """
+        Create a table that reads directly from a buffer in the metrics file format.
+
+        No data is copied: the table's arrays are memoryviews over buffer.
+        Files written in the other byte order are byteswapped into arrays.
+
+        Returns:
+            The table, or None if buffer is not a compatible metrics file.
+        """
+        view = memoryview(buffer)
+        if len(view) < _METRICS_HEADER.size:
+            return None
+        fields = _unpack_header(_METRICS_HEADER, view)
+        if fields is None:
+            return None
+        magic, version, byte_order, units_per_em, fallback, page_count, advance_count = fields
+        offsets_end = _METRICS_HEADER.size + page_count * 4
+        advances_end = offsets_end + advance_count * 4
+        if (
+            magic != _METRICS_MAGIC
+            or version != _METRICS_VERSION
+            or page_count != _PAGE_COUNT
+            or advance_count % _PAGE_SIZE
+            or len(view) != advances_end + (advance_count >> 3)
+        ):
+            return None
+        coverage = view[advances_end:]
+        if byte_order != _BYTE_ORDER_FLAG:
+            page_offsets: _IntBuffer = _swapped_array(view[_METRICS_HEADER.size : offsets_end], "i")
+            advances: _FloatBuffer = _swapped_array(view[offsets_end:advances_end], "f")
+            return cls(units_per_em, fallback, page_offsets, advances, coverage)
+        page_offsets = view[_METRICS_HEADER.size : offsets_end].cast("i")
+        advances = view[offsets_end:advances_end].cast("f")
+        return cls(units_per_em, fallback, page_offsets, advances, coverage)
+
+    @classmethod
+    def load(cls, path: str) -> Optional[AdvanceTable]:
+        """
+        Memory-map a metrics file written by save().
+
+        Returns:
+            The table, or None if the file is missing or not a compatible metrics file.
+        """
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        return cls.from_buffer(mapped)
+
+    def totals(self, texts: Sequence[str]) -> Sequence[float]:
+        """
+        Sum advance widths for each of many strings, in font units.
+
+        With NumPy installed, the batch is encoded into one codepoint buffer,
+        advances are gathered from the table in a single vectorized lookup and
+        reduced per string with segment sums.
+
+        Returns:
+            A float64 numpy.ndarray when NumPy is installed, otherwise an array('d').
+        """
+        np = _get_numpy()
+        if np is None:
+            return array("d", map(self.total, texts))
+
+        lengths = np.fromiter(map(len, texts), dtype=np.intp, count=len(texts))
+        totals = np.zeros(len(texts), dtype=np.float64)
+        nonempty = lengths > 0
+        if not nonempty.any():
+            return cast(Sequence[float], totals)
+
+        codepoints = np.frombuffer("".join(texts).encode("utf-32-le", "surrogatepass"), dtype="<u4")
+        page_offsets = np.frombuffer(self.page_offsets, dtype=np.int32)
+        advances = np.frombuffer(self.advances, dtype=np.float32)
+        per_char = advances[page_offsets[codepoints >> _PAGE_SHIFT] + (codepoints & _PAGE_MASK)]
+
+        # Segments are contiguous, so summing between the starts of the
+        # non-empty strings gives each string's total
+        starts = (np.cumsum(lengths) - lengths)[nonempty]
+        totals[nonempty] = np.add.reduceat(per_char.astype(np.float64), starts)
+        return cast(Sequence[float], totals)
+
+    def covers(self, codepoint: int) -> bool:
+        """Check whether the font has a glyph for codepoint."""
+        index = self.page_offsets[codepoint >> _PAGE_SHIFT] + (codepoint & _PAGE_MASK)
+        return bool(self.coverage[index >> 3] >> (index & 7) & 1)
+
+    def advance(self, codepoint: int) -> float:
+        """Advance width of a single codepoint in font units."""
+        return float(
+            self.advances[self.page_offsets[codepoint >> _PAGE_SHIFT] + (codepoint & _PAGE_MASK)]
+        )
+
+    def total(self, text: str) -> float:
+        """Sum of advance widths for text, in font units."""
+        if text.isascii():
+            return sum(map(self._ascii.__getitem__, text.encode("ascii")))
+        offsets = self.page_offsets
+        advances = self.advances
+        return sum(
+            [advances[offsets[cp >> _PAGE_SHIFT] + (cp & _PAGE_MASK)] for cp in map(ord, text)]
+        )
+
+
+# Kerning file layout: a 16-byte header followed by the int64 pair keys and
+# the float32 adjustments, in the writer's byte order like metrics files.
+_KERNING_MAGIC = b"MDSVGKRN"
+_KERNING_HEADER = struct.Struct("=8sHHI")
+
+# A kerning pair is keyed by (left << 21) | right; codepoints fit in 21 bits
+_PAIR_SHIFT = 21
+
+# GPOS lookup types for pair adjustment and extension subtables
+_GPOS_PAIR_ADJUSTMENT = 2
+_GPOS_EXTENSION = 9
 
 
-@dataclass
+def _reverse_cmap(cmap: Dict[int, str]) -> Dict[str, List[int]]:
+    """Map each glyph name to the codepoints that use it."""
+    reverse: Dict[str, List[int]] = {}
+    for codepoint, glyph_name in cmap.items():
+        reverse.setdefault(glyph_name, []).append(codepoint)
+    return reverse
+
+
+def _gpos_kerning_pairs(font: Any, reverse: Dict[str, List[int]]) -> Dict[int, float]:
+    """
+    Flatten the pair adjustments of a font's GPOS kern feature into codepoint pairs.
+
+    Within a lookup the first subtable that covers a pair wins; adjustments
+    from separate lookups add up, as they do when shaping.
+    """
+    gpos = font["GPOS"].table
+    if gpos.FeatureList is None or gpos.LookupList is None:
+        return {}
+    lookup_indices = sorted(
+        {
+            index
+            for record in gpos.FeatureList.FeatureRecord
+            if record.FeatureTag == "kern"
+            for index in record.Feature.LookupListIndex
+        }
+    )
+
+    pairs: Dict[int, float] = {}
+    for lookup_index in lookup_indices:
+        lookup = gpos.LookupList.Lookup[lookup_index]
+        lookup_pairs: Dict[int, float] = {}
+        for subtable in lookup.SubTable:
+            if lookup.LookupType == _GPOS_EXTENSION:
+                if subtable.ExtensionLookupType != _GPOS_PAIR_ADJUSTMENT:
+                    continue
+                subtable = subtable.ExtSubTable
+            elif lookup.LookupType != _GPOS_PAIR_ADJUSTMENT:
+                continue
+            if not (subtable.ValueFormat1 & 0x0004):  # No XAdvance on the first glyph
+                continue
+
+            if subtable.Format == 1:
+                for left_glyph, pair_set in zip(subtable.Coverage.glyphs, subtable.PairSet):
+                    lefts = reverse.get(left_glyph)
+                    if not lefts:
+                        continue
+                    for record in pair_set.PairValueRecord:
+                        value = record.Value1.XAdvance if record.Value1 else 0
+                        rights = reverse.get(record.SecondGlyph)
+                        if not value or not rights:
+                            continue
+                        for left in lefts:
+                            for right in rights:
+                                lookup_pairs.setdefault((left << _PAIR_SHIFT) | right, value)
+
+            elif subtable.Format == 2:
+                left_classes = subtable.ClassDef1.classDefs
+                right_classes = subtable.ClassDef2.classDefs
+                # Class 0 holds every glyph not listed in ClassDef2
+                members: Dict[int, List[int]] = {}
+                for glyph_name, codepoints in reverse.items():
+                    members.setdefault(right_classes.get(glyph_name, 0), []).extend(codepoints)
+                for left_glyph in subtable.Coverage.glyphs:
+                    lefts = reverse.get(left_glyph)
+                    if not lefts:
+                        continue
+                    records = subtable.Class1Record[left_classes.get(left_glyph, 0)].Class2Record
+                    for right_class, record in enumerate(records):
+                        value = record.Value1.XAdvance if record.Value1 else 0
+                        if not value:
+                            continue
+                        for left in lefts:
+                            for right in members.get(right_class, ()):
+                                lookup_pairs.setdefault((left << _PAIR_SHIFT) | right, value)
+
+        for key, value in lookup_pairs.items():
+            pairs[key] = pairs.get(key, 0.0) + value
+    return pairs
+
+
+def _legacy_kerning_pairs(font: Any, reverse: Dict[str, List[int]]) -> Dict[int, float]:
+    """Flatten the horizontal subtables of a legacy kern table into codepoint pairs."""
+    pairs: Dict[int, float] = {}
+    for subtable in font["kern"].kernTables:
+        if getattr(subtable, "format", None) != 0 or not getattr(subtable, "coverage", 1) & 1:
+            continue
+        for (left_glyph, right_glyph), value in subtable.kernTable.items():
+            if not value:
+                continue
+            for left in reverse.get(left_glyph, ()):
+                for right in reverse.get(right_glyph, ()):
+                    key = (left << _PAIR_SHIFT) | right
+                    pairs[key] = pairs.get(key, 0.0) + value
+    return pairs
+
+
+@dataclass(frozen=True, eq=False)
+class KerningTable:
+    """
+    Kerning adjustments (in font units) flattened into a hash of codepoint pairs.
+
+    Pairs are keyed by `(left << 21) | right`, so looking up a pair is a
+    single dict probe regardless of how the font stores its kerning
+    (glyph pairs, class pairs or a legacy kern table).
+    """
+
+    pairs: Dict[int, float]
+
+    @classmethod
+    def from_font(cls, font: Any) -> KerningTable:
+        """
+        Build a table from a fontTools TTFont.
+
+        Uses the GPOS kern feature when the font has one, otherwise the
+        legacy kern table. Fonts without kerning give an empty table.
+        """
+        cmap = font.getBestCmap() or {}
+        reverse = _reverse_cmap(cmap)
+        if "GPOS" in font:
+            pairs = _gpos_kerning_pairs(font, reverse)
+            if pairs:
+                return cls(pairs)
+        if "kern" in font:
+            return cls(_legacy_kerning_pairs(font, reverse))
+        return cls({})
+
+    def to_bytes(self) -> bytes:
+        """Serialize the table in the kerning file format."""
+        header = _KERNING_HEADER.pack(
+            _KERNING_MAGIC, _METRICS_VERSION, _BYTE_ORDER_FLAG, len(self.pairs)
+        )
+        keys = array("q", self.pairs.keys())
+        values = array("f", self.pairs.values())
+        return header + keys.tobytes() + values.tobytes()
+
+    def save(self, path: str) -> None:
+        """Atomically write the table to path."""
+        _write_atomic(path, self.to_bytes())
+
+    @classmethod
+    def from_buffer(cls, buffer: Any) -> Optional[KerningTable]:
+        """
+        Create a table from a buffer in the kerning file format.
+
+        Returns:
+            The table, or None if buffer is not a compatible kerning file.
+        """
+        view = memoryview(buffer)
+        if len(view) < _KERNING_HEADER.size:
+            return None
+        fields = _unpack_header(_KERNING_HEADER, view)
+        if fields is None:
+            return None
+        magic, version, byte_order, count = fields
+        keys_end = _KERNING_HEADER.size + count * 8
+        if (
+            magic != _KERNING_MAGIC
+            or version != _METRICS_VERSION
+            or len(view) != keys_end + count * 4
+        ):
+            return None
+        if byte_order != _BYTE_ORDER_FLAG:
+            keys: Sequence[int] = _swapped_array(view[_KERNING_HEADER.size : keys_end], "q")
+            values: Sequence[float] = _swapped_array(view[keys_end:], "f")
+        else:
+            keys = view[_KERNING_HEADER.size : keys_end].cast("q")
+            values = view[keys_end:].cast("f")
+        return cls(dict(zip(keys, values)))
+
+    @classmethod
+    def load(cls, path: str) -> Optional[KerningTable]:
+        """
+        Read a kerning file written by save().
+
+        Returns:
+            The table, or None if the file is missing or not a compatible kerning file.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        return cls.from_buffer(data)
+
+    def adjustment(self, left: int, right: int) -> float:
+        """Kerning between two codepoints in font units (0 if the pair isn't kerned)."""
+        return self.pairs.get((left << _PAIR_SHIFT) | right, 0.0)
+
+    def total(self, text: str) -> float:
+        """Sum of kerning adjustments between adjacent characters of text, in font units."""
+        pairs = self.pairs
+        if not pairs or len(text) < 2:
+            return 0.0
+        codepoints: Sequence[int] = text.encode("ascii") if text.isascii() else list(map(ord, text))
+        keys = [(left << _PAIR_SHIFT) | right for left, right in zip(codepoints, codepoints[1:])]
+        return sum(map(pairs.get, keys, repeat(0.0)))
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Write data to path through a temporary file so readers never see a partial file."""
+    import tempfile
+
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _get_numpy() -> Any:
+    """Import NumPy if it is installed, otherwise return None."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _has_fonttools() -> bool:
+    """Check whether fonttools is installed, without importing it."""
+    return importlib.util.find_spec("fontTools") is not None
+
+
+def _open_font(font_path: str, font_number: int = 0) -> Any:
+    """
+    Open a font with fonttools, decompiling tables only when accessed.
+
+    A synthetic glyph order is installed so that reading cmap and hmtx does not
+    pull in the post or CFF tables just to name glyphs. Names stay consistent
+    across every table read from the returned font.
+    """
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(font_path, fontNumber=font_number, lazy=True)
+    font.setGlyphOrder([f"glyph{i:05d}" for i in range(font["maxp"].numGlyphs)])
+    return font
+
+
+class TextMeasurer(Protocol):
+    """
+    Anything that can measure runs of body text for SVGRenderer.
+
+    FontMeasurer, FallbackMeasurer and shaping.HarfBuzzMeasurer all qualify.
+    Pass an implementation as SVGRenderer(measurer=...) to plug in another
+    measurement backend.
+    """
+
+    @property
+    def is_available(self) -> bool:
+        """Whether measure() can be used (may load fonts)."""
+        ...
+
+    def measure(self, text: str, font_size: float, kerning: bool = False) -> float:
+        """Width of a run of text in pixels."""
+        ...
+
+
+@dataclass(frozen=True)
 class FontMeasurer:
     """
     Measure text width using actual font metrics via fonttools.
 
+    Metrics are loaded on first use (the first measure() or is_available
+    check), so constructing a measurer is cheap and does not import fonttools.
+    Measurers are immutable and thread-safe; use get_measurer() to share one
+    per font across the process instead of loading the same font repeatedly.
+
     Example:
         >>> measurer = FontMeasurer("/System/Library/Fonts/Helvetica.ttc")
         >>> measurer.measure("Hello World", 14)
@@ -60,35 +624,105 @@ class FontMeasurer:
 
     font_path: str
     font_number: int = 0  # For .ttc files with multiple fonts
-    _cmap: Optional[Dict[int, str]] = field(default=None, init=False, repr=False)
-    _hmtx: Optional[Any] = field(default=None, init=False, repr=False)
-    _units_per_em: int = field(default=1000, init=False, repr=False)
-    _available: bool = field(default=False, init=False, repr=False)
+    use_metrics_cache: bool = True  # Reuse metrics extracted by earlier processes
+    _table: Optional[AdvanceTable] = field(default=None, init=False, repr=False, compare=False)
+    _loaded: bool = field(default=False, init=False, repr=False, compare=False)
+    _kerning: Optional[KerningTable] = field(default=None, init=False, repr=False, compare=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
 
-    def __post_init__(self) -> None:
-        self._init_font()
+    def _load(self) -> Optional[AdvanceTable]:
+        """Load the advance table once; returns None if the font can't be read."""
+        if self._loaded:
+            return self._table
+        with self._lock:
+            if not self._loaded:
+                object.__setattr__(self, "_table", self._init_font())
+                object.__setattr__(self, "_loaded", True)
+        return self._table
+
+    def _init_font(self) -> Optional[AdvanceTable]:
+        """Load font metrics from the font file into a compact advance table.
+
+        Only the cmap, hmtx and head tables (plus the small maxp and hhea
+        tables they depend on) are decompiled, and the TTFont is closed once
+        the table is built. With use_metrics_cache, the table is saved to the
+        metrics cache and later loads map that file instead of parsing the font.
+        """
+        cache_path = (
+            get_metrics_cache_path(self.font_path, self.font_number)
+            if self.use_metrics_cache
+            else None
+        )
+        table = AdvanceTable.load(cache_path) if cache_path else None
+        if table is not None:
+            return table
 
-    def _init_font(self) -> None:
-        """Load font metrics from the font file."""
         try:
-            from fontTools.ttLib import TTFont
+            font = _open_font(self.font_path, self.font_number)
+            try:
+                table = AdvanceTable.from_font(font)
+            finally:
+                font.close()
+        except Exception:
+            # fonttools missing, or font file not found or invalid
+            return None
+
+        if cache_path:
+            # The cache is an optimization; an unwritable cache dir is fine
+            with contextlib.suppress(OSError):
+                table.save(cache_path)
+        return table
 
-            font = TTFont(self.font_path, fontNumber=self.font_number)
-            self._cmap = font.getBestCmap()
-            self._hmtx = font["hmtx"]
-            self._units_per_em = font["head"].unitsPerEm
-            self._available = True
+    def _load_kerning(self) -> KerningTable:
+        """Load the kerning pairs once; empty if the font can't be read or has none.
+
+        Kerning is only loaded the first time it is asked for, and is cached
+        next to the font's metrics file like the advance table.
+        """
+        if self._kerning is not None:
+            return self._kerning
+        with self._lock:
+            if self._kerning is None:
+                object.__setattr__(self, "_kerning", self._init_kerning())
+        return cast(KerningTable, self._kerning)
+
+    def _init_kerning(self) -> KerningTable:
+        """Read kerning from the metrics cache, or flatten it from the font file."""
+        cache_path = (
+            get_metrics_cache_path(self.font_path, self.font_number, "kern")
+            if self.use_metrics_cache
+            else None
+        )
+        kerning = KerningTable.load(cache_path) if cache_path else None
+        if kerning is not None:
+            return kerning
+
+        try:
+            font = _open_font(self.font_path, self.font_number)
+            try:
+                kerning = KerningTable.from_font(font)
+            finally:
+                font.close()
         except Exception:
-            # Font file not found or invalid
-            self._available = False
+            # fonttools missing, font unreadable, or malformed kerning data
+            return KerningTable({})
+
+        if cache_path:
+            with contextlib.suppress(OSError):
+                kerning.save(cache_path)
+        return kerning
 
-    def measure(self, text: str, font_size: float) -> float:
+    def measure(self, text: str, font_size: float, kerning: bool = False) -> float:
         """
         Measure the width of text in pixels.
 
         Args:
             text: The text to measure.
             font_size: Font size in pixels.
+            kerning: Apply the font's pair kerning (GPOS kern feature or
+                legacy kern table), as browsers do by default.
 
         Returns:
             Width in pixels.
@@ -99,27 +733,76 @@ class FontMeasurer:
         if not text:
             return 0.0
 
-        if not self._available:
+        table = self._table if self._loaded else self._load()
+        if table is None:
             raise RuntimeError(
                 "FontMeasurer not available. Install fonttools: pip install fonttools"
             )
 
-        total_width: float = 0
-        for char in text:
-            glyph_id = self._cmap.get(ord(char)) if self._cmap else None
-            if glyph_id and self._hmtx and glyph_id in self._hmtx.metrics:
-                advance_width, _ = self._hmtx.metrics[glyph_id]
-                total_width += advance_width
-            else:
-                # Fallback for unknown glyphs (space-like width)
-                total_width += self._units_per_em * 0.25
+        # Unknown glyphs are charged a space-like fallback width by the table
+        total = table.total(text)
+        if kerning:
+            total += self._load_kerning().total(text)
+        return (total / table.units_per_em) * font_size
 
-        return (total_width / self._units_per_em) * font_size
+    def measure_many(
+        self, texts: Sequence[str], font_size: float, kerning: bool = False
+    ) -> Sequence[float]:
+        """
+        Measure the widths of many strings in pixels in one batch.
+
+        Much faster than calling measure() in a loop when NumPy is installed
+        (pip install markdown-svg[batch]); falls back to pure Python otherwise.
+
+        Args:
+            texts: The strings to measure.
+            font_size: Font size in pixels.
+            kerning: Apply the font's pair kerning (see measure()).
+
+        Returns:
+            Widths in pixels, in the order of texts: a float64 numpy.ndarray
+            when NumPy is installed, otherwise an array('d').
+
+        Raises:
+            RuntimeError: If fonttools is not available.
+
+        Example:
+            >>> widths = measurer.measure_many(["Revenue", "Costs", "Net"], 12)
+        """
+        table = self._table if self._loaded else self._load()
+        if table is None:
+            raise RuntimeError(
+                "FontMeasurer not available. Install fonttools: pip install fonttools"
+            )
+
+        totals: Any = table.totals(texts)
+        units_per_em = table.units_per_em
+        if kerning:
+            pairs = self._load_kerning()
+            if pairs:
+                kerned = array("d", map(pairs.total, texts))
+                if isinstance(totals, array):
+                    totals = array("d", [total + kern for total, kern in zip(totals, kerned)])
+                else:
+                    totals = totals + memoryview(kerned)
+        if isinstance(totals, array):
+            return array("d", [(total / units_per_em) * font_size for total in totals])
+        return cast(Sequence[float], (totals / units_per_em) * font_size)
 
     @property
     def is_available(self) -> bool:
-        """Check if font measurement is available."""
-        return self._available
+        """Check if font measurement is available (loads the font if needed)."""
+        return self._load() is not None
+
+    @property
+    def table(self) -> Optional[AdvanceTable]:
+        """The font's advance table, or None if the font can't be loaded."""
+        return self._load()
+
+    @property
+    def kerning(self) -> KerningTable:
+        """The font's kerning pairs (empty if the font has none or can't be loaded)."""
+        return self._load_kerning()
 
     @classmethod
     def system_default(cls) -> Optional[FontMeasurer]:
@@ -179,16 +862,774 @@ def get_system_font() -> Optional[str]:
     return None
 
 
+class FontRegistryStats(NamedTuple):
+    """Statistics for a FontRegistry."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class FontRegistry:
+    """
+    Thread-safe registry of shared FontMeasurers, keyed by font file and font number.
+
+    Every renderer asking for the same font gets the same measurer, so each
+    font is parsed at most once per process until it is evicted.
+
+    Example:
+        >>> registry = get_font_registry()
+        >>> measurer = registry.get("./fonts/Inter-Regular.ttf")
+        >>> registry.get("./fonts/Inter-Regular.ttf") is measurer
+        True
+        >>> registry.stats()
+        FontRegistryStats(hits=1, misses=1, evictions=0, size=1)
+    """
+
+    def __init__(self) -> None:
+        self._measurers: Dict[Tuple[str, int], FontMeasurer] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _key(font_path: str, font_number: int) -> Tuple[str, int]:
+        return (os.path.realpath(font_path), font_number)
+
+    def get(self, font_path: str, font_number: int = 0) -> FontMeasurer:
+        """
+        Get the shared measurer for a font, creating it on first request.
+
+        Args:
+            font_path: Path to a TTF/OTF/TTC font file.
+            font_number: Font index within a .ttc collection.
+
+        Returns:
+            The shared FontMeasurer (loaded lazily on first use).
+        """
+        key = self._key(font_path, font_number)
+        with self._lock:
+            measurer = self._measurers.get(key)
+            if measurer is not None:
+                self._hits += 1
+                return measurer
+            self._misses += 1
+            measurer = self._measurers[key] = FontMeasurer(font_path, font_number)
+            return measurer
+
+    def register(self, measurer: FontMeasurer) -> None:
+        """
+        Make measurer the shared measurer for its font, replacing any existing one.
+
+        Used to install measurers whose tables come from somewhere other than
+        the font file, such as SharedMetrics attached in a worker process.
+        """
+        key = self._key(measurer.font_path, measurer.font_number)
+        with self._lock:
+            self._measurers[key] = measurer
+
+    def evict(self, font_path: str, font_number: int = 0) -> bool:
+        """
+        Drop a font's measurer so the next get() reloads it.
+
+        Renderers already holding the measurer keep using it.
+
+        Returns:
+            True if a measurer was evicted.
+        """
+        with self._lock:
+            if self._measurers.pop(self._key(font_path, font_number), None) is None:
+                return False
+            self._evictions += 1
+            return True
+
+    def clear(self) -> None:
+        """Evict every measurer."""
+        with self._lock:
+            self._evictions += len(self._measurers)
+            self._measurers.clear()
+
+    def stats(self) -> FontRegistryStats:
+        """Return hit/miss/eviction counters and the number of registered fonts."""
+        with self._lock:
+            return FontRegistryStats(
+                self._hits, self._misses, self._evictions, len(self._measurers)
+            )
+
+    def __len__(self) -> int:
+        return len(self._measurers)
+
+
+_font_registry = FontRegistry()
+
+
+def get_font_registry() -> FontRegistry:
+    """Get the process-wide FontRegistry."""
+    return _font_registry
+
+
+def get_measurer(font_path: str, font_number: int = 0) -> FontMeasurer:
+    """
+    Get the process-wide shared FontMeasurer for a font file.
+
+    Args:
+        font_path: Path to a TTF/OTF/TTC font file.
+        font_number: Font index within a .ttc collection.
+
+    Returns:
+        The shared FontMeasurer (loaded lazily on first use).
+    """
+    return _font_registry.get(font_path, font_number)
+
+
 @lru_cache(maxsize=1)
+def _get_system_font_cached() -> Optional[str]:
+    return get_system_font()
+
+
 def get_default_measurer() -> Optional[FontMeasurer]:
-    """Get a cached FontMeasurer using the system default font."""
-    return FontMeasurer.system_default()
+    """
+    Get the shared FontMeasurer for the system default font.
+
+    The measurer loads its metrics on first use, so check is_available
+    before relying on it.
+
+    Returns:
+        FontMeasurer for the system font. If no system font is found, or it
+        can't be read because fonttools is missing and its metrics aren't
+        cached, the bundled DejaVu Sans metric pack (which needs no
+        fonttools). None only if neither is available.
+    """
+    font_path = _get_system_font_cached()
+    if font_path:
+        measurer = get_measurer(font_path)
+        if measurer._loaded:
+            if measurer._table is not None:
+                return measurer
+        elif _has_fonttools():
+            return measurer
+        else:
+            cache_path = get_metrics_cache_path(font_path)
+            if cache_path and os.path.exists(cache_path):
+                return measurer
+
+    from .metricpacks import get_pack_measurer
+
+    return get_pack_measurer("sans-serif")
+
+
+def _align_tables(tables: Sequence[AdvanceTable]) -> List[AdvanceTable]:
+    """
+    Re-lay out advance tables so they all share one page_offsets array.
+
+    The shared layout covers the union of every table's pages; each table
+    gets its own advances array in that layout (pages it lacks hold its
+    fallback width). Looking a codepoint up in any of the returned tables
+    costs exactly the same as in the original.
+    """
+    pages = sorted({page for table in tables for page, off in enumerate(table.page_offsets) if off})
+    page_offsets = array("i", [0]) * _PAGE_COUNT
+    for slot, page in enumerate(pages, start=1):
+        page_offsets[page] = slot * _PAGE_SIZE
+
+    aligned: List[AdvanceTable] = []
+    for table in tables:
+        advances = array("f", [table.fallback]) * _PAGE_SIZE
+        coverage = bytearray(_PAGE_SIZE >> 3)
+        for page in pages:
+            start = table.page_offsets[page]
+            advances.extend(table.advances[start : start + _PAGE_SIZE])
+            coverage += table.coverage[start >> 3 : (start + _PAGE_SIZE) >> 3]
+        aligned.append(
+            AdvanceTable(table.units_per_em, table.fallback, page_offsets, advances, coverage)
+        )
+    return aligned
+
+
+def _same_layout(tables: Sequence[AdvanceTable]) -> bool:
+    """Check whether tables already share one page layout, such as aligned shared metrics."""
+    first = tables[0]
+    return all(
+        table.page_offsets is first.page_offsets or table.page_offsets == first.page_offsets
+        for table in tables[1:]
+    )
+
+
+def _shared_table(font_path: str, font_number: int = 0) -> Optional[AdvanceTable]:
+    """Get the advance table of the registry's shared measurer for a font."""
+    return get_measurer(font_path, font_number).table
+
+
+def _shared_kerning(font_path: str, font_number: int = 0) -> KerningTable:
+    """Get the kerning pairs of the registry's shared measurer for a font."""
+    return get_measurer(font_path, font_number).kerning
+
+
+def _variable_instance_table(font_path: str, weight: float, italic: bool) -> Optional[AdvanceTable]:
+    """Build an advance table for one instance of a variable font."""
+    instance = _instantiate_variable_font(font_path, weight, italic)
+    return AdvanceTable.from_font(instance) if instance is not None else None
+
+
+def _variable_instance_kerning(font_path: str, weight: float, italic: bool) -> KerningTable:
+    """Build the kerning pairs for one instance of a variable font."""
+    instance = _instantiate_variable_font(font_path, weight, italic)
+    try:
+        return KerningTable.from_font(instance) if instance is not None else KerningTable({})
+    except Exception:
+        return KerningTable({})
+
+
+def _instantiate_variable_font(font_path: str, weight: float, italic: bool) -> Any:
+    """Instance a variable font at a weight (and italic), or None if that isn't possible."""
+    try:
+        from fontTools.ttLib import TTFont
+        from fontTools.varLib import instancer
+
+        font = TTFont(font_path)
+        axes = {axis.axisTag: axis for axis in font["fvar"].axes}
+        location: Dict[str, float] = {}
+        if "wght" in axes:
+            location["wght"] = min(max(weight, axes["wght"].minValue), axes["wght"].maxValue)
+        if italic:
+            if "ital" in axes:
+                location["ital"] = axes["ital"].maxValue
+            elif "slnt" in axes:
+                # Negative slant leans right, like an italic
+                location["slnt"] = axes["slnt"].minValue
+            else:
+                return None
+        return instancer.instantiateVariableFont(font, location, updateFontNames=False)
+    except Exception:
+        return None
+
+
+# Faces are indexed by bold * 2 + italic
+_FACE_NAMES = ("regular", "italic", "bold", "bold_italic")
+
+# When a face is missing, try these faces (by index) in order
+_FACE_FALLBACKS = ((0,), (1, 0), (2, 0), (3, 2, 1, 0))
+
+# A face is a font file path, or a (path, font number) pair for .ttc collections
+FaceSource = Union[str, Tuple[str, int]]
+
+
+def _face_source(face: Optional[FaceSource]) -> Optional[Tuple[str, int]]:
+    """Normalize a face to (path, font number)."""
+    if face is None:
+        return None
+    return (face, 0) if isinstance(face, str) else face
+
+
+class FontFamilyMeasurer:
+    """
+    Measure text with the real regular, bold, italic and bold-italic faces of a family.
+
+    All faces share one page layout (see AdvanceTable), with a compact
+    advances array per face, so measuring styled text costs the same as
+    measuring regular text. Faces load lazily on first use. Faces that were
+    published as a family with SharedMetrics already share a layout and are
+    read in place; others are copied onto a common layout.
+
+    Example:
+        >>> family = FontFamilyMeasurer(
+        ...     "Inter-Regular.ttf", bold="Inter-Bold.ttf", italic="Inter-Italic.ttf"
+        ... )
+        >>> family.measure("Hello", 14, bold=True)
+        37.4
+
+        >>> family = FontFamilyMeasurer.from_variable_font("Inter[wght].ttf")
+    """
+
+    def __init__(
+        self,
+        regular: FaceSource,
+        bold: Optional[FaceSource] = None,
+        italic: Optional[FaceSource] = None,
+        bold_italic: Optional[FaceSource] = None,
+    ) -> None:
+        """
+        Initialize the family from one font file per face.
+
+        Each face is a font file path, or a (path, font_number) pair for a
+        face inside a .ttc collection.
+
+        Args:
+            regular: The regular face (required).
+            bold: The bold face.
+            italic: The italic face.
+            bold_italic: The bold italic face.
+        """
+        sources = tuple(_face_source(face) for face in (regular, italic, bold, bold_italic))
+        faces = tuple(
+            (f"{source[0]}#{source[1]}" if source[1] else source[0]) if source else None
+            for source in sources
+        )
+        loaders = tuple(partial(_shared_table, *source) if source else None for source in sources)
+        kerning_loaders = tuple(
+            partial(_shared_kerning, *source) if source else None for source in sources
+        )
+        self._setup(faces, loaders, kerning_loaders)
+
+    @classmethod
+    def from_variable_font(
+        cls,
+        font_path: str,
+        italic_font_path: Optional[str] = None,
+        regular_weight: float = 400,
+        bold_weight: float = 700,
+    ) -> FontFamilyMeasurer:
+        """
+        Create a family from instances of a variable font.
+
+        Args:
+            font_path: Variable font with a wght axis.
+            italic_font_path: Separate variable font for italics. If None,
+                italics come from the font's ital or slnt axis when it has one.
+            regular_weight: wght value for the regular and italic faces.
+            bold_weight: wght value for the bold faces.
+
+        Returns:
+            A FontFamilyMeasurer whose faces are instantiated on first use.
+        """
+        family = cls.__new__(cls)
+        faces: List[Optional[str]] = []
+        loaders: List[Optional[Callable[[], Optional[AdvanceTable]]]] = []
+        kerning_loaders: List[Optional[Callable[[], KerningTable]]] = []
+        for index in range(4):
+            is_bold, is_italic = bool(index & 2), bool(index & 1)
+            path = italic_font_path if is_italic and italic_font_path else font_path
+            weight = bold_weight if is_bold else regular_weight
+            synthesize_italic = is_italic and not italic_font_path
+            faces.append(f"{path}@wght={weight}" + (",italic" if synthesize_italic else ""))
+            loaders.append(partial(_variable_instance_table, path, weight, synthesize_italic))
+            kerning_loaders.append(
+                partial(_variable_instance_kerning, path, weight, synthesize_italic)
+            )
+        family._setup(tuple(faces), tuple(loaders), tuple(kerning_loaders))
+        return family
+
+    @classmethod
+    def from_measurers(
+        cls,
+        regular: FontMeasurer,
+        bold: Optional[FontMeasurer] = None,
+        italic: Optional[FontMeasurer] = None,
+        bold_italic: Optional[FontMeasurer] = None,
+    ) -> FontFamilyMeasurer:
+        """
+        Create a family from existing measurers, one per face.
+
+        Returns:
+            A FontFamilyMeasurer whose faces load through the given measurers.
+        """
+        family = cls.__new__(cls)
+        measurers = (regular, italic, bold, bold_italic)
+        family._setup(
+            tuple(m.font_path if m else None for m in measurers),
+            tuple(partial(getattr, m, "table") if m else None for m in measurers),
+            tuple(partial(getattr, m, "kerning") if m else None for m in measurers),
+        )
+        return family
+
+    def with_fallback(self, font_paths: Sequence[str]) -> FontFamilyMeasurer:
+        """
+        Create a copy of the family that measures characters its faces lack with fallback fonts.
+
+        Each face is merged with the fallback chain the way FallbackMeasurer
+        merges its fonts, so styled text keeps its own face's widths and only
+        missing glyphs are measured with the fallbacks.
+
+        Args:
+            font_paths: Fallback font files in priority order.
+
+        Returns:
+            A FontFamilyMeasurer whose faces are merged on first use.
+        """
+        measurers = tuple(get_measurer(path) for path in font_paths)
+        family = type(self).__new__(type(self))
+        family._setup(
+            self.faces,
+            tuple(
+                partial(_fallback_face_table, loader, measurers) if loader else None
+                for loader in self._loaders
+            ),
+            self._kerning_loaders,
+        )
+        return family
+
+    def _setup(
+        self,
+        faces: Tuple[Optional[str], ...],
+        loaders: Tuple[Optional[Callable[[], Optional[AdvanceTable]]], ...],
+        kerning_loaders: Tuple[Optional[Callable[[], KerningTable]], ...],
+    ) -> None:
+        self.faces = faces
+        self._loaders = loaders
+        self._kerning_loaders = kerning_loaders
+        self._kerning: List[Optional[KerningTable]] = [None] * 4
+        self._tables: Tuple[Optional[AdvanceTable], ...] = (None,) * 4
+        self._resolved: Tuple[int, ...] = (0,) * 4
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Tuple[Optional[AdvanceTable], ...]:
+        """Load every face once and align them onto a shared page layout."""
+        if self._loaded:
+            return self._tables
+        with self._lock:
+            if self._loaded:
+                return self._tables
+            loaded = [loader() if loader else None for loader in self._loaders]
+            present = {index: table for index, table in enumerate(loaded) if table is not None}
+            tables: List[Optional[AdvanceTable]] = [None] * 4
+            if 0 in present:
+                faces = list(present.values())
+                if not _same_layout(faces):
+                    faces = _align_tables(faces)
+                for index, table in zip(present, faces):
+                    tables[index] = table
+            self._tables = tuple(tables)
+            self._resolved = tuple(
+                next((face for face in fallbacks if tables[face] is not None), 0)
+                for fallbacks in _FACE_FALLBACKS
+            )
+            self._loaded = True
+        return self._tables
+
+    @property
+    def is_available(self) -> bool:
+        """Check if at least the regular face can be measured (loads faces if needed)."""
+        return self._load()[0] is not None
+
+    def has_face(self, bold: bool = False, italic: bool = False) -> bool:
+        """Check whether the family has a real face for this style."""
+        return self._load()[bold * 2 + italic] is not None
+
+    def resolve(self, bold: bool = False, italic: bool = False) -> Tuple[bool, bool]:
+        """
+        Get the style of the face measure() uses for a requested style.
+
+        Missing faces fall back to the closest available one (bold italic
+        falls back to bold, then italic, then regular).
+
+        Returns:
+            Tuple of (bold, italic) for the face actually used.
+        """
+        self._load()
+        face = self._resolved[bold * 2 + italic]
+        return bool(face & 2), bool(face & 1)
+
+    def measure(
+        self,
+        text: str,
+        font_size: float,
+        bold: bool = False,
+        italic: bool = False,
+        kerning: bool = False,
+    ) -> float:
+        """
+        Measure the width of text in pixels with the face for the given style.
+
+        Args:
+            text: The text to measure.
+            font_size: Font size in pixels.
+            bold: Measure with the bold face.
+            italic: Measure with the italic face.
+            kerning: Apply the face's pair kerning (see FontMeasurer.measure()).
+
+        Returns:
+            Width in pixels.
+
+        Raises:
+            RuntimeError: If the regular face can't be loaded.
+        """
+        if not text:
+            return 0.0
+
+        tables = self._tables if self._loaded else self._load()
+        face = self._resolved[bold * 2 + italic]
+        table = tables[face]
+        if table is None:
+            raise RuntimeError(
+                "FontFamilyMeasurer not available. Install fonttools: pip install fonttools"
+            )
+        total = table.total(text)
+        if kerning:
+            total += self._load_kerning(face).total(text)
+        return (total / table.units_per_em) * font_size
+
+    def _load_kerning(self, face: int) -> KerningTable:
+        """Load a face's kerning pairs on first use."""
+        kerning = self._kerning[face]
+        if kerning is None:
+            with self._lock:
+                kerning = self._kerning[face]
+                if kerning is None:
+                    loader = self._kerning_loaders[face]
+                    kerning = loader() if loader else KerningTable({})
+                    self._kerning[face] = kerning
+        return kerning
+
+    def __repr__(self) -> str:
+        faces = ", ".join(f"{name}={face!r}" for name, face in zip(_FACE_NAMES, self.faces) if face)
+        return f"FontFamilyMeasurer({faces})"
+
+
+def _page_coverage(table: AdvanceTable, page: int) -> int:
+    """Get a page's coverage bitmap as an int (bit i is codepoint page * 256 + i)."""
+    start = table.page_offsets[page] >> 3
+    return int.from_bytes(table.coverage[start : start + (_PAGE_SIZE >> 3)], "little")
+
+
+def _merge_fallback_tables(tables: Sequence[AdvanceTable]) -> Tuple[AdvanceTable, Dict[int, int]]:
+    """
+    Merge a fallback chain into one advance table in the first table's units.
+
+    Each codepoint takes its advance from the first table that covers it.
+    Resolution happens once per page: a page whose glyphs all come from one
+    font is copied from it whole, and only pages that mix fonts are
+    resolved codepoint by codepoint.
+
+    Returns:
+        Tuple of (merged table, mapping of page number to the index of the
+        table that covers the whole page, or -1 when the page mixes fonts).
+    """
+    primary = tables[0]
+    fallback = primary.fallback
+    pages: Dict[int, array[float]] = {}
+    coverage: Dict[int, bytearray] = {}
+    owners: Dict[int, int] = {}
+
+    page_numbers = sorted(
+        {page for table in tables for page, offset in enumerate(table.page_offsets) if offset}
+    )
+    for page in page_numbers:
+        candidates = [
+            (index, table, _page_coverage(table, page))
+            for index, table in enumerate(tables)
+            if table.page_offsets[page]
+        ]
+        union = 0
+        for _, _, bits in candidates:
+            union |= bits
+        if not union:
+            continue
+
+        merged = array("f", [fallback]) * _PAGE_SIZE
+        owner = next(index for index, _, bits in candidates if bits)
+        remaining = union
+        for index, table, bits in candidates:
+            claimed = bits & remaining
+            if not claimed:
+                continue
+            if claimed != bits or index != owner:
+                owner = -1
+            remaining &= ~claimed
+            start = table.page_offsets[page]
+            scale = primary.units_per_em / table.units_per_em
+            for slot in range(_PAGE_SIZE):
+                if claimed >> slot & 1:
+                    merged[slot] = table.advances[start + slot] * scale
+            if not remaining:
+                break
+
+        pages[page] = merged
+        coverage[page] = bytearray(union.to_bytes(_PAGE_SIZE >> 3, "little"))
+        owners[page] = owner
+
+    table = AdvanceTable.from_pages(primary.units_per_em, fallback, pages, coverage)
+    return table, owners
+
+
+def _fallback_face_table(
+    loader: Callable[[], Optional[AdvanceTable]], measurers: Sequence[FontMeasurer]
+) -> Optional[AdvanceTable]:
+    """Load a family face and merge a fallback chain into it."""
+    table = loader()
+    if table is None:
+        return None
+    fallbacks = [measurer.table for measurer in measurers]
+    tables = [table, *(fallback for fallback in fallbacks if fallback is not None)]
+    return _merge_fallback_tables(tables)[0] if len(tables) > 1 else table
+
+
+class FallbackMeasurer:
+    """
+    Measure text with a chain of fonts, like a CSS font-family fallback list.
+
+    Each character is measured with the first font in the chain that has a
+    glyph for it, so CJK, emoji and symbols get real widths instead of the
+    fallback charge. Every font's coverage bitmap is consulted once per
+    256-codepoint block when the chain loads, and the chosen advances are
+    merged into a single table, so mixed-script text still measures in one
+    pass. Fonts are shared through the font registry and load on first use.
+
+    Example:
+        >>> measurer = FallbackMeasurer(
+        ...     ["Inter-Regular.ttf", "NotoSansCJK-Regular.ttc", "NotoColorEmoji.ttf"]
+        ... )
+        >>> measurer.measure("Hello 世界 👋", 14)
+        78.6
+    """
+
+    def __init__(self, font_paths: Sequence[str]) -> None:
+        """
+        Initialize the fallback chain.
+
+        Args:
+            font_paths: Font files in priority order. Widths are reported in
+                the units of the first font that loads; fonts that can't be
+                loaded are skipped.
+        """
+        if not font_paths:
+            raise ValueError("FallbackMeasurer needs at least one font")
+        self.font_paths: Tuple[str, ...] = tuple(font_paths)
+        self._measurers = tuple(get_measurer(path) for path in self.font_paths)
+        self._table: Optional[AdvanceTable] = None
+        self._chain: Tuple[Tuple[int, AdvanceTable], ...] = ()
+        self._owners: Dict[int, int] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Optional[AdvanceTable]:
+        """Load every font in the chain once and merge their advances."""
+        if self._loaded:
+            return self._table
+        with self._lock:
+            if not self._loaded:
+                chain = tuple(
+                    (index, measurer.table)
+                    for index, measurer in enumerate(self._measurers)
+                    if measurer.table is not None
+                )
+                if chain:
+                    self._table, owners = _merge_fallback_tables([table for _, table in chain])
+                    # Report owners as positions in font_paths, skipping failed fonts
+                    self._owners = {
+                        page: chain[owner][0] if owner >= 0 else -1
+                        for page, owner in owners.items()
+                    }
+                self._chain = chain
+                self._loaded = True
+        return self._table
+
+    @property
+    def is_available(self) -> bool:
+        """Check if at least one font in the chain can be loaded (loads fonts if needed)."""
+        return self._load() is not None
+
+    @property
+    def table(self) -> Optional[AdvanceTable]:
+        """The merged advance table, or None if no font in the chain loads."""
+        return self._load()
+
+    def font_index(self, char: str) -> Optional[int]:
+        """
+        Get the position in font_paths of the font that measures a character.
+
+        Returns:
+            Index into font_paths, or None if no font in the chain covers it.
+        """
+        self._load()
+        codepoint = ord(char)
+        owner = self._owners.get(codepoint >> _PAGE_SHIFT)
+        if owner is None:
+            return None
+        if owner >= 0:
+            return owner if self._table is not None and self._table.covers(codepoint) else None
+        return next((index for index, table in self._chain if table.covers(codepoint)), None)
+
+    def measure(self, text: str, font_size: float, kerning: bool = False) -> float:
+        """
+        Measure the width of text in pixels.
+
+        Args:
+            text: The text to measure.
+            font_size: Font size in pixels.
+            kerning: Apply the first font's pair kerning. Only pairs where
+                both characters come from that font are kerned.
+
+        Returns:
+            Width in pixels.
+
+        Raises:
+            RuntimeError: If no font in the chain can be loaded.
+        """
+        if not text:
+            return 0.0
+
+        table = self._table if self._loaded else self._load()
+        if table is None:
+            raise RuntimeError(
+                "FallbackMeasurer not available. Install fonttools: pip install fonttools"
+            )
+        total = table.total(text)
+        if kerning:
+            total += self._measurers[self._chain[0][0]].kerning.total(text)
+        return (total / table.units_per_em) * font_size
+
+    def measure_many(self, texts: Sequence[str], font_size: float) -> Sequence[float]:
+        """
+        Measure the widths of many strings in pixels in one batch.
+
+        See FontMeasurer.measure_many().
+        """
+        table = self._table if self._loaded else self._load()
+        if table is None:
+            raise RuntimeError(
+                "FallbackMeasurer not available. Install fonttools: pip install fonttools"
+            )
+        totals: Any = table.totals(texts)
+        units_per_em = table.units_per_em
+        if isinstance(totals, array):
+            return array("d", [(total / units_per_em) * font_size for total in totals])
+        return cast(Sequence[float], (totals / units_per_em) * font_size)
+
+    def __repr__(self) -> str:
+        return f"FallbackMeasurer({list(self.font_paths)!r})"
+
+
+def warmup(*font_paths: str) -> bool:
+    """
+    Load font metrics ahead of the first render.
+
+    Measurers load lazily, so the first render in a process pays for
+    importing fonttools and reading the font. Servers can call this at boot
+    to move that cost out of the first request. Loading also fills the
+    on-disk metrics cache and the installed font index for later processes.
+
+    Args:
+        *font_paths: Additional font files (e.g. the font_path and
+            mono_font_path passed to SVGRenderer) to load.
+
+    Returns:
+        True if precise measurement with the system default font is available.
+
+    Example:
+        >>> import mdsvg
+        >>> mdsvg.warmup("./fonts/Inter-Regular.ttf")
+        True
+    """
+    from .fontindex import get_font_index
+
+    for font_path in font_paths:
+        get_measurer(font_path)._load()
+
+    # Build or refresh the installed font index used to resolve CSS font stacks
+    len(get_font_index())
+
+    measurer = get_default_measurer()
+    return measurer is not None and measurer.is_available
 
 
 def create_precise_wrapper(
     max_width: float,
     font_size: float,
     measurer: Optional[FontMeasurer] = None,
+    font_path: Optional[str] = None,
 ) -> Callable[[str], List[str]]:
     """
     Create a text wrapper function that uses precise font measurement.
@@ -197,12 +1638,14 @@ def create_precise_wrapper(
         max_width: Maximum line width in pixels.
         font_size: Font size in pixels.
         measurer: FontMeasurer to use (auto-detects if None).
+        font_path: Font file to measure with, via the shared registry.
+            Ignored if measurer is given.
 
     Returns:
         A function that takes text and returns list of wrapped lines.
     """
     if measurer is None:
-        measurer = get_default_measurer()
+        measurer = get_measurer(font_path) if font_path else get_default_measurer()
 
     if measurer is None or not measurer.is_available:
         from .measure import wrap_text
@@ -268,16 +1711,55 @@ def calibrate_heuristic(
     return (ratio, ratio * 1.08)
 
 
-def get_font_cache_dir() -> str:
+def calibrate_char_widths(measurer: Optional[FontMeasurer] = None) -> CharWidthTable:
     """
-    Get the directory for caching downloaded fonts.
+    Build a full per-character heuristic table from a real font.
 
-    Creates the directory if it doesn't exist.
+    Unlike calibrate_heuristic(), which reduces a font to one average ratio,
+    this copies the width of every character the font covers. The table can
+    then be saved or passed to estimate_text_width() to measure like the font
+    without loading it again. Characters the font lacks get the average width
+    of its ASCII letters.
+
+    Args:
+        measurer: FontMeasurer to calibrate from. Defaults to
+            get_default_measurer().
 
     Returns:
-        Path to the font cache directory.
+        A CharWidthTable, or the default heuristic table if no font is available.
+
+    Example:
+        >>> table = calibrate_char_widths(FontMeasurer("/path/to/Inter.ttf"))
+        >>> estimate_text_width("Hello", 14, table=table)
+        35.2
     """
-    # Use platform-appropriate cache directory
+    if measurer is None:
+        measurer = get_default_measurer()
+
+    table = measurer.table if measurer is not None else None
+    if table is None:
+        return heuristic_table(0.48)
+
+    units_per_em = table.units_per_em
+    ascii_ratios = tuple(table.advance(codepoint) / units_per_em for codepoint in range(128))
+    import string
+
+    letters = [ascii_ratios[ord(char)] for char in string.ascii_letters]
+
+    extra: Dict[int, float] = {}
+    for page_number, offset in enumerate(table.page_offsets):
+        if offset == 0:
+            continue
+        first = max(page_number << _PAGE_SHIFT, 128)
+        for codepoint in range(first, (page_number + 1) << _PAGE_SHIFT):
+            if table.covers(codepoint):
+                extra[codepoint] = table.advance(codepoint) / units_per_em
+
+    return CharWidthTable(ascii_ratios, sum(letters) / len(letters), extra)
+
+
+def _get_cache_root() -> str:
+    """Get the platform-appropriate mdsvg cache directory (not created)."""
     system = platform.system()
 
     if system == "Darwin":
@@ -287,11 +1769,71 @@ def get_font_cache_dir() -> str:
     else:
         cache_base = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
 
-    cache_dir = os.path.join(cache_base, "mdsvg", "fonts")
+    return os.path.join(cache_base, "mdsvg")
+
+
+def get_font_cache_dir() -> str:
+    """
+    Get the directory for caching downloaded fonts.
+
+    Creates the directory if it doesn't exist.
+
+    Returns:
+        Path to the font cache directory.
+    """
+    cache_dir = os.path.join(_get_cache_root(), "fonts")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def get_metrics_cache_dir() -> str:
+    """
+    Get the directory for cached font metrics, next to the font cache.
+
+    Creates the directory if it doesn't exist.
+
+    Returns:
+        Path to the metrics cache directory.
+    """
+    cache_dir = os.path.join(_get_cache_root(), "metrics")
     os.makedirs(cache_dir, exist_ok=True)
     return cache_dir
 
 
+def get_metrics_cache_path(
+    font_path: str, font_number: int = 0, kind: str = "metrics"
+) -> Optional[str]:
+    """
+    Get the metrics cache file for a font.
+
+    The file name is a fingerprint of the font's resolved path, size,
+    modification time and font number, so editing or replacing the font
+    file automatically selects a new cache entry.
+
+    Args:
+        font_path: Path to the font file.
+        font_number: Font index within a .ttc collection.
+        kind: Which cache file: "metrics" for advance widths or "kern" for
+            kerning pairs.
+
+    Returns:
+        Path to the cache file (which may not exist yet), or None if the
+        font file can't be read or the cache directory can't be created.
+    """
+    try:
+        real_path = os.path.realpath(font_path)
+        stat = os.stat(real_path)
+        cache_dir = get_metrics_cache_dir()
+    except OSError:
+        return None
+
+    fingerprint = f"{real_path}|{stat.st_size}|{stat.st_mtime_ns}|{font_number}"
+    import hashlib
+
+    digest = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.v{_METRICS_VERSION}.{kind}")
+
+
 def download_google_font(
     font_name: str,
     weight: int = 400,
@@ -0,0 +1,239 @@
+"""
+Positioned layout tree for rendered Markdown.
+
+SVGRenderer renders in two stages. layout() places every block, line and
+run of a document in a LayoutTree, and render_layout() serializes the tree
+to SVG. The tree is also useful without the SVG: hit_test() finds the boxes
+under a point, paginate() splits the document into pages, and to_json()
+exports it for client-side renderers.
+
+Coordinates are pixels from the top-left corner of the rendered SVG.
+
+Example:
+    >>> renderer = SVGRenderer()
+    >>> tree = renderer.layout(parse("# Title\\n\\nSome text"), width=400)
+    >>> [box.kind for box in tree.hit_test(30, 120)]
+    ['paragraph']
+    >>> svg = renderer.render_layout(tree).to_svg()
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .types import Block, CodeBlock, Heading, ImageBlock, _slotted
+
+
+class LayoutRun(NamedTuple):
+    """A run of text in one style, placed on a line."""
+
+    text: str
+    x: float  # Left edge
+    width: float
+    is_bold: bool = False
+    is_italic: bool = False
+    is_code: bool = False
+    is_link: bool = False
+    url: Optional[str] = None
+
+
+class LayoutLine(NamedTuple):
+    """
+    A line of text.
+
+    Like an SVG <text> element, the line is placed at x by its anchor:
+    x is its left edge for "start", its center for "middle" and its right
+    edge for "end". Runs are placed by their left edges.
+    """
+
+    x: float
+    y: float  # Top of the line box
+    width: float  # Width of the text
+    height: float  # Line height
+    baseline: float
+    font_size: float
+    runs: Tuple[LayoutRun, ...] = ()
+    anchor: str = "start"
+
+    @property
+    def left(self) -> float:
+        """Get the left edge of the text."""
+        if self.anchor == "middle":
+            return self.x - self.width / 2
+        if self.anchor == "end":
+            return self.x - self.width
+        return self.x
+
+
+class LayoutBox(NamedTuple):
+    """
+    A positioned block.
+
+    Boxes, lines and runs are named tuples, which are cheap to create and
+    small: a tree has one per block, line and run of the document.
+
+    Attributes:
+        kind: The block's BlockType value (e.g. "paragraph" or "table"), or
+            "list_item", "table_row" or "table_cell" for the parts of lists
+            and tables.
+        x: Left edge.
+        y: Top edge.
+        width: Width.
+        height: Height.
+        lines: Lines of text in the box itself, not in its children.
+        children: Nested boxes: a blockquote's blocks, a list's items, an
+            item's nested list, a table's rows (header first) and a row's cells.
+        block: The block the box was laid out from; None for list items and
+            table rows and cells.
+        marker: A list item's bullet ("•") or number (e.g. "3.").
+    """
+
+    kind: str
+    x: float
+    y: float
+    width: float
+    height: float
+    lines: Tuple[LayoutLine, ...] = ()
+    children: Tuple[LayoutBox, ...] = ()
+    block: Optional[Block] = None
+    marker: Optional[str] = None
+
+    def contains(self, x: float, y: float) -> bool:
+        """Check if a point is inside the box."""
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the box and its children to JSON-compatible data."""
+        data: Dict[str, Any] = {
+            "kind": self.kind,
+            "x": self.x,
+            "y": self.y,
+            "width": self.width,
+            "height": self.height,
+        }
+        if isinstance(self.block, Heading):
+            data["level"] = self.block.level
+        elif isinstance(self.block, CodeBlock):
+            data["language"] = self.block.language
+        elif isinstance(self.block, ImageBlock):
+            data["url"] = self.block.url
+            data["alt"] = self.block.alt
+            data["title"] = self.block.title
+        if self.marker is not None:
+            data["marker"] = self.marker
+        if self.lines:
+            data["lines"] = [_line_to_dict(line) for line in self.lines]
+        if self.children:
+            data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+
+@_slotted
+@dataclass(frozen=True)
+class LayoutTree:
+    """
+    A laid out document: its top-level boxes and the SVG's size.
+
+    A tree is laid out for one renderer's style and fonts, and
+    render_layout() on that renderer turns it into the same SVG render()
+    would produce.
+    """
+
+    width: float
+    height: float
+    padding: float
+    boxes: Tuple[LayoutBox, ...]
+
+    def hit_test(self, x: float, y: float) -> List[LayoutBox]:
+        """
+        Find the boxes under a point.
+
+        Returns:
+            The boxes containing the point, from the top-level box down to
+            the innermost one, or an empty list if the point is between
+            blocks.
+        """
+        path: List[LayoutBox] = []
+        boxes = self.boxes
+        while True:
+            for box in boxes:
+                if box.contains(x, y):
+                    path.append(box)
+                    boxes = box.children
+                    break
+            else:
+                return path
+
+    def paginate(self, page_height: float) -> List[List[LayoutBox]]:
+        """
+        Split the top-level boxes into pages.
+
+        Boxes are never split: a box that would end past the bottom of the
+        current page starts a new one, and a box taller than a page gets a
+        page of its own.
+
+        Args:
+            page_height: Height of a page, in pixels.
+
+        Returns:
+            The boxes on each page.
+
+        Raises:
+            ValueError: If page_height isn't positive.
+        """
+        if page_height <= 0:
+            raise ValueError("page_height must be positive")
+        pages: List[List[LayoutBox]] = []
+        page_top = 0.0
+        for box in self.boxes:
+            if not pages or box.y + box.height - page_top > page_height:
+                pages.append([])
+                page_top = box.y
+            pages[-1].append(box)
+        return pages
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the tree to JSON-compatible data."""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "padding": self.padding,
+            "boxes": [box.to_dict() for box in self.boxes],
+        }
+
+    def to_json(self, **kwargs: Any) -> str:
+        """
+        Serialize the tree as JSON.
+
+        Args:
+            **kwargs: Passed to json.dumps(), e.g. indent=2.
+        """
+        import json
+
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+def _line_to_dict(line: LayoutLine) -> Dict[str, Any]:
+    """Convert a line and its runs to JSON-compatible data."""
+    return {
+        "x": line.x,
+        "y": line.y,
+        "width": line.width,
+        "height": line.height,
+        "baseline": line.baseline,
+        "font_size": line.font_size,
+        "anchor": line.anchor,
+        "runs": [
+            {
+                "text": run.text,
+                "x": run.x,
+                "width": run.width,
+                "bold": run.is_bold,
+                "italic": run.is_italic,
+                "code": run.is_code,
+                "url": run.url if run.is_link else None,
+            }
+            for run in line.runs
+        ],
+    }
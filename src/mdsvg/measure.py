@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
-from collections.abc import Sequence
-from dataclasses import dataclass
-from typing import TYPE_CHECKING, List
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Mapping, NamedTuple, Optional, Tuple
 
 if TYPE_CHECKING:
     from .style import Style
@@ -29,6 +32,206 @@ class TextMetrics:
     lines: tuple[str, ...]
 
 
+class WidthCacheInfo(NamedTuple):
+    """Hit/miss statistics for a WidthCache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class WidthCache:
+    """
+    Thread-safe, size-bounded LRU cache of measured text widths.
+
+    The renderer keys entries by the text, font size, style flags and the
+    measurement setup (font file and width ratios), so one cache can safely
+    be shared by every SVGRenderer in a process. The setup is registered
+    once with scope_id(), so lookups only hash a small integer and the text.
+
+    Example:
+        >>> cache = WidthCache(maxsize=50_000)
+        >>> renderer = SVGRenderer(width_cache=cache)
+        >>> renderer.render(parse(markdown))
+        >>> cache.info()
+        WidthCacheInfo(hits=812, misses=164, maxsize=50000, currsize=164)
+    """
+
+    def __init__(self, maxsize: int = 8192) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of widths to keep. 0 disables caching
+                while still counting misses.
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._scopes: OrderedDict[Hashable, int] = OrderedDict()
+        self._next_scope = 0
+
+    def scope_id(self, scope: Hashable) -> int:
+        """
+        Get a small integer standing for a measurement setup, to build keys from.
+
+        Equal scopes get the same id while they are remembered. Only the most
+        recently used scopes are kept; a forgotten scope gets a new id, and
+        ids are never reused, so keys from different scopes never collide.
+        Ids are multiples of 8, leaving the low bits for style flags.
+        """
+        with self._lock:
+            scope_id = self._scopes.get(scope)
+            if scope_id is None:
+                scope_id = self._scopes[scope] = self._next_scope
+                self._next_scope += 8
+                if len(self._scopes) > _MAX_SCOPES:
+                    self._scopes.popitem(last=False)
+            else:
+                self._scopes.move_to_end(scope)
+            return scope_id
+
+    def get(self, key: Hashable) -> Optional[float]:
+        """Return the cached width for key, or None on a miss."""
+        with self._lock:
+            width = self._entries.get(key)
+            if width is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return width
+
+    def put(self, key: Hashable, width: float) -> None:
+        """Store a width, evicting the least recently used entry if full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = width
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def info(self) -> WidthCacheInfo:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return WidthCacheInfo(self._hits, self._misses, self.maxsize, len(self._entries))
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Measurement setups a WidthCache remembers ids for (see WidthCache.scope_id)
+_MAX_SCOPES = 256
+
+_default_width_cache = WidthCache()
+
+
+def get_default_width_cache() -> WidthCache:
+    """Get the process-wide WidthCache shared by renderers by default."""
+    return _default_width_cache
+
+
+# Heuristic width multipliers (relative to the base ratio) by character class.
+# The first class containing a character wins; everything else is 1.0.
+_HEURISTIC_CLASSES = (
+    ("iIlj1|!.,;:'`", 0.5),  # Narrow
+    ("mwMW@", 1.5),  # Wide
+    ("ABCDEFGHJKNOPQRSTUVXYZ0234567890", 1.2),  # Medium-wide
+    (" ", 0.8),  # Space
+)
+
+# Monospace fonts have consistent width
+_MONO_RATIO = 0.6
+
+
+@dataclass(frozen=True, eq=False)
+class CharWidthTable:
+    """
+    Per-character widths as fractions of the font size.
+
+    ASCII widths are a 128-entry tuple, so measuring an ASCII string is one
+    table-sum pass over its bytes. Other characters are looked up in `extra`
+    and fall back to `default`. Tables compare and hash by identity, so they
+    can be part of a WidthCache key.
+
+    Example:
+        >>> table = heuristic_table(0.48)
+        >>> table.width("Hello", 14.0)
+        28.224
+    """
+
+    ascii: Tuple[float, ...]
+    default: float
+    extra: Mapping[int, float] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if len(self.ascii) != 128:
+            raise ValueError(f"ascii must have 128 entries, got {len(self.ascii)}")
+
+    def ratio(self, char: str) -> float:
+        """Width of a single character as a fraction of the font size."""
+        codepoint = ord(char)
+        if codepoint < 128:
+            return self.ascii[codepoint]
+        return self.extra.get(codepoint, self.default)
+
+    def total(self, text: str) -> float:
+        """Sum of the width ratios of every character in text."""
+        if text.isascii():
+            return sum(map(self.ascii.__getitem__, text.encode("ascii")))
+        ascii_ratios = self.ascii
+        get = self.extra.get
+        default = self.default
+        return sum(
+            [
+                ascii_ratios[codepoint] if codepoint < 128 else get(codepoint, default)
+                for codepoint in map(ord, text)
+            ]
+        )
+
+    def width(self, text: str, font_size: float) -> float:
+        """Width of text in pixels at font_size."""
+        return self.total(text) * font_size
+
+
+@lru_cache(maxsize=64)
+def heuristic_table(base_ratio: float) -> CharWidthTable:
+    """
+    Compile the character-class heuristic into a CharWidthTable.
+
+    Tables are cached per ratio, so each (char_width_ratio,
+    bold_char_width_ratio) pair is compiled once per process.
+
+    Args:
+        base_ratio: Average character width ratio, e.g. Style.char_width_ratio.
+
+    Returns:
+        The table; non-ASCII characters get base_ratio.
+    """
+    ascii_ratios = [base_ratio] * 128
+    for chars, multiplier in reversed(_HEURISTIC_CLASSES):
+        for char in chars:
+            ascii_ratios[ord(char)] = base_ratio * multiplier
+    return CharWidthTable(tuple(ascii_ratios), base_ratio)
+
+
+@lru_cache(maxsize=None)
+def _mono_table() -> CharWidthTable:
+    """Get the table for monospace text, where every character is the same width."""
+    return CharWidthTable((_MONO_RATIO,) * 128, _MONO_RATIO)
+
+
 def estimate_char_width(
     char: str,
     font_size: float,
@@ -55,28 +258,9 @@ def estimate_char_width(
         Estimated width in pixels.
     """
     if is_mono:
-        # Monospace fonts have consistent width
-        return font_size * 0.6
-
-    base_ratio = bold_char_width_ratio if is_bold else char_width_ratio
-
-    # Narrow characters
-    if char in "iIlj1|!.,;:'`":
-        return font_size * base_ratio * 0.5
-
-    # Wide characters
-    if char in "mwMW@":
-        return font_size * base_ratio * 1.5
-
-    # Medium-wide characters
-    if char in "ABCDEFGHJKNOPQRSTUVXYZ0234567890":
-        return font_size * base_ratio * 1.2
-
-    # Spaces
-    if char == " ":
-        return font_size * base_ratio * 0.8
-
-    return font_size * base_ratio
+        return font_size * _MONO_RATIO
+    table = heuristic_table(bold_char_width_ratio if is_bold else char_width_ratio)
+    return font_size * table.ratio(char)
 
 
 def estimate_text_width(
@@ -86,6 +270,7 @@ def estimate_text_width(
     is_mono: bool = False,
     char_width_ratio: float = 0.48,
     bold_char_width_ratio: float = 0.52,
+    table: Optional[CharWidthTable] = None,
 ) -> float:
     """
     Estimate the width of a text string.
@@ -97,14 +282,17 @@ def estimate_text_width(
         is_mono: Whether using a monospace font.
         char_width_ratio: Average character width ratio for normal text.
         bold_char_width_ratio: Average character width ratio for bold text.
+        table: Per-character widths to use instead of the heuristic, e.g.
+            from calibrate_char_widths(). Ignored for monospace text.
 
     Returns:
         Estimated width in pixels.
     """
-    return sum(
-        estimate_char_width(c, font_size, is_bold, is_mono, char_width_ratio, bold_char_width_ratio)
-        for c in text
-    )
+    if is_mono:
+        return len(text) * font_size * _MONO_RATIO
+    if table is None:
+        table = heuristic_table(bold_char_width_ratio if is_bold else char_width_ratio)
+    return table.width(text, font_size)
 
 
 def wrap_text(
@@ -115,6 +303,7 @@ def wrap_text(
     is_mono: bool = False,
     char_width_ratio: float = 0.48,
     bold_char_width_ratio: float = 0.52,
+    table: Optional[CharWidthTable] = None,
 ) -> List[str]:
     """
     Wrap text to fit within a maximum width.
@@ -127,6 +316,7 @@ def wrap_text(
         is_mono: Whether using a monospace font.
         char_width_ratio: Average character width ratio.
         bold_char_width_ratio: Character width ratio for bold.
+        table: Per-character widths to use instead of the heuristic.
 
     Returns:
         List of wrapped lines.
@@ -134,37 +324,28 @@ def wrap_text(
     if not text:
         return [""]
 
+    if is_mono:
+        table = _mono_table()
+    elif table is None:
+        table = heuristic_table(bold_char_width_ratio if is_bold else char_width_ratio)
+
     words = text.split(" ")
     lines: List[str] = []
     current_line: List[str] = []
     current_width = 0.0
 
-    space_width = estimate_char_width(
-        " ", font_size, is_bold, is_mono, char_width_ratio, bold_char_width_ratio
-    )
+    space_width = table.width(" ", font_size)
 
     for word in words:
-        word_width = estimate_text_width(
-            word, font_size, is_bold, is_mono, char_width_ratio, bold_char_width_ratio
-        )
+        word_width = table.width(word, font_size)
 
         # If word is longer than max_width, force break it
         if word_width > max_width and not current_line:
             # Break the long word
-            broken = _break_long_word(
-                word,
-                max_width,
-                font_size,
-                is_bold,
-                is_mono,
-                char_width_ratio,
-                bold_char_width_ratio,
-            )
+            broken = _break_long_word(word, max_width, font_size, table)
             lines.extend(broken[:-1])
             current_line = [broken[-1]]
-            current_width = estimate_text_width(
-                broken[-1], font_size, is_bold, is_mono, char_width_ratio, bold_char_width_ratio
-            )
+            current_width = table.width(broken[-1], font_size)
             continue
 
         # Check if word fits on current line
@@ -191,10 +372,7 @@ def _break_long_word(
     word: str,
     max_width: float,
     font_size: float,
-    is_bold: bool,
-    is_mono: bool,
-    char_width_ratio: float,
-    bold_char_width_ratio: float,
+    table: CharWidthTable,
 ) -> List[str]:
     """Break a word that's longer than max_width into chunks."""
     chunks: List[str] = []
@@ -202,9 +380,7 @@ def _break_long_word(
     current_width = 0.0
 
     for char in word:
-        char_width = estimate_char_width(
-            char, font_size, is_bold, is_mono, char_width_ratio, bold_char_width_ratio
-        )
+        char_width = font_size * table.ratio(char)
 
         if current_width + char_width > max_width and current_chunk:
             chunks.append(current_chunk)
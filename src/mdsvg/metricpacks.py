@@ -0,0 +1,212 @@
+"""Precomputed font metrics shipped with mdsvg.
+
+Metric packs are advance (and kerning) tables extracted from common fonts
+and stored as package data in the metrics cache file format. They let
+precise measurement work where no fonts are installed or fonttools is
+missing, such as slim containers. Loading a pack reads one small file and
+does not import fonttools.
+
+## Basic Usage
+
+    from mdsvg.metricpacks import get_pack_measurer
+
+    measurer = get_pack_measurer("Helvetica, sans-serif")  # DejaVu Sans pack
+    width = measurer.measure("Hello World", 14)
+
+Packs are built from font files with `write_metric_pack()`; see
+`scripts/build_metric_packs.py`.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .fontindex import parse_font_stack
+from .fonts import (
+    AdvanceTable,
+    FontFamilyMeasurer,
+    FontMeasurer,
+    KerningTable,
+    _open_font,
+)
+
+_PACK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "metrics")
+
+
+class MetricPack(NamedTuple):
+    """The bundled metric files for one font family (file stems; None if not bundled)."""
+
+    family: str
+    regular: str
+    bold: Optional[str] = None
+    italic: Optional[str] = None
+    bold_italic: Optional[str] = None
+    aliases: Tuple[str, ...] = ()  # Metric-compatible families this pack stands in for
+
+
+METRIC_PACKS: Tuple[MetricPack, ...] = (
+    MetricPack(
+        "DejaVu Sans",
+        "dejavu-sans",
+        bold="dejavu-sans-bold",
+        aliases=("Bitstream Vera Sans",),
+    ),
+    MetricPack(
+        "DejaVu Serif",
+        "dejavu-serif",
+        bold="dejavu-serif-bold",
+        aliases=("Bitstream Vera Serif",),
+    ),
+    MetricPack(
+        "DejaVu Sans Mono",
+        "dejavu-sans-mono",
+        bold="dejavu-sans-mono-bold",
+        aliases=("Bitstream Vera Sans Mono",),
+    ),
+)
+
+# Packs used for CSS generic and system font keywords when no named family matches
+_GENERIC_PACKS = {
+    "sans-serif": "DejaVu Sans",
+    "system-ui": "DejaVu Sans",
+    "ui-sans-serif": "DejaVu Sans",
+    "serif": "DejaVu Serif",
+    "ui-serif": "DejaVu Serif",
+    "monospace": "DejaVu Sans Mono",
+    "ui-monospace": "DejaVu Sans Mono",
+}
+
+_PACKS_BY_NAME: Dict[str, MetricPack] = {
+    name.casefold(): pack for pack in METRIC_PACKS for name in (pack.family, *pack.aliases)
+}
+
+
+@dataclass(frozen=True)
+class PackMeasurer(FontMeasurer):
+    """
+    A FontMeasurer that reads a bundled metric pack instead of a font file.
+
+    font_path is the pack's file stem. Packs need neither the font file nor
+    fonttools, and load from package data on first use.
+    """
+
+    def _init_font(self) -> Optional[AdvanceTable]:
+        return AdvanceTable.load(os.path.join(_PACK_DIR, f"{self.font_path}.metrics"))
+
+    def _init_kerning(self) -> KerningTable:
+        kerning = KerningTable.load(os.path.join(_PACK_DIR, f"{self.font_path}.kern"))
+        return kerning if kerning is not None else KerningTable({})
+
+
+def find_metric_pack(stack: str) -> Optional[MetricPack]:
+    """
+    Find the bundled pack for a CSS font-family stack.
+
+    The first family in the stack that has a pack (or that a pack is
+    metric-compatible with) wins; generic families map to the closest
+    bundled family.
+
+    Returns:
+        The pack, or None if nothing in the stack has one.
+    """
+    for name in parse_font_stack(stack):
+        key = name.casefold()
+        pack = _PACKS_BY_NAME.get(key)
+        if pack is None and key in _GENERIC_PACKS:
+            pack = _PACKS_BY_NAME[_GENERIC_PACKS[key].casefold()]
+        if pack is not None:
+            return pack
+    return None
+
+
+@lru_cache(maxsize=None)
+def _pack_measurer(stem: str) -> PackMeasurer:
+    """Get the shared measurer for a pack file."""
+    return PackMeasurer(stem)
+
+
+def get_pack_measurer(
+    stack: str, bold: bool = False, italic: bool = False
+) -> Optional[FontMeasurer]:
+    """
+    Get a measurer for a CSS font-family stack from the bundled metric packs.
+
+    Falls back to the family's regular face when the requested style isn't
+    bundled.
+
+    Args:
+        stack: CSS font-family value, e.g. Style.font_family.
+        bold: Prefer the bold face.
+        italic: Prefer the italic face.
+
+    Returns:
+        A FontMeasurer, or None if no pack matches the stack.
+
+    Example:
+        >>> get_pack_measurer("ui-monospace, monospace").measure("x = 1", 13)
+        39.13
+    """
+    pack = find_metric_pack(stack)
+    if pack is None:
+        return None
+    faces = {
+        (False, False): pack.regular,
+        (True, False): pack.bold,
+        (False, True): pack.italic,
+        (True, True): pack.bold_italic or pack.bold,
+    }
+    return _pack_measurer(faces[(bold, italic)] or pack.regular)
+
+
+def get_pack_family(stack: str) -> Optional[FontFamilyMeasurer]:
+    """
+    Get a FontFamilyMeasurer with every bundled face of the pack for a stack.
+
+    Returns:
+        The family, or None if no pack matches the stack.
+    """
+    pack = find_metric_pack(stack)
+    if pack is None:
+        return None
+    return FontFamilyMeasurer.from_measurers(
+        _pack_measurer(pack.regular),
+        bold=_pack_measurer(pack.bold) if pack.bold else None,
+        italic=_pack_measurer(pack.italic) if pack.italic else None,
+        bold_italic=_pack_measurer(pack.bold_italic) if pack.bold_italic else None,
+    )
+
+
+def write_metric_pack(
+    font_path: str, output_dir: str, name: str, font_number: int = 0
+) -> List[str]:
+    """
+    Extract a font's advance and kerning tables into pack files.
+
+    Requires fonttools.
+
+    Args:
+        font_path: Font file to extract metrics from.
+        output_dir: Directory to write the pack files to.
+        name: File stem for the pack, e.g. "dejavu-sans-bold".
+        font_number: Font index within a .ttc collection.
+
+    Returns:
+        Paths of the files written.
+    """
+    font = _open_font(font_path, font_number)
+    try:
+        table = AdvanceTable.from_font(font)
+        kerning = KerningTable.from_font(font)
+    finally:
+        font.close()
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = [os.path.join(output_dir, f"{name}.metrics")]
+    table.save(written[0])
+    if kerning:
+        written.append(os.path.join(output_dir, f"{name}.kern"))
+        kerning.save(written[1])
+    return written
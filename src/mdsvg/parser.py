@@ -3,7 +3,21 @@
 from __future__ import annotations
 
 import re
-from typing import List, Optional, Tuple
+from bisect import bisect_left
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Protocol,
+    Tuple,
+    Union,
+)
 
 from .types import (
     AnyBlock,
@@ -16,6 +30,8 @@ from .types import (
     ListItem,
     OrderedList,
     Paragraph,
+    ParsedDocument,
+    SourceMap,
     Span,
     SpanType,
     Table,
@@ -25,6 +41,263 @@ from .types import (
 )
 from .utils import normalize_whitespace, split_lines
 
+if TYPE_CHECKING:
+    from .doccache import DocumentCache
+
+# Version of the blocks MarkdownParser produces, part of its cache_key. Bump
+# it whenever a change makes any text parse differently, so documents cached
+# by earlier versions aren't used.
+PARSER_VERSION = 1
+
+# Line kinds, as classified once per line by MarkdownParser._classify_lines().
+# Indentation (indented code) is checked separately, since an indented line
+# can also be a list item.
+LINE_BLANK = 0
+LINE_TEXT = 1
+LINE_HEADING = 2
+LINE_RULE = 3
+LINE_FENCE = 4
+LINE_QUOTE = 5
+LINE_TABLE_ROW = 6
+LINE_BULLET = 7
+LINE_NUMBERED = 8
+LINE_IMAGE = 9
+
+# Kinds that end a paragraph
+_PARAGRAPH_BREAKS = frozenset(
+    {
+        LINE_BLANK,
+        LINE_HEADING,
+        LINE_RULE,
+        LINE_FENCE,
+        LINE_QUOTE,
+        LINE_TABLE_ROW,
+        LINE_BULLET,
+        LINE_NUMBERED,
+    }
+)
+
+# The kind a line may be, by its first character. Lines starting with any
+# other non-space character are text, or numbered items for digits.
+_BLOCK_STARTS = {
+    "#": LINE_HEADING,
+    "-": LINE_RULE,
+    "*": LINE_RULE,
+    "_": LINE_RULE,
+    "+": LINE_BULLET,
+    "`": LINE_FENCE,
+    ">": LINE_QUOTE,
+    "|": LINE_TABLE_ROW,
+    "!": LINE_IMAGE,
+    **dict.fromkeys("0123456789", LINE_NUMBERED),
+}
+
+# Kinds that can end the block before them, and kinds that usually come in
+# runs belonging to one block, for MarkdownParser.parse_iter()
+_STREAM_BREAKS = _PARAGRAPH_BREAKS | {LINE_IMAGE}
+_RUN_KINDS = frozenset({LINE_QUOTE, LINE_TABLE_ROW, LINE_BULLET, LINE_NUMBERED})
+
+# Short plain-text spans and table cells ("Yes", "N/A", " | ") repeat within
+# and across documents. AST nodes are immutable, so equal ones are shared.
+# Longer text is rarely repeated and isn't worth a cache slot.
+_INTERN_MAX_TEXT = 64
+
+
+@lru_cache(maxsize=16384)
+def _text_span(text: str) -> Span:
+    """Get the shared plain-text span for short text."""
+    return Span(text=text)
+
+
+@lru_cache(maxsize=4096)
+def _intern_cell(cell: TableCell) -> TableCell:
+    """Get the shared table cell equal to cell."""
+    return cell
+
+
+def _plain_span(text: str) -> Span:
+    """Make a plain-text span, shared if the text is short."""
+    return _text_span(text) if len(text) <= _INTERN_MAX_TEXT else Span(text=text)
+
+
+def _stream_lines(
+    source: Iterable[str], check_size: Optional[Callable[[int], None]] = None
+) -> Iterator[str]:
+    """
+    Split a stream of text chunks into lines without line endings.
+
+    Chunks can end anywhere, even between the two characters of a CRLF: the
+    unterminated tail of each chunk, and a trailing carriage return, are held
+    back and joined to the text that follows.
+
+    Args:
+        source: The text, in chunks.
+        check_size: Called with the size of the held-back text as it grows,
+            to reject a line too long to buffer before it completes.
+    """
+    pending: List[str] = []  # Text read since the last complete line
+    pending_size = 0
+    read = False
+    for chunk in source:
+        read = True
+        if "\n" not in chunk and "\r" not in chunk:
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if check_size is not None:
+                check_size(pending_size)
+            continue
+        if not pending and chunk.find("\n") == len(chunk) - 1 and "\r" not in chunk:
+            # One whole line, as text files yield them
+            yield chunk[:-1]
+            continue
+        if pending:
+            pending.append(chunk)
+            chunk = "".join(pending)
+            pending_size = 0
+        if chunk.endswith("\r"):
+            lines = split_lines(chunk[:-1])
+            pending = [lines.pop(), "\r"]
+        else:
+            lines = split_lines(chunk)
+            tail = lines.pop()
+            pending = [tail] if tail else []
+        yield from lines
+    # Like split_lines(), text ending in a line break ends with an empty line
+    if read:
+        yield from split_lines("".join(pending))
+
+
+class TextEdit(NamedTuple):
+    """
+    A change to a document's text: text replaces old_text[start:end].
+
+    Offsets are character offsets into the old text, as editors report
+    changes. An insertion has start == end; a deletion has empty text.
+    """
+
+    start: int
+    end: int
+    text: str = ""
+
+    def apply(self, old_text: str) -> str:
+        """Get the text after the edit."""
+        return old_text[: self.start] + self.text + old_text[self.end :]
+
+    @classmethod
+    def between(cls, old_text: str, new_text: str) -> TextEdit:
+        """
+        Get a single edit that turns old_text into new_text.
+
+        The edit spans everything between the texts' common prefix and
+        common suffix, e.g. the characters typed or deleted since old_text.
+        """
+        limit = min(len(old_text), len(new_text))
+        prefix = 0
+        # Compare a chunk at a time, then find the first difference in the chunk
+        while (
+            prefix < limit and old_text[prefix : prefix + 4096] == new_text[prefix : prefix + 4096]
+        ):
+            prefix += 4096
+        prefix = min(prefix, limit)
+        while prefix < limit and old_text[prefix] == new_text[prefix]:
+            prefix += 1
+
+        limit -= prefix
+        suffix = 0
+        old_end, new_end = len(old_text), len(new_text)
+        while (
+            suffix < limit
+            and old_text[max(old_end - suffix - 4096, 0) : old_end - suffix]
+            == new_text[max(new_end - suffix - 4096, 0) : new_end - suffix]
+        ):
+            suffix += 4096
+        suffix = min(suffix, limit)
+        while suffix < limit and old_text[old_end - suffix - 1] == new_text[new_end - suffix - 1]:
+            suffix += 1
+
+        return cls(prefix, old_end - suffix, new_text[prefix : new_end - suffix])
+
+
+def _count_breaks(text: str, start: int, end: int) -> int:
+    """Count the line breaks in text[start:end] the way split_lines() splits them."""
+    breaks = text.count("\n", start, end)
+    if "\r" in text:
+        breaks += text.count("\r", start, end) - text.count("\r\n", start, end)
+    return breaks
+
+
+def _line_starts(text: str, lines: List[str], line: int, offset: int, stop: int) -> List[int]:
+    """Get the character offsets of lines[line:stop] in text, given where line starts."""
+    starts = []
+    crlf = "\r\n" in text
+    for current in lines[line:stop]:
+        starts.append(offset)
+        offset += len(current)
+        offset += 2 if crlf and text.startswith("\r\n", offset) else 1
+    return starts
+
+
+def _block_positions(
+    text: str,
+    lines: List[str],
+    kinds: bytearray,
+    ranges: List[Tuple[int, int]],
+    line: int = 0,
+    offset: int = 0,
+) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Get the source positions of blocks from their line ranges.
+
+    Args:
+        text: The parsed text.
+        lines: Its lines.
+        kinds: The lines' kinds.
+        ranges: Line ranges of the blocks.
+        line: A line at or before the first block's start.
+        offset: The character offset that line starts at.
+    """
+    if not ranges:
+        return
+    starts = _line_starts(text, lines, line, offset, ranges[-1][1])
+    for start, end in ranges:
+        # Blank lines a block consumed after its content aren't part of it
+        while end > start + 1 and kinds[end - 1] == LINE_BLANK:
+            end -= 1
+        yield start, end, starts[start - line], starts[end - 1 - line] + len(lines[end - 1])
+
+
+def _is_indented(line: str) -> bool:
+    """Check whether a line is indented enough to be a code block line."""
+    return line.startswith("    ") or line.startswith("\t")
+
+
+def _image_size(attrs: str, pattern: Pattern[str]) -> Tuple[Optional[float], Optional[float]]:
+    """Read the width and height from image {width=X height=Y} attributes."""
+    width: Optional[float] = None
+    height: Optional[float] = None
+    for match in pattern.finditer(attrs):
+        key = match.group(1).lower()
+        value = float(match.group(2))
+        if key == "width":
+            width = value
+        elif key == "height":
+            height = value
+    return width, height
+
+
+class ParserBackend(Protocol):
+    """
+    Anything that can parse Markdown text into mdsvg's AST.
+
+    MarkdownParser, backends.MarkdownItBackend and backends.MistuneBackend
+    all qualify. Pass an implementation as parse(text, backend=...), or make
+    it the default for parse() and render() with set_parser_backend().
+    """
+
+    def parse(self, text: str, source_map: bool = False) -> Document:
+        """Parse text into a list of blocks (recording source positions if asked)."""
+        ...
+
 
 class MarkdownParser:
     """
@@ -70,88 +343,425 @@ class MarkdownParser:
     BOLD_ITALIC = re.compile(r"\*\*\*(.+?)\*\*\*|___(.+?)___")
     BOLD = re.compile(r"\*\*(.+?)\*\*|__(.+?)__")
     ITALIC = re.compile(r"\*([^*]+)\*|_([^_]+)_")
-    LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)(?:\s+[\"']([^\"']+)[\"'])?\)")
-    IMAGE = re.compile(r"!\[([^\]]*)\]\(([^)\s]+)(?:\s+[\"']([^\"']+)[\"'])?\)")
+    # Link text and image alt stop at any bracket and URLs stop at "[", so
+    # a failed match only scans up to the next "[": the text each attempt
+    # reads doesn't overlap, and unclosed brackets cost linear time
+    LINK = re.compile(r"\[([^\[\]]+)\]\(([^)\s\[]+)(?:\s+[\"']([^\"']+)[\"'])?\)")
+    IMAGE = re.compile(r"!\[([^\[\]]*)\]\(([^)\s\[]+)(?:\s+[\"']([^\"']+)[\"'])?\)")
+    # All inline patterns as one alternation, in priority order: at any
+    # position the first alternative that matches wins, so a single search
+    # finds the same token as searching for each pattern and taking the
+    # earliest (ties going to the higher-priority pattern)
+    INLINE_TOKEN = re.compile(
+        r"(?P<code>`(?P<code_text>[^`]+)`)"
+        r"|(?P<image>!\[(?P<image_alt>[^\[\]]*)\]\((?P<image_url>[^)\s\[]+)"
+        r"(?:\s+[\"'](?P<image_title>[^\"']+)[\"'])?\))"
+        r"|(?P<link>\[(?P<link_text>[^\[\]]+)\]\((?P<link_url>[^)\s\[]+)"
+        r"(?:\s+[\"'](?P<link_title>[^\"']+)[\"'])?\))"
+        r"|(?P<bold_italic>\*\*\*(?P<bold_italic_star>.+?)\*\*\*|___(?P<bold_italic_under>.+?)___)"
+        r"|(?P<bold>\*\*(?P<bold_star>.+?)\*\*|__(?P<bold_under>.+?)__)"
+        r"|(?P<italic>\*(?P<italic_star>[^*]+)\*|_(?P<italic_under>[^_]+)_)"
+    )
+    # Characters an inline token can start with. Scanning for these is much
+    # cheaper than searching with INLINE_TOKEN, which tries every position
+    INLINE_MARKER = re.compile(r"[`!\[*_]")
+
+    def __init__(self, max_nesting: int = 32, max_input_size: Optional[int] = None) -> None:
+        """
+        Initialize the parser.
+
+        Parsing takes time linear in the input, whatever the input is. The
+        budgets bound the depth of the tree and the size of the input, for
+        parsing text from untrusted sources.
 
-    def parse(self, text: str) -> Document:
+        Args:
+            max_nesting: Most blockquotes that can be nested inside each
+                other. A blockquote nested deeper is parsed as a paragraph
+                of its text, ">" markers included.
+            max_input_size: Most characters of Markdown to parse, or None for
+                no limit. Larger inputs raise ValueError.
+
+        Raises:
+            ValueError: If max_nesting or max_input_size is negative.
+        """
+        if max_nesting < 0:
+            raise ValueError(f"max_nesting must be non-negative, got {max_nesting}")
+        if max_input_size is not None and max_input_size < 0:
+            raise ValueError(f"max_input_size must be non-negative, got {max_input_size}")
+        self.max_nesting = max_nesting
+        self.max_input_size = max_input_size
+
+    @property
+    def cache_key(self) -> str:
+        """Identify this parser's output for DocumentCache: class, version and budgets."""
+        cls = type(self)
+        return (
+            f"{cls.__module__}.{cls.__qualname__}/{PARSER_VERSION}"
+            f"/{self.max_nesting}/{self.max_input_size}"
+        )
+
+    def parse(
+        self, text: str, source_map: bool = False, incremental: bool = False
+    ) -> ParsedDocument:
         """
         Parse Markdown text into a document AST.
 
         Args:
             text: Markdown text to parse.
+            source_map: Also record the line and character positions of each
+                block, in the document's source_map.
+            incremental: Keep each block's source lines and the line kinds
+                (line_ranges and line_kinds), so that reparse() only
+                re-parses the blocks an edit touches. Source-mapped documents
+                always keep them.
 
         Returns:
-            List of Block objects representing the document.
-        """
-        if not text or not text.strip():
-            return []
+            List of Block objects representing the document, as a
+            ParsedDocument.
 
+        Raises:
+            ValueError: If text is longer than max_input_size.
+        """
+        self._check_size(len(text))
         lines = split_lines(text)
-        return self._parse_blocks(lines)
+        document = self._parse_blocks(lines, line_info=source_map or incremental)
+        if source_map:
+            document.source_map = SourceMap(
+                _block_positions(text, lines, document.line_kinds, document.line_ranges)
+            )
+        return document
+
+    def reparse(self, previous: Document, old_text: str, edit: TextEdit) -> ParsedDocument:
+        """
+        Parse edited text, re-parsing only the blocks the edit can change.
 
-    def _parse_blocks(self, lines: List[str]) -> Document:
-        """Parse a list of lines into blocks."""
-        blocks: Document = []
-        i = 0
+        Blocks are re-parsed from the first one that the edited lines could
+        extend or end differently, until parsing reaches the start of a block
+        after the edit that was also a block start before it. Every other
+        block is reused from previous unchanged, so the work tracks the size
+        of the edited blocks rather than the document.
 
-        while i < len(lines):
-            line = lines[i]
+        Args:
+            previous: The document old_text was parsed into, as returned by
+                parse() or reparse().
+            old_text: The text before the edit.
+            edit: The change to old_text.
+
+        Returns:
+            The same blocks parse() returns for the edited text, with the
+            line information for the next reparse(). If previous has no line
+            information for old_text (it wasn't parsed with incremental=True
+            or source_map=True), the edited text is parsed in full.
+
+        Raises:
+            ValueError: If the edited text is longer than max_input_size.
+
+        Example:
+            >>> doc = parser.parse(text, incremental=True)
+            >>> edit = TextEdit(start=120, end=120, text="more ")  # typed at offset 120
+            >>> doc = parser.reparse(doc, text, edit)
+            >>> text = edit.apply(text)
+        """
+        new_text = edit.apply(old_text)
+        self._check_size(len(new_text))
+        if not isinstance(previous, ParsedDocument) or len(previous.line_ranges) != len(previous):
+            return self.parse(new_text, incremental=True)
+        source_map = previous.source_map is not None
+
+        # Old lines first..last are replaced by new lines first..new_last
+        first = _count_breaks(old_text, 0, edit.start)
+        last = first + _count_breaks(old_text, edit.start, edit.end)
+        if old_text[edit.start - 1 : edit.start + 1] == "\r\n":
+            first -= 1  # The edit splits a line break
+        lines = split_lines(new_text)
+        shift = len(lines) - len(previous.line_kinds)
+        new_last = last + shift
+        if not 0 <= first <= new_last < len(lines) or last >= len(previous.line_kinds):
+            # previous wasn't parsed from old_text
+            return self.parse(new_text, source_map=source_map, incremental=True)
+        old_kinds = previous.line_kinds
+        kinds = old_kinds[:first]
+        kinds += self._classify_lines(lines[first : new_last + 1])
+        kinds += old_kinds[last + 1 :]
+
+        # A block is decided by its lines and the line that ended it (a
+        # blockquote also looks one line further), so blocks that ended before
+        # the edit are kept and parsing restarts after them
+        ranges = previous.line_ranges
+        keep = bisect_left(ranges, (first,))
+        while keep and ranges[keep - 1][1] + isinstance(previous[keep - 1], Blockquote) >= first:
+            keep -= 1
+        restart = ranges[keep - 1][1] if keep else 0
+
+        blocks: List[AnyBlock] = list(previous[:keep])
+        new_ranges = ranges[:keep]
+        resume = len(previous)
+        for block, start, end in self._iter_blocks(lines, kinds, start=restart):
+            blocks.append(block)
+            new_ranges.append((start, end))
+            following = end
+            while following < len(lines) and kinds[following] == LINE_BLANK:
+                following += 1
+            if following > new_last:
+                # Past the edit, a block starting where one started before
+                # parses as it did before, and so does the rest
+                index = bisect_left(ranges, (following - shift,))
+                if index < len(ranges) and ranges[index][0] == following - shift:
+                    resume = index
+                    break
+
+        reparsed = new_ranges[keep:]
+        blocks.extend(previous[resume:])
+        new_ranges.extend((start + shift, end + shift) for start, end in ranges[resume:])
+        document = ParsedDocument(blocks, new_ranges, kinds)
+
+        old_map = previous.source_map
+        if old_map is not None:
+            # Positions before the edit stay and those after it move with the
+            # text; re-parsed blocks are measured from the last kept block
+            line, offset = (old_map[keep - 1][0], old_map[keep - 1][2]) if keep else (0, 0)
+            moved = len(edit.text) - (edit.end - edit.start)
+            document.source_map = SourceMap(old_map[index] for index in range(keep))
+            for position in _block_positions(new_text, lines, kinds, reparsed, line, offset):
+                document.source_map.append(position)
+            for index in range(resume, len(old_map)):
+                start_line, end_line, start_offset, end_offset = old_map[index]
+                document.source_map.append(
+                    (start_line + shift, end_line + shift, start_offset + moved, end_offset + moved)
+                )
+        return document
+
+    def parse_iter(self, source: Union[str, Iterable[str]]) -> Iterator[AnyBlock]:
+        """
+        Parse Markdown from a stream, yielding each top-level block once it is complete.
 
+        Lines are read as they are needed, and only the lines of the block
+        still being parsed are kept, so memory is bounded by the largest
+        block rather than the document. The blocks are the same as parse()
+        returns for the whole text.
+
+        The source is read as consecutive pieces of the text, such as the
+        lines of a text file or chunks read from a socket. A piece can end
+        anywhere, including in the middle of a line or between the characters
+        of a CRLF. To stream lines that have no line endings, add them back,
+        e.g. (line + "\\n" for line in lines).
+
+        Args:
+            source: A text file or other iterable of text chunks, or the whole
+                text as a string.
+
+        Yields:
+            Block objects, in document order.
+
+        Raises:
+            ValueError: Once more than max_input_size characters have been
+                read. Blocks before that point have already been yielded.
+
+        Example:
+            >>> with open("CHANGELOG.md", encoding="utf-8") as f:
+            ...     for block in MarkdownParser().parse_iter(f):
+            ...         print(block.block_type)
+        """
+        if isinstance(source, str):
+            source = (source,)
+
+        lines: List[str] = []
+        kinds = bytearray()
+        # Re-parse the buffer only once it has doubled since the last attempt,
+        # so the total parsing work stays linear in the input
+        threshold = 1
+        size = -1  # Characters read, counting a break before every line but the first
+
+        for line in _stream_lines(source, self._check_size):
+            size += len(line) + 1
+            self._check_size(size)
+            kind = self._classify_line(line)
+            previous = kinds[-1] if kinds else LINE_BLANK
+            lines.append(line)
+            kinds.append(kind)
+            # Try to finish blocks at lines that may start a new one. A run of
+            # rows, quote lines or items of one kind is usually a single block.
+            if len(lines) < threshold or kind == LINE_BLANK:
+                continue
+            if previous != LINE_BLANK and (
+                kind not in _STREAM_BREAKS or (kind == previous and kind in _RUN_KINDS)
+            ):
+                continue
+
+            # A block is complete once a non-blank line follows it: every
+            # block parser decides where it ends by the next non-blank line.
+            # Blocks from the new line on are left until more is read.
+            last = len(lines) - 1
+            keep = last
+            for block, start, end in self._iter_blocks(lines, kinds, stop=last):
+                if end > last:
+                    keep = start
+                    break
+                yield block
+            del lines[:keep]
+            del kinds[:keep]
+            threshold = 2 * len(lines)
+
+        for block, _, _ in self._iter_blocks(lines, kinds):
+            yield block
+
+    def _classify_line(self, line: str) -> int:
+        """
+        Decide a line's kind from its first non-space character.
+
+        At most one regex runs per line: the one for the kind that character
+        can start (a rule that isn't one may still be a bullet).
+        """
+        first = line[:1]
+        kind = _BLOCK_STARTS.get(first)
+
+        if kind is None:
+            if not first.isspace():
+                if not first:
+                    return LINE_BLANK
+                if first.isdecimal() and self.ORDERED_LIST_ITEM.match(line):
+                    return LINE_NUMBERED
+                return LINE_TEXT
+            # Leading whitespace: only list items and images allow it
+            stripped = line.lstrip()
+            if not stripped:
+                return LINE_BLANK
+            first = stripped[0]
+            if first in "-*+":
+                return LINE_BULLET if self.UNORDERED_LIST_ITEM.match(line) else LINE_TEXT
+            if first.isdecimal():
+                return LINE_NUMBERED if self.ORDERED_LIST_ITEM.match(line) else LINE_TEXT
+            if first == "!" and self.IMAGE_BLOCK.match(stripped.rstrip()):
+                return LINE_IMAGE
+            return LINE_TEXT
+
+        if kind == LINE_RULE:
+            if self.HORIZONTAL_RULE.match(line):
+                return LINE_RULE
+            if first != "_" and self.UNORDERED_LIST_ITEM.match(line):
+                return LINE_BULLET
+            return LINE_TEXT
+        if kind == LINE_QUOTE:
+            return LINE_QUOTE
+        if kind == LINE_HEADING:
+            pattern = self.HEADING_PATTERN
+        elif kind == LINE_BULLET:
+            pattern = self.UNORDERED_LIST_ITEM
+        elif kind == LINE_FENCE:
+            pattern = self.FENCED_CODE_START
+        elif kind == LINE_TABLE_ROW:
+            pattern = self.TABLE_ROW
+        elif kind == LINE_NUMBERED:
+            pattern = self.ORDERED_LIST_ITEM
+        else:
+            return LINE_IMAGE if self.IMAGE_BLOCK.match(line.strip()) else LINE_TEXT
+        return kind if pattern.match(line) else LINE_TEXT
+
+    def _check_size(self, size: int) -> None:
+        """Raise ValueError if size characters are more than max_input_size."""
+        if self.max_input_size is not None and size > self.max_input_size:
+            raise ValueError(
+                f"Markdown input is over max_input_size ({self.max_input_size} characters)"
+            )
+
+    def _classify_lines(self, lines: List[str]) -> bytearray:
+        """Classify every line once, for the block parsers to share."""
+        return bytearray(map(self._classify_line, lines))
+
+    def _parse_blocks(
+        self, lines: List[str], depth: int = 0, line_info: bool = False
+    ) -> ParsedDocument:
+        """Parse a list of lines into blocks, inside depth blockquotes (with line info if asked)."""
+        kinds = self._classify_lines(lines)
+        if not line_info:
+            return ParsedDocument(
+                block for block, _, _ in self._iter_blocks(lines, kinds, depth=depth)
+            )
+        blocks: List[AnyBlock] = []
+        ranges: List[Tuple[int, int]] = []
+        for block, start, end in self._iter_blocks(lines, kinds, depth=depth):
+            blocks.append(block)
+            ranges.append((start, end))
+        return ParsedDocument(blocks, ranges, kinds)
+
+    def _iter_blocks(
+        self,
+        lines: List[str],
+        kinds: bytearray,
+        start: int = 0,
+        stop: Optional[int] = None,
+        depth: int = 0,
+    ) -> Iterator[Tuple[AnyBlock, int, int]]:
+        """
+        Parse classified lines, yielding each block with its start and end line index.
+
+        Args:
+            lines: Lines to parse.
+            kinds: The lines' kinds, from _classify_lines().
+            start: Line to start parsing at; must be a block start or blank.
+            stop: Stop before a block that would start at or after this line.
+            depth: Number of blockquotes the lines are inside.
+        """
+        i = start
+        stop = len(lines) if stop is None else stop
+
+        while i < stop:
             # Skip empty lines
-            if not line.strip():
+            if kinds[i] == LINE_BLANK:
                 i += 1
                 continue
 
             # Try each block type
-            block, consumed = self._try_parse_block(lines, i)
+            block, consumed = self._try_parse_block(lines, kinds, i, depth)
 
-            if block is not None:
-                blocks.append(block)
-                i += consumed
-            else:
+            if block is None:
                 # Default to paragraph - collect until empty line or other block
-                para_lines, consumed = self._collect_paragraph_lines(lines, i)
-                if para_lines:
-                    para_text = " ".join(para_lines)
-                    spans = self._parse_inline(para_text)
-                    blocks.append(Paragraph(spans=tuple(spans)))
-                i += consumed
+                para_lines, consumed = self._collect_paragraph_lines(lines, kinds, i)
+                para_text = " ".join(para_lines)
+                spans = self._parse_inline(para_text)
+                block = Paragraph(spans=tuple(spans))
 
-        return blocks
+            yield block, i, i + consumed
+            i += consumed
 
-    def _try_parse_block(self, lines: List[str], start: int) -> Tuple[Optional[AnyBlock], int]:
+    def _try_parse_block(
+        self, lines: List[str], kinds: bytearray, start: int, depth: int = 0
+    ) -> Tuple[Optional[AnyBlock], int]:
         """Try to parse a block starting at the given line index."""
         line = lines[start]
+        kind = kinds[start]
 
         # Heading
-        match = self.HEADING_PATTERN.match(line)
-        if match:
+        if kind == LINE_HEADING:
+            match = self.HEADING_PATTERN.match(line)
+            assert match is not None
             level = len(match.group(1))
             text = match.group(2).strip()
             spans = self._parse_inline(text)
             return Heading(level=level, spans=tuple(spans)), 1
 
         # Horizontal rule
-        if self.HORIZONTAL_RULE.match(line):
+        if kind == LINE_RULE:
             return HorizontalRule(), 1
 
         # Fenced code block
-        match = self.FENCED_CODE_START.match(line)
-        if match:
+        if kind == LINE_FENCE:
+            match = self.FENCED_CODE_START.match(line)
+            assert match is not None
             language = match.group(1) or None
-            code_lines: List[str] = []
-            i = start + 1
-            while i < len(lines):
-                if self.FENCED_CODE_END.match(lines[i]):
-                    i += 1
-                    break
-                code_lines.append(lines[i])
-                i += 1
-            code = "\n".join(code_lines)
-            return CodeBlock(code=code, language=language), i - start
+            # A closing fence is also classified as a fence, so only those
+            # lines are tested
+            end = kinds.find(LINE_FENCE, start + 1)
+            while end != -1 and not self.FENCED_CODE_END.match(lines[end]):
+                end = kinds.find(LINE_FENCE, end + 1)
+            if end == -1:
+                code = "\n".join(lines[start + 1 :])
+                return CodeBlock(code=code, language=language), len(lines) - start
+            code = "\n".join(lines[start + 1 : end])
+            return CodeBlock(code=code, language=language), end + 1 - start
 
         # Indented code block (4 spaces or 1 tab)
-        if line.startswith("    ") or line.startswith("\t"):
+        if _is_indented(line):
             code_lines_indented: List[str] = []
             i = start
             while i < len(lines):
@@ -172,99 +782,83 @@ class MarkdownParser:
                 return CodeBlock(code="\n".join(code_lines_indented)), i - start
 
         # Blockquote
-        match = self.BLOCKQUOTE.match(line)
-        if match:
+        if kind == LINE_QUOTE:
             quote_lines: List[str] = []
             i = start
             while i < len(lines):
-                bq_match = self.BLOCKQUOTE.match(lines[i])
-                if bq_match:
+                if kinds[i] == LINE_QUOTE:
+                    bq_match = self.BLOCKQUOTE.match(lines[i])
+                    assert bq_match is not None
                     quote_lines.append(bq_match.group(1))
-                elif not lines[i].strip():
+                elif kinds[i] == LINE_BLANK:
                     # Empty line might continue quote
-                    if i + 1 < len(lines) and self.BLOCKQUOTE.match(lines[i + 1]):
+                    if i + 1 < len(lines) and kinds[i + 1] == LINE_QUOTE:
                         quote_lines.append("")
                     else:
                         break
                 else:
                     break
                 i += 1
+            if depth >= self.max_nesting:
+                # Past the nesting budget the quote is text, markers and all
+                para_text = " ".join(
+                    lines[j].strip() for j in range(start, i) if kinds[j] != LINE_BLANK
+                )
+                return Paragraph(spans=tuple(self._parse_inline(para_text))), i - start
             # Parse the content inside the blockquote
-            inner_text = "\n".join(quote_lines)
-            inner_blocks = self.parse(inner_text)
+            inner_blocks = self._parse_blocks(quote_lines, depth + 1)
             return Blockquote(blocks=tuple(inner_blocks)), i - start
 
         # Table
-        if self.TABLE_ROW.match(line):
-            table, consumed = self._parse_table(lines, start)
+        if kind == LINE_TABLE_ROW:
+            table, consumed = self._parse_table(lines, kinds, start)
             if table:
                 return table, consumed
 
         # Unordered list
-        match = self.UNORDERED_LIST_ITEM.match(line)
-        if match:
-            return self._parse_unordered_list(lines, start)
+        if kind == LINE_BULLET:
+            return self._parse_unordered_list(lines, kinds, start)
 
         # Ordered list
-        match = self.ORDERED_LIST_ITEM.match(line)
-        if match:
-            return self._parse_ordered_list(lines, start)
+        if kind == LINE_NUMBERED:
+            return self._parse_ordered_list(lines, kinds, start)
 
         # Image block (standalone)
-        match = self.IMAGE_BLOCK.match(line.strip())
+        match = self.IMAGE_BLOCK.match(line.strip()) if kind == LINE_IMAGE else None
         if match:
             alt = match.group(1)
             url = match.group(2)
             title = match.group(3) if match.group(3) else None
 
             # Parse optional {width=X height=Y} attributes
-            width: Optional[float] = None
-            height: Optional[float] = None
             attrs_str = match.group(4)
-            if attrs_str:
-                for attr_match in self.IMAGE_ATTR.finditer(attrs_str):
-                    key = attr_match.group(1).lower()
-                    value = float(attr_match.group(2))
-                    if key == "width":
-                        width = value
-                    elif key == "height":
-                        height = value
+            width, height = _image_size(attrs_str, self.IMAGE_ATTR) if attrs_str else (None, None)
 
             return ImageBlock(url=url, alt=alt, title=title, width=width, height=height), 1
 
         return None, 0
 
-    def _collect_paragraph_lines(self, lines: List[str], start: int) -> Tuple[List[str], int]:
-        """Collect lines that belong to a paragraph."""
-        para_lines: List[str] = []
-        i = start
-
-        while i < len(lines):
-            line = lines[i]
-
-            # Empty line ends paragraph
-            if not line.strip():
-                break
+    def _collect_paragraph_lines(
+        self, lines: List[str], kinds: bytearray, start: int
+    ) -> Tuple[List[str], int]:
+        """Collect lines that belong to a paragraph.
 
-            # Check if line starts a new block type
-            if (
-                self.HEADING_PATTERN.match(line)
-                or self.HORIZONTAL_RULE.match(line)
-                or self.FENCED_CODE_START.match(line)
-                or self.BLOCKQUOTE.match(line)
-                or self.UNORDERED_LIST_ITEM.match(line)
-                or self.ORDERED_LIST_ITEM.match(line)
-                or self.TABLE_ROW.match(line)
-                or (line.startswith("    ") and not para_lines)
-            ):
-                break
+        The first line always belongs to it: it is only collected when no
+        block could be parsed from it (e.g. a lone table row).
+        """
+        para_lines = [normalize_whitespace(lines[start])]
+        i = start + 1
 
-            para_lines.append(normalize_whitespace(line))
+        # An empty line or the start of another block ends the paragraph
+        while i < len(lines) and kinds[i] not in _PARAGRAPH_BREAKS:
+            para_lines.append(normalize_whitespace(lines[i]))
             i += 1
 
         return para_lines, i - start
 
-    def _parse_unordered_list(self, lines: List[str], start: int) -> Tuple[UnorderedList, int]:
+    def _parse_unordered_list(
+        self, lines: List[str], kinds: bytearray, start: int
+    ) -> Tuple[UnorderedList, int]:
         """Parse an unordered list."""
         items: List[ListItem] = []
         i = start
@@ -273,11 +867,11 @@ class MarkdownParser:
         while i < len(lines):
             line = lines[i]
 
-            if not line.strip():
+            if kinds[i] == LINE_BLANK:
                 i += 1
                 continue
 
-            match = self.UNORDERED_LIST_ITEM.match(line)
+            match = self.UNORDERED_LIST_ITEM.match(line) if kinds[i] == LINE_BULLET else None
             if match:
                 indent = len(match.group(1))
 
@@ -302,7 +896,9 @@ class MarkdownParser:
 
         return UnorderedList(items=tuple(items)), i - start
 
-    def _parse_ordered_list(self, lines: List[str], start: int) -> Tuple[OrderedList, int]:
+    def _parse_ordered_list(
+        self, lines: List[str], kinds: bytearray, start: int
+    ) -> Tuple[OrderedList, int]:
         """Parse an ordered list."""
         items: List[ListItem] = []
         i = start
@@ -312,11 +908,11 @@ class MarkdownParser:
         while i < len(lines):
             line = lines[i]
 
-            if not line.strip():
+            if kinds[i] == LINE_BLANK:
                 i += 1
                 continue
 
-            match = self.ORDERED_LIST_ITEM.match(line)
+            match = self.ORDERED_LIST_ITEM.match(line) if kinds[i] == LINE_NUMBERED else None
             if match:
                 indent = len(match.group(1))
 
@@ -338,7 +934,9 @@ class MarkdownParser:
 
         return OrderedList(items=tuple(items), start=start_num), i - start
 
-    def _parse_table(self, lines: List[str], start: int) -> Tuple[Optional[Table], int]:
+    def _parse_table(
+        self, lines: List[str], kinds: bytearray, start: int
+    ) -> Tuple[Optional[Table], int]:
         """Parse a GFM-style table."""
         if start + 1 >= len(lines):
             return None, 0
@@ -347,7 +945,7 @@ class MarkdownParser:
         separator_line = lines[start + 1]
 
         # Must have header row and separator row
-        if not self.TABLE_ROW.match(header_line):
+        if kinds[start] != LINE_TABLE_ROW or kinds[start + 1] != LINE_TABLE_ROW:
             return None, 0
         if not self.TABLE_SEPARATOR.match(separator_line):
             return None, 0
@@ -363,12 +961,8 @@ class MarkdownParser:
         rows: List[TableRow] = []
         i = start + 2
 
-        while i < len(lines):
-            line = lines[i]
-            if not self.TABLE_ROW.match(line):
-                break
-
-            row_cells = self._parse_table_row(line, alignments, is_header=False)
+        while i < len(lines) and kinds[i] == LINE_TABLE_ROW:
+            row_cells = self._parse_table_row(lines[i], alignments, is_header=False)
             rows.append(TableRow(cells=tuple(row_cells)))
             i += 1
 
@@ -415,7 +1009,8 @@ class MarkdownParser:
             cell_text = cell_text.strip()
             spans = self._parse_inline(cell_text)
             align = alignments[idx] if idx < len(alignments) else None
-            cells.append(TableCell(spans=tuple(spans), is_header=is_header, align=align))
+            cell = TableCell(spans=tuple(spans), is_header=is_header, align=align)
+            cells.append(_intern_cell(cell) if len(cell_text) <= _INTERN_MAX_TEXT else cell)
 
         return cells
 
@@ -424,124 +1019,144 @@ class MarkdownParser:
         Parse inline formatting in text.
 
         Handles: bold, italic, bold+italic, inline code, links, images.
+        Walks the text once, matching INLINE_TOKEN only where INLINE_MARKER
+        finds a character a token can start with, so the cost is linear in
+        its length and plain text is a single scan.
         """
         if not text:
             return []
 
         spans: List[Span] = []
-        remaining = text
-
-        while remaining:
-            # Find the earliest match
-            earliest_match = None
-            earliest_pos = len(remaining)
-            match_type = None
-
-            # Check for inline code first (highest priority)
-            match = self.INLINE_CODE.search(remaining)
-            if match and match.start() < earliest_pos:
-                earliest_match = match
-                earliest_pos = match.start()
-                match_type = "code"
-
-            # Check for images (before links, since syntax overlaps)
-            match = self.IMAGE.search(remaining)
-            if match and match.start() < earliest_pos:
-                earliest_match = match
-                earliest_pos = match.start()
-                match_type = "image"
-
-            # Check for links
-            match = self.LINK.search(remaining)
-            if match and match.start() < earliest_pos:
-                earliest_match = match
-                earliest_pos = match.start()
-                match_type = "link"
-
-            # Check for bold+italic
-            match = self.BOLD_ITALIC.search(remaining)
-            if match and match.start() < earliest_pos:
-                earliest_match = match
-                earliest_pos = match.start()
-                match_type = "bold_italic"
-
-            # Check for bold
-            match = self.BOLD.search(remaining)
-            if match and match.start() < earliest_pos:
-                earliest_match = match
-                earliest_pos = match.start()
-                match_type = "bold"
-
-            # Check for italic
-            match = self.ITALIC.search(remaining)
-            if match and match.start() < earliest_pos:
-                earliest_match = match
-                earliest_pos = match.start()
-                match_type = "italic"
-
-            if earliest_match is None:
-                # No more formatting, add remaining as text
-                if remaining:
-                    spans.append(Span(text=remaining))
+        find_marker = self.INLINE_MARKER.search
+        match_token = self.INLINE_TOKEN.match
+        pos = 0  # End of the last token
+        scan = 0  # Where to look for the next marker
+
+        while True:
+            marker = find_marker(text, scan)
+            if marker is None:
+                # No more formatting, add the rest as text
+                if pos < len(text):
+                    spans.append(_plain_span(text[pos:]))
                 break
+            start = marker.start()
+            match = match_token(text, start)
+            if match is None:
+                scan = start + 1
+                continue
 
             # Add text before the match
-            if earliest_pos > 0:
-                spans.append(Span(text=remaining[:earliest_pos]))
-
-            # Process the match
-            if match_type == "code":
-                code_text = earliest_match.group(1)
-                spans.append(Span(text=code_text, span_type=SpanType.CODE))
-
-            elif match_type == "image":
-                alt = earliest_match.group(1)
-                url = earliest_match.group(2)
-                title = (
-                    earliest_match.group(3)
-                    if earliest_match.lastindex and earliest_match.lastindex >= 3
-                    else None
+            if start > pos:
+                spans.append(_plain_span(text[pos:start]))
+
+            kind = match.lastgroup
+            if kind == "code":
+                spans.append(Span(text=match.group("code_text"), span_type=SpanType.CODE))
+
+            elif kind == "image":
+                alt = match.group("image_alt")
+                url = match.group("image_url")
+                spans.append(
+                    Span(
+                        text=alt or url,
+                        span_type=SpanType.IMAGE,
+                        url=url,
+                        title=match.group("image_title"),
+                    )
                 )
-                spans.append(Span(text=alt or url, span_type=SpanType.IMAGE, url=url, title=title))
-
-            elif match_type == "link":
-                link_text = earliest_match.group(1)
-                url = earliest_match.group(2)
-                title = (
-                    earliest_match.group(3)
-                    if earliest_match.lastindex and earliest_match.lastindex >= 3
-                    else None
+
+            elif kind == "link":
+                spans.append(
+                    Span(
+                        text=match.group("link_text"),
+                        span_type=SpanType.LINK,
+                        url=match.group("link_url"),
+                        title=match.group("link_title"),
+                    )
                 )
-                spans.append(Span(text=link_text, span_type=SpanType.LINK, url=url, title=title))
 
-            elif match_type == "bold_italic":
-                inner = earliest_match.group(1) or earliest_match.group(2)
+            elif kind == "bold_italic":
+                inner = match.group("bold_italic_star") or match.group("bold_italic_under")
                 spans.append(Span(text=inner, span_type=SpanType.BOLD_ITALIC))
 
-            elif match_type == "bold":
-                inner = earliest_match.group(1) or earliest_match.group(2)
+            elif kind == "bold":
+                inner = match.group("bold_star") or match.group("bold_under")
                 spans.append(Span(text=inner, span_type=SpanType.BOLD))
 
-            elif match_type == "italic":
-                inner = earliest_match.group(1) or earliest_match.group(2)
+            else:
+                inner = match.group("italic_star") or match.group("italic_under")
                 spans.append(Span(text=inner, span_type=SpanType.ITALIC))
 
-            # Continue with rest of text
-            remaining = remaining[earliest_match.end() :]
+            # Continue after the match
+            pos = scan = match.end()
 
         return spans
 
 
+_parser_backend: Optional[ParserBackend] = None
+
+
+def get_parser_backend() -> ParserBackend:
+    """Get the backend parse() uses by default (a MarkdownParser unless one was set)."""
+    return _parser_backend if _parser_backend is not None else MarkdownParser()
+
+
+def set_parser_backend(backend: Optional[ParserBackend]) -> None:
+    """
+    Set the backend parse(), render() and measure() use by default.
+
+    Args:
+        backend: The parser to delegate to, e.g. backends.MarkdownItBackend().
+            None restores MarkdownParser.
+    """
+    global _parser_backend
+    _parser_backend = backend
+
+
+_document_cache: Optional[DocumentCache] = None
+
+
+def get_document_cache() -> Optional[DocumentCache]:
+    """Get the DocumentCache parse() uses, or None if documents aren't cached."""
+    return _document_cache
+
+
+def set_document_cache(cache: Optional[DocumentCache]) -> None:
+    """
+    Set the DocumentCache parse(), render() and measure() look documents up in.
+
+    Args:
+        cache: The cache, e.g. doccache.DocumentCache(directory=...). None
+            stops caching.
+    """
+    global _document_cache
+    _document_cache = cache
+
+
 # Convenience function
-def parse(text: str) -> Document:
+def parse(
+    text: str,
+    source_map: bool = False,
+    backend: Optional[ParserBackend] = None,
+    incremental: bool = False,
+) -> Document:
     """
     Parse Markdown text into a document AST.
 
-    This is a convenience function that creates a MarkdownParser
-    and calls parse() on it.
+    This is a convenience function that calls parse() on the parser
+    backend, a new MarkdownParser unless another backend was set with
+    set_parser_backend(). If a DocumentCache was set with
+    set_document_cache(), the document is looked up there first.
 
     Args:
         text: Markdown text to parse.
+        source_map: Also record each block's source position in the
+            returned document's source_map.
+        backend: Parse with this backend instead of the default.
+        incremental: Keep the line information reparse() uses to re-parse
+            only what an edit touches (see MarkdownParser.parse()). Only the
+            built-in parser records it, and such documents bypass the
+            DocumentCache.
 
     Returns:
         List of Block objects representing the document.
@@ -550,4 +1165,54 @@ def parse(text: str) -> Document:
         >>> doc = parse("# Hello World")
         >>> print(doc[0].level)  # 1
     """
-    return MarkdownParser().parse(text)
+    if backend is None:
+        backend = get_parser_backend()
+    if incremental and isinstance(backend, MarkdownParser):
+        return backend.parse(text, source_map=source_map, incremental=True)
+    if _document_cache is not None:
+        return _document_cache.parse(text, backend, source_map)
+    return backend.parse(text, source_map=source_map)
+
+
+def reparse(previous: Document, old_text: str, edit: TextEdit) -> ParsedDocument:
+    """
+    Parse edited text, reusing the blocks of previous that the edit can't change.
+
+    This is a convenience function that creates a MarkdownParser
+    and calls reparse() on it.
+
+    Args:
+        previous: The document old_text was parsed into.
+        old_text: The text before the edit.
+        edit: The change to old_text.
+
+    Returns:
+        The same blocks parse() returns for the edited text.
+
+    Example:
+        >>> doc = parse(text, incremental=True)
+        >>> new_text = text + "\\n\\nA new paragraph."
+        >>> doc = reparse(doc, text, TextEdit.between(text, new_text))
+    """
+    return MarkdownParser().reparse(previous, old_text, edit)
+
+
+def parse_iter(source: Union[str, Iterable[str]]) -> Iterator[AnyBlock]:
+    """
+    Parse Markdown from a stream, yielding top-level blocks as they complete.
+
+    This is a convenience function that creates a MarkdownParser
+    and calls parse_iter() on it.
+
+    Args:
+        source: A text file or other iterable of text chunks (see
+            MarkdownParser.parse_iter), or the whole text.
+
+    Yields:
+        Block objects, in document order.
+
+    Example:
+        >>> with open("CHANGELOG.md", encoding="utf-8") as f:
+        ...     headings = [b for b in parse_iter(f) if isinstance(b, Heading)]
+    """
+    return MarkdownParser().parse_iter(source)
@@ -4,12 +4,26 @@ from __future__ import annotations
 
 from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 # Precise text measurement
-from .fonts import FontMeasurer, get_default_measurer
+from .fonts import (
+    FallbackMeasurer,
+    FontFamilyMeasurer,
+    FontMeasurer,
+    TextMeasurer,
+    get_default_measurer,
+    get_measurer,
+)
 from .images import ImageSize, ImageUrlMapper, get_image_size
-from .measure import Size, estimate_text_width
+from .layout import LayoutBox, LayoutLine, LayoutRun, LayoutTree
+from .measure import (
+    CharWidthTable,
+    Size,
+    WidthCache,
+    estimate_text_width,
+    get_default_width_cache,
+)
 from .style import Style
 from .types import (
     Block,
@@ -24,11 +38,17 @@ from .types import (
     Span,
     SpanType,
     Table,
-    TableRow,
     UnorderedList,
 )
 from .utils import escape_svg_text, format_number
 
+# Memoized word widths, by text, font size, bold, italic and mono
+_WordWidths = Dict[Tuple[str, float, bool, bool, bool], float]
+# The style of a run of text: bold, italic, code, link and link URL
+_RunStyle = Tuple[bool, bool, bool, bool, Optional[str]]
+# A run of text on a wrapped line: its text, width and style
+_LineRun = Tuple[str, float, _RunStyle]
+
 
 @dataclass
 class RenderResult:
@@ -102,37 +122,6 @@ class RenderResult:
         return "\n".join(svg_parts)
 
 
-@dataclass
-class RenderContext:
-    """Context passed through rendering for tracking state."""
-
-    x: float
-    y: float
-    width: float
-    style: Style
-    indent: float = 0.0
-
-    def with_offset(self, dx: float = 0, dy: float = 0) -> RenderContext:
-        """Create a new context with offset position."""
-        return RenderContext(
-            x=self.x + dx,
-            y=self.y + dy,
-            width=self.width,
-            style=self.style,
-            indent=self.indent,
-        )
-
-    def with_indent(self, additional_indent: float) -> RenderContext:
-        """Create a new context with additional indentation."""
-        return RenderContext(
-            x=self.x + additional_indent,
-            y=self.y,
-            width=self.width - additional_indent,
-            style=self.style,
-            indent=self.indent + additional_indent,
-        )
-
-
 class SVGRenderer:
     """
     Renderer that converts Markdown AST to SVG.
@@ -157,6 +146,15 @@ class SVGRenderer:
         image_base_path: Optional[str] = None,
         image_url_mapper: Optional[ImageUrlMapper] = None,
         image_timeout: float = 10.0,
+        *,
+        bold_font_path: Optional[str] = None,
+        italic_font_path: Optional[str] = None,
+        bold_italic_font_path: Optional[str] = None,
+        width_cache: Optional[WidthCache] = None,
+        use_kerning: bool = False,
+        fallback_font_paths: Optional[Sequence[str]] = None,
+        char_width_table: Optional[CharWidthTable] = None,
+        measurer: Optional[TextMeasurer] = None,
     ) -> None:
         """
         Initialize the renderer.
@@ -164,12 +162,19 @@ class SVGRenderer:
         Args:
             style: Style configuration. Uses default style if None.
             font_path: Path to a TTF/OTF font file for precise measurement.
-                      If None, uses system default font.
+                      If None, uses system default font. Measurers come from
+                      the shared font registry, so each font is parsed once.
             mono_font_path: Path to a monospace TTF/OTF font file for measuring
-                      inline code. If None, uses style.mono_char_width_ratio.
+                      inline code. If None, inline code is measured with the
+                      installed face that style.mono_font_family resolves to,
+                      or with the matching bundled metric pack when none is
+                      installed. style.mono_char_width_ratio is only used when
+                      precise measurement is off or the stack matches no
+                      installed font or pack.
             use_precise_measurement: If True (default), uses fonttools for
                       accurate text measurement when available. Set to False
-                      to always use heuristic estimation.
+                      to use heuristic estimation instead of fonts. A
+                      measurer passed below is still used.
             fetch_image_sizes: If True (default), fetch image dimensions from
                       local files or remote URLs. Required for accurate layout.
             image_base_path: Base directory for resolving relative image paths.
@@ -178,11 +183,42 @@ class SVGRenderer:
                       embedding in SVG. Useful for mapping local paths to CDN URLs.
                       Example: create_prefix_mapper({"/assets/": "https://cdn.example.com/"})
             image_timeout: Timeout in seconds for fetching remote images (default 10).
+                      The options below are keyword-only.
+            bold_font_path: Path to the bold face of the body font. When any
+                      styled face is given, bold/italic text is measured with
+                      the real face instead of scaling regular widths by the
+                      style's width ratios.
+            italic_font_path: Path to the italic face of the body font.
+            bold_italic_font_path: Path to the bold italic face of the body font.
+            width_cache: LRU cache for measured word widths. If None, uses the
+                      process-wide cache shared by all renderers.
+            use_kerning: If True, precise measurement applies the font's pair
+                      kerning, as browsers do by default. Off by default to
+                      keep layouts identical to earlier versions.
+            fallback_font_paths: Fonts to measure characters the body font has
+                      no glyph for (e.g. CJK or emoji fonts), in priority order,
+                      like a CSS font-family fallback list.
+            char_width_table: Per-character widths for heuristic measurement,
+                      e.g. from calibrate_char_widths(), used when no font is
+                      measured. Bold and italic widths are scaled by the
+                      style's width ratios.
+            measurer: Measurement backend for body text, e.g. a
+                      shaping.HarfBuzzMeasurer. While it is available, it
+                      takes precedence over the body fonts, char_width_table
+                      and the heuristic, even with use_precise_measurement
+                      False: that flag only controls the fonts the renderer
+                      loads itself. Bold and italic widths are scaled by the
+                      style's width ratios.
         """
         self.style = style or Style()
         self._measurer: Optional[FontMeasurer] = None
         self._mono_measurer: Optional[FontMeasurer] = None
+        self._family: Optional[FontFamilyMeasurer] = None
+        self._fallback: Optional[FallbackMeasurer] = None
         self._mono_char_width: Optional[float] = None  # Cached mono character width per unit
+        self._use_kerning = use_kerning
+        self._char_width_table = char_width_table
+        self._text_measurer = measurer
 
         # Image handling
         self._fetch_image_sizes = fetch_image_sizes
@@ -191,23 +227,111 @@ class SVGRenderer:
         self._image_timeout = image_timeout
         self._image_size_cache: Dict[str, Optional[ImageSize]] = {}
 
+        self._styled_font_paths = (bold_font_path, italic_font_path, bold_italic_font_path)
+        self._fallback_font_paths = tuple(fallback_font_paths or ())
+        # Fonts not given as paths are resolved from the style's CSS font
+        # stacks through the font index, on first measurement
+        self._font_stacks_pending = use_precise_measurement and not (font_path and mono_font_path)
+
         if use_precise_measurement:
+            # Measurers are shared per font and load on first use, so
+            # constructing a renderer doesn't import fonttools or read fonts
             if font_path:
-                self._measurer = FontMeasurer(font_path)
-                if not self._measurer.is_available:
-                    self._measurer = None
-            else:
-                self._measurer = get_default_measurer()
-
-            # Set up mono font measurement
+                self._set_body_font(get_measurer(font_path))
             if mono_font_path:
-                self._mono_measurer = FontMeasurer(mono_font_path)
-                if self._mono_measurer.is_available:
-                    # Measure a reference character to get exact width per unit
-                    # All chars in monospace have same width, so just measure one
-                    self._mono_char_width = self._mono_measurer.measure("M", 1.0)
+                self._mono_measurer = get_measurer(mono_font_path)
+
+        # Width cache keys are scoped by everything besides the text and flags
+        # that affects a measured width, so renderers can share one cache.
+        # The scope is registered once; keys carry its id plus the style flags.
+        self._width_cache = width_cache if width_cache is not None else get_default_width_cache()
+        self._width_cache_scope = self._width_cache.scope_id(
+            (
+                use_precise_measurement,
+                font_path or self.style.font_family,
+                mono_font_path or self.style.mono_font_family,
+                self._styled_font_paths,
+                self._fallback_font_paths,
+                self.style.char_width_ratio,
+                self.style.bold_char_width_ratio,
+                self.style.italic_char_width_ratio,
+                self.style.mono_char_width_ratio,
+                self.style.text_width_scale,
+                use_kerning,
+                char_width_table,
+                measurer,
+            )
+        )
+
+    def _set_body_font(
+        self,
+        measurer: Optional[FontMeasurer],
+        family: Optional[FontFamilyMeasurer] = None,
+    ) -> None:
+        """Use measurer for body text, with the renderer's styled and fallback fonts."""
+        self._measurer = measurer
+        if measurer is None:
+            return
+        regular = (measurer.font_path, measurer.font_number)
+        if any(self._styled_font_paths):
+            bold, italic, bold_italic = self._styled_font_paths
+            family = FontFamilyMeasurer(regular, bold=bold, italic=italic, bold_italic=bold_italic)
+        if family is not None and self._fallback_font_paths:
+            # Characters the family's faces lack are measured with the fallbacks
+            family = family.with_fallback(self._fallback_font_paths)
+        self._family = family
+        if family is None and self._fallback_font_paths:
+            self._fallback = FallbackMeasurer([measurer.font_path, *self._fallback_font_paths])
+
+    def _resolve_font_stacks(self) -> None:
+        """Pick measurement fonts for style.font_family / mono_font_family from installed fonts."""
+        self._font_stacks_pending = False
+        # Imported here so that `import mdsvg` doesn't load the font index or packs
+        from .fontindex import find_standard_faces, get_font_index
+        from .metricpacks import PackMeasurer, find_metric_pack, get_pack_family, get_pack_measurer
+
+        # Common fonts are found at their standard locations; the installed
+        # font index is only loaded for stacks those can't resolve
+        if self._measurer is None:
+            faces = find_standard_faces(self.style.font_family)
+            if faces is not None:
+                regular, bold, italic, bold_italic = faces
+                family = FontFamilyMeasurer(
+                    regular, bold=bold, italic=italic, bold_italic=bold_italic
+                )
+                self._set_body_font(get_measurer(regular), family)
+            else:
+                index = get_font_index()
+                face = index.resolve(self.style.font_family)
+                if face is not None:
+                    self._set_body_font(
+                        get_measurer(face.path, face.font_number),
+                        index.resolve_family(self.style.font_family),
+                    )
+        if self._measurer is None:
+            default = get_default_measurer()
+            if (
+                default is not None
+                and not isinstance(default, PackMeasurer)
+                and default.is_available
+            ):
+                self._set_body_font(default)
+            else:
+                # No usable installed font (or no fonttools): use bundled metrics
+                stack = self.style.font_family
+                if find_metric_pack(stack) is None:
+                    stack = "sans-serif"
+                self._set_body_font(get_pack_measurer(stack), get_pack_family(stack))
+        if self._mono_measurer is None:
+            faces = find_standard_faces(self.style.mono_font_family)
+            if faces is not None:
+                self._mono_measurer = get_measurer(faces[0])
+            else:
+                face = get_font_index().resolve(self.style.mono_font_family)
+                if face is not None:
+                    self._mono_measurer = get_measurer(face.path, face.font_number)
                 else:
-                    self._mono_measurer = None
+                    self._mono_measurer = get_pack_measurer(self.style.mono_font_family)
 
     def _measure_text(
         self,
@@ -217,30 +341,86 @@ class SVGRenderer:
         is_italic: bool = False,
         is_mono: bool = False,
     ) -> float:
-        """Measure text width using best available method."""
+        """Measure text width using best available method, through the width cache."""
+        flags = self._width_cache_scope + is_bold * 4 + is_italic * 2 + is_mono
+        key = (flags, text, font_size)
+        cached = self._width_cache.get(key)
+        if cached is not None:
+            return cached
+
+        width = self._compute_text_width(text, font_size, is_bold, is_italic, is_mono)
+        self._width_cache.put(key, width)
+        return width
+
+    def _synthetic_style_scale(self, is_bold: bool, is_italic: bool) -> float:
+        """Width multiplier approximating a bold/italic face from regular-face widths."""
+        # Bold text is typically 10-15% wider, italic ~4% wider
+        if is_bold and is_italic:
+            # Bold italic combines both effects
+            bold_ratio = self.style.bold_char_width_ratio / self.style.char_width_ratio
+            italic_ratio = self.style.italic_char_width_ratio / self.style.char_width_ratio
+            return bold_ratio * italic_ratio / 1.0  # Combine effects
+        elif is_bold:
+            return self.style.bold_char_width_ratio / self.style.char_width_ratio
+        elif is_italic:
+            return self.style.italic_char_width_ratio / self.style.char_width_ratio
+        return 1.0
+
+    def _get_mono_char_width(self) -> Optional[float]:
+        """Get the mono font's character width per unit font size, measured on first use."""
+        if self._mono_char_width is None and self._mono_measurer is not None:
+            if self._mono_measurer.is_available:
+                # Measure a reference character to get exact width per unit
+                # All chars in monospace have same width, so just measure one
+                self._mono_char_width = self._mono_measurer.measure("M", 1.0)
+            else:
+                self._mono_measurer = None
+        return self._mono_char_width
+
+    def _compute_text_width(
+        self,
+        text: str,
+        font_size: float,
+        is_bold: bool,
+        is_italic: bool,
+        is_mono: bool,
+    ) -> float:
+        """Measure text width without consulting the cache."""
         width: float
+        if self._font_stacks_pending:
+            self._resolve_font_stacks()
 
         # Monospace: all characters have identical width, so just multiply
         if is_mono:
-            if self._mono_char_width is not None:
+            mono_char_width = self._get_mono_char_width()
+            if mono_char_width is not None:
                 # Use measured width from actual mono font
-                width = len(text) * self._mono_char_width * font_size
+                width = len(text) * mono_char_width * font_size
             else:
                 # Fall back to configured ratio
                 width = len(text) * font_size * self.style.mono_char_width_ratio
+        elif self._text_measurer is not None and self._text_measurer.is_available:
+            width = self._text_measurer.measure(text, font_size, kerning=self._use_kerning)
+            width *= self._synthetic_style_scale(is_bold, is_italic)
+        elif self._family is not None and self._family.is_available:
+            # Measure with the real face; only styles the family lacks are scaled
+            face_bold, face_italic = self._family.resolve(is_bold, is_italic)
+            width = self._family.measure(
+                text, font_size, bold=face_bold, italic=face_italic, kerning=self._use_kerning
+            )
+            width *= self._synthetic_style_scale(
+                is_bold and not face_bold, is_italic and not face_italic
+            )
+        elif self._fallback is not None and self._fallback.is_available:
+            width = self._fallback.measure(text, font_size, kerning=self._use_kerning)
+            width *= self._synthetic_style_scale(is_bold, is_italic)
         elif self._measurer is not None and self._measurer.is_available:
-            width = self._measurer.measure(text, font_size)
+            width = self._measurer.measure(text, font_size, kerning=self._use_kerning)
             # Apply scaling for bold/italic since FontMeasurer only has regular font
-            # Bold text is typically 10-15% wider, italic ~4% wider
-            if is_bold and is_italic:
-                # Bold italic combines both effects
-                bold_ratio = self.style.bold_char_width_ratio / self.style.char_width_ratio
-                italic_ratio = self.style.italic_char_width_ratio / self.style.char_width_ratio
-                width *= bold_ratio * italic_ratio / 1.0  # Combine effects
-            elif is_bold:
-                width *= self.style.bold_char_width_ratio / self.style.char_width_ratio
-            elif is_italic:
-                width *= self.style.italic_char_width_ratio / self.style.char_width_ratio
+            width *= self._synthetic_style_scale(is_bold, is_italic)
+        elif self._char_width_table is not None:
+            width = self._char_width_table.width(text, font_size)
+            width *= self._synthetic_style_scale(is_bold, is_italic)
         else:
             # Use heuristic when FontMeasurer is not available
             effective_ratio = self.style.char_width_ratio
@@ -259,48 +439,96 @@ class SVGRenderer:
         # Apply safety margin for browser rendering differences
         return width * self.style.text_width_scale
 
-    def _render_blocks_to_elements(
+    def layout(
         self,
         blocks: Document,
-        width: float,
-        padding: float,
-    ) -> Tuple[List[str], float]:
+        width: float = 400,
+        padding: float = 0,
+    ) -> LayoutTree:
         """
-        Render blocks to SVG elements and return total height.
+        Lay out blocks without building SVG.
 
-        This is the core rendering logic shared by render() and render_content().
+        This is the first stage of render() and render_content(). The tree
+        has every block, line and text run with its position and size, for
+        hit-testing, pagination, caching or JSON export. render_layout()
+        serializes it to SVG.
 
         Args:
-            blocks: Document AST to render.
+            blocks: Document AST to lay out.
             width: Width of the SVG in pixels.
             padding: Padding inside the SVG.
 
         Returns:
-            Tuple of (svg_elements, total_height).
+            LayoutTree with the positioned top-level blocks.
+
+        Example:
+            >>> renderer = SVGRenderer()
+            >>> tree = renderer.layout(parse("# Hello"), width=400)
+            >>> tree.boxes[0].lines[0].runs[0].width  # Measured width of "Hello"
+            >>> tree.to_json()
         """
-        content_width = width - (padding * 2)
+        return self._layout(blocks, width, padding, with_lines=True)
 
-        ctx = RenderContext(
-            x=padding,
-            y=padding,
-            width=content_width,
-            style=self.style,
-        )
+    def _layout(
+        self,
+        blocks: Document,
+        width: float,
+        padding: float,
+        with_lines: bool,
+    ) -> LayoutTree:
+        """
+        Lay out blocks, with their lines or, for measure(), only their sizes.
+
+        Without lines, text is still broken into lines by _break_lines() to
+        get its height, but no runs, lines or table cells are built.
+        """
+        content_width = width - (padding * 2)
+        # Word widths for this pass, which skips the shared cache's lock
+        widths: _WordWidths = {}
 
-        svg_elements: List[str] = []
+        boxes: List[LayoutBox] = []
         current_y = padding
 
         for block in blocks:
-            elements, height = self._render_block(block, ctx.with_offset(dy=current_y - ctx.y))
-            svg_elements.extend(elements)
+            box = self._layout_block(block, padding, current_y, content_width, widths, with_lines)
+            height = 0.0
+            if box is not None:
+                boxes.append(box)
+                height = box.height
             current_y += height + self.style.paragraph_spacing
 
         # Remove trailing spacing
         if blocks:
             current_y -= self.style.paragraph_spacing
 
-        total_height = current_y + padding
-        return svg_elements, total_height
+        return LayoutTree(width, current_y + padding, padding, tuple(boxes))
+
+    def render_layout(self, tree: LayoutTree) -> RenderResult:
+        """
+        Serialize a layout tree to SVG.
+
+        The second stage of render_content(). The tree should come from
+        layout() on a renderer with the same style.
+
+        Args:
+            tree: Tree returned by layout().
+
+        Returns:
+            RenderResult with the SVG elements, width and height.
+        """
+        return RenderResult(
+            elements="\n".join(self._write_layout(tree)),
+            style_block=self._get_style_block(),
+            width=tree.width,
+            height=tree.height,
+        )
+
+    def _write_layout(self, tree: LayoutTree) -> List[str]:
+        """Serialize a layout tree's boxes to SVG elements."""
+        elements: List[str] = []
+        for box in tree.boxes:
+            self._write_box(box, elements)
+        return elements
 
     def render(
         self,
@@ -319,9 +547,8 @@ class SVGRenderer:
         Returns:
             SVG string.
         """
-        svg_elements, total_height = self._render_blocks_to_elements(blocks, width, padding)
-        svg = self._build_svg(svg_elements, width, total_height)
-        return svg
+        tree = self.layout(blocks, width, padding)
+        return self._build_svg(self._write_layout(tree), width, tree.height)
 
     def render_content(
         self,
@@ -354,14 +581,7 @@ class SVGRenderer:
             >>> result.height   # Actual rendered height
             >>> result.to_svg() # Full SVG with wrapper
         """
-        svg_elements, total_height = self._render_blocks_to_elements(blocks, width, padding)
-
-        return RenderResult(
-            elements="\n".join(svg_elements),
-            style_block=self._get_style_block(),
-            width=width,
-            height=total_height,
-        )
+        return self.render_layout(self.layout(blocks, width, padding))
 
     def measure(
         self,
@@ -372,6 +592,10 @@ class SVGRenderer:
         """
         Measure the size needed to render blocks.
 
+        This is the layout pass of render() without building lines, runs
+        or SVG, so it is two to three times faster than render(). The
+        height is the same as render_content() reports.
+
         Args:
             blocks: Document AST to measure.
             width: Width constraint.
@@ -380,25 +604,8 @@ class SVGRenderer:
         Returns:
             Size with width and height.
         """
-        content_width = width - (padding * 2)
-
-        ctx = RenderContext(
-            x=padding,
-            y=padding,
-            width=content_width,
-            style=self.style,
-        )
-
-        current_y = padding
-
-        for block in blocks:
-            _, height = self._render_block(block, ctx.with_offset(dy=current_y - ctx.y))
-            current_y += height + self.style.paragraph_spacing
-
-        if blocks:
-            current_y -= self.style.paragraph_spacing
-
-        return Size(width=width, height=current_y + padding)
+        tree = self._layout(blocks, width, padding, with_lines=False)
+        return Size(width=width, height=tree.height)
 
     def _get_style_block(self) -> str:
         """Generate the CSS style block for SVG rendering.
@@ -436,481 +643,272 @@ class SVGRenderer:
 
         return "\n".join(svg_parts)
 
-    def _render_block(
+    def _layout_block(
         self,
         block: Block,
-        ctx: RenderContext,
-    ) -> Tuple[List[str], float]:
-        """Render a block and return SVG elements and height used."""
+        x: float,
+        y: float,
+        width: float,
+        widths: _WordWidths,
+        with_lines: bool,
+    ) -> Optional[LayoutBox]:
+        """Lay out a block with its top-left corner at (x, y)."""
         if isinstance(block, Paragraph):
-            return self._render_paragraph(block, ctx)
+            lines, height = self._layout_text(
+                block.spans, x, y, width, self.style.base_font_size, widths, with_lines
+            )
+            return LayoutBox("paragraph", x, y, width, height, lines, block=block)
         elif isinstance(block, Heading):
-            return self._render_heading(block, ctx)
+            return self._layout_heading(block, x, y, width, widths, with_lines)
         elif isinstance(block, CodeBlock):
-            return self._render_code_block(block, ctx)
+            return self._layout_code_block(block, x, y, width, with_lines)
         elif isinstance(block, Blockquote):
-            return self._render_blockquote(block, ctx)
-        elif isinstance(block, UnorderedList):
-            return self._render_unordered_list(block, ctx)
-        elif isinstance(block, OrderedList):
-            return self._render_ordered_list(block, ctx)
+            return self._layout_blockquote(block, x, y, width, widths, with_lines)
+        elif isinstance(block, (UnorderedList, OrderedList)):
+            return self._layout_list(block, x, y, width, widths, with_lines)
         elif isinstance(block, HorizontalRule):
-            return self._render_horizontal_rule(ctx)
+            margin = self.style.paragraph_spacing
+            height = margin + self.style.hr_height + margin
+            return LayoutBox("horizontal_rule", x, y, width, height, block=block)
         elif isinstance(block, Table):
-            return self._render_table(block, ctx)
+            return self._layout_table(block, x, y, width, with_lines)
         elif isinstance(block, ImageBlock):
-            return self._render_image_block(block, ctx)
+            img_width, img_height = self._layout_image(block, width)
+            return LayoutBox("image", x, y, img_width, img_height, block=block)
         else:
             # Unknown block type
-            return [], 0
-
-    def _render_paragraph(
-        self,
-        para: Paragraph,
-        ctx: RenderContext,
-    ) -> Tuple[List[str], float]:
-        """Render a paragraph."""
-        return self._render_text_block(
-            para.spans,
-            ctx,
-            font_size=self.style.base_font_size,
-            css_class="md-text",
-        )
+            return None
 
-    def _render_heading(
+    def _layout_heading(
         self,
         heading: Heading,
-        ctx: RenderContext,
-    ) -> Tuple[List[str], float]:
-        """Render a heading."""
+        x: float,
+        y: float,
+        width: float,
+        widths: _WordWidths,
+        with_lines: bool,
+    ) -> LayoutBox:
+        """Lay out a heading, with its margins inside the box."""
         scale = self.style.get_heading_scale(heading.level)
         font_size = self.style.base_font_size * scale
 
-        # Add top margin
         margin_top = font_size * self.style.heading_margin_top
         margin_bottom = font_size * self.style.heading_margin_bottom
 
-        elements, text_height = self._render_text_block(
-            heading.spans,
-            ctx.with_offset(dy=margin_top),
-            font_size=font_size,
-            css_class="md-heading",
-            font_weight=self.style.heading_font_weight,
+        lines, text_height = self._layout_text(
+            heading.spans, x, y + margin_top, width, font_size, widths, with_lines
         )
+        height = margin_top + text_height + margin_bottom
+        return LayoutBox("heading", x, y, width, height, lines, block=heading)
 
-        return elements, margin_top + text_height + margin_bottom
-
-    def _render_code_block(
+    def _layout_code_block(
         self,
         code: CodeBlock,
-        ctx: RenderContext,
-    ) -> Tuple[List[str], float]:
-        """Render a code block with background."""
+        x: float,
+        y: float,
+        width: float,
+        with_lines: bool,
+    ) -> LayoutBox:
+        """Lay out a code block's lines, wrapped or cut as style.code_block_overflow says."""
         overflow = self.style.code_block_overflow
-
-        if overflow == "wrap":
-            return self._render_code_block_wrapped(code, ctx)
-        elif overflow in {"show", "hide", "ellipsis"}:
-            return self._render_code_block_simple(code, ctx, overflow)
-        else:
-            # Defensive fallback (should be unreachable due to typing)
-            return self._render_code_block_wrapped(code, ctx)
-
-    def _render_code_block_simple(
-        self,
-        code: CodeBlock,
-        ctx: RenderContext,
-        overflow: str,
-    ) -> Tuple[List[str], float]:
-        """Render code block with show/hide/ellipsis overflow."""
-        elements: List[str] = []
-
-        padding = self.style.code_block_padding
-        font_size = self.style.base_font_size * 0.9
-        line_height = font_size * 1.4
+        padding, font_size, line_height = self._code_block_metrics()
         char_width = font_size * self.style.mono_char_width_ratio
-        max_chars = int((ctx.width - padding * 2) / char_width)
-
-        lines = code.code.split("\n")
 
-        # Process lines for ellipsis mode
-        if overflow == "ellipsis":
-            processed_lines = []
-            for line in lines:
-                if len(line) > max_chars and max_chars > 3:
-                    processed_lines.append(line[: max_chars - 3] + "...")
+        code_lines: List[str] = []
+        if overflow in {"show", "hide", "ellipsis"}:
+            max_chars = int((width - padding * 2) / char_width)
+            for line in code.code.split("\n"):
+                if overflow == "ellipsis" and len(line) > max_chars and max_chars > 3:
+                    line = line[: max_chars - 3] + "..."
+                code_lines.append(line)
+        else:
+            max_chars = self._code_block_wrap_chars(width)
+            for line in code.code.split("\n"):
+                if not line:
+                    code_lines.append("")
+                elif len(line) <= max_chars:
+                    code_lines.append(line)
                 else:
-                    processed_lines.append(line)
-            lines = processed_lines
-
-        text_height = len(lines) * line_height
-        total_height = text_height + (padding * 2)
-
-        # For hide mode, add a clipPath
-        clip_id = None
-        if overflow == "hide":
-            clip_id = f"code-clip-{id(code)}"
-            elements.append(
-                f'  <defs><clipPath id="{clip_id}">'
-                f'<rect x="{format_number(ctx.x)}" y="{format_number(ctx.y)}" '
-                f'width="{format_number(ctx.width)}" height="{format_number(total_height)}"/>'
-                f"</clipPath></defs>"
+                    # Wrap long lines
+                    while line:
+                        code_lines.append(line[:max_chars])
+                        line = line[max_chars:]
+
+        lines: List[LayoutLine] = []
+        text_x = x + padding
+        top = y + padding
+        baseline = y + padding + font_size
+        for line in code_lines if with_lines else ():
+            line_width = len(line) * char_width
+            runs = (LayoutRun(line, text_x, line_width, is_code=True),) if line else ()
+            lines.append(
+                LayoutLine(text_x, top, line_width, line_height, baseline, font_size, runs)
             )
+            top += line_height
+            baseline += line_height
 
-        # Background rectangle
-        elements.append(
-            f'  <rect x="{format_number(ctx.x)}" y="{format_number(ctx.y)}" '
-            f'width="{format_number(ctx.width)}" height="{format_number(total_height)}" '
-            f'fill="{self.style.code_background}" '
-            f'rx="{format_number(self.style.code_block_border_radius)}"/>'
-        )
-
-        # Code lines (optionally clipped)
-        clip_attr = f' clip-path="url(#{clip_id})"' if clip_id else ""
-        y_offset = ctx.y + padding + font_size
-        for line in lines:
-            if line:  # Don't render empty lines as text elements
-                escaped = escape_svg_text(line)
-                elements.append(
-                    f'  <text x="{format_number(ctx.x + padding)}" '
-                    f'y="{format_number(y_offset)}" '
-                    f'class="md-mono" font-size="{format_number(font_size)}" '
-                    f'font-weight="400" '
-                    f'fill="{self.style.text_color}"{clip_attr}>{escaped}</text>'
-                )
-            y_offset += line_height
-
-        return elements, total_height
+        height = len(code_lines) * line_height + (padding * 2)
+        return LayoutBox("code_block", x, y, width, height, tuple(lines), block=code)
 
-    def _render_code_block_wrapped(
-        self,
-        code: CodeBlock,
-        ctx: RenderContext,
-    ) -> Tuple[List[str], float]:
-        """Render code block with wrapped lines."""
-        elements: List[str] = []
-
-        padding = self.style.code_block_padding
+    def _code_block_metrics(self) -> Tuple[float, float, float]:
+        """Get a code block's padding, font size and line height."""
         font_size = self.style.base_font_size * 0.9
-        line_height = font_size * 1.4
-        char_width = font_size * self.style.mono_char_width_ratio
-        max_chars = max(10, int((ctx.width - padding * 2) / char_width))
-
-        # Wrap lines
-        wrapped_lines: List[str] = []
-        for line in code.code.split("\n"):
-            if not line:
-                wrapped_lines.append("")
-            elif len(line) <= max_chars:
-                wrapped_lines.append(line)
-            else:
-                # Wrap long lines
-                while line:
-                    wrapped_lines.append(line[:max_chars])
-                    line = line[max_chars:]
+        return self.style.code_block_padding, font_size, font_size * 1.4
 
-        text_height = len(wrapped_lines) * line_height
-        total_height = text_height + (padding * 2)
-
-        # Background rectangle
-        elements.append(
-            f'  <rect x="{format_number(ctx.x)}" y="{format_number(ctx.y)}" '
-            f'width="{format_number(ctx.width)}" height="{format_number(total_height)}" '
-            f'fill="{self.style.code_background}" '
-            f'rx="{format_number(self.style.code_block_border_radius)}"/>'
-        )
-
-        # Code lines
-        y_offset = ctx.y + padding + font_size
-        for line in wrapped_lines:
-            if line:
-                escaped = escape_svg_text(line)
-                elements.append(
-                    f'  <text x="{format_number(ctx.x + padding)}" '
-                    f'y="{format_number(y_offset)}" '
-                    f'class="md-mono" font-size="{format_number(font_size)}" '
-                    f'font-weight="400" '
-                    f'fill="{self.style.text_color}">{escaped}</text>'
-                )
-            y_offset += line_height
-
-        return elements, total_height
+    def _code_block_wrap_chars(self, width: float) -> int:
+        """Get the characters per line wrapped code blocks break lines at."""
+        padding, font_size, _ = self._code_block_metrics()
+        char_width = font_size * self.style.mono_char_width_ratio
+        return max(10, int((width - padding * 2) / char_width))
 
-    def _render_blockquote(
+    def _layout_blockquote(
         self,
         bq: Blockquote,
-        ctx: RenderContext,
-    ) -> Tuple[List[str], float]:
-        """Render a blockquote with left border."""
-        elements: List[str] = []
-
-        # Create indented context for content
+        x: float,
+        y: float,
+        width: float,
+        widths: _WordWidths,
+        with_lines: bool,
+    ) -> LayoutBox:
+        """Lay out a blockquote's blocks, indented past its left border."""
         indent = self.style.blockquote_padding
-        inner_ctx = ctx.with_indent(indent)
-
-        # Render inner blocks
+        children: List[LayoutBox] = []
         current_y = 0.0
-        inner_elements: List[str] = []
 
         for block in bq.blocks:
-            block_elements, height = self._render_block(
-                block,
-                inner_ctx.with_offset(dy=current_y),
+            box = self._layout_block(
+                block, x + indent, y + current_y, width - indent, widths, with_lines
             )
-            inner_elements.extend(block_elements)
+            height = 0.0
+            if box is not None:
+                children.append(box)
+                height = box.height
             current_y += height + self.style.paragraph_spacing
 
         if bq.blocks:
             current_y -= self.style.paragraph_spacing
 
-        total_height = current_y
-
-        # Left border
-        elements.append(
-            f'  <rect x="{format_number(ctx.x)}" y="{format_number(ctx.y)}" '
-            f'width="{format_number(self.style.blockquote_border_width)}" '
-            f'height="{format_number(total_height)}" '
-            f'fill="{self.style.blockquote_border_color}"/>'
-        )
-
-        elements.extend(inner_elements)
-
-        return elements, total_height
+        return LayoutBox("blockquote", x, y, width, current_y, children=tuple(children), block=bq)
 
-    def _render_unordered_list(
+    def _layout_list(
         self,
-        ul: UnorderedList,
-        ctx: RenderContext,
-    ) -> Tuple[List[str], float]:
-        """Render an unordered list."""
-        elements: List[str] = []
+        lst: Union[UnorderedList, OrderedList],
+        x: float,
+        y: float,
+        width: float,
+        widths: _WordWidths,
+        with_lines: bool,
+    ) -> LayoutBox:
+        """Lay out a list's items, with their text indented past the markers."""
+        indent = self.style.list_indent
+        spacing = self.style.list_item_spacing
+        items: List[LayoutBox] = []
         current_y = 0.0
 
-        bullet_indent = self.style.list_indent
-
-        for item in ul.items:
-            # Render bullet
-            bullet_x = ctx.x + (bullet_indent / 2) - 4
-            bullet_y = ctx.y + current_y + (self.style.base_font_size * self.style.line_height / 2)
-
-            elements.append(
-                f'  <circle cx="{format_number(bullet_x)}" '
-                f'cy="{format_number(bullet_y)}" r="3" '
-                f'fill="{self.style.text_color}"/>'
-            )
-
-            # Render item text
-            item_ctx = ctx.with_indent(bullet_indent).with_offset(dy=current_y)
-            item_elements, item_height = self._render_text_block(
+        for idx, item in enumerate(lst.items):
+            item_y = y + current_y
+            lines, item_height = self._layout_text(
                 item.spans,
-                item_ctx,
-                font_size=self.style.base_font_size,
-                css_class="md-text",
+                x + indent,
+                item_y,
+                width - indent,
+                self.style.base_font_size,
+                widths,
+                with_lines,
             )
-            elements.extend(item_elements)
-
-            current_y += item_height + self.style.list_item_spacing
-
-        if ul.items:
-            current_y -= self.style.list_item_spacing
-
-        return elements, current_y
-
-    def _render_ordered_list(
-        self,
-        ol: OrderedList,
-        ctx: RenderContext,
-    ) -> Tuple[List[str], float]:
-        """Render an ordered list."""
-        elements: List[str] = []
-        current_y = 0.0
 
-        bullet_indent = self.style.list_indent
-
-        for idx, item in enumerate(ol.items):
-            number = ol.start + idx
-
-            # Render number
-            number_text = f"{number}."
-            number_x = ctx.x + bullet_indent - 8
-            number_y = ctx.y + current_y + self.style.base_font_size
-
-            elements.append(
-                f'  <text x="{format_number(number_x)}" '
-                f'y="{format_number(number_y)}" '
-                f'class="md-text" font-size="{format_number(self.style.base_font_size)}" '
-                f'text-anchor="end">{number_text}</text>'
-            )
+            # A nested list goes below the item's text
+            children: Tuple[LayoutBox, ...] = ()
+            if item.nested_list is not None:
+                nested = self._layout_list(
+                    item.nested_list,
+                    x + indent,
+                    item_y + item_height + spacing,
+                    width - indent,
+                    widths,
+                    with_lines,
+                )
+                children = (nested,)
+                item_height += spacing + nested.height
 
-            # Render item text
-            item_ctx = ctx.with_indent(bullet_indent).with_offset(dy=current_y)
-            item_elements, item_height = self._render_text_block(
-                item.spans,
-                item_ctx,
-                font_size=self.style.base_font_size,
-                css_class="md-text",
+            marker = f"{lst.start + idx}." if isinstance(lst, OrderedList) else "•"
+            items.append(
+                LayoutBox(
+                    "list_item", x, item_y, width, item_height, lines, children, marker=marker
+                )
             )
-            elements.extend(item_elements)
-
-            current_y += item_height + self.style.list_item_spacing
+            current_y += item_height + spacing
 
-        if ol.items:
-            current_y -= self.style.list_item_spacing
+        if lst.items:
+            current_y -= spacing
 
-        return elements, current_y
-
-    def _render_horizontal_rule(
-        self,
-        ctx: RenderContext,
-    ) -> Tuple[List[str], float]:
-        """Render a horizontal rule."""
-        height = self.style.hr_height
-        margin = self.style.paragraph_spacing
-
-        y_pos = ctx.y + margin
-
-        element = (
-            f'  <rect x="{format_number(ctx.x)}" '
-            f'y="{format_number(y_pos)}" '
-            f'width="{format_number(ctx.width)}" '
-            f'height="{format_number(height)}" '
-            f'fill="{self.style.hr_color}"/>'
+        return LayoutBox(
+            lst.block_type.value, x, y, width, current_y, children=tuple(items), block=lst
         )
 
-        return [element], margin + height + margin
-
-    def _render_table(
+    def _layout_table(
         self,
         table: Table,
-        ctx: RenderContext,
-    ) -> Tuple[List[str], float]:
-        """Render a table."""
-        elements: List[str] = []
-
+        x: float,
+        y: float,
+        width: float,
+        with_lines: bool,
+    ) -> LayoutBox:
+        """Lay out a table's rows and cells, with columns of equal width."""
         padding = self.style.table_cell_padding
         font_size = self.style.base_font_size
-        row_height = font_size * self.style.line_height + (padding * 2)
+        line_height = font_size * self.style.line_height
+        row_height = line_height + (padding * 2)
 
-        # Calculate column widths (equal distribution for now)
         num_cols = len(table.header.cells)
-        col_width = ctx.width / num_cols if num_cols > 0 else ctx.width
-
-        current_y = ctx.y
-
-        # Render header background
-        elements.append(
-            f'  <rect x="{format_number(ctx.x)}" y="{format_number(current_y)}" '
-            f'width="{format_number(ctx.width)}" height="{format_number(row_height)}" '
-            f'fill="{self.style.table_header_background}"/>'
-        )
-
-        # Render header row
-        self._render_table_row(
-            elements,
-            table.header,
-            ctx.x,
-            current_y,
-            col_width,
-            row_height,
-            padding,
-            font_size,
-            table.alignments,
-            is_header=True,
-        )
-        current_y += row_height
-
-        # Render body rows
-        for row in table.rows:
-            self._render_table_row(
-                elements,
-                row,
-                ctx.x,
-                current_y,
-                col_width,
-                row_height,
-                padding,
-                font_size,
-                table.alignments,
-                is_header=False,
-            )
-            current_y += row_height
-
-        # Table border
-        total_height = current_y - ctx.y
-        elements.append(
-            f'  <rect x="{format_number(ctx.x)}" y="{format_number(ctx.y)}" '
-            f'width="{format_number(ctx.width)}" height="{format_number(total_height)}" '
-            f'fill="none" stroke="{self.style.table_border_color}"/>'
-        )
-
-        # Column separators
-        col_x = ctx.x
-        for _ in range(num_cols - 1):
-            col_x += col_width
-            elements.append(
-                f'  <line x1="{format_number(col_x)}" y1="{format_number(ctx.y)}" '
-                f'x2="{format_number(col_x)}" y2="{format_number(current_y)}" '
-                f'stroke="{self.style.table_border_color}"/>'
-            )
-
-        # Row separators
-        row_y = ctx.y
-        for _ in range(len(table.rows) + 1):
-            row_y += row_height
-            if row_y < current_y:
-                elements.append(
-                    f'  <line x1="{format_number(ctx.x)}" y1="{format_number(row_y)}" '
-                    f'x2="{format_number(ctx.x + ctx.width)}" y2="{format_number(row_y)}" '
-                    f'stroke="{self.style.table_border_color}"/>'
+        col_width = width / num_cols if num_cols > 0 else width
+
+        rows: List[LayoutBox] = []
+        current_y = y
+        for row in (table.header, *table.rows) if with_lines else ():
+            is_header = not rows
+            cells: List[LayoutBox] = []
+            cell_x = x
+            for idx, cell in enumerate(row.cells):
+                text = "".join(span.text for span in cell.spans)
+                text_width = self._measure_text(text, font_size, is_bold=is_header)
+
+                align = table.alignments[idx] if idx < len(table.alignments) else None
+                if align == "center":
+                    text_x = cell_x + col_width / 2
+                    anchor = "middle"
+                    left = text_x - text_width / 2
+                elif align == "right":
+                    text_x = cell_x + col_width - padding
+                    anchor = "end"
+                    left = text_x - text_width
+                else:  # left or default
+                    text_x = cell_x + padding
+                    anchor = "start"
+                    left = text_x
+
+                runs = (LayoutRun(text, left, text_width, is_bold=is_header),) if text else ()
+                line = LayoutLine(
+                    text_x,
+                    current_y + padding,
+                    text_width,
+                    line_height,
+                    current_y + padding + font_size,
+                    font_size,
+                    runs,
+                    anchor,
                 )
-
-        return elements, total_height
-
-    def _render_table_row(
-        self,
-        elements: List[str],
-        row: TableRow,
-        start_x: float,
-        y: float,
-        col_width: float,
-        row_height: float,
-        padding: float,
-        font_size: float,
-        alignments: Tuple[Optional[str], ...],
-        is_header: bool,
-    ) -> None:
-        """Render a single table row."""
-        x = start_x
-        text_y = y + padding + font_size
-
-        for idx, cell in enumerate(row.cells):
-            # Get text
-            text = "".join(span.text for span in cell.spans)
-            escaped = escape_svg_text(text)
-
-            # Get alignment
-            align = alignments[idx] if idx < len(alignments) else None
-
-            if align == "center":
-                text_x = x + col_width / 2
-                anchor = "middle"
-            elif align == "right":
-                text_x = x + col_width - padding
-                anchor = "end"
-            else:  # left or default
-                text_x = x + padding
-                anchor = "start"
-
-            css_class = "md-text"
-            weight = "bold" if is_header else "normal"
-
-            elements.append(
-                f'  <text x="{format_number(text_x)}" y="{format_number(text_y)}" '
-                f'class="{css_class}" font-size="{format_number(font_size)}" '
-                f'font-weight="{weight}" text-anchor="{anchor}">{escaped}</text>'
+                cells.append(
+                    LayoutBox("table_cell", cell_x, current_y, col_width, row_height, (line,))
+                )
+                cell_x += col_width
+            rows.append(
+                LayoutBox("table_row", x, current_y, width, row_height, children=tuple(cells))
             )
+            current_y += row_height
 
-            x += col_width
+        height = row_height * (len(table.rows) + 1)
+        return LayoutBox("table", x, y, width, height, children=tuple(rows), block=table)
 
     def _get_image_size(self, url: str) -> Optional[ImageSize]:
         """Get image dimensions, using cache to avoid re-fetching."""
@@ -938,22 +936,8 @@ class SVGRenderer:
             return self._image_url_mapper(url)
         return url
 
-    def _render_image_block(
-        self,
-        img: ImageBlock,
-        ctx: RenderContext,
-    ) -> Tuple[List[str], float]:
-        """Render an image block.
-
-        Image sizing priority:
-        1. Explicit dimensions from markdown: ![alt](url){width=X height=Y}
-        2. Fetched dimensions from the actual image (if fetch_image_sizes=True)
-        3. Style defaults (image_width, image_height)
-        4. Fallback: full width with image_fallback_aspect_ratio
-
-        The preserveAspectRatio attribute ensures the actual image
-        scales proportionally within the allocated space.
-        """
+    def _layout_image(self, img: ImageBlock, max_width: float) -> Tuple[float, float]:
+        """Get the width and height to draw an image block at, in the priority order above."""
         # Try to get actual image dimensions
         actual_size = self._get_image_size(img.url)
 
@@ -964,13 +948,13 @@ class SVGRenderer:
         # Calculate final width
         if explicit_width is not None:
             # Explicit width from markdown
-            img_width = min(ctx.width, explicit_width)
+            img_width = min(max_width, explicit_width)
         elif self.style.image_width is not None:
             # Style default width
-            img_width = min(ctx.width, self.style.image_width)
+            img_width = min(max_width, self.style.image_width)
         else:
             # Full container width
-            img_width = ctx.width
+            img_width = max_width
 
         # Calculate final height
         if explicit_height is not None:
@@ -989,69 +973,208 @@ class SVGRenderer:
             # Fallback to configured aspect ratio
             img_height = img_width / self.style.image_fallback_aspect_ratio
 
-        # Map URL for embedding (e.g., local path -> CDN URL)
-        embed_url = self._map_image_url(img.url)
+        return img_width, img_height
 
-        element = (
-            f'  <image x="{format_number(ctx.x)}" y="{format_number(ctx.y)}" '
-            f'width="{format_number(img_width)}" height="{format_number(img_height)}" '
-            f'href="{escape_svg_text(embed_url)}" '
-            f'preserveAspectRatio="xMidYMid meet"/>'
-        )
+    def _layout_text(
+        self,
+        spans: Sequence[Span],
+        x: float,
+        y: float,
+        width: float,
+        font_size: float,
+        widths: _WordWidths,
+        with_lines: bool,
+    ) -> Tuple[Tuple[LayoutLine, ...], float]:
+        """Wrap spans into lines, aligned as style.text_align says; returns the lines and height."""
+        if not spans:
+            return (), 0
+
+        line_height = font_size * self.style.line_height
+        wrapped = self._break_lines(spans, width, font_size, widths, with_lines)
+        if not with_lines:
+            return (), len(wrapped) * line_height
+
+        # Calculate x position based on text alignment
+        anchor = self.style.get_text_anchor()
+        if self.style.text_align == "center":
+            text_x = x + width / 2
+        elif self.style.text_align == "right":
+            text_x = x + width
+        else:  # left (default)
+            text_x = x
+
+        lines: List[LayoutLine] = []
+        top = y
+        baseline = y + font_size
+        for line_runs in wrapped:
+            line_width = sum(run[1] for run in line_runs)
+            if anchor == "middle":
+                run_x = text_x - line_width / 2
+            elif anchor == "end":
+                run_x = text_x - line_width
+            else:
+                run_x = text_x
 
-        elements = [element]
+            placed: List[LayoutRun] = []
+            for text, run_width, run_style in line_runs:
+                if text:
+                    placed.append(LayoutRun(text, run_x, run_width, *run_style))
+                run_x += run_width
 
-        # Add alt text as title for accessibility
-        if img.alt:
-            elements.append(f"  <title>{escape_svg_text(img.alt)}</title>")
+            lines.append(
+                LayoutLine(
+                    text_x, top, line_width, line_height, baseline, font_size, tuple(placed), anchor
+                )
+            )
+            top += line_height
+            baseline += line_height
 
-        return elements, img_height
+        return tuple(lines), len(wrapped) * line_height
 
-    def _render_text_block(
+    def _break_lines(
         self,
         spans: Sequence[Span],
-        ctx: RenderContext,
+        max_width: float,
         font_size: float,
-        css_class: str,
-        font_weight: str = "normal",
-    ) -> Tuple[List[str], float]:
-        """Render a sequence of spans as wrapped text using tspan for proper spacing."""
-        if not spans:
-            return [], 0
+        widths: _WordWidths,
+        with_runs: bool = True,
+    ) -> List[List[_LineRun]]:
+        """
+        Break spans into lines that fit within max_width.
 
-        elements: List[str] = []
-        line_height = font_size * self.style.line_height
+        Text is broken at spaces, and a word that doesn't fit starts a new
+        line unless it is the first on its line. Each line is a list of
+        (text, width, style) runs, where consecutive words of the same style
+        share a run. Without with_runs, the lines are left empty, for callers
+        that only need how many there are.
 
-        # Build runs of text with their styles
-        runs = self._build_text_runs(spans, font_size)
+        Word widths are memoized in widths.
+        """
+        lines: List[List[_LineRun]] = [[]]
+        line = lines[0]
+        current_width = 0.0
+        line_started = False
+        ends_with_space = False  # Whether the last run's text ends with a space
+        # The last run, kept open while words are appended to it
+        last_style: _RunStyle = (False, False, False, False, None)
+        run_text = ""
+        run_width = 0.0
 
-        # Wrap and layout text
-        lines = self._wrap_runs(runs, ctx.width, font_size)
+        for span in spans:
+            span_type = span.span_type
+            is_bold = span_type is SpanType.BOLD or span_type is SpanType.BOLD_ITALIC
+            is_italic = span_type is SpanType.ITALIC or span_type is SpanType.BOLD_ITALIC
+            is_code = span_type is SpanType.CODE
+            style = (is_bold, is_italic, is_code, span_type is SpanType.LINK, span.url)
 
-        current_y = ctx.y + font_size  # Baseline
+            for i, word in enumerate(span.text.split(" ")):
+                # Add space before word if not at start of line
+                if line_started and (i > 0 or not ends_with_space):
+                    word = " " + word
 
-        # Calculate x position based on text alignment
-        text_anchor = self.style.get_text_anchor()
-        if self.style.text_align == "center":
-            text_x = ctx.x + ctx.width / 2
-        elif self.style.text_align == "right":
-            text_x = ctx.x + ctx.width
-        else:  # left (default)
-            text_x = ctx.x
+                key = (word, font_size, is_bold, is_italic, is_code)
+                word_width = widths.get(key)
+                if word_width is None:
+                    word_width = widths[key] = self._measure_text(*key)
+
+                if current_width + word_width <= max_width or not line_started:
+                    # Word fits on current line
+                    if line_started and style == last_style:
+                        if with_runs:
+                            run_text += word
+                            run_width += word_width
+                        if word:
+                            ends_with_space = word.endswith(" ")
+                    else:
+                        if not line_started:
+                            word = word.lstrip(" ")
+                        elif with_runs:
+                            line.append((run_text, run_width, last_style))
+                        run_text = word
+                        run_width = word_width
+                        ends_with_space = word.endswith(" ")
+                        last_style = style
+                        line_started = True
+                    current_width += word_width
+                else:
+                    # Start new line
+                    if with_runs:
+                        line.append((run_text, run_width, last_style))
+                    line = []
+                    lines.append(line)
+                    word = word.lstrip(" ")
+                    key = (word, font_size, is_bold, is_italic, is_code)
+                    word_width = widths.get(key)
+                    if word_width is None:
+                        word_width = widths[key] = self._measure_text(*key)
+                    current_width = word_width
+                    run_text = word
+                    run_width = word_width
+                    ends_with_space = False
+                    last_style = style
+
+        if with_runs and line_started:
+            line.append((run_text, run_width, last_style))
+        return lines
 
-        for line_runs in lines:
-            if not line_runs:
-                current_y += line_height
-                continue
+    def _write_box(self, box: LayoutBox, elements: List[str]) -> None:
+        """Append the SVG elements for a box and its children to elements."""
+        kind = box.kind
+        if kind == "paragraph":
+            self._write_lines(box.lines, "md-text", "normal", elements)
+        elif kind == "heading":
+            self._write_lines(box.lines, "md-heading", self.style.heading_font_weight, elements)
+        elif kind == "code_block":
+            self._write_code_block(box, elements)
+        elif kind == "blockquote":
+            # Left border
+            elements.append(
+                f'  <rect x="{format_number(box.x)}" y="{format_number(box.y)}" '
+                f'width="{format_number(self.style.blockquote_border_width)}" '
+                f'height="{format_number(box.height)}" '
+                f'fill="{self.style.blockquote_border_color}"/>'
+            )
+            for child in box.children:
+                self._write_box(child, elements)
+        elif kind in ("unordered_list", "ordered_list"):
+            self._write_list(box, elements)
+        elif kind == "horizontal_rule":
+            elements.append(
+                f'  <rect x="{format_number(box.x)}" '
+                f'y="{format_number(box.y + self.style.paragraph_spacing)}" '
+                f'width="{format_number(box.width)}" '
+                f'height="{format_number(self.style.hr_height)}" '
+                f'fill="{self.style.hr_color}"/>'
+            )
+        elif kind == "table":
+            self._write_table(box, elements)
+        elif kind == "image" and isinstance(box.block, ImageBlock):
+            # Map URL for embedding (e.g., local path -> CDN URL)
+            embed_url = self._map_image_url(box.block.url)
+            elements.append(
+                f'  <image x="{format_number(box.x)}" y="{format_number(box.y)}" '
+                f'width="{format_number(box.width)}" height="{format_number(box.height)}" '
+                f'href="{escape_svg_text(embed_url)}" '
+                f'preserveAspectRatio="xMidYMid meet"/>'
+            )
+            # Add alt text as title for accessibility
+            if box.block.alt:
+                elements.append(f"  <title>{escape_svg_text(box.block.alt)}</title>")
 
+    def _write_lines(
+        self,
+        lines: Sequence[LayoutLine],
+        css_class: str,
+        font_weight: str,
+        elements: List[str],
+    ) -> None:
+        """Append a <text> element per line, with a <tspan> per styled run."""
+        for line in lines:
             # Build a single <text> element with <tspan> children for proper spacing
             # This lets the browser handle text positioning correctly
             tspan_parts: List[str] = []
 
-            for run in line_runs:
-                if not run.text:
-                    continue
-
+            for run in line.runs:
                 escaped = escape_svg_text(run.text)
 
                 # Build tspan styling
@@ -1091,137 +1214,116 @@ class SVGRenderer:
 
             # Build the complete text element
             text_content = "".join(tspan_parts)
-            text_element = (
-                f'  <text x="{format_number(text_x)}" y="{format_number(current_y)}" '
-                f'font-size="{format_number(font_size)}" class="{css_class}" '
-                f'text-anchor="{text_anchor}">'
+            elements.append(
+                f'  <text x="{format_number(line.x)}" y="{format_number(line.baseline)}" '
+                f'font-size="{format_number(line.font_size)}" class="{css_class}" '
+                f'text-anchor="{line.anchor}">'
                 f"{text_content}</text>"
             )
-            elements.append(text_element)
-
-            current_y += line_height
-
-        total_height = len(lines) * line_height
-        return elements, total_height
-
-    def _build_text_runs(
-        self,
-        spans: Sequence[Span],
-        font_size: float,
-    ) -> List[TextRun]:
-        """Convert spans to text runs with computed styles."""
-        runs: List[TextRun] = []
 
-        for span in spans:
-            is_bold = span.span_type in (SpanType.BOLD, SpanType.BOLD_ITALIC)
-            is_italic = span.span_type in (SpanType.ITALIC, SpanType.BOLD_ITALIC)
-            is_code = span.span_type == SpanType.CODE
-            is_link = span.span_type == SpanType.LINK
-            is_image = span.span_type == SpanType.IMAGE
-
-            runs.append(
-                TextRun(
-                    text=span.text,
-                    is_bold=is_bold,
-                    is_italic=is_italic,
-                    is_code=is_code,
-                    is_link=is_link,
-                    is_image=is_image,
-                    url=span.url,
-                )
+    def _write_code_block(self, box: LayoutBox, elements: List[str]) -> None:
+        """Append a code block's background and lines, clipped in "hide" overflow mode."""
+        # For hide mode, add a clipPath
+        clip_id = None
+        if self.style.code_block_overflow == "hide":
+            clip_id = f"code-clip-{id(box.block)}"
+            elements.append(
+                f'  <defs><clipPath id="{clip_id}">'
+                f'<rect x="{format_number(box.x)}" y="{format_number(box.y)}" '
+                f'width="{format_number(box.width)}" height="{format_number(box.height)}"/>'
+                f"</clipPath></defs>"
             )
 
-        return runs
-
-    def _wrap_runs(
-        self,
-        runs: List[TextRun],
-        max_width: float,
-        font_size: float,
-    ) -> List[List[TextRun]]:
-        """Wrap text runs to fit within max_width."""
-        if not runs:
-            return []
-
-        lines: List[List[TextRun]] = [[]]
-        current_width = 0.0
+        # Background rectangle
+        elements.append(
+            f'  <rect x="{format_number(box.x)}" y="{format_number(box.y)}" '
+            f'width="{format_number(box.width)}" height="{format_number(box.height)}" '
+            f'fill="{self.style.code_background}" '
+            f'rx="{format_number(self.style.code_block_border_radius)}"/>'
+        )
 
-        for run in runs:
-            words = run.text.split(" ")
+        # Code lines (optionally clipped); empty lines get no text element
+        clip_attr = f' clip-path="url(#{clip_id})"' if clip_id else ""
+        for line in box.lines:
+            for run in line.runs:
+                elements.append(
+                    f'  <text x="{format_number(line.x)}" '
+                    f'y="{format_number(line.baseline)}" '
+                    f'class="md-mono" font-size="{format_number(line.font_size)}" '
+                    f'font-weight="400" '
+                    f'fill="{self.style.text_color}"{clip_attr}>{escape_svg_text(run.text)}</text>'
+                )
 
-            for i, word in enumerate(words):
-                # Add space before word if not at start of line
-                if i > 0 or (lines[-1] and not lines[-1][-1].text.endswith(" ")):
-                    word = " " + word if lines[-1] else word
+    def _write_list(self, box: LayoutBox, elements: List[str]) -> None:
+        """Append each item's bullet or number, its text and its nested list."""
+        bullet_indent = self.style.list_indent
+        font_size = self.style.base_font_size
 
-                word_width = self._measure_text(
-                    word,
-                    font_size,
-                    is_bold=run.is_bold,
-                    is_italic=run.is_italic,
-                    is_mono=run.is_code,
+        for item in box.children:
+            if box.kind == "ordered_list":
+                elements.append(
+                    f'  <text x="{format_number(item.x + bullet_indent - 8)}" '
+                    f'y="{format_number(item.y + font_size)}" '
+                    f'class="md-text" font-size="{format_number(font_size)}" '
+                    f'text-anchor="end">{item.marker}</text>'
+                )
+            else:
+                bullet_x = item.x + (bullet_indent / 2) - 4
+                bullet_y = item.y + (font_size * self.style.line_height / 2)
+                elements.append(
+                    f'  <circle cx="{format_number(bullet_x)}" '
+                    f'cy="{format_number(bullet_y)}" r="3" '
+                    f'fill="{self.style.text_color}"/>'
                 )
 
-                if current_width + word_width <= max_width or not lines[-1]:
-                    # Word fits on current line
-                    if lines[-1] and lines[-1][-1].same_style(run):
-                        lines[-1][-1] = lines[-1][-1].append(word)
-                    else:
-                        word_to_add = word.lstrip(" ") if not lines[-1] else word
-                        lines[-1].append(run.with_text(word_to_add))
-                    current_width += word_width
-                else:
-                    # Start new line
-                    word_clean = word.lstrip(" ")
-                    lines.append([run.with_text(word_clean)])
-                    current_width = self._measure_text(
-                        word_clean,
-                        font_size,
-                        is_bold=run.is_bold,
-                        is_italic=run.is_italic,
-                        is_mono=run.is_code,
-                    )
+            self._write_lines(item.lines, "md-text", "normal", elements)
+            for nested in item.children:
+                self._write_box(nested, elements)
 
-        return lines
+    def _write_table(self, box: LayoutBox, elements: List[str]) -> None:
+        """Append a table's header background, cell text, border and grid lines."""
+        header = box.children[0]
+        elements.append(
+            f'  <rect x="{format_number(box.x)}" y="{format_number(box.y)}" '
+            f'width="{format_number(box.width)}" height="{format_number(header.height)}" '
+            f'fill="{self.style.table_header_background}"/>'
+        )
 
+        for row in box.children:
+            weight = "bold" if row is header else "normal"
+            for cell in row.children:
+                line = cell.lines[0]
+                text = "".join(run.text for run in line.runs)
+                elements.append(
+                    f'  <text x="{format_number(line.x)}" y="{format_number(line.baseline)}" '
+                    f'class="md-text" font-size="{format_number(line.font_size)}" '
+                    f'font-weight="{weight}" text-anchor="{line.anchor}">'
+                    f"{escape_svg_text(text)}</text>"
+                )
 
-@dataclass
-class TextRun:
-    """A run of text with consistent styling."""
-
-    text: str
-    is_bold: bool = False
-    is_italic: bool = False
-    is_code: bool = False
-    is_link: bool = False
-    is_image: bool = False
-    url: Optional[str] = None
-
-    def same_style(self, other: TextRun) -> bool:
-        """Check if another run has the same styling."""
-        return (
-            self.is_bold == other.is_bold
-            and self.is_italic == other.is_italic
-            and self.is_code == other.is_code
-            and self.is_link == other.is_link
-            and self.url == other.url
+        # Table border
+        elements.append(
+            f'  <rect x="{format_number(box.x)}" y="{format_number(box.y)}" '
+            f'width="{format_number(box.width)}" height="{format_number(box.height)}" '
+            f'fill="none" stroke="{self.style.table_border_color}"/>'
         )
 
-    def with_text(self, text: str) -> TextRun:
-        """Create a copy with different text."""
-        return TextRun(
-            text=text,
-            is_bold=self.is_bold,
-            is_italic=self.is_italic,
-            is_code=self.is_code,
-            is_link=self.is_link,
-            is_image=self.is_image,
-            url=self.url,
-        )
+        # Column separators, at the left edges of the header's cells after the first
+        bottom = box.children[-1].y + box.children[-1].height
+        for cell in header.children[1:]:
+            elements.append(
+                f'  <line x1="{format_number(cell.x)}" y1="{format_number(box.y)}" '
+                f'x2="{format_number(cell.x)}" y2="{format_number(bottom)}" '
+                f'stroke="{self.style.table_border_color}"/>'
+            )
 
-    def append(self, text: str) -> TextRun:
-        """Create a copy with appended text."""
-        return self.with_text(self.text + text)
+        # Row separators, at the tops of the body rows
+        for row in box.children[1:]:
+            elements.append(
+                f'  <line x1="{format_number(box.x)}" y1="{format_number(row.y)}" '
+                f'x2="{format_number(box.x + box.width)}" y2="{format_number(row.y)}" '
+                f'stroke="{self.style.table_border_color}"/>'
+            )
 
 
 # Convenience functions
@@ -1310,6 +1412,36 @@ def measure(
     return renderer.measure(blocks, width=width, padding=padding)
 
 
+def layout(
+    markdown: str,
+    width: float = 400,
+    padding: float = 20,
+    style: Optional[Style] = None,
+) -> LayoutTree:
+    """
+    Lay out Markdown as a tree of positioned blocks, lines and text runs.
+
+    Args:
+        markdown: Markdown text to lay out.
+        width: Width of the SVG in pixels.
+        padding: Padding inside the SVG.
+        style: Style configuration.
+
+    Returns:
+        LayoutTree for hit-testing, pagination or JSON export.
+
+    Example:
+        >>> tree = layout("# Hello\\n\\nSome text", width=400)
+        >>> tree.hit_test(30, 140)  # Boxes under a point
+        >>> tree.to_json()
+    """
+    from .parser import parse
+
+    blocks = parse(markdown)
+    renderer = SVGRenderer(style=style)
+    return renderer.layout(blocks, width=width, padding=padding)
+
+
 def render_content(
     markdown: str,
     width: float = 400,
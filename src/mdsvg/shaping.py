@@ -0,0 +1,155 @@
+"""Text measurement with HarfBuzz shaping.
+
+FontMeasurer sums per-codepoint advances. That ignores ligatures, contextual
+forms and the glyph reordering that complex scripts like Arabic and
+Devanagari need, so paragraphs in those scripts wrap at the wrong place.
+HarfBuzzMeasurer shapes each run with HarfBuzz (through the optional
+uharfbuzz package) and measures the shaped glyphs instead.
+
+Shaping costs far more than a table sum, so shaped widths are kept in a
+WidthCache keyed by run text, face, features and kerning. Runs are shaped at
+the font's design size (units per em) and scaled to the font size, so one
+cache entry serves every size.
+
+## Basic Usage
+
+    from mdsvg import SVGRenderer
+    from mdsvg.shaping import HarfBuzzMeasurer
+
+    measurer = HarfBuzzMeasurer("./fonts/NotoSansArabic-Regular.ttf")
+    renderer = SVGRenderer(measurer=measurer, use_kerning=True)
+
+Install uharfbuzz with `pip install markdown-svg[shaping]`. Without it the
+measurer reports is_available as False, and SVGRenderer falls back to its
+usual fonts.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Mapping, NamedTuple, Optional, Tuple, Union
+
+from .measure import WidthCache
+
+# OpenType feature settings: tag -> value (0/False disables, 1/True enables,
+# larger values pick alternates)
+FeatureSettings = Union[Mapping[str, Union[bool, int]], Tuple[Tuple[str, int], ...]]
+
+_shaped_run_cache = WidthCache(maxsize=32768)
+
+
+def get_shaped_run_cache() -> WidthCache:
+    """Get the process-wide cache of shaped run widths shared by HarfBuzzMeasurers."""
+    return _shaped_run_cache
+
+
+class _ShapingFont(NamedTuple):
+    """A loaded HarfBuzz font and the uharfbuzz module that shapes with it."""
+
+    hb: Any
+    font: Any
+    units_per_em: int
+
+
+@dataclass(frozen=True)
+class HarfBuzzMeasurer:
+    """
+    Measure text width by shaping it with HarfBuzz.
+
+    The font is loaded on first use. Measurers are immutable and thread-safe,
+    and compare equal when they shape with the same face and features, so
+    they can be part of a WidthCache key.
+
+    Example:
+        >>> measurer = HarfBuzzMeasurer("./fonts/Amiri-Regular.ttf", features={"liga": True})
+        >>> measurer.measure("مرحبا بالعالم", 14)
+        71.3
+    """
+
+    font_path: str
+    font_number: int = 0  # For .ttc files with multiple fonts
+    features: FeatureSettings = ()
+    cache: Optional[WidthCache] = field(default=None, compare=False, repr=False)
+    _font: Optional[_ShapingFont] = field(default=None, init=False, repr=False, compare=False)
+    _loaded: bool = field(default=False, init=False, repr=False, compare=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        # Features are stored as sorted pairs so the measurer stays hashable
+        items = self.features.items() if isinstance(self.features, Mapping) else self.features
+        object.__setattr__(self, "features", tuple(sorted((tag, int(v)) for tag, v in items)))
+
+    def _load(self) -> Optional[_ShapingFont]:
+        """Load the font once; returns None if uharfbuzz or the font is unavailable."""
+        if self._loaded:
+            return self._font
+        with self._lock:
+            if not self._loaded:
+                object.__setattr__(self, "_font", self._init_font())
+                object.__setattr__(self, "_loaded", True)
+        return self._font
+
+    def _init_font(self) -> Optional[_ShapingFont]:
+        try:
+            import uharfbuzz as hb
+
+            face = hb.Face(hb.Blob.from_file_path(self.font_path), self.font_number)
+            font = hb.Font(face)
+        except Exception:
+            # uharfbuzz missing, or font file not found or invalid
+            return None
+        # A new hb.Font is scaled to units per em, so advances come back in font units
+        return _ShapingFont(hb, font, face.upem)
+
+    def _shape(self, shaping: _ShapingFont, text: str, kerning: bool) -> float:
+        """Shape text and return its advance in font units."""
+        buffer = shaping.hb.Buffer()
+        buffer.add_str(text)
+        buffer.guess_segment_properties()
+        features = dict(self.features)
+        if not kerning:
+            features.setdefault("kern", False)
+        shaping.hb.shape(shaping.font, buffer, features)
+        return float(sum(position.x_advance for position in buffer.glyph_positions))
+
+    def measure(self, text: str, font_size: float, kerning: bool = False) -> float:
+        """
+        Measure the width of shaped text in pixels.
+
+        Args:
+            text: The text to measure, as one run in a single font and style.
+            font_size: Font size in pixels.
+            kerning: Apply the font's kerning. Like SVGRenderer(use_kerning=...),
+                this is off by default; browsers kern, so turn it on to match
+                them. Features set on the measurer take precedence.
+
+        Returns:
+            Width in pixels.
+
+        Raises:
+            RuntimeError: If uharfbuzz is not installed or the font can't be loaded.
+        """
+        if not text:
+            return 0.0
+
+        shaping = self._font if self._loaded else self._load()
+        if shaping is None:
+            raise RuntimeError(
+                "HarfBuzzMeasurer not available. Install uharfbuzz: pip install uharfbuzz"
+            )
+
+        cache = self.cache if self.cache is not None else _shaped_run_cache
+        key = (self.font_path, self.font_number, self.features, kerning, text)
+        units = cache.get(key)
+        if units is None:
+            units = self._shape(shaping, text, kerning)
+            cache.put(key, units)
+        return (units / shaping.units_per_em) * font_size
+
+    @property
+    def is_available(self) -> bool:
+        """Check if shaping is available (loads the font if needed)."""
+        return self._load() is not None
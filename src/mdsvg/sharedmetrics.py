@@ -0,0 +1,474 @@
+"""Font metric tables shared between processes.
+
+A parent process publishes the advance and kerning tables of its fonts once,
+into a shared memory block or a single memory-mapped file. Worker processes
+attach to it and measure straight from the shared pages, read-only, so a host
+keeps one physical copy of the metrics and workers start without reading
+fonts, metrics cache files or importing fonttools.
+
+## Basic Usage
+
+    from multiprocessing import Pool
+
+    import mdsvg
+    from mdsvg.sharedmetrics import attach_shared_metrics, publish_shared_metrics
+
+    shared = publish_shared_metrics("./fonts/Inter-Regular.ttf")
+    with Pool(8, initializer=attach_shared_metrics, initargs=(shared.handle,)) as pool:
+        svgs = pool.map(mdsvg.render, documents)
+    shared.close()
+    shared.unlink()
+
+Pass `path=` to publish into a file instead of shared memory; workers then
+memory-map the file, and it can be reused by processes that start later.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import mmap
+import os
+import struct
+import sys
+from dataclasses import dataclass, field
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
+
+from .fontindex import find_standard_faces, get_font_index
+from .fonts import (
+    _BYTE_ORDER_FLAG,
+    AdvanceTable,
+    FaceSource,
+    FontMeasurer,
+    FontRegistry,
+    KerningTable,
+    _align_tables,
+    _get_system_font_cached,
+    _write_atomic,
+    get_font_registry,
+    get_measurer,
+)
+from .style import Style
+
+# Shared block layout: a 16-byte header, a JSON directory of the fonts, then
+# each font's tables in the metrics and kerning file formats, 8-byte aligned.
+_SHARED_MAGIC = b"MDSVGSHM"
+_SHARED_VERSION = 1
+_SHARED_HEADER = struct.Struct("=8sHHI")
+_ALIGNMENT = 8
+
+# Where POSIX shared memory blocks appear as files. Platforms without it
+# (e.g. macOS) publish into a temporary file instead, whose pages the OS
+# shares between processes the same way.
+_SHM_DIR = "/dev/shm"
+
+# Directory entry: metrics offset and length, kerning offset and length (0 if absent)
+_Entry = Tuple[int, int, int, int]
+
+
+class SharedMetricsHandle(NamedTuple):
+    """Picklable reference to published metrics, for passing to worker processes."""
+
+    kind: str  # "memory" for a shared memory block, "file" for a metrics bundle file
+    name: str  # Shared memory block name or file path
+
+
+def _face_key(face: FaceSource) -> Tuple[str, int]:
+    """Get the (resolved path, font number) a face is published under."""
+    font_path, font_number = (face, 0) if isinstance(face, str) else face
+    return os.path.realpath(font_path), font_number
+
+
+def _align(size: int) -> int:
+    """Round size up to the block alignment."""
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+def _pack(tables: Dict[Tuple[str, int], Tuple[bytes, Optional[bytes]]]) -> bytes:
+    """Lay out serialized tables in the shared block format."""
+    fonts = []
+    blobs = []
+    offset = 0
+    for (font_path, font_number), (metrics, kerning) in tables.items():
+        entry = [font_path, font_number, offset, len(metrics), 0, 0]
+        blobs.append(metrics)
+        offset += len(metrics)
+        if kerning is not None:
+            entry[4:] = [offset, len(kerning)]
+            blobs.append(kerning)
+            offset += len(kerning)
+        padding = _align(offset) - offset
+        blobs.append(b"\0" * padding)
+        offset += padding
+        fonts.append(entry)
+
+    directory = json.dumps({"fonts": fonts}).encode("utf-8")
+    header = _SHARED_HEADER.pack(_SHARED_MAGIC, _SHARED_VERSION, _BYTE_ORDER_FLAG, len(directory))
+    prefix = header + directory
+    prefix += b"\0" * (_align(len(prefix)) - len(prefix))
+    return prefix + b"".join(blobs)
+
+
+def _read_directory(view: memoryview) -> Tuple[Dict[Tuple[str, int], _Entry], int]:
+    """
+    Read the font directory of a shared block.
+
+    Returns:
+        The entries by (font path, font number) and the offset the tables start at.
+
+    Raises:
+        ValueError: If the buffer isn't a compatible shared metrics block.
+    """
+    if len(view) < _SHARED_HEADER.size:
+        raise ValueError("Buffer is too small to hold shared metrics")
+    magic, version, byte_order, directory_size = _SHARED_HEADER.unpack_from(view)
+    if magic != _SHARED_MAGIC or version != _SHARED_VERSION or byte_order != _BYTE_ORDER_FLAG:
+        raise ValueError("Buffer does not hold compatible shared metrics")
+    directory_end = _SHARED_HEADER.size + directory_size
+    directory = json.loads(bytes(view[_SHARED_HEADER.size : directory_end]).decode("utf-8"))
+    entries = {
+        (font_path, font_number): (metrics_offset, metrics_size, kern_offset, kern_size)
+        for font_path, font_number, metrics_offset, metrics_size, kern_offset, kern_size in (
+            directory["fonts"]
+        )
+    }
+    return entries, _align(directory_end)
+
+
+def _map_file(path: str) -> mmap.mmap:
+    """Map a file read-only."""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _map_block(name: str) -> mmap.mmap:
+    """
+    Map a shared memory block read-only, by name.
+
+    The mapping is independent of any SharedMemory object, which refuses to
+    close (even at interpreter exit) while tables still view its buffer. On
+    POSIX the block is opened through its file in the shared memory
+    filesystem; on Windows through its tag name.
+
+    Raises:
+        FileNotFoundError: If the block doesn't exist.
+    """
+    if sys.platform == "win32":
+        from multiprocessing import shared_memory
+
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            return mmap.mmap(-1, block.size, tagname=block.name, access=mmap.ACCESS_READ)
+        finally:
+            block.close()
+    return _map_file(os.path.join(_SHM_DIR, name.lstrip("/")))
+
+
+class SharedMetrics:
+    """
+    Advance and kerning tables for a set of fonts in one shared, read-only buffer.
+
+    The publishing process creates the buffer with publish(); workers attach
+    to it through its handle. Advance tables are read in place without
+    copying; a font's kerning pairs are decoded the first time kerned text
+    is measured with it.
+
+    Example:
+        >>> shared = SharedMetrics.publish(["./fonts/Inter-Regular.ttf"])
+        >>> worker_view = SharedMetrics.attach(shared.handle)  # in a worker
+        >>> worker_view.install()  # get_measurer() now reads the shared tables
+    """
+
+    def __init__(self, handle: SharedMetricsHandle, mapping: mmap.mmap) -> None:
+        """
+        Wrap an already mapped shared block; use publish() or attach() instead.
+
+        Args:
+            handle: The block's handle.
+            mapping: Read-only mapping of the block.
+        """
+        self.handle = handle
+        self._mapping = mapping
+        self._view: Optional[memoryview] = memoryview(mapping)
+        self._entries, self._data_offset = _read_directory(self._view)
+        self._installed: List[Tuple[FontRegistry, str, int]] = []
+
+    @classmethod
+    def publish(
+        cls,
+        fonts: Iterable[FaceSource],
+        path: Optional[str] = None,
+        kerning: bool = True,
+        families: Iterable[Sequence[FaceSource]] = (),
+    ) -> SharedMetrics:
+        """
+        Load fonts' metrics and publish them for other processes.
+
+        Tables come from the process-wide shared measurers, so fonts already
+        loaded are not read again. Fonts that can't be loaded are skipped.
+
+        Args:
+            fonts: Font files, or (path, font number) pairs for .ttc faces.
+            path: Write the tables to this file instead of a shared memory
+                block. Workers memory-map it. Where POSIX shared memory has
+                no filesystem (e.g. macOS), a temporary file is always used.
+            kerning: Also publish each font's kerning pairs.
+            families: Groups of faces measured together by a
+                FontFamilyMeasurer (e.g. a family's regular and bold faces).
+                Each group is published on one page layout, so workers'
+                families read the shared tables instead of copying them. A
+                face only joins the first group it appears in. Faces listed
+                here are published even if they aren't in fonts.
+
+        Returns:
+            The published metrics. The caller owns them: call unlink() (after
+            close()) once no worker needs them.
+        """
+        groups = [list(map(_face_key, group)) for group in families]
+        measurers: Dict[Tuple[str, int], FontMeasurer] = {}
+        loaded: Dict[Tuple[str, int], AdvanceTable] = {}
+        for key in [*map(_face_key, fonts), *(key for group in groups for key in group)]:
+            if key in measurers:
+                continue
+            measurers[key] = measurer = get_measurer(*key)
+            table = measurer.table
+            if table is not None:
+                loaded[key] = table
+
+        grouped: Dict[Tuple[str, int], AdvanceTable] = {}
+        for group in groups:
+            members = list(dict.fromkeys(k for k in group if k in loaded and k not in grouped))
+            if len(members) > 1:
+                aligned = _align_tables([loaded[key] for key in members])
+                grouped.update(zip(members, aligned))
+
+        tables: Dict[Tuple[str, int], Tuple[bytes, Optional[bytes]]] = {
+            key: (
+                grouped.get(key, table).to_bytes(),
+                measurers[key].kerning.to_bytes() if kerning else None,
+            )
+            for key, table in loaded.items()
+        }
+        data = _pack(tables)
+
+        if path is None and sys.platform != "win32" and not os.path.isdir(_SHM_DIR):
+            import tempfile
+
+            fd, path = tempfile.mkstemp(prefix="mdsvg-", suffix=".metrics")
+            os.close(fd)
+        if path is not None:
+            _write_atomic(path, data)
+            return cls.attach(SharedMetricsHandle("file", os.path.abspath(path)))
+
+        from multiprocessing import shared_memory
+
+        block = shared_memory.SharedMemory(create=True, size=len(data))
+        try:
+            cast(memoryview, block.buf)[: len(data)] = data
+            mapping = _map_block(block.name)
+        finally:
+            block.close()
+        return cls(SharedMetricsHandle("memory", block.name), mapping)
+
+    @classmethod
+    def attach(cls, handle: SharedMetricsHandle) -> SharedMetrics:
+        """
+        Map metrics published by another process.
+
+        Args:
+            handle: The publisher's SharedMetrics.handle.
+
+        Returns:
+            The attached metrics.
+
+        Raises:
+            FileNotFoundError: If the block or file no longer exists.
+            ValueError: If it doesn't hold compatible shared metrics.
+        """
+        if handle.kind == "file":
+            return cls(handle, _map_file(handle.name))
+        # Mapping the block directly, rather than through SharedMemory, also
+        # keeps it out of this process's resource tracker, which would
+        # otherwise unlink the publisher's block when this process exits
+        return cls(handle, _map_block(handle.name))
+
+    @property
+    def fonts(self) -> List[Tuple[str, int]]:
+        """The (font path, font number) of every published font."""
+        return list(self._entries)
+
+    def _blob(self, font_path: str, font_number: int, kind: int) -> Optional[memoryview]:
+        """Get a font's metrics (kind 0) or kerning (kind 2) bytes, or None."""
+        entry = self._entries.get((os.path.realpath(font_path), font_number))
+        if entry is None or self._view is None or not entry[kind + 1]:
+            return None
+        start = self._data_offset + entry[kind]
+        return self._view[start : start + entry[kind + 1]]
+
+    def table(self, font_path: str, font_number: int = 0) -> Optional[AdvanceTable]:
+        """Get a font's advance table, reading the shared buffer in place (None if not published)."""
+        blob = self._blob(font_path, font_number, 0)
+        return AdvanceTable.from_buffer(blob) if blob is not None else None
+
+    def kerning(self, font_path: str, font_number: int = 0) -> Optional[KerningTable]:
+        """Get a font's kerning pairs (None if not published)."""
+        blob = self._blob(font_path, font_number, 2)
+        return KerningTable.from_buffer(blob) if blob is not None else None
+
+    def measurer(self, font_path: str, font_number: int = 0) -> SharedMeasurer:
+        """Get a measurer for a font that reads its tables from this buffer."""
+        return SharedMeasurer(font_path, font_number, use_metrics_cache=False, shared=self)
+
+    def install(self, registry: Optional[FontRegistry] = None) -> int:
+        """
+        Register a shared measurer for every published font.
+
+        Afterwards get_measurer(), and so SVGRenderer and the font stack
+        resolution, measure those fonts from the shared buffer.
+
+        Args:
+            registry: Registry to install into. Defaults to the process-wide one.
+
+        Returns:
+            The number of fonts installed.
+        """
+        registry = registry if registry is not None else get_font_registry()
+        for font_path, font_number in self._entries:
+            registry.register(self.measurer(font_path, font_number))
+            self._installed.append((registry, font_path, font_number))
+        return len(self._entries)
+
+    def close(self) -> None:
+        """
+        Evict installed measurers and unmap the buffer in this process.
+
+        If measurers are still referenced elsewhere (e.g. by a live
+        renderer), the mapping stays open until they are released.
+        """
+        for registry, font_path, font_number in self._installed:
+            registry.evict(font_path, font_number)
+        self._installed.clear()
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        with contextlib.suppress(BufferError):
+            self._mapping.close()
+
+    def unlink(self) -> None:
+        """Delete the shared block or file. Only the publisher should call this."""
+        if self.handle.kind == "file":
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.handle.name)
+        else:
+            from multiprocessing import shared_memory
+
+            block = shared_memory.SharedMemory(name=self.handle.name)
+            block.close()
+            block.unlink()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"SharedMetrics({self.handle.kind}={self.handle.name!r}, fonts={len(self)})"
+
+
+@dataclass(frozen=True)
+class SharedMeasurer(FontMeasurer):
+    """
+    A FontMeasurer that reads its tables from SharedMetrics instead of the font file.
+
+    Fonts that weren't published are loaded from the font file as usual.
+    """
+
+    shared: Optional[SharedMetrics] = field(default=None, repr=False, compare=False)
+
+    def _init_font(self) -> Optional[AdvanceTable]:
+        table = self.shared.table(self.font_path, self.font_number) if self.shared else None
+        return table if table is not None else super()._init_font()
+
+    def _init_kerning(self) -> KerningTable:
+        kerning = self.shared.kerning(self.font_path, self.font_number) if self.shared else None
+        return kerning if kerning is not None else super()._init_kerning()
+
+
+_attached: Optional[SharedMetrics] = None
+
+
+def publish_shared_metrics(
+    *font_paths: FaceSource,
+    path: Optional[str] = None,
+    kerning: bool = True,
+    families: Iterable[Sequence[FaceSource]] = (),
+) -> SharedMetrics:
+    """
+    Publish fonts' metrics, plus the default fonts, for worker processes.
+
+    The defaults are the system default font and every installed face of the
+    families the default Style's font stacks resolve to, which is what
+    SVGRenderer measures with when no font paths are given. Each of those
+    families is published on one page layout. Call this in the parent before
+    starting workers, and pass the result's handle to attach_shared_metrics()
+    in each worker.
+
+    Args:
+        *font_paths: Font files (e.g. the font_path and mono_font_path passed
+            to SVGRenderer), or (path, font number) pairs.
+        path: Publish into this file instead of a shared memory block.
+        kerning: Also publish kerning pairs.
+        families: Groups of faces used together, e.g. the font_path and
+            bold_font_path passed to SVGRenderer (see SharedMetrics.publish()).
+
+    Returns:
+        The published SharedMetrics; close() and unlink() it when the workers are done.
+
+    Example:
+        >>> shared = publish_shared_metrics("./fonts/Inter-Regular.ttf")
+        >>> Pool(8, initializer=attach_shared_metrics, initargs=(shared.handle,))
+    """
+    fonts: List[FaceSource] = list(font_paths)
+    system_font = _get_system_font_cached()
+    if system_font:
+        fonts.append(system_font)
+
+    groups: List[Sequence[FaceSource]] = list(families)
+    style = Style()
+    for stack in (style.font_family, style.mono_font_family):
+        faces = find_standard_faces(stack)
+        if faces is not None:
+            groups.append([face for face in faces if face])
+            continue
+        index = get_font_index()
+        face = index.resolve(stack)
+        if face is not None:
+            groups.append([(other.path, other.font_number) for other in index.faces(face.family)])
+    return SharedMetrics.publish(fonts, path=path, kerning=kerning, families=groups)
+
+
+def attach_shared_metrics(handle: SharedMetricsHandle) -> SharedMetrics:
+    """
+    Attach to published metrics and install them as this process's shared measurers.
+
+    Suitable as a multiprocessing pool initializer. The mapping stays open
+    for the life of the process.
+
+    Args:
+        handle: SharedMetrics.handle from the publishing process.
+
+    Returns:
+        The attached SharedMetrics.
+    """
+    global _attached
+    shared = SharedMetrics.attach(handle)
+    shared.install()
+    _attached = shared
+    return shared
@@ -2,9 +2,70 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from array import array
+from bisect import bisect_right
+from dataclasses import MISSING, dataclass, field, fields
 from enum import Enum
-from typing import List, Optional, Union
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
+
+_T = TypeVar("_T")
+
+
+def _stored_fields(cls: Any) -> List[str]:
+    """Names of a dataclass's fields that are stored on instances."""
+    # The generated __init__ never assigns init=False fields that have a plain
+    # default (block_type); dataclasses leave the default as a class attribute,
+    # so it is shared by every instance and needs no slot
+    return [f.name for f in fields(cls) if f.init or f.default is MISSING]
+
+
+def _getstate(self: Any) -> List[Any]:
+    """Get a slotted dataclass's field values, for pickling."""
+    return [getattr(self, name) for name in _stored_fields(self)]
+
+
+def _setstate(self: Any, state: List[Any]) -> None:
+    """Restore field values from _getstate(), bypassing frozen __setattr__."""
+    for name, value in zip(_stored_fields(self), state):
+        object.__setattr__(self, name, value)
+
+
+def _slotted(cls: Type[_T]) -> Type[_T]:
+    """
+    Rebuild a dataclass with __slots__ for its fields.
+
+    Does what dataclass(slots=True) does on Python 3.10+, on 3.9 too.
+    Instances have no __dict__, so an AST node costs little more than its
+    field pointers. Frozen classes get __getstate__/__setstate__, so they
+    still pickle and copy.
+    """
+    stored = _stored_fields(cls)
+    inherited = {name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())}
+    # Defaults of stored fields live in __init__, and their class attributes
+    # would clash with the slots
+    namespace = dict(cls.__dict__)
+    for name in (*stored, "__dict__", "__weakref__"):
+        namespace.pop(name, None)
+    namespace["__slots__"] = tuple(name for name in stored if name not in inherited)
+    if cls.__dataclass_params__.frozen:  # type: ignore[attr-defined]
+        namespace["__getstate__"] = _getstate
+        namespace["__setstate__"] = _setstate
+    metaclass: Any = type(cls)
+    slotted = metaclass(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return cast(Type[_T], slotted)
 
 
 class SpanType(Enum):
@@ -19,6 +80,7 @@ class SpanType(Enum):
     IMAGE = "image"
 
 
+@_slotted
 @dataclass(frozen=True)
 class Span:
     """An inline text span with styling."""
@@ -51,6 +113,7 @@ class BlockType(Enum):
     IMAGE = "image"
 
 
+@_slotted
 @dataclass(frozen=True)
 class Block:
     """Base class for block-level elements."""
@@ -58,6 +121,7 @@ class Block:
     block_type: BlockType
 
 
+@_slotted
 @dataclass(frozen=True)
 class Paragraph(Block):
     """A paragraph containing inline spans."""
@@ -66,6 +130,7 @@ class Paragraph(Block):
     block_type: BlockType = field(default=BlockType.PARAGRAPH, init=False)
 
 
+@_slotted
 @dataclass(frozen=True)
 class Heading(Block):
     """A heading (h1-h6)."""
@@ -80,6 +145,7 @@ class Heading(Block):
             raise ValueError(f"Heading level must be 1-6, got {self.level}")
 
 
+@_slotted
 @dataclass(frozen=True)
 class CodeBlock(Block):
     """A fenced or indented code block."""
@@ -89,6 +155,7 @@ class CodeBlock(Block):
     block_type: BlockType = field(default=BlockType.CODE_BLOCK, init=False)
 
 
+@_slotted
 @dataclass(frozen=True)
 class Blockquote(Block):
     """A blockquote containing other blocks."""
@@ -97,6 +164,7 @@ class Blockquote(Block):
     block_type: BlockType = field(default=BlockType.BLOCKQUOTE, init=False)
 
 
+@_slotted
 @dataclass(frozen=True)
 class ListItem(Block):
     """A single item in a list."""
@@ -107,6 +175,7 @@ class ListItem(Block):
     block_type: BlockType = field(default=BlockType.LIST_ITEM, init=False)
 
 
+@_slotted
 @dataclass(frozen=True)
 class UnorderedList(Block):
     """An unordered (bullet) list."""
@@ -115,6 +184,7 @@ class UnorderedList(Block):
     block_type: BlockType = field(default=BlockType.UNORDERED_LIST, init=False)
 
 
+@_slotted
 @dataclass(frozen=True)
 class OrderedList(Block):
     """An ordered (numbered) list."""
@@ -124,6 +194,7 @@ class OrderedList(Block):
     block_type: BlockType = field(default=BlockType.ORDERED_LIST, init=False)
 
 
+@_slotted
 @dataclass(frozen=True)
 class HorizontalRule(Block):
     """A horizontal rule/divider."""
@@ -131,6 +202,7 @@ class HorizontalRule(Block):
     block_type: BlockType = field(default=BlockType.HORIZONTAL_RULE, init=False)
 
 
+@_slotted
 @dataclass(frozen=True)
 class TableCell:
     """A single cell in a table."""
@@ -140,6 +212,7 @@ class TableCell:
     align: Optional[str] = None  # "left", "center", "right"
 
 
+@_slotted
 @dataclass(frozen=True)
 class TableRow:
     """A row in a table."""
@@ -147,6 +220,7 @@ class TableRow:
     cells: tuple[TableCell, ...] = field(default_factory=tuple)
 
 
+@_slotted
 @dataclass(frozen=True)
 class Table(Block):
     """A table with header and body rows."""
@@ -157,6 +231,7 @@ class Table(Block):
     block_type: BlockType = field(default=BlockType.TABLE, init=False)
 
 
+@_slotted
 @dataclass(frozen=True)
 class ImageBlock(Block):
     """A standalone image block.
@@ -192,3 +267,118 @@ AnyBlock = Union[
 
 # Type alias for list of blocks (the AST)
 Document = List[AnyBlock]
+
+
+class SourcePosition(NamedTuple):
+    """Where a block is in the text it was parsed from."""
+
+    start_line: int  # First line, zero-based
+    end_line: int  # Line after the block's last non-blank line
+    start_offset: int  # Character offset of the block's first line
+    end_offset: int  # Character offset just past its last line (before the line break)
+
+
+class SourceMap:
+    """
+    Source positions of a document's top-level blocks, indexed like the blocks.
+
+    Positions are packed into one integer array beside the document instead
+    of being stored on the frozen block nodes, which stay small and can be
+    shared between documents.
+
+    Example:
+        >>> doc = parse(text, source_map=True)
+        >>> position = doc.source_map[3]
+        >>> text[position.start_offset : position.end_offset]  # Source of doc[3]
+    """
+
+    __slots__ = ("_data", "_starts")
+
+    def __init__(self, positions: Iterable[Tuple[int, int, int, int]] = ()) -> None:
+        self._data = array("q")
+        self._starts: Optional[array[int]] = None  # Start offsets, built by block_at()
+        for position in positions:
+            self._data.extend(position)
+
+    def append(self, position: Tuple[int, int, int, int]) -> None:
+        """Add the position of the next block."""
+        self._data.extend(position)
+        self._starts = None
+
+    def to_bytes(self) -> bytes:
+        """Serialize the positions as packed native 64-bit integers."""
+        return self._data.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> SourceMap:
+        """Create a source map from the bytes to_bytes() returned."""
+        source_map = cls()
+        source_map._data.frombytes(data)
+        return source_map
+
+    def block_at(self, offset: int) -> Optional[int]:
+        """
+        Find the block whose source contains a character offset.
+
+        Returns:
+            The block's index, or None if the offset is between blocks.
+        """
+        starts = self._starts
+        if starts is None:
+            starts = self._starts = self._data[2::4]
+        index = bisect_right(starts, offset) - 1
+        if index >= 0 and offset < self._data[index * 4 + 3]:
+            return index
+        return None
+
+    def __getitem__(self, index: int) -> SourcePosition:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("source map index out of range")
+        return SourcePosition(*self._data[index * 4 : index * 4 + 4])
+
+    def __len__(self) -> int:
+        return len(self._data) // 4
+
+    def __iter__(self) -> Iterator[SourcePosition]:
+        return (self[index] for index in range(len(self)))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SourceMap):
+            return NotImplemented
+        return self._data == other._data
+
+    def __repr__(self) -> str:
+        return f"SourceMap({list(self)!r})"
+
+
+class ParsedDocument(List[AnyBlock]):
+    """
+    A Document produced by the parser, with the source lines of each block.
+
+    It is a list of blocks and can be used anywhere a Document is expected.
+
+    Attributes:
+        line_ranges: The (start, end) line range of each block in the parsed
+            text, zero-based with the end exclusive. A range may include blank
+            lines the block consumed after its content. Only kept when the
+            document was parsed with incremental=True or source_map=True;
+            otherwise empty.
+        line_kinds: The parser's classification of every source line, used by
+            MarkdownParser.reparse(). Kept along with line_ranges.
+        source_map: Line and character positions of each block, if the
+            document was parsed with source_map=True; otherwise None.
+    """
+
+    def __init__(
+        self,
+        blocks: Iterable[AnyBlock] = (),
+        line_ranges: Iterable[Tuple[int, int]] = (),
+        line_kinds: Optional[bytearray] = None,
+        source_map: Optional[SourceMap] = None,
+    ) -> None:
+        super().__init__(blocks)
+        self.line_ranges: List[Tuple[int, int]] = list(line_ranges)
+        self.line_kinds = line_kinds if line_kinds is not None else bytearray()
+        self.source_map = source_map
@@ -62,6 +62,8 @@ def split_lines(text: str) -> List[str]:
     Returns:
         List of lines (without line ending characters).
     """
+    if "\r" not in text:
+        return text.split("\n")
     return text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
 
 
@@ -0,0 +1,69 @@
+"""
+Adversarial Markdown inputs for the parser's linear-time guarantee.
+
+Each entry builds an input of about n characters that drives a naive
+parser into super-linear work: unmatched delimiters that every later
+position tries to close, deep blockquote nesting, and long table rows.
+Parse time should grow in proportion to n. tests/test_parser.py asserts
+that, and benchmarks/bench_adversarial.py reports the timings.
+"""
+
+from typing import Callable, Dict
+
+
+def _repeat(unit: str) -> Callable[[int], str]:
+    """Build inputs of unit repeated to about n characters."""
+    return lambda n: unit * max(1, n // len(unit))
+
+
+def _nested_quotes(n: int) -> str:
+    """One line nested n blockquotes deep."""
+    return ">" * n + " x"
+
+
+def _quote_staircase(n: int) -> str:
+    """Lines nested 1 to 64 blockquotes deep, over and over."""
+    lines = []
+    size = 0
+    while size < n:
+        lines.append(">" * (len(lines) % 64 + 1) + " x")
+        size += len(lines[-1]) + 1
+    return "\n".join(lines)
+
+
+def _list_staircase(n: int) -> str:
+    """List items indented 0 to 63 spaces, over and over."""
+    lines = []
+    size = 0
+    while size < n:
+        lines.append(" " * (len(lines) % 64) + "- x")
+        size += len(lines[-1]) + 1
+    return "\n".join(lines)
+
+
+def _wide_table(n: int) -> str:
+    """A table with about n / 4 columns."""
+    columns = max(1, n // 4)
+    return "|" + "a|" * columns + "\n|" + "-|" * columns
+
+
+ADVERSARIAL_INPUTS: Dict[str, Callable[[int], str]] = {
+    "stars": _repeat("*"),
+    "underscores": _repeat("_"),
+    "backticks": _repeat("`"),
+    "open_brackets": _repeat("["),
+    "image_opens": _repeat("!["),
+    "unclosed_link_text": _repeat("[a "),
+    "unclosed_link_url": _repeat("[a]("),
+    "unclosed_link_title": _repeat('[a](b "'),
+    "unclosed_bold": _repeat("**a "),
+    "unclosed_bold_italic": _repeat("***a "),
+    "unclosed_bold_under": _repeat("__a "),
+    "italic_runs": _repeat("*a "),
+    "mixed_emphasis": _repeat("**a*"),
+    "code_and_brackets": _repeat("`_]"),
+    "nested_quotes": _nested_quotes,
+    "quote_staircase": _quote_staircase,
+    "list_staircase": _list_staircase,
+    "wide_table": _wide_table,
+}
@@ -0,0 +1,152 @@
+"""Tests for the third-party parser backends."""
+
+import sys
+
+import mdsvg
+import pytest
+from mdsvg import (
+    Blockquote,
+    CodeBlock,
+    Heading,
+    HorizontalRule,
+    ImageBlock,
+    MarkdownParser,
+    OrderedList,
+    Paragraph,
+    Span,
+    SpanType,
+    Table,
+    UnorderedList,
+    parse,
+    set_parser_backend,
+)
+from mdsvg.backends import MarkdownItBackend, MistuneBackend
+
+DOCUMENT = """# Title with *emphasis*
+
+A paragraph with **bold**, `code` and a [link](https://example.com "Example").
+It continues on a second line.
+
+> Quoted text
+
+```python
+print("hi")
+```
+
+![Diagram](diagram.png){width=320 height=200}
+
+| Name | Count |
+|:-----|------:|
+| a | 1 |
+
+---
+
+3. three
+4. four
+"""
+
+
+@pytest.fixture(params=["markdown-it", "mistune"])
+def backend(request):
+    """Get each third-party backend, or skip if its library isn't installed."""
+    if request.param == "markdown-it":
+        pytest.importorskip("markdown_it")
+        return MarkdownItBackend()
+    pytest.importorskip("mistune")
+    return MistuneBackend()
+
+
+@pytest.fixture
+def restore_backend():
+    """Restore the default parser backend after the test."""
+    yield
+    set_parser_backend(None)
+
+
+class TestBackends:
+    """Test converting third-party token streams to mdsvg nodes."""
+
+    def test_same_blocks_as_builtin(self, backend) -> None:
+        """Test a document within both parsers' syntax gives the same nodes."""
+        assert list(parse(DOCUMENT, backend=backend)) == list(parse(DOCUMENT))
+
+    def test_block_types(self, backend) -> None:
+        """Test each block kind is converted to its node type."""
+        doc = parse(DOCUMENT, backend=backend)
+        assert [type(block) for block in doc] == [
+            Heading,
+            Paragraph,
+            Blockquote,
+            CodeBlock,
+            ImageBlock,
+            Table,
+            HorizontalRule,
+            OrderedList,
+        ]
+        assert doc[4] == ImageBlock(url="diagram.png", alt="Diagram", width=320, height=200)
+        assert doc[5].alignments == ("left", "right")
+        assert doc[7].start == 3
+
+    def test_nested_lists(self, backend) -> None:
+        """Test nested list items become ListItem.nested_list."""
+        doc = parse("- top\n  - middle\n    1. bottom\n- next", backend=backend)
+        top = doc[0].items[0]
+        assert top.spans == (Span("top"),)
+        assert isinstance(top.nested_list, UnorderedList)
+        middle = top.nested_list.items[0]
+        assert isinstance(middle.nested_list, OrderedList)
+        assert middle.nested_list.items[0].spans == (Span("bottom"),)
+        assert doc[0].items[1].nested_list is None
+
+    def test_nested_emphasis(self, backend) -> None:
+        """Test emphasis inside bold, and bold links, keep their combined style."""
+        doc = parse("**bold *both* [link](https://x.y)**", backend=backend)
+        assert doc[0].spans == (
+            Span("bold ", SpanType.BOLD),
+            Span("both", SpanType.BOLD_ITALIC),
+            Span(" ", SpanType.BOLD),
+            Span("link", SpanType.LINK, url="https://x.y"),
+        )
+
+    def test_source_map(self) -> None:
+        """Test markdown-it reports the same block positions as MarkdownParser."""
+        pytest.importorskip("markdown_it")
+        text = DOCUMENT.replace("\n", "\r\n")
+        expected = parse(text, source_map=True).source_map
+        assert parse(text, source_map=True, backend=MarkdownItBackend()).source_map == expected
+
+    def test_mistune_has_no_source_map(self) -> None:
+        """Test asking mistune for source positions is an error."""
+        pytest.importorskip("mistune")
+        with pytest.raises(ValueError):
+            parse("text", source_map=True, backend=MistuneBackend())
+
+    def test_not_installed(self, monkeypatch) -> None:
+        """Test backends report unavailable and raise when their library is missing."""
+        monkeypatch.setitem(sys.modules, "markdown_it", None)
+        monkeypatch.setitem(sys.modules, "mistune", None)
+        for backend in (MarkdownItBackend(), MistuneBackend()):
+            assert not backend.is_available
+            with pytest.raises(ImportError):
+                backend.parse("text")
+
+
+class TestDefaultBackend:
+    """Test choosing the backend parse() and render() use."""
+
+    def test_set_parser_backend(self, backend, restore_backend) -> None:
+        """Test the default backend is used by parse() and render()."""
+        set_parser_backend(backend)
+        assert mdsvg.get_parser_backend() is backend
+        assert parse("- a\n  - b")[0].items[0].nested_list is not None
+        assert ">b</text>" in mdsvg.render("- a\n  - b")
+
+        set_parser_backend(None)
+        assert isinstance(mdsvg.get_parser_backend(), MarkdownParser)
+        assert parse("- a\n  - b")[0].items[0].nested_list is None
+
+    def test_nested_list_rendered_below_item(self, backend) -> None:
+        """Test nested lists add to the list's height."""
+        flat = mdsvg.measure("- a\n- c")
+        nested = parse("- a\n  - b\n- c", backend=backend)
+        assert mdsvg.SVGRenderer().measure(nested, width=400, padding=20).height > flat.height
@@ -0,0 +1,240 @@
+"""Tests for the parsed document cache."""
+
+import os
+
+import mdsvg
+import pytest
+from mdsvg import (
+    DocumentCache,
+    MarkdownParser,
+    ParsedDocument,
+    get_document_cache,
+    parse,
+    reparse,
+    set_document_cache,
+)
+from mdsvg import parser as parser_module
+from mdsvg.doccache import document_key, dump_document, load_document
+from mdsvg.parser import TextEdit
+
+DOCUMENT = """# Title with *emphasis*
+
+A paragraph with **bold**, `code` and a [link](https://example.com "Example").
+
+> Quoted text
+> > and nested
+
+```python
+print("hi")
+```
+
+![Diagram](diagram.png "Figure"){width=320 height=200}
+
+| Name | Done |
+|:-----|:----:|
+| a | Yes |
+| b | Yes |
+
+---
+
+3. three
+4. four
+
+- item with ***both***
+"""
+
+
+class NoKeyBackend:
+    """A backend without a cache_key."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def parse(self, text: str, source_map: bool = False) -> ParsedDocument:
+        self.calls += 1
+        return MarkdownParser().parse(text, source_map=source_map)
+
+
+@pytest.fixture
+def restore_cache():
+    """Stop caching documents after the test."""
+    yield
+    set_document_cache(None)
+
+
+class TestSerialization:
+    """Test the binary document format."""
+
+    def test_round_trip(self) -> None:
+        """Test a document loads equal to the parsed one, with its line information."""
+        doc = parse(DOCUMENT, source_map=True)
+        loaded = load_document(dump_document(doc))
+        assert isinstance(loaded, ParsedDocument)
+        assert list(loaded) == list(doc)
+        assert loaded.line_ranges == doc.line_ranges
+        assert loaded.line_kinds == doc.line_kinds
+        assert loaded.source_map == doc.source_map
+        assert load_document(dump_document(parse(DOCUMENT))).source_map is None
+
+    def test_loaded_document_reparses(self) -> None:
+        """Test a loaded document can be edited incrementally."""
+        loaded = load_document(dump_document(parse(DOCUMENT)))
+        edit = TextEdit(2, 7, "Heading")
+        assert reparse(loaded, DOCUMENT, edit) == parse(edit.apply(DOCUMENT))
+
+    def test_shared_nodes_stay_shared(self) -> None:
+        """Test repeated cells are one object after loading."""
+        table = load_document(dump_document(parse(DOCUMENT)))[5]
+        assert table.rows[0].cells[1] is table.rows[1].cells[1]
+
+    def test_plain_list(self) -> None:
+        """Test a plain list of blocks serializes without line information."""
+        loaded = load_document(dump_document(list(parse(DOCUMENT))))
+        assert list(loaded) == list(parse(DOCUMENT))
+        assert loaded.line_ranges == []
+
+    def test_compact(self) -> None:
+        """Test the serialized form is smaller than the text for prose."""
+        text = "Some words with **bold** text and a [link](https://x.y).\n\n" * 200
+        assert len(dump_document(parse(text))) < len(text) / 4
+
+    @pytest.mark.parametrize(
+        "data",
+        [b"", b"MDSVGDOC", b"NOTADOC!\x01\x00\x04\x00abc", b"MDSVGDOC\x01\x00\x04\x00garbage"],
+    )
+    def test_invalid_data(self, data: bytes) -> None:
+        """Test data that isn't a document loads as None."""
+        assert load_document(data) is None
+
+    def test_other_version_ignored(self) -> None:
+        """Test documents in another format version load as None."""
+        data = bytearray(dump_document(parse(DOCUMENT)))
+        data[8] += 1
+        assert load_document(bytes(data)) is None
+
+
+class TestDocumentCache:
+    """Test the memory and disk tiers."""
+
+    def test_memory_hits(self) -> None:
+        """Test a second parse of the same text is a memory hit."""
+        cache = DocumentCache()
+        parser = MarkdownParser()
+        first = cache.parse(DOCUMENT, parser)
+        second = cache.parse(DOCUMENT, parser)
+        assert second == first
+        assert cache.info() == mdsvg.DocumentCacheInfo(1, 0, 1, 256, 1)
+
+    def test_returns_copies(self) -> None:
+        """Test changing a returned document doesn't change the cached one."""
+        cache = DocumentCache()
+        doc = cache.parse(DOCUMENT, MarkdownParser())
+        doc.clear()
+        cached = cache.parse(DOCUMENT, MarkdownParser())
+        assert cached == MarkdownParser().parse(DOCUMENT)
+        assert cached[0] is cache.parse(DOCUMENT, MarkdownParser())[0]
+
+    def test_memory_only_skips_serialization(self, monkeypatch) -> None:
+        """Test a cache without a directory never serializes documents."""
+
+        def fail(document):
+            raise AssertionError("memory-only cache serialized a document")
+
+        monkeypatch.setattr("mdsvg.doccache.dump_document", fail)
+        cache = DocumentCache()
+        cache.parse(DOCUMENT, MarkdownParser())
+        assert len(cache) == 1
+
+    def test_lru_eviction(self) -> None:
+        """Test the least recently used document is evicted when full."""
+        cache = DocumentCache(maxsize=2)
+        parser = MarkdownParser()
+        for text in ("a", "b", "a", "c"):
+            cache.parse(text, parser)
+        assert len(cache) == 2
+        cache.parse("a", parser)
+        cache.parse("b", parser)
+        assert cache.info().hits == 2
+        assert cache.info().misses == 4
+
+    def test_disk_tier(self, tmp_path) -> None:
+        """Test documents written by one cache load in another."""
+        directory = str(tmp_path / "documents")
+        doc = DocumentCache(directory=directory).parse(DOCUMENT, MarkdownParser(), True)
+        assert len(os.listdir(directory)) == 1
+        assert os.listdir(directory)[0].endswith(".v1.doc")
+
+        cache = DocumentCache(directory=directory)
+        loaded = cache.parse(DOCUMENT, MarkdownParser(), True)
+        assert loaded == doc
+        assert loaded.source_map == doc.source_map
+        assert cache.info().disk_hits == 1
+        cache.parse(DOCUMENT, MarkdownParser(), True)
+        assert cache.info().hits == 1
+
+    def test_corrupt_file_reparsed(self, tmp_path) -> None:
+        """Test an unreadable cache file is a miss."""
+        cache = DocumentCache(maxsize=0, directory=str(tmp_path))
+        cache.parse(DOCUMENT, MarkdownParser())
+        for name in os.listdir(tmp_path):
+            (tmp_path / name).write_bytes(b"MDSVGDOC broken")
+        assert cache.parse(DOCUMENT, MarkdownParser()) == parse(DOCUMENT)
+        assert cache.info().disk_hits == 0
+        assert cache.info().misses == 2
+
+    def test_backend_without_key(self) -> None:
+        """Test backends without a cache_key always parse."""
+        cache = DocumentCache()
+        backend = NoKeyBackend()
+        cache.parse(DOCUMENT, backend)
+        cache.parse(DOCUMENT, backend)
+        assert backend.calls == 2
+        assert len(cache) == 0
+
+
+class TestCacheKeys:
+    """Test what invalidates cached documents."""
+
+    def test_key_depends_on_parser(self, monkeypatch) -> None:
+        """Test keys change with the text, parser budgets, source_map and parser version."""
+        parser = MarkdownParser()
+        key = document_key(DOCUMENT, parser)
+        assert key == document_key(DOCUMENT, MarkdownParser())
+        assert key != document_key(DOCUMENT + " ", parser)
+        assert key != document_key(DOCUMENT, MarkdownParser(max_nesting=4))
+        assert key != document_key(DOCUMENT, parser, source_map=True)
+        assert document_key(DOCUMENT, NoKeyBackend()) is None
+
+        monkeypatch.setattr(parser_module, "PARSER_VERSION", parser_module.PARSER_VERSION + 1)
+        assert key != document_key(DOCUMENT, parser)
+
+    def test_backend_keys(self) -> None:
+        """Test third-party backends are keyed by their library's version."""
+        pytest.importorskip("markdown_it")
+        from mdsvg.backends import MarkdownItBackend
+
+        assert MarkdownItBackend().cache_key.startswith("markdown-it-py/")
+        assert document_key(DOCUMENT, MarkdownItBackend()) != document_key(
+            DOCUMENT, MarkdownParser()
+        )
+
+
+class TestDefaultCache:
+    """Test the cache parse() and render() use."""
+
+    def test_set_document_cache(self, restore_cache) -> None:
+        """Test render() looks documents up in the cache once one is set."""
+        assert get_document_cache() is None
+        cache = DocumentCache()
+        set_document_cache(cache)
+        assert get_document_cache() is cache
+
+        svg = mdsvg.render(DOCUMENT)
+        assert mdsvg.render(DOCUMENT) == svg
+        assert parse(DOCUMENT) == list(parse(DOCUMENT))
+        assert cache.info().misses == 1
+        assert cache.info().hits == 3
+
+        set_document_cache(None)
+        parse(DOCUMENT)
+        assert cache.info().hits == 3
@@ -0,0 +1,222 @@
+"""Tests for the installed font index."""
+
+import json
+import os
+import shutil
+
+import pytest
+from mdsvg import Style, SVGRenderer, WidthCache, fontindex
+from mdsvg.fontindex import FontFace, FontIndex, parse_font_stack
+from mdsvg.fonts import FontMeasurer
+
+DEJAVU_DIR = "/usr/share/fonts/truetype/dejavu"
+
+
+@pytest.fixture
+def font_dir(tmp_path) -> str:
+    """Copy the DejaVu fonts into a temp directory tree, or skip."""
+    pytest.importorskip("fontTools")
+    if not os.path.exists(os.path.join(DEJAVU_DIR, "DejaVuSans-Bold.ttf")):
+        pytest.skip("DejaVu fonts not installed")
+    root = tmp_path / "fonts"
+    (root / "sans").mkdir(parents=True)
+    (root / "mono").mkdir()
+    for name in ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf"):
+        shutil.copy(os.path.join(DEJAVU_DIR, name), root / "sans" / name)
+    shutil.copy(os.path.join(DEJAVU_DIR, "DejaVuSansMono.ttf"), root / "mono")
+    return str(root)
+
+
+@pytest.fixture
+def index_path(tmp_path) -> str:
+    """Get a temp path for the saved index."""
+    return str(tmp_path / "cache" / "font-index.json")
+
+
+class TestParseFontStack:
+    """Test CSS font-family parsing."""
+
+    def test_quotes_and_whitespace(self) -> None:
+        """Test names are unquoted and trimmed."""
+        stack = " system-ui, 'Segoe UI' ,\"Helvetica Neue\", sans-serif "
+        assert parse_font_stack(stack) == ["system-ui", "Segoe UI", "Helvetica Neue", "sans-serif"]
+
+    def test_empty_entries_skipped(self) -> None:
+        """Test empty entries are dropped."""
+        assert parse_font_stack("Inter,, ,monospace") == ["Inter", "monospace"]
+
+
+class TestFontIndex:
+    """Test scanning, persisting and resolving installed fonts."""
+
+    def test_scan_reads_families(self, font_dir: str, index_path: str) -> None:
+        """Test faces are indexed by family, weight and style."""
+        index = FontIndex([font_dir], index_path)
+        assert index.families() == ["DejaVu Sans", "DejaVu Sans Mono"]
+        assert [(face.weight, face.italic) for face in index.faces("dejavu sans")] == [
+            (400, False),
+            (700, False),
+        ]
+
+    def test_resolve_stack(self, font_dir: str, index_path: str) -> None:
+        """Test the first installed family in a stack wins."""
+        index = FontIndex([font_dir], index_path)
+        face = index.resolve("'Not Installed', \"DejaVu Sans\", monospace")
+        assert face is not None
+        assert face.path.endswith("DejaVuSans.ttf")
+        assert index.resolve("Not Installed, Also Missing") is None
+
+    def test_resolve_generic_families(self, font_dir: str, index_path: str) -> None:
+        """Test generic families map to installed platform fonts."""
+        index = FontIndex([font_dir], index_path)
+        style = Style()
+        sans = index.resolve(style.font_family)
+        mono = index.resolve(style.mono_font_family)
+        assert sans is not None and sans.family == "DejaVu Sans"
+        assert mono is not None and mono.family == "DejaVu Sans Mono"
+
+    def test_weight_and_style_matching(self, font_dir: str, index_path: str) -> None:
+        """Test the closest weight is chosen and italics fall back to upright."""
+        index = FontIndex([font_dir], index_path)
+        assert index.find("DejaVu Sans", 600).weight == 700
+        assert index.find("DejaVu Sans", 300).weight == 400
+        assert index.find("DejaVu Sans", 400, italic=True) == index.find("DejaVu Sans", 400)
+
+    def test_resolve_family_has_real_faces(self, font_dir: str, index_path: str) -> None:
+        """Test the resolved measurer family only includes faces that exist."""
+        family = FontIndex([font_dir], index_path).resolve_family("DejaVu Sans")
+        assert family is not None
+        assert family.has_face(bold=True)
+        assert not family.has_face(italic=True)
+        bold = FontMeasurer(os.path.join(font_dir, "sans", "DejaVuSans-Bold.ttf"))
+        assert family.measure("Hello", 14, bold=True) == bold.measure("Hello", 14)
+
+    def test_saved_index_reused(self, font_dir: str, index_path: str, monkeypatch) -> None:
+        """Test a later index loads the saved file without reading any fonts."""
+        assert len(FontIndex([font_dir], index_path)) == 3
+        with open(index_path, encoding="utf-8") as f:
+            assert json.load(f)["version"] == 1
+
+        def fail(path):
+            raise AssertionError(f"{path} was read despite an up-to-date index")
+
+        monkeypatch.setattr(fontindex, "_read_faces", fail)
+        index = FontIndex([font_dir], index_path)
+        assert index.resolve("DejaVu Sans Mono") is not None
+
+    def test_changed_directory_rescanned(self, font_dir: str, index_path: str, monkeypatch) -> None:
+        """Test only directories whose mtime changed are rescanned."""
+        assert len(FontIndex([font_dir], index_path)) == 3
+        shutil.copy(
+            os.path.join(DEJAVU_DIR, "DejaVuSansMono-Bold.ttf"), os.path.join(font_dir, "mono")
+        )
+
+        read = []
+        original = fontindex._read_faces
+
+        def tracking(path):
+            read.append(os.path.basename(path))
+            return original(path)
+
+        monkeypatch.setattr(fontindex, "_read_faces", tracking)
+        index = FontIndex([font_dir], index_path)
+        assert len(index) == 4
+        assert sorted(read) == ["DejaVuSansMono-Bold.ttf", "DejaVuSansMono.ttf"]
+        assert index.find("DejaVu Sans Mono", 700).weight == 700
+
+    def test_font_face_round_trips_json(self) -> None:
+        """Test FontFace survives the JSON lists the index is saved as."""
+        face = FontFace("Inter", "/fonts/Inter.ttc", 2, 700, True, 5)
+        assert FontFace(*json.loads(json.dumps(list(face)))) == face
+
+    def test_missing_directory(self, tmp_path, index_path: str) -> None:
+        """Test directories that don't exist give an empty index."""
+        pytest.importorskip("fontTools")
+        index = FontIndex([str(tmp_path / "nope")], index_path)
+        assert len(index) == 0
+        assert index.resolve("sans-serif") is None
+
+
+class TestStandardFaces:
+    """Test resolving stacks from standard font locations without the index."""
+
+    @pytest.fixture
+    def fonts(self, tmp_path, monkeypatch) -> str:
+        """Install a fake standard font table with DejaVu Sans in a temp directory."""
+        root = tmp_path / "fonts"
+        root.mkdir()
+        for name in ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf"):
+            (root / name).write_bytes(b"")
+        faces = [(str(root / "DejaVuSans.ttf"), str(root / "DejaVuSans-Bold.ttf"), "", "")]
+        table = {"dejavu sans": faces, "segoe ui": [], "sf pro text": []}
+        monkeypatch.setattr(fontindex, "_standard_fonts", lambda: table)
+        return str(root)
+
+    def test_first_installed_family(self, fonts: str) -> None:
+        """Test families that aren't installed are skipped, and missing faces are None."""
+        faces = fontindex.find_standard_faces("'Segoe UI', 'DejaVu Sans'")
+        assert faces == (
+            os.path.join(fonts, "DejaVuSans.ttf"),
+            os.path.join(fonts, "DejaVuSans-Bold.ttf"),
+            None,
+            None,
+        )
+
+    def test_unknown_family_needs_index(self, fonts: str) -> None:
+        """Test a family without a standard location defers to the index."""
+        assert fontindex.find_standard_faces("Inter, 'DejaVu Sans'") is None
+        assert fontindex.find_standard_faces("'Segoe UI', Inter") is None
+        assert fontindex.find_standard_faces("'Segoe UI'") is None
+
+    def test_renderer_skips_index(self, monkeypatch) -> None:
+        """Test the default stacks resolve on a stock Linux install without the index."""
+        if fontindex.find_standard_faces(Style().font_family) is None:
+            pytest.skip("default stacks don't resolve to standard font locations here")
+        if fontindex.find_standard_faces(Style().mono_font_family) is None:
+            pytest.skip("default stacks don't resolve to standard font locations here")
+
+        def fail():
+            raise AssertionError("font index loaded for the default stacks")
+
+        monkeypatch.setattr("mdsvg.fontindex.get_font_index", fail)
+        renderer = SVGRenderer(width_cache=WidthCache())
+        assert renderer._measure_text("Hello", 14) > 0
+        assert renderer._measure_text("x = 1", 14, is_mono=True) > 0
+
+
+class TestRendererFontStacks:
+    """Test SVGRenderer picks measurement fonts from Style font stacks."""
+
+    def test_font_family_selects_font(self, font_dir: str, index_path: str, monkeypatch) -> None:
+        """Test body and mono text are measured with the fonts the stacks resolve to."""
+        index = FontIndex([font_dir], index_path)
+        monkeypatch.setattr("mdsvg.fontindex.get_font_index", lambda: index)
+        renderer = SVGRenderer(style=Style(), width_cache=WidthCache())
+        scale = renderer.style.text_width_scale
+
+        bold = FontMeasurer(os.path.join(font_dir, "sans", "DejaVuSans-Bold.ttf"))
+        mono = FontMeasurer(os.path.join(font_dir, "mono", "DejaVuSansMono.ttf"))
+        assert (
+            renderer._measure_text("Title", 20, is_bold=True) == bold.measure("Title", 20) * scale
+        )
+        assert renderer._measure_text("x = 1", 10, is_mono=True) == pytest.approx(
+            5 * mono.measure("M", 1.0) * 10 * scale
+        )
+
+    def test_explicit_font_path_wins(self, font_dir: str, index_path: str, monkeypatch) -> None:
+        """Test font_path overrides the style's font stack."""
+        index = FontIndex([font_dir], index_path)
+        monkeypatch.setattr("mdsvg.fontindex.get_font_index", lambda: index)
+        mono_path = os.path.join(font_dir, "mono", "DejaVuSansMono.ttf")
+        renderer = SVGRenderer(font_path=mono_path, width_cache=WidthCache())
+        expected = FontMeasurer(mono_path).measure("Hello", 14) * renderer.style.text_width_scale
+        assert renderer._measure_text("Hello", 14) == expected
+
+    def test_construction_does_not_scan(self, monkeypatch) -> None:
+        """Test fonts are only resolved when text is first measured."""
+
+        def fail():
+            raise AssertionError("font index used during construction")
+
+        monkeypatch.setattr("mdsvg.fontindex.get_font_index", fail)
+        SVGRenderer()
@@ -3,12 +3,24 @@
 import os
 
 import pytest
+from mdsvg import WidthCache, fonts
 from mdsvg.fonts import (
+    AdvanceTable,
+    FallbackMeasurer,
+    FontFamilyMeasurer,
     FontMeasurer,
+    FontRegistry,
+    FontRegistryStats,
+    KerningTable,
+    calibrate_char_widths,
     calibrate_heuristic,
     create_precise_wrapper,
+    get_default_measurer,
+    get_measurer,
+    get_metrics_cache_path,
     get_system_font,
 )
+from mdsvg.measure import estimate_text_width, heuristic_table
 
 
 class TestFontMeasurer:
@@ -66,6 +78,569 @@ class TestFontMeasurer:
             assert measurer.is_available
 
 
+class TestAdvanceTable:
+    """Test the page-table advance widths built by FontMeasurer."""
+
+    @pytest.fixture
+    def font_path(self) -> str:
+        """Get a system font path or skip if fonttools/fonts are missing."""
+        pytest.importorskip("fontTools")
+        font_path = get_system_font()
+        if not font_path:
+            pytest.skip("No system font available")
+        return font_path
+
+    def test_matches_font_metrics(self, font_path: str) -> None:
+        """Test table advances match hmtx lookups through the cmap."""
+        from fontTools.ttLib import TTFont
+
+        font = TTFont(font_path)
+        cmap = font.getBestCmap()
+        metrics = font["hmtx"].metrics
+        table = AdvanceTable.from_font(font)
+
+        for codepoint in [32, 65, 105, 0xE9, 0x416, 0x2014]:
+            if codepoint in cmap:
+                assert table.advance(codepoint) == metrics[cmap[codepoint]][0]
+
+    def test_missing_codepoint_uses_fallback(self, font_path: str) -> None:
+        """Test codepoints outside the font are charged the fallback width."""
+        measurer = FontMeasurer(font_path)
+        table = measurer.table
+        assert table is not None
+        assert table.advance(0x10FFFD) == table.units_per_em * 0.25
+
+    def test_ascii_fast_path_matches_general_path(self, font_path: str) -> None:
+        """Test pure-ASCII strings measure the same as per-codepoint lookups."""
+        measurer = FontMeasurer(font_path)
+        table = measurer.table
+        assert table is not None
+        text = "The quick brown fox, 0123456789!"
+        assert table.total(text) == sum(table.advance(ord(c)) for c in text)
+
+    def test_mixed_scripts(self, font_path: str) -> None:
+        """Test non-ASCII text sums per-codepoint advances."""
+        measurer = FontMeasurer(font_path)
+        table = measurer.table
+        assert table is not None
+        text = "café — Привет \U0001f600"
+        assert table.total(text) == sum(table.advance(ord(c)) for c in text)
+
+
+class TestLazyLoading:
+    """Test deferred font loading."""
+
+    def test_construction_does_not_load(self, tmp_path) -> None:
+        """Test a measurer reads nothing until it is used."""
+        measurer = FontMeasurer(str(tmp_path / "missing.ttf"))
+        assert measurer._loaded is False
+        assert measurer.is_available is False
+        assert measurer._loaded is True
+
+    def test_renderer_does_not_import_fonttools(self) -> None:
+        """Test building a renderer defers the fonttools import until measuring."""
+        import subprocess
+        import sys
+
+        code = "import sys, mdsvg\nmdsvg.SVGRenderer()\nassert 'fontTools' not in sys.modules\n"
+        import mdsvg
+
+        src_dir = os.path.dirname(os.path.dirname(mdsvg.__file__))
+        env = {**os.environ, "PYTHONPATH": src_dir}
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+    def test_warmup(self) -> None:
+        """Test warmup loads the default measurer."""
+        from mdsvg import warmup
+        from mdsvg.fonts import get_default_measurer
+
+        available = warmup()
+        measurer = get_default_measurer()
+        assert available == (measurer is not None and measurer.is_available)
+        if measurer is not None:
+            assert measurer._loaded
+
+
+class TestMeasureMany:
+    """Test batch measurement."""
+
+    TEXTS = ["Revenue", "", "Q3 2024", "café — Привет", "x" * 40, ""]
+
+    @pytest.fixture
+    def measurer(self) -> FontMeasurer:
+        """Get a FontMeasurer or skip if not available."""
+        font_path = get_system_font()
+        if not font_path:
+            pytest.skip("No system font available")
+        measurer = FontMeasurer(font_path)
+        if not measurer.is_available:
+            pytest.skip("FontMeasurer not available")
+        return measurer
+
+    def test_matches_measure(self, measurer: FontMeasurer) -> None:
+        """Test batch widths equal per-string measure() results."""
+        widths = measurer.measure_many(self.TEXTS, 12)
+        assert list(widths) == [measurer.measure(t, 12) for t in self.TEXTS]
+
+    def test_pure_python_fallback(self, measurer: FontMeasurer, monkeypatch) -> None:
+        """Test the fallback without NumPy returns the same widths."""
+        from array import array
+
+        monkeypatch.setattr(fonts, "_get_numpy", lambda: None)
+        widths = measurer.measure_many(self.TEXTS, 12)
+        assert isinstance(widths, array)
+        assert list(widths) == [measurer.measure(t, 12) for t in self.TEXTS]
+
+    def test_empty_batch(self, measurer: FontMeasurer) -> None:
+        """Test an empty batch and a batch of empty strings."""
+        assert len(measurer.measure_many([], 12)) == 0
+        assert list(measurer.measure_many(["", ""], 12)) == [0.0, 0.0]
+
+    def test_lone_surrogate(self, measurer: FontMeasurer) -> None:
+        """Test strings with a lone surrogate measure the same as measure()."""
+        texts = ["a\ud800b", "\udfff"]
+        assert list(measurer.measure_many(texts, 14)) == [measurer.measure(t, 14) for t in texts]
+
+
+def _build_variable_font(path: str) -> None:
+    """Write a tiny variable font whose "A" widens from 600 to 800 units along wght."""
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    from fontTools.ttLib.tables._g_v_a_r import TupleVariation
+
+    def box(width: int):
+        pen = TTGlyphPen(None)
+        pen.moveTo((0, 0))
+        pen.lineTo((0, 500))
+        pen.lineTo((width, 500))
+        pen.lineTo((width, 0))
+        pen.closePath()
+        return pen.glyph()
+
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder([".notdef", "A", "space"])
+    builder.setupCharacterMap({65: "A", 32: "space"})
+    builder.setupGlyf({".notdef": box(500), "A": box(600), "space": TTGlyphPen(None).glyph()})
+    builder.setupHorizontalMetrics({".notdef": (500, 0), "A": (600, 0), "space": (250, 0)})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "Test", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.setupFvar([("wght", 100, 400, 900, "Weight")], [])
+    # 4 outline points + 4 phantom points; the right phantom point sets the advance
+    deltas = [(0, 0), (0, 0), (200, 0), (200, 0), (0, 0), (200, 0), (0, 0), (0, 0)]
+    builder.setupGvar({"A": [TupleVariation({"wght": (0, 1, 1)}, deltas)]})
+    builder.save(path)
+
+
+def _build_kerned_font(path: str, legacy: bool = False) -> None:
+    """Write a font with 600-unit glyphs kerning A/V by -80 and T/o by -50."""
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    from fontTools.ttLib import newTable
+    from fontTools.ttLib.tables._k_e_r_n import KernTable_format_0
+
+    names = [".notdef", "A", "V", "T", "o"]
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({ord(name): name for name in names[1:]})
+    builder.setupGlyf({name: TTGlyphPen(None).glyph() for name in names})
+    builder.setupHorizontalMetrics(dict.fromkeys(names, (600, 0)))
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "Kerned", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    if legacy:
+        subtable = KernTable_format_0()
+        subtable.version, subtable.coverage = 0, 1
+        subtable.kernTable = {("A", "V"): -80, ("T", "o"): -50}
+        kern = newTable("kern")
+        kern.version, kern.kernTables = 0, [subtable]
+        builder.font["kern"] = kern
+    else:
+        # A glyph pair (PairPos format 1) and a class pair (format 2)
+        builder.addOpenTypeFeatures("feature kern { pos A V -80; pos T [o] -50; } kern;")
+    builder.save(path)
+
+
+class TestKerning:
+    """Test kerning-aware measurement."""
+
+    @pytest.fixture(params=[False, True], ids=["gpos", "legacy-kern"])
+    def font_path(self, request, tmp_path, monkeypatch) -> str:
+        """Build a kerned test font and point the metrics cache at a temp dir."""
+        pytest.importorskip("fontTools")
+        monkeypatch.setattr(fonts, "_get_cache_root", lambda: str(tmp_path / "cache"))
+        path = str(tmp_path / "kerned.ttf")
+        _build_kerned_font(path, legacy=request.param)
+        return path
+
+    def test_pairs_flattened(self, font_path: str) -> None:
+        """Test kerning pairs are flattened to codepoint pairs."""
+        kerning = FontMeasurer(font_path).kerning
+        assert kerning.adjustment(ord("A"), ord("V")) == -80
+        assert kerning.adjustment(ord("T"), ord("o")) == -50
+        assert kerning.adjustment(ord("V"), ord("A")) == 0
+
+    def test_measure_with_kerning(self, font_path: str) -> None:
+        """Test kerning is only applied when requested."""
+        measurer = FontMeasurer(font_path)
+        assert measurer.measure("AVTo", 1000) == 2400
+        assert measurer.measure("AVTo", 1000, kerning=True) == 2400 - 80 - 50
+        assert measurer.measure("A", 1000, kerning=True) == 600
+        assert list(measurer.measure_many(["AV", "", "To"], 1000, kerning=True)) == [
+            1120,
+            0,
+            1150,
+        ]
+
+    def test_kerning_cached(self, font_path: str, monkeypatch) -> None:
+        """Test kerning pairs are read back from the metrics cache."""
+        expected = FontMeasurer(font_path).kerning.pairs
+
+        def fail(font):
+            raise AssertionError("font was parsed despite a cache hit")
+
+        monkeypatch.setattr(KerningTable, "from_font", fail)
+        assert FontMeasurer(font_path).kerning.pairs == expected
+
+    def test_unkerned_font(self) -> None:
+        """Test fonts without kerning data measure the same either way."""
+        pytest.importorskip("fontTools")
+        mono = "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf"
+        if not os.path.exists(mono):
+            pytest.skip("DejaVu Sans Mono not installed")
+        measurer = FontMeasurer(mono)
+        assert measurer.measure("AVTo", 14, kerning=True) == measurer.measure("AVTo", 14)
+
+    def test_renderer_use_kerning(self, font_path: str) -> None:
+        """Test SVGRenderer(use_kerning=True) measures kerned widths."""
+        from mdsvg import SVGRenderer
+
+        plain = SVGRenderer(font_path=font_path, width_cache=WidthCache())
+        kerned = SVGRenderer(font_path=font_path, use_kerning=True, width_cache=WidthCache())
+        scale = plain.style.text_width_scale
+        assert plain._measure_text("AV", 10) == pytest.approx(12 * scale)
+        assert kerned._measure_text("AV", 10) == pytest.approx(11.2 * scale)
+
+
+def _build_cjk_font(path: str) -> None:
+    """Write a 1000-unit font with a full-width "世" and a 900-unit "A"."""
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    names = [".notdef", "A", "uni4E16"]
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({0x41: "A", 0x4E16: "uni4E16"})
+    builder.setupGlyf({name: TTGlyphPen(None).glyph() for name in names})
+    builder.setupHorizontalMetrics({".notdef": (500, 0), "A": (900, 0), "uni4E16": (1000, 0)})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "CJK", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(path)
+
+
+class TestFallbackMeasurer:
+    """Test measuring through a chain of fallback fonts."""
+
+    SANS = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+    @pytest.fixture
+    def cjk_path(self, tmp_path, monkeypatch) -> str:
+        """Build a CJK test font next to DejaVu Sans, or skip."""
+        pytest.importorskip("fontTools")
+        if not os.path.exists(self.SANS):
+            pytest.skip("DejaVu Sans not installed")
+        monkeypatch.setattr(fonts, "_get_cache_root", lambda: str(tmp_path / "cache"))
+        path = str(tmp_path / "cjk.ttf")
+        _build_cjk_font(path)
+        return path
+
+    def test_coverage_bitmap(self, cjk_path: str) -> None:
+        """Test coverage bits survive a round trip through the metrics file format."""
+        table = FontMeasurer(cjk_path).table
+        assert table is not None
+        loaded = AdvanceTable.from_buffer(table.to_bytes())
+        assert loaded is not None
+        for check in (table, loaded):
+            assert check.covers(0x4E16)
+            assert check.covers(0x41)
+            assert not check.covers(0x42)
+            assert not check.covers(0x4E17)
+
+    def test_first_covering_font_wins(self, cjk_path: str) -> None:
+        """Test each character is measured with the first font that has it."""
+        measurer = FallbackMeasurer([self.SANS, cjk_path])
+        sans = FontMeasurer(self.SANS)
+        assert measurer.measure("A", 14) == sans.measure("A", 14)
+        # The CJK font's 1000-unit em is rescaled to DejaVu's 2048-unit em
+        assert measurer.measure("世", 14) == pytest.approx(14)
+        assert measurer.measure("A世A", 14) == pytest.approx(2 * sans.measure("A", 14) + 14)
+        assert measurer.font_index("A") == 0
+        assert measurer.font_index("世") == 1
+
+    def test_uncovered_character(self, cjk_path: str) -> None:
+        """Test characters no font covers are charged the first font's fallback."""
+        measurer = FallbackMeasurer([self.SANS, cjk_path])
+        assert measurer.font_index("\U0010fffd") is None
+        assert measurer.measure("\U0010fffd", 100) == pytest.approx(25)
+
+    def test_missing_font_skipped(self, cjk_path: str, tmp_path) -> None:
+        """Test fonts that can't be loaded are left out of the chain."""
+        measurer = FallbackMeasurer([str(tmp_path / "missing.ttf"), cjk_path])
+        assert measurer.is_available
+        assert measurer.font_index("世") == 1
+        assert measurer.measure("A", 10) == pytest.approx(9)
+        assert not FallbackMeasurer([str(tmp_path / "missing.ttf")]).is_available
+
+    def test_measure_many(self, cjk_path: str) -> None:
+        """Test batch measurement matches measure()."""
+        measurer = FallbackMeasurer([self.SANS, cjk_path])
+        texts = ["A世", "", "Hello 世界"]
+        assert list(measurer.measure_many(texts, 14)) == pytest.approx(
+            [measurer.measure(text, 14) for text in texts]
+        )
+
+    def test_renderer_fallback_fonts(self, cjk_path: str) -> None:
+        """Test SVGRenderer(fallback_font_paths=...) measures with the chain."""
+        from mdsvg import SVGRenderer
+
+        renderer = SVGRenderer(
+            font_path=self.SANS, fallback_font_paths=[cjk_path], width_cache=WidthCache()
+        )
+        scale = renderer.style.text_width_scale
+        assert renderer._measure_text("世世", 10) == pytest.approx(20 * scale)
+
+    def test_family_with_fallback(self, cjk_path: str) -> None:
+        """Test each face of a family measures missing characters with the chain."""
+        bold = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+        family = FontFamilyMeasurer(self.SANS, bold=bold).with_fallback([cjk_path])
+        assert family.measure("A世", 10) == pytest.approx(
+            FontMeasurer(self.SANS).measure("A", 10) + 10
+        )
+        assert family.measure("A世", 10, bold=True) == pytest.approx(
+            FontMeasurer(bold).measure("A", 10) + 10
+        )
+
+    def test_renderer_family_with_fallback_fonts(self, cjk_path: str) -> None:
+        """Test fallback fonts still apply when the body font is a family."""
+        from mdsvg import SVGRenderer
+
+        renderer = SVGRenderer(
+            font_path=self.SANS,
+            bold_font_path="/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+            fallback_font_paths=[cjk_path],
+            width_cache=WidthCache(),
+        )
+        scale = renderer.style.text_width_scale
+        assert renderer._measure_text("世世", 10) == pytest.approx(20 * scale)
+        assert renderer._measure_text("世世", 10, is_bold=True) == pytest.approx(20 * scale)
+
+
+class TestFontFamilyMeasurer:
+    """Test measuring with real styled faces."""
+
+    REGULAR = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+    BOLD = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+    @pytest.fixture
+    def family(self) -> FontFamilyMeasurer:
+        """Get a DejaVu Sans family with a bold face, or skip."""
+        pytest.importorskip("fontTools")
+        if not (os.path.exists(self.REGULAR) and os.path.exists(self.BOLD)):
+            pytest.skip("DejaVu Sans regular/bold not installed")
+        return FontFamilyMeasurer(self.REGULAR, bold=self.BOLD)
+
+    def test_faces_match_single_measurers(self, family: FontFamilyMeasurer) -> None:
+        """Test each face measures exactly like its own FontMeasurer."""
+        text = "Hello, café — Привет"
+        assert family.measure(text, 14) == FontMeasurer(self.REGULAR).measure(text, 14)
+        assert family.measure(text, 14, bold=True) == FontMeasurer(self.BOLD).measure(text, 14)
+
+    def test_faces_share_page_layout(self, family: FontFamilyMeasurer) -> None:
+        """Test all faces use one page_offsets array."""
+        assert family.is_available
+        regular, _, bold, _ = family._tables
+        assert regular is not None and bold is not None
+        assert regular.page_offsets is bold.page_offsets
+        assert regular.advances is not bold.advances
+
+    def test_missing_faces_resolve_to_closest(self, family: FontFamilyMeasurer) -> None:
+        """Test missing styles fall back to the nearest available face."""
+        assert family.has_face(bold=True)
+        assert not family.has_face(italic=True)
+        assert family.resolve(bold=True, italic=True) == (True, False)
+        assert family.resolve(italic=True) == (False, False)
+
+    def test_unavailable_family(self, tmp_path) -> None:
+        """Test a family whose regular face can't be loaded is unavailable."""
+        family = FontFamilyMeasurer(str(tmp_path / "missing.ttf"))
+        assert not family.is_available
+        with pytest.raises(RuntimeError):
+            family.measure("Hello", 14)
+
+    def test_variable_font_instances(self, tmp_path) -> None:
+        """Test regular and bold faces are instantiated from a variable font."""
+        pytest.importorskip("fontTools")
+        path = str(tmp_path / "var.ttf")
+        _build_variable_font(path)
+        family = FontFamilyMeasurer.from_variable_font(path, bold_weight=900)
+        assert family.measure("A", 1000) == 600
+        assert family.measure("A", 1000, bold=True) == 800
+        # No ital/slnt axis, so italics fall back to the upright faces
+        assert not family.has_face(italic=True)
+        assert family.resolve(bold=True, italic=True) == (True, False)
+
+    def test_renderer_uses_bold_face(self, family: FontFamilyMeasurer) -> None:
+        """Test the renderer measures bold text with the bold face, unscaled."""
+        from mdsvg import SVGRenderer
+
+        renderer = SVGRenderer(font_path=self.REGULAR, bold_font_path=self.BOLD)
+        scale = renderer.style.text_width_scale
+        bold = FontMeasurer(self.BOLD).measure("Heading", 20)
+        assert renderer._measure_text("Heading", 20, is_bold=True) == bold * scale
+        # Italic has no real face, so it keeps the ratio-based approximation
+        regular = FontMeasurer(self.REGULAR).measure("Heading", 20)
+        italic_ratio = renderer.style.italic_char_width_ratio / renderer.style.char_width_ratio
+        assert renderer._measure_text("Heading", 20, is_italic=True) == pytest.approx(
+            regular * italic_ratio * scale
+        )
+
+
+class TestFontRegistry:
+    """Test the shared measurer registry."""
+
+    def test_same_font_shares_measurer(self, tmp_path) -> None:
+        """Test repeated requests return one measurer and count hits."""
+        registry = FontRegistry()
+        path = str(tmp_path / "font.ttf")
+        first = registry.get(path)
+        assert registry.get(path) is first
+        assert registry.get(path, font_number=1) is not first
+        assert registry.stats() == FontRegistryStats(hits=1, misses=2, evictions=0, size=2)
+
+    def test_evict(self, tmp_path) -> None:
+        """Test an evicted font gets a fresh measurer."""
+        registry = FontRegistry()
+        path = str(tmp_path / "font.ttf")
+        first = registry.get(path)
+        assert registry.evict(path) is True
+        assert registry.evict(path) is False
+        assert registry.get(path) is not first
+        assert registry.stats().evictions == 1
+
+    def test_clear(self, tmp_path) -> None:
+        """Test clear() evicts every font."""
+        registry = FontRegistry()
+        registry.get(str(tmp_path / "a.ttf"))
+        registry.get(str(tmp_path / "b.ttf"))
+        registry.clear()
+        assert len(registry) == 0
+        assert registry.stats().evictions == 2
+
+    def test_concurrent_get(self, tmp_path) -> None:
+        """Test threads racing for a font all get the same measurer."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        registry = FontRegistry()
+        path = str(tmp_path / "font.ttf")
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            measurers = list(pool.map(lambda _: registry.get(path), range(64)))
+        assert all(m is measurers[0] for m in measurers)
+
+    def test_measurers_are_immutable(self, tmp_path) -> None:
+        """Test shared measurers can't be repointed at another font."""
+        import dataclasses
+
+        measurer = FontRegistry().get(str(tmp_path / "font.ttf"))
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            measurer.font_path = "other.ttf"  # type: ignore[misc]
+
+    def test_renderers_share_measurer(self) -> None:
+        """Test renderers built with the same font_path share a measurer."""
+        from mdsvg import SVGRenderer
+
+        font_path = get_system_font()
+        if not font_path:
+            pytest.skip("No system font available")
+        first = SVGRenderer(font_path=font_path)
+        second = SVGRenderer(font_path=font_path)
+        assert first._measurer is second._measurer
+        assert first._measurer is get_measurer(font_path)
+
+
+class TestMetricsCache:
+    """Test the on-disk font metrics cache."""
+
+    @pytest.fixture
+    def font_path(self, tmp_path, monkeypatch) -> str:
+        """Point the cache at a temp dir and get a system font path."""
+        pytest.importorskip("fontTools")
+        font_path = get_system_font()
+        if not font_path:
+            pytest.skip("No system font available")
+        monkeypatch.setattr(fonts, "_get_cache_root", lambda: str(tmp_path))
+        return font_path
+
+    def test_first_load_writes_cache(self, font_path: str) -> None:
+        """Test loading a font stores its metrics file."""
+        assert FontMeasurer(font_path).is_available
+        cache_path = get_metrics_cache_path(font_path)
+        assert cache_path is not None
+        assert os.path.exists(cache_path)
+
+    def test_cached_load_skips_fonttools(self, font_path: str, monkeypatch) -> None:
+        """Test a cached font is measured without parsing the font file."""
+        expected = FontMeasurer(font_path).measure("Hello, café — Привет", 14)
+
+        def fail(font):
+            raise AssertionError("font was parsed despite a cache hit")
+
+        monkeypatch.setattr(AdvanceTable, "from_font", fail)
+        measurer = FontMeasurer(font_path)
+        assert measurer.is_available
+        assert measurer.measure("Hello, café — Привет", 14) == expected
+
+    def test_cache_disabled(self, font_path: str) -> None:
+        """Test use_metrics_cache=False neither reads nor writes the cache."""
+        assert FontMeasurer(font_path, use_metrics_cache=False).is_available
+        cache_path = get_metrics_cache_path(font_path)
+        assert cache_path is not None
+        assert not os.path.exists(cache_path)
+
+    def test_fingerprint_changes_with_mtime(self, font_path: str, tmp_path) -> None:
+        """Test touching the font file selects a new cache entry."""
+        import shutil
+
+        copy = str(tmp_path / "font.ttf")
+        shutil.copy(font_path, copy)
+        before = get_metrics_cache_path(copy)
+        os.utime(copy, ns=(0, 0))
+        assert get_metrics_cache_path(copy) != before
+
+    def test_corrupt_cache_falls_back_to_font(self, font_path: str) -> None:
+        """Test an unreadable cache file is ignored and rewritten."""
+        cache_path = get_metrics_cache_path(font_path)
+        assert cache_path is not None
+        with open(cache_path, "wb") as f:
+            f.write(b"not a metrics file")
+        measurer = FontMeasurer(font_path)
+        assert measurer.is_available
+        assert measurer.measure("Hello", 14) > 0
+        assert AdvanceTable.load(cache_path) is not None
+
+    def test_roundtrip(self, font_path: str) -> None:
+        """Test a table survives serialization unchanged."""
+        table = FontMeasurer(font_path, use_metrics_cache=False).table
+        assert table is not None
+        loaded = AdvanceTable.from_buffer(table.to_bytes())
+        assert loaded is not None
+        assert loaded.units_per_em == table.units_per_em
+        assert list(loaded.advances) == list(table.advances)
+
+
 class TestPreciseWrapper:
     """Test precise text wrapping."""
 
@@ -133,6 +708,28 @@ class TestCalibrateHeuristic:
         assert bold_ratio >= ratio
 
 
+class TestCalibrateCharWidths:
+    """Test building a full per-character table from a font."""
+
+    def test_matches_font(self) -> None:
+        """Test the calibrated table measures like the font it came from."""
+        measurer = get_default_measurer()
+        if measurer is None or not measurer.is_available:
+            pytest.skip("No font available")
+        table = calibrate_char_widths(measurer)
+        text = "Typography — café, Привет"
+        assert estimate_text_width(text, 14, table=table) == pytest.approx(
+            measurer.measure(text, 14)
+        )
+        assert ord("é") in table.extra
+        assert 0x4E2D not in table.extra
+
+    def test_without_font(self) -> None:
+        """Test the default heuristic table is returned when no font loads."""
+        table = calibrate_char_widths(FontMeasurer("/nonexistent/font.ttf"))
+        assert table is heuristic_table(0.48)
+
+
 class TestFallback:
     """Test fallback behavior when fonttools not available."""
 
@@ -150,6 +150,34 @@ class TestImports:
         assert Heading is not None
         assert Paragraph is not None
 
+    def test_optional_modules_load_lazily(self) -> None:
+        """Test optional subsystems are imported on first access, not by `import mdsvg`."""
+        import os
+        import subprocess
+        import sys
+
+        import mdsvg
+
+        code = (
+            "import sys, mdsvg\n"
+            "lazy = ['backends', 'doccache', 'fontindex', 'metricpacks', 'shaping', 'sharedmetrics']\n"
+            "assert not [m for m in lazy if 'mdsvg.' + m in sys.modules]\n"
+            "mdsvg.render('# Hello')\n"
+            "assert 'mdsvg.sharedmetrics' not in sys.modules\n"
+            "assert mdsvg.SharedMetrics.__module__ == 'mdsvg.sharedmetrics'\n"
+        )
+        src_dir = os.path.dirname(os.path.dirname(mdsvg.__file__))
+        env = {**os.environ, "PYTHONPATH": src_dir}
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+    def test_all_exports_resolve(self) -> None:
+        """Test every name in __all__, including lazy ones, can be imported."""
+        import mdsvg
+
+        for name in mdsvg.__all__:
+            assert getattr(mdsvg, name) is not None
+        assert set(mdsvg.__all__) <= set(dir(mdsvg))
+
     def test_version(self) -> None:
         """Test version is available."""
         from mdsvg import __version__
@@ -0,0 +1,231 @@
+"""Tests for the positioned layout tree."""
+
+import json
+
+import pytest
+from mdsvg import (
+    LayoutBox,
+    LayoutTree,
+    Style,
+    layout,
+    parse,
+    render,
+    render_content,
+)
+from mdsvg.renderer import SVGRenderer
+from mdsvg.types import ListItem, OrderedList, Span, UnorderedList
+
+DOCUMENT = """# Title
+
+Text with **bold**, *italic*, `code` and a [link](https://example.com), long enough to wrap.
+
+> Quoted
+>
+> > nested
+
+```python
+print("hi")
+```
+
+3. three
+4. four
+
+| Name | Count |
+|:-----|------:|
+| a | 1 |
+| b | 22 |
+
+![Diagram](diagram.png "Figure"){width=200 height=100}
+
+---
+"""
+
+
+def walk(boxes):
+    """Yield boxes and all their descendants."""
+    for box in boxes:
+        yield box
+        yield from walk(box.children)
+
+
+class TestLayoutStage:
+    """Test layout() and serializing its tree."""
+
+    @pytest.mark.parametrize("text_align", ["left", "center", "right"])
+    def test_render_layout_matches_render(self, text_align: str) -> None:
+        """Test the serialized tree is the SVG render_content() and render() give."""
+        renderer = SVGRenderer(style=Style(text_align=text_align))
+        blocks = parse(DOCUMENT)
+        tree = renderer.layout(blocks, width=300, padding=20)
+        result = renderer.render_layout(tree)
+        expected = renderer.render_content(blocks, width=300, padding=20)
+        assert result.elements == expected.elements
+        assert (result.width, result.height) == (expected.width, expected.height)
+        assert renderer.measure(blocks, width=300, padding=20).height == tree.height
+
+    def test_top_level_boxes(self) -> None:
+        """Test each block gets a box, stacked with paragraph spacing."""
+        tree = layout(DOCUMENT, width=300)
+        assert [box.kind for box in tree.boxes] == [
+            "heading",
+            "paragraph",
+            "blockquote",
+            "code_block",
+            "ordered_list",
+            "table",
+            "image",
+            "horizontal_rule",
+        ]
+        spacing = Style().paragraph_spacing
+        for above, below in zip(tree.boxes, tree.boxes[1:]):
+            assert below.y == pytest.approx(above.y + above.height + spacing)
+        assert tree.height == pytest.approx(tree.boxes[-1].y + tree.boxes[-1].height + 20)
+
+    def test_lines_and_runs(self) -> None:
+        """Test a wrapped paragraph's lines stack and its runs sit side by side."""
+        paragraph = layout(DOCUMENT, width=300).boxes[1]
+        assert len(paragraph.lines) > 1
+        for line in paragraph.lines:
+            assert line.y >= paragraph.y
+            assert line.left + line.width <= paragraph.x + paragraph.width + 1e-9
+            x = line.left
+            for run in line.runs:
+                assert run.x == pytest.approx(x)
+                x += run.width
+        runs = [run for line in paragraph.lines for run in line.runs]
+        assert any(run.is_bold for run in runs)
+        assert any(run.is_link and run.url == "https://example.com" for run in runs)
+
+    def test_centered_lines(self) -> None:
+        """Test centered lines are anchored at the middle of the box."""
+        tree = layout("Short line", width=300, style=Style(text_align="center"))
+        line = tree.boxes[0].lines[0]
+        assert line.anchor == "middle"
+        assert line.x == 150
+        assert line.left == pytest.approx(150 - line.width / 2)
+
+    def test_nested_boxes(self) -> None:
+        """Test lists, tables and blockquotes have boxes for their parts."""
+        boxes = layout(DOCUMENT, width=300).boxes
+        assert [item.marker for item in boxes[4].children] == ["3.", "4."]
+
+        header, *rows = boxes[5].children
+        assert [cell.lines[0].runs[0].text for cell in header.children] == ["Name", "Count"]
+        assert header.children[0].lines[0].runs[0].is_bold
+        assert rows[1].children[1].lines[0].anchor == "end"
+
+        assert boxes[2].children[1].kind == "blockquote"
+        assert boxes[2].children[0].x > boxes[2].x
+
+    def test_nested_list(self) -> None:
+        """Test a nested list is a child of its item, below the item's text."""
+        nested = UnorderedList(items=(ListItem(spans=(Span("inner"),)),))
+        outer = OrderedList(items=(ListItem(spans=(Span("outer"),), nested_list=nested),))
+        item = SVGRenderer().layout([outer], width=300).boxes[0].children[0]
+        inner = item.children[0]
+        assert inner.kind == "unordered_list"
+        assert inner.children[0].marker == "•"
+        assert inner.x > item.x
+        assert inner.y > item.lines[-1].y
+        assert item.y + item.height == inner.y + inner.height
+
+    def test_code_and_image_boxes(self) -> None:
+        """Test code lines are measured in monospace, and images take their size."""
+        boxes = layout(DOCUMENT, width=300).boxes
+        code_line = boxes[3].lines[0]
+        assert code_line.runs[0].is_code
+        char_width = code_line.font_size * Style().mono_char_width_ratio
+        assert code_line.width == pytest.approx(len('print("hi")') * char_width)
+        assert (boxes[6].width, boxes[6].height) == (200, 100)
+
+    def test_unknown_blocks_skipped(self) -> None:
+        """Test blocks the renderer doesn't know get no box."""
+        tree = SVGRenderer().layout([object()], width=300)  # type: ignore[list-item]
+        assert tree.boxes == ()
+
+
+class TestHitTesting:
+    """Test finding boxes under a point."""
+
+    def test_hit_test_path(self) -> None:
+        """Test hit_test() returns the boxes from the top level down."""
+        tree = layout(DOCUMENT, width=300)
+        table = tree.boxes[5]
+        cell = table.children[2].children[1]
+        path = tree.hit_test(cell.x + 5, cell.y + 5)
+        assert [box.kind for box in path] == ["table", "table_row", "table_cell"]
+        assert path[-1] is cell
+
+    def test_hit_test_misses(self) -> None:
+        """Test points in the padding or between blocks hit nothing."""
+        tree = layout(DOCUMENT, width=300)
+        assert tree.hit_test(5, 5) == []
+        first, second = tree.boxes[:2]
+        assert tree.hit_test(30, (first.y + first.height + second.y) / 2) == []
+
+    def test_every_box_is_hit(self) -> None:
+        """Test each box's center hits that box."""
+        tree = layout(DOCUMENT, width=300)
+        for box in walk(tree.boxes):
+            path = tree.hit_test(box.x + box.width / 2, box.y + box.height / 2)
+            assert box in path
+
+
+class TestPagination:
+    """Test splitting a tree into pages."""
+
+    def test_pages_fit(self) -> None:
+        """Test every page holds its boxes, in order, without splitting any."""
+        tree = layout(DOCUMENT, width=300)
+        pages = tree.paginate(200)
+        assert [box for page in pages for box in page] == list(tree.boxes)
+        for page in pages:
+            extent = page[-1].y + page[-1].height - page[0].y
+            assert extent <= 200 or len(page) == 1
+
+    def test_one_page(self) -> None:
+        """Test a tall enough page holds the whole document."""
+        tree = layout(DOCUMENT, width=300)
+        assert tree.paginate(tree.height) == [list(tree.boxes)]
+        assert layout("", width=300).paginate(100) == []
+
+    def test_invalid_page_height(self) -> None:
+        """Test page heights must be positive."""
+        with pytest.raises(ValueError, match="page_height"):
+            layout(DOCUMENT).paginate(0)
+
+
+class TestJsonExport:
+    """Test exporting the tree for client-side renderers."""
+
+    def test_to_json(self) -> None:
+        """Test the JSON has every box, line and run with its geometry."""
+        tree = layout(DOCUMENT, width=300)
+        data = json.loads(tree.to_json())
+        assert data["height"] == tree.height
+        assert len(data["boxes"]) == len(tree.boxes)
+
+        heading = data["boxes"][0]
+        assert heading["level"] == 1
+        assert heading["lines"][0]["runs"][0]["text"] == "Title"
+        assert set(heading["lines"][0]) >= {"x", "y", "width", "baseline", "anchor", "runs"}
+
+        assert data["boxes"][4]["children"][0]["marker"] == "3."
+        assert data["boxes"][6]["url"] == "diagram.png"
+        assert data["boxes"][6]["title"] == "Figure"
+        assert "block" not in heading
+
+    def test_boxes_are_tuples(self) -> None:
+        """Test trees are immutable and compare by value."""
+        tree = layout(DOCUMENT, width=300)
+        assert isinstance(tree.boxes[0], LayoutBox)
+        assert tree == layout(DOCUMENT, width=300)
+        with pytest.raises(AttributeError):
+            tree.boxes[0].y = 0  # type: ignore[misc]
+        assert isinstance(tree, LayoutTree)
+
+    def test_render_unchanged(self) -> None:
+        """Test render() is the serialized layout wrapped in an <svg>."""
+        svg = render(DOCUMENT, width=300)
+        result = render_content(DOCUMENT, width=300)
+        assert result.elements in svg
@@ -1,12 +1,18 @@
 """Tests for text measurement utilities."""
 
+import sys
+
 import pytest
 from mdsvg import Span, SpanType, Style
 from mdsvg.measure import (
+    CharWidthTable,
     Size,
     TextMetrics,
+    WidthCache,
+    WidthCacheInfo,
     estimate_char_width,
     estimate_text_width,
+    heuristic_table,
     measure_spans,
     wrap_text,
 )
@@ -67,6 +73,56 @@ class TestEstimateTextWidth:
         assert width > 0
 
 
+class TestHeuristicTable:
+    """Test the compiled heuristic width table."""
+
+    def _reference_width(self, text: str, font_size: float, ratio: float) -> float:
+        """Measure text with the character-class rules the table is compiled from."""
+        total = 0.0
+        for char in text:
+            if char in "iIlj1|!.,;:'`":
+                total += font_size * ratio * 0.5
+            elif char in "mwMW@":
+                total += font_size * ratio * 1.5
+            elif char in "ABCDEFGHJKNOPQRSTUVXYZ0234567890":
+                total += font_size * ratio * 1.2
+            elif char == " ":
+                total += font_size * ratio * 0.8
+            else:
+                total += font_size * ratio
+        return total
+
+    @pytest.mark.parametrize("text", ["Hello, World!", "MW@ 1.0 Typography", "café — naïve 中文"])
+    def test_matches_character_classes(self, text: str) -> None:
+        """Test table widths equal the per-character heuristic."""
+        expected = self._reference_width(text, 14.0, 0.48)
+        assert estimate_text_width(text, 14.0) == pytest.approx(expected)
+        bold = self._reference_width(text, 14.0, 0.6)
+        assert estimate_text_width(
+            text, 14.0, is_bold=True, bold_char_width_ratio=0.6
+        ) == pytest.approx(bold)
+
+    def test_cached_per_ratio(self) -> None:
+        """Test each ratio is compiled once."""
+        assert heuristic_table(0.5) is heuristic_table(0.5)
+        assert heuristic_table(0.5) is not heuristic_table(0.55)
+
+    def test_custom_table(self) -> None:
+        """Test a custom table overrides the heuristic, including non-ASCII lookups."""
+        table = CharWidthTable((0.5,) * 128, 1.0, {ord("é"): 0.25})
+        assert estimate_text_width("ab", 10.0, table=table) == 10.0
+        assert estimate_text_width("aé中", 10.0, table=table) == 17.5
+        assert wrap_text("aaaa aaaa", max_width=40.0, font_size=10.0, table=table) == [
+            "aaaa",
+            "aaaa",
+        ]
+
+    def test_table_needs_full_ascii_range(self) -> None:
+        """Test tables must cover all 128 ASCII codepoints."""
+        with pytest.raises(ValueError):
+            CharWidthTable((0.5,) * 10, 0.5)
+
+
 class TestWrapText:
     """Test text wrapping."""
 
@@ -187,3 +243,54 @@ class TestCustomRatios:
         normal = estimate_text_width(text, 14.0, is_bold=True, bold_char_width_ratio=0.52)
         wider = estimate_text_width(text, 14.0, is_bold=True, bold_char_width_ratio=0.6)
         assert wider > normal
+
+
+class TestWidthCache:
+    """Test the LRU width cache."""
+
+    def test_scope_ids(self, monkeypatch) -> None:
+        """Test equal scopes share an id and forgotten scopes never reuse one."""
+        monkeypatch.setattr(sys.modules["mdsvg.measure"], "_MAX_SCOPES", 2)
+        cache = WidthCache()
+        first = cache.scope_id(("DejaVu Sans", 0.48))
+        assert cache.scope_id(("DejaVu Sans", 0.48)) == first
+        assert first % 8 == 0
+        second = cache.scope_id(("serif", 0.5))
+        cache.scope_id(("monospace", 0.6))  # Forgets the first scope
+        assert cache.scope_id(("DejaVu Sans", 0.48)) not in (first, second)
+
+    def test_miss_then_hit(self) -> None:
+        """Test a stored width is returned and counted as a hit."""
+        cache = WidthCache(maxsize=4)
+        assert cache.get("a") is None
+        cache.put("a", 1.5)
+        assert cache.get("a") == 1.5
+        info = cache.info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test the oldest untouched entry is evicted when full."""
+        cache = WidthCache(maxsize=2)
+        cache.put("a", 1.0)
+        cache.put("b", 2.0)
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", 3.0)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1.0
+        assert cache.get("c") == 3.0
+        assert len(cache) == 2
+
+    def test_zero_maxsize_disables_storage(self) -> None:
+        """Test maxsize=0 never stores entries."""
+        cache = WidthCache(maxsize=0)
+        cache.put("a", 1.0)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_clear_resets_counters(self) -> None:
+        """Test clear() empties the cache and zeroes statistics."""
+        cache = WidthCache()
+        cache.put("a", 1.0)
+        cache.get("a")
+        cache.clear()
+        assert cache.info() == WidthCacheInfo(hits=0, misses=0, maxsize=8192, currsize=0)
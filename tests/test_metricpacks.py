@@ -0,0 +1,232 @@
+"""Tests for the bundled font metric packs."""
+
+import os
+import struct
+import subprocess
+import sys
+from array import array
+
+import mdsvg
+import pytest
+from mdsvg import SVGRenderer, WidthCache, fonts
+from mdsvg.fontindex import FontIndex
+from mdsvg.fonts import AdvanceTable, FontMeasurer, KerningTable, get_default_measurer
+from mdsvg.metricpacks import (
+    METRIC_PACKS,
+    PackMeasurer,
+    find_metric_pack,
+    get_pack_family,
+    get_pack_measurer,
+    write_metric_pack,
+)
+
+DEJAVU_DIR = "/usr/share/fonts/truetype/dejavu"
+PACK_DIR = os.path.join(os.path.dirname(mdsvg.__file__), "metrics")
+
+
+class TestFindMetricPack:
+    """Test choosing a pack for a CSS font stack."""
+
+    def test_named_family(self) -> None:
+        """Test a bundled family is found by name, case-insensitively."""
+        pack = find_metric_pack("'Not Installed', 'dejavu serif', sans-serif")
+        assert pack is not None and pack.family == "DejaVu Serif"
+
+    def test_metric_compatible_alias(self) -> None:
+        """Test families a pack is metric-compatible with map to it."""
+        pack = find_metric_pack("Bitstream Vera Sans Mono")
+        assert pack is not None and pack.family == "DejaVu Sans Mono"
+
+    def test_generic_families(self) -> None:
+        """Test generic families fall back to the closest bundled family."""
+        style = mdsvg.Style()
+        assert find_metric_pack(style.font_family).family == "DejaVu Sans"
+        assert find_metric_pack(style.mono_font_family).family == "DejaVu Sans Mono"
+        assert find_metric_pack("Georgia, serif").family == "DejaVu Serif"
+
+    def test_no_match(self) -> None:
+        """Test stacks without a bundled or generic family have no pack."""
+        assert find_metric_pack("Comic Sans MS, Papyrus") is None
+        assert get_pack_measurer("Comic Sans MS") is None
+
+
+class TestPackMeasurer:
+    """Test measuring with bundled packs."""
+
+    def test_every_pack_loads(self) -> None:
+        """Test all bundled pack files are present and readable."""
+        for pack in METRIC_PACKS:
+            for stem in (pack.regular, pack.bold, pack.italic, pack.bold_italic):
+                if stem:
+                    assert PackMeasurer(stem).is_available, stem
+
+    @pytest.mark.parametrize(
+        ("stack", "bold", "font_file"),
+        [
+            ("DejaVu Sans", False, "DejaVuSans.ttf"),
+            ("DejaVu Sans", True, "DejaVuSans-Bold.ttf"),
+            ("monospace", False, "DejaVuSansMono.ttf"),
+        ],
+    )
+    def test_matches_font_file(self, stack: str, bold: bool, font_file: str) -> None:
+        """Test packs measure exactly like the fonts they were built from."""
+        pytest.importorskip("fontTools")
+        font_path = os.path.join(DEJAVU_DIR, font_file)
+        if not os.path.exists(font_path):
+            pytest.skip(f"{font_file} not installed")
+        measurer = get_pack_measurer(stack, bold=bold)
+        font = FontMeasurer(font_path, use_metrics_cache=False)
+        text = "AVAWAY Typography — café, Привет"
+        assert measurer.measure(text, 14) == font.measure(text, 14)
+        assert measurer.measure(text, 14, kerning=True) == font.measure(text, 14, kerning=True)
+
+    def test_missing_style_uses_regular(self) -> None:
+        """Test styles without a bundled face fall back to the regular face."""
+        assert get_pack_measurer("DejaVu Sans", italic=True) is get_pack_measurer("DejaVu Sans")
+
+    def test_pack_family(self) -> None:
+        """Test the pack family measures bold text with the bold pack."""
+        family = get_pack_family("sans-serif")
+        assert family is not None
+        assert family.has_face(bold=True)
+        bold = get_pack_measurer("sans-serif", bold=True)
+        assert family.measure("Hello", 14, bold=True) == bold.measure("Hello", 14)
+
+    def test_loading_does_not_import_fonttools(self) -> None:
+        """Test packs load without importing fonttools."""
+        code = (
+            "import sys\n"
+            "from mdsvg.metricpacks import get_pack_measurer\n"
+            "assert get_pack_measurer('sans-serif').measure('Hello', 14) > 0\n"
+            "assert 'fontTools' not in sys.modules\n"
+        )
+        src_dir = os.path.dirname(os.path.dirname(mdsvg.__file__))
+        env = {**os.environ, "PYTHONPATH": src_dir}
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+    def test_write_metric_pack(self, tmp_path) -> None:
+        """Test pack files written from a font load back as a PackMeasurer."""
+        pytest.importorskip("fontTools")
+        font_path = os.path.join(DEJAVU_DIR, "DejaVuSerif.ttf")
+        if not os.path.exists(font_path):
+            pytest.skip("DejaVu Serif not installed")
+        written = write_metric_pack(font_path, str(tmp_path), "serif")
+        assert sorted(os.path.basename(path) for path in written) == [
+            "serif.kern",
+            "serif.metrics",
+        ]
+        with open(written[0], "rb") as f:
+            assert f.read() == get_pack_measurer("serif").table.to_bytes()
+
+
+def _swap_byte_order(data: bytes, header: struct.Struct, typecodes: str) -> bytes:
+    """Rewrite a metrics ("if") or kerning ("qf") file as a host with the other byte order would."""
+    fields = list(header.unpack_from(data))
+    # Metrics headers end with the page and advance counts; kerning headers with the pair count
+    counts = fields[-2:] if typecodes == "if" else fields[-1:] * 2
+    fields[2] = 3 - fields[2]
+    prefix = ">" if sys.byteorder == "little" else "<"
+    out = struct.Struct(prefix + header.format[1:]).pack(*fields)
+    offset = header.size
+    for typecode, count in zip(typecodes, counts):
+        values = array(typecode)
+        end = offset + count * values.itemsize
+        values.frombytes(data[offset:end])
+        values.byteswap()
+        out += values.tobytes()
+        offset = end
+    return out + data[offset:]
+
+
+class TestByteOrder:
+    """Test pack files written on a host with the other byte order."""
+
+    def test_swapped_metrics(self) -> None:
+        """Test a byteswapped metrics file measures like the native one."""
+        native = get_pack_measurer("sans-serif")
+        with open(os.path.join(PACK_DIR, f"{native.font_path}.metrics"), "rb") as f:
+            data = f.read()
+        swapped = _swap_byte_order(data, fonts._METRICS_HEADER, "if")
+        assert swapped != data
+        table = AdvanceTable.from_buffer(swapped)
+        assert table is not None
+        text = "AVAWAY Typography — café, Привет"
+        assert table.total(text) == native.table.total(text)
+        assert bytes(table.coverage) == bytes(native.table.coverage)
+
+    def test_swapped_kerning(self) -> None:
+        """Test a byteswapped kerning file loads the same pairs."""
+        native = get_pack_measurer("sans-serif")
+        with open(os.path.join(PACK_DIR, f"{native.font_path}.kern"), "rb") as f:
+            data = f.read()
+        kerning = KerningTable.from_buffer(_swap_byte_order(data, fonts._KERNING_HEADER, "qf"))
+        assert kerning is not None
+        assert kerning.pairs == native.kerning.pairs
+
+    def test_unknown_byte_order_rejected(self) -> None:
+        """Test files with an invalid byte order flag are not loaded."""
+        data = bytearray(get_pack_measurer("sans-serif").table.to_bytes())
+        fields = list(fonts._METRICS_HEADER.unpack_from(data))
+        fields[2] = 7
+        fonts._METRICS_HEADER.pack_into(data, 0, *fields)
+        assert AdvanceTable.from_buffer(data) is None
+
+
+class TestPackFallback:
+    """Test packs are used when no installed font is usable."""
+
+    def test_default_measurer_without_system_font(self, monkeypatch) -> None:
+        """Test get_default_measurer() falls back to the DejaVu Sans pack."""
+        monkeypatch.setattr(fonts, "_get_system_font_cached", lambda: None)
+        measurer = get_default_measurer()
+        assert isinstance(measurer, PackMeasurer)
+        assert measurer.is_available
+
+    def test_default_measurer_without_fonttools(self, tmp_path, monkeypatch) -> None:
+        """Test a system font that can't be read without fonttools falls back to a pack."""
+        font_path = fonts.get_system_font()
+        if not font_path:
+            pytest.skip("No system font available")
+        monkeypatch.setattr(fonts, "_get_cache_root", lambda: str(tmp_path))
+        monkeypatch.setattr(fonts, "_font_registry", fonts.FontRegistry())
+        monkeypatch.setattr(fonts, "_has_fonttools", lambda: False)
+        measurer = get_default_measurer()
+        assert isinstance(measurer, PackMeasurer)
+        assert measurer.is_available
+
+        text = "The quick brown fox jumps over the lazy dog " * 3
+        wrap = fonts.create_precise_wrapper(200, 14)
+        expected = fonts.create_precise_wrapper(200, 14, measurer=measurer)
+        assert wrap(text) == expected(text)
+
+    def test_default_measurer_with_cached_metrics(self, tmp_path, monkeypatch) -> None:
+        """Test a system font with cached metrics is used without fonttools."""
+        pytest.importorskip("fontTools")
+        font_path = fonts.get_system_font()
+        if not font_path:
+            pytest.skip("No system font available")
+        monkeypatch.setattr(fonts, "_get_cache_root", lambda: str(tmp_path))
+        assert FontMeasurer(font_path).is_available
+        monkeypatch.setattr(fonts, "_font_registry", fonts.FontRegistry())
+        monkeypatch.setattr(fonts, "_has_fonttools", lambda: False)
+        measurer = get_default_measurer()
+        assert measurer is not None and measurer.font_path == font_path
+        assert measurer.is_available
+
+    def test_renderer_without_installed_fonts(self, tmp_path, monkeypatch) -> None:
+        """Test the renderer measures with packs chosen by the style's font stacks."""
+        monkeypatch.setattr(fonts, "_get_system_font_cached", lambda: None)
+        index = FontIndex([str(tmp_path / "no-fonts")], "")
+        monkeypatch.setattr("mdsvg.fontindex.get_font_index", lambda: index)
+        style = mdsvg.Style(font_family="'DejaVu Serif', serif")
+        renderer = SVGRenderer(style=style, width_cache=WidthCache())
+        scale = style.text_width_scale
+
+        bold = get_pack_measurer("DejaVu Serif", bold=True)
+        mono = get_pack_measurer("monospace")
+        assert (
+            renderer._measure_text("Title", 20, is_bold=True) == bold.measure("Title", 20) * scale
+        )
+        assert renderer._measure_text("x = 1", 10, is_mono=True) == pytest.approx(
+            5 * mono.measure("M", 1.0) * 10 * scale
+        )
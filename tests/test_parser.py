@@ -1,6 +1,15 @@
 """Tests for the Markdown parser."""
 
-
+import copy
+import dataclasses
+import io
+import itertools
+import pickle
+import random
+import time
+from typing import List
+
+import pytest
 from mdsvg import (
     Blockquote,
     CodeBlock,
@@ -9,12 +18,21 @@ from mdsvg import (
     ImageBlock,
     OrderedList,
     Paragraph,
+    ParsedDocument,
+    SourcePosition,
+    Span,
     SpanType,
     Table,
+    TableCell,
     UnorderedList,
     parse,
+    parse_iter,
+    reparse,
 )
-from mdsvg.parser import MarkdownParser
+from mdsvg import parser as parser_module
+from mdsvg.parser import MarkdownParser, TextEdit
+
+from .fixtures.adversarial import ADVERSARIAL_INPUTS
 
 
 class TestHeadings:
@@ -299,3 +317,473 @@ class TestParserClass:
         parser = MarkdownParser()
         doc = parser.parse("# Test")
         assert len(doc) == 1
+
+
+def _six_pass_inline(text: str) -> List[Span]:
+    """The previous inline parser: search every pattern on each step and slice."""
+    parser = MarkdownParser
+    patterns = [
+        ("code", parser.INLINE_CODE),
+        ("image", parser.IMAGE),
+        ("link", parser.LINK),
+        ("bold_italic", parser.BOLD_ITALIC),
+        ("bold", parser.BOLD),
+        ("italic", parser.ITALIC),
+    ]
+    styles = {
+        "bold_italic": SpanType.BOLD_ITALIC,
+        "bold": SpanType.BOLD,
+        "italic": SpanType.ITALIC,
+    }
+    spans: List[Span] = []
+    remaining = text
+    while remaining:
+        found = None
+        for kind, pattern in patterns:
+            match = pattern.search(remaining)
+            if match and (found is None or match.start() < found[1].start()):
+                found = (kind, match)
+        if found is None:
+            spans.append(Span(text=remaining))
+            break
+        kind, match = found
+        if match.start() > 0:
+            spans.append(Span(text=remaining[: match.start()]))
+        if kind == "code":
+            spans.append(Span(text=match.group(1), span_type=SpanType.CODE))
+        elif kind == "image":
+            url = match.group(2)
+            spans.append(
+                Span(
+                    text=match.group(1) or url,
+                    span_type=SpanType.IMAGE,
+                    url=url,
+                    title=match.group(3),
+                )
+            )
+        elif kind == "link":
+            spans.append(
+                Span(
+                    text=match.group(1),
+                    span_type=SpanType.LINK,
+                    url=match.group(2),
+                    title=match.group(3),
+                )
+            )
+        else:
+            spans.append(Span(text=match.group(1) or match.group(2), span_type=styles[kind]))
+        remaining = remaining[match.end() :]
+    return spans
+
+
+class TestInlineTokenizer:
+    """Test the single-pass inline tokenizer."""
+
+    def test_matches_six_pass_parser(self) -> None:
+        """Test random inline markup gives the same spans as searching each pattern."""
+        pieces = ["a", "b ", " ", "*", "**", "_", "__", "`", "[", "]", "(", ")", "!", '"', "x y"]
+        rng = random.Random(1234)
+        parser = MarkdownParser()
+        for _ in range(3000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 24)))
+            assert parser._parse_inline(text) == _six_pass_inline(text), text
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "***both*** and **bold** and *it* and `code`",
+            "___both___ __bold__ _it_",
+            '![alt](img.png "Title") then [link](https://x.io "T") and [l](u)',
+            "`**not bold**` **`code in bold`**",
+            "![](empty-alt.png)",
+        ],
+    )
+    def test_known_markup(self, text: str) -> None:
+        """Test hand-written markup gives the same spans as searching each pattern."""
+        assert MarkdownParser()._parse_inline(text) == _six_pass_inline(text)
+
+    def test_long_paragraph(self) -> None:
+        """Test long paragraphs are tokenized completely."""
+        text = "Some **bold** and *italic* with `code` and [a link](u). " * 500
+        spans = MarkdownParser()._parse_inline(text)
+        assert (
+            "".join(span.text for span in spans)
+            == "Some bold and italic with code and a link. " * 500
+        )
+        assert spans == _six_pass_inline(text)
+
+
+class TestLineClassifier:
+    """Test the per-line kinds the block parsers share."""
+
+    @pytest.mark.parametrize(
+        ("line", "kind"),
+        [
+            ("", parser_module.LINE_BLANK),
+            ("   ", parser_module.LINE_BLANK),
+            ("## Title", parser_module.LINE_HEADING),
+            ("#hashtag", parser_module.LINE_TEXT),
+            ("---", parser_module.LINE_RULE),
+            ("***", parser_module.LINE_RULE),
+            ("- item", parser_module.LINE_BULLET),
+            ("  * nested", parser_module.LINE_BULLET),
+            ("-- dashes", parser_module.LINE_TEXT),
+            ("```python", parser_module.LINE_FENCE),
+            ("> quote", parser_module.LINE_QUOTE),
+            ("| a | b |", parser_module.LINE_TABLE_ROW),
+            ("| open", parser_module.LINE_TEXT),
+            ("12. twelve", parser_module.LINE_NUMBERED),
+            ("2024 was a year", parser_module.LINE_TEXT),
+            ("  ![alt](img.png)", parser_module.LINE_IMAGE),
+            ("    # indented heading", parser_module.LINE_TEXT),
+        ],
+    )
+    def test_line_kinds(self, line: str, kind: int) -> None:
+        """Test lines are classified by their first non-space character."""
+        assert MarkdownParser()._classify_line(line) == kind
+
+    def test_lone_table_row_is_paragraph(self) -> None:
+        """Test a table row without a separator row parses as a paragraph."""
+        doc = parse("|a|")
+        assert len(doc) == 1
+        assert isinstance(doc[0], Paragraph)
+        assert doc[0].spans[0].text == "|a|"
+
+    def test_table_rows_without_separator(self) -> None:
+        """Test consecutive rows without a separator each become a paragraph."""
+        doc = parse("|a|\n|b|\ntext")
+        assert [type(block) for block in doc] == [Paragraph, Paragraph]
+        assert doc[1].spans[0].text == "|b| text"
+
+
+class TestParseIter:
+    """Test streaming parsing."""
+
+    SOURCE = (
+        "# Title\n\nSome *text*\nover two lines.\n\n- one\n- two\n\n  still two\n"
+        "> quote\n\n> same quote\n\n| a | b |\n|---|---|\n| 1 | 2 |\n"
+        "```python\nx = 1\n\n# comment\n```\n    indented\n\n![img](a.png)\n---\n"
+    )
+
+    def test_matches_parse(self) -> None:
+        """Test streamed blocks equal parse() for files, line lists and strings."""
+        expected = parse(self.SOURCE)
+        assert list(parse_iter(io.StringIO(self.SOURCE))) == expected
+        assert list(parse_iter(self.SOURCE.splitlines(keepends=True))) == expected
+        assert list(parse_iter(self.SOURCE)) == expected
+        crlf = self.SOURCE.replace("\n", "\r\n")
+        assert list(parse_iter(crlf.splitlines(keepends=True))) == parse(crlf)
+
+    def test_lines_without_endings(self) -> None:
+        """Test lines without line endings parse like the joined text once endings are added."""
+        lines = self.SOURCE.split("\n")
+        assert list(parse_iter(line + "\n" for line in lines)) == parse("\n".join(lines) + "\n")
+
+    def test_unclosed_fence_trailing_newline(self) -> None:
+        """Test an unclosed fence keeps its trailing newline."""
+        text = "```\ncode\n\n"
+        assert list(parse_iter(text.splitlines(keepends=True))) == parse(text)
+        assert list(parse_iter(text.splitlines(keepends=True)))[0].code == "code\n\n"
+
+    def test_chunks_split_lines(self) -> None:
+        """Test chunks that end mid-line are joined to the rest of the line."""
+        assert list(parse_iter(["Hello wor", "ld\n"])) == parse("Hello world\n")
+        assert list(parse_iter(["# Hea", "d\n"])) == parse("# Head\n")
+        assert list(parse_iter(["a", "b", "c"])) == parse("abc")
+
+    def test_chunks_split_crlf(self) -> None:
+        """Test a CRLF split across chunks is a single line break."""
+        assert list(parse_iter(["a\r", "\nb"])) == parse("a\r\nb")
+        assert list(parse_iter(["# a\r", "\r\n", "b"])) == parse("# a\r\r\nb")
+        assert list(parse_iter(["a\r", "b\r"])) == parse("a\rb\r")
+
+    def test_fixed_size_chunks(self) -> None:
+        """Test reading the text in fixed-size chunks gives the same blocks."""
+        crlf = self.SOURCE.replace("\n", "\r\n")
+        for text in (self.SOURCE, crlf):
+            for size in (1, 2, 3, 7, 64):
+                chunks = [text[i : i + size] for i in range(0, len(text), size)]
+                assert list(parse_iter(chunks)) == parse(text)
+
+    def test_matches_parse_randomized(self) -> None:
+        """Test random documents stream to the same blocks as parse()."""
+        pieces = ["# H", "---", "- a", "  - b", "1. c", "```", "    code", "> q", ""]
+        pieces += ["|a|b|", "|---|---|", "![i](u.png)", "text", "  indented", ""]
+        rng = random.Random(42)
+        parser = MarkdownParser()
+        for _ in range(500):
+            text = "\n".join(rng.choice(pieces) for _ in range(rng.randint(1, 20)))
+            assert list(parser.parse_iter(text.splitlines(keepends=True))) == parser.parse(text)
+
+    def test_yields_before_end_of_stream(self) -> None:
+        """Test blocks are yielded while the source is still being read."""
+        read = []
+
+        def entries():
+            for i in itertools.count():
+                read.append(i)
+                yield f"## Entry {i}\n\nDetails for entry {i}.\n\n"
+
+        blocks = list(itertools.islice(parse_iter(entries()), 100))
+        assert len(blocks) == 100
+        assert blocks[-1] == Paragraph(spans=(Span(text="Details for entry 49."),))
+        assert len(read) <= 52
+
+    def test_unclosed_fence_at_end(self) -> None:
+        """Test a block still open when the stream ends is yielded."""
+        source = ["text\n", "\n", "```\n", "code\n"]
+        assert list(parse_iter(source)) == parse("".join(source))
+
+
+class TestReparse:
+    """Test incremental re-parsing after an edit."""
+
+    TEXT = (
+        "# Title\n\nFirst paragraph.\n\n- one\n- two\n\n> quote\n\n"
+        "| a | b |\n|---|---|\n| 1 | 2 |\n\n```\ncode\n```\n\nLast paragraph.\n"
+    )
+
+    def test_line_ranges(self) -> None:
+        """Test parse(incremental=True) records the source lines of each block."""
+        doc = parse(self.TEXT, incremental=True)
+        assert isinstance(doc, ParsedDocument)
+        assert doc.line_ranges == [(0, 1), (2, 3), (4, 7), (7, 8), (9, 12), (13, 16), (17, 18)]
+        assert doc == list(doc)
+
+    def test_line_info_only_when_asked(self) -> None:
+        """Test plain parses don't keep line information, and reparse() output does."""
+        doc = parse(self.TEXT)
+        assert doc.line_ranges == [] and doc.line_kinds == bytearray()
+        assert (
+            parse(self.TEXT, source_map=True).line_ranges
+            == parse(self.TEXT, incremental=True).line_ranges
+        )
+        edit = TextEdit(0, 0, "## ")
+        new_doc = reparse(doc, self.TEXT, edit)
+        assert new_doc.line_ranges == parse(edit.apply(self.TEXT), incremental=True).line_ranges
+
+    def test_edit_reuses_other_blocks(self) -> None:
+        """Test blocks away from the edit are reused, not re-parsed."""
+        doc = parse(self.TEXT, incremental=True)
+        offset = self.TEXT.index("First") + len("First")
+        edit = TextEdit(offset, offset, " edited")
+        new_doc = reparse(doc, self.TEXT, edit)
+        assert new_doc == parse(edit.apply(self.TEXT))
+        assert new_doc[1].spans[0].text == "First edited paragraph."
+        assert all(new is old for new, old in zip(new_doc, doc) if new is not new_doc[1])
+
+    def test_edit_changing_block_boundaries(self) -> None:
+        """Test edits that merge, split or restructure blocks."""
+        cases = [
+            ("First paragraph.\n\n", "First paragraph.\n"),  # Joins the list
+            ("```\ncode", "code"),  # Removes the fence opener
+            ("|---|---|\n", ""),  # Table loses its separator
+            ("\n> quote", "\nmore\n> quote"),  # Paragraph before the quote
+            ("# Title", "# Title\n\n```"),  # Opens a fence over the rest
+        ]
+        doc = parse(self.TEXT, incremental=True)
+        for old, new in cases:
+            start = self.TEXT.index(old)
+            edit = TextEdit(start, start + len(old), new)
+            result = reparse(doc, self.TEXT, edit)
+            expected = parse(edit.apply(self.TEXT), incremental=True)
+            assert result == expected, old
+            assert result.line_ranges == expected.line_ranges, old
+
+    def test_random_edits(self) -> None:
+        """Test a sequence of random edits always matches a full parse."""
+        inserts = ["\n", "\n\n", "x", "# ", "- ", "> ", "```", "|", "    ", "1. ", "\r\n", ""]
+        rng = random.Random(7)
+        text = self.TEXT
+        doc = parse(text, incremental=True)
+        for _ in range(500):
+            start = rng.randint(0, len(text))
+            end = min(len(text), start + rng.choice([0, 1, 3, 10]))
+            edit = TextEdit(start, end, rng.choice(inserts))
+            doc = reparse(doc, text, edit)
+            text = edit.apply(text)
+            assert doc == parse(text), repr(text)
+            assert doc.line_ranges == parse(text, incremental=True).line_ranges
+
+    def test_plain_list_is_parsed_in_full(self) -> None:
+        """Test documents without line information are parsed from scratch."""
+        edit = TextEdit(0, 0, "## ")
+        assert reparse(list(parse("Hello")), "Hello", edit) == parse("## Hello")
+
+    def test_edit_between(self) -> None:
+        """Test the edit between two texts covers only what changed."""
+        assert TextEdit.between("hello world", "hello brave world") == TextEdit(6, 6, "brave ")
+        assert TextEdit.between("aaaa", "aa") == TextEdit(2, 4, "")
+        long_text = "x" * 10000
+        edit = TextEdit.between(long_text, long_text[:5000] + "y" + long_text[5000:])
+        assert edit.text == "y" and edit.start == edit.end
+        assert edit.apply(long_text) == long_text[:5000] + "y" + long_text[5000:]
+
+
+class TestSourceMap:
+    """Test block source positions."""
+
+    TEXT = "# Title\r\n\r\nSome text\r\nover two lines.\r\n\r\n- one\r\n- two\r\n\r\n\r\n```\r\ncode\r\n```"
+
+    def test_off_by_default(self) -> None:
+        """Test documents have no source map unless asked for."""
+        assert parse(self.TEXT).source_map is None
+
+    def test_positions(self) -> None:
+        """Test each block's lines and character range."""
+        doc = parse(self.TEXT, source_map=True)
+        assert list(doc.source_map) == [
+            SourcePosition(0, 1, 0, 7),
+            SourcePosition(2, 4, 11, 37),
+            SourcePosition(5, 7, 41, 53),
+            SourcePosition(9, 12, 59, 73),
+        ]
+        position = doc.source_map[1]
+        assert self.TEXT[position.start_offset : position.end_offset] == (
+            "Some text\r\nover two lines."
+        )
+        assert doc.source_map[-1] == doc.source_map[3]
+        with pytest.raises(IndexError):
+            doc.source_map[4]
+
+    def test_block_at(self) -> None:
+        """Test finding the block under a character offset."""
+        source_map = parse(self.TEXT, source_map=True).source_map
+        assert source_map.block_at(0) == 0
+        assert source_map.block_at(self.TEXT.index("over")) == 1
+        assert source_map.block_at(self.TEXT.index("code")) == 3
+        assert source_map.block_at(8) is None  # Blank line between blocks
+        source_map.append((13, 14, 80, 90))
+        assert source_map.block_at(85) == 4
+
+    def test_reparse_updates_source_map(self) -> None:
+        """Test re-parsing keeps the source map in step with the edited text."""
+        text = self.TEXT
+        doc = parse(text, source_map=True)
+        rng = random.Random(3)
+        for _ in range(200):
+            start = rng.randint(0, len(text))
+            edit = TextEdit(
+                start, min(len(text), start + rng.randint(0, 4)), rng.choice(["x", "\n", ""])
+            )
+            doc = reparse(doc, text, edit)
+            text = edit.apply(text)
+            assert doc.source_map == parse(text, source_map=True).source_map
+
+
+class TestCompactNodes:
+    """Test AST nodes are slotted and equal nodes are shared."""
+
+    def test_nodes_have_no_instance_dict(self) -> None:
+        """Test nodes store their fields in slots and stay frozen."""
+        doc = parse("# Title\n\n| a |\n|---|\n| b |\n\n- item")
+        heading, table, items = doc
+        for node in (heading, heading.spans[0], table, table.rows[0].cells[0], items.items[0]):
+            assert not hasattr(node, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            heading.level = 2  # type: ignore[misc]
+        assert heading.block_type.value == "heading"
+
+    def test_nodes_pickle_and_copy(self) -> None:
+        """Test slotted nodes survive pickling, copying and replace()."""
+        doc = list(parse("Some **bold** [link](https://x.y)\n\n> quote\n\n| a |\n|---|\n| b |"))
+        assert pickle.loads(pickle.dumps(doc)) == doc
+        assert copy.deepcopy(doc) == doc
+        assert dataclasses.replace(doc[0], spans=()) == Paragraph()
+
+    def test_plain_spans_shared(self) -> None:
+        """Test equal short plain-text spans are the same object across documents."""
+        first = parse("Status: **ok**")[0].spans[0]
+        second = parse("Status: *fine*")[0].spans[0]
+        assert first == Span("Status: ")
+        assert first is second
+        long_text = "word " * 20
+        assert parse(long_text)[0].spans[0] is not parse(long_text)[0].spans[0]
+
+    def test_repeated_cells_shared(self) -> None:
+        """Test repeated table cells are one object."""
+        table = parse("| Done |\n|---|\n| Yes |\n| Yes |\n| No |")[0]
+        cells = [row.cells[0] for row in table.rows]
+        assert cells[0] is cells[1]
+        assert cells[0] == TableCell(spans=(Span("Yes"),))
+        assert cells[2] is not cells[0]
+
+
+def _best_parse_time(text: str) -> float:
+    """Get the best of three times to parse text."""
+    parser = MarkdownParser()
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        parser.parse(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+class TestAdversarialInput:
+    """Test pathological inputs parse in linear time and within the budgets."""
+
+    @pytest.mark.parametrize("name", sorted(ADVERSARIAL_INPUTS))
+    def test_linear_time(self, name: str) -> None:
+        """Test 8x the input takes well under the 64x a quadratic parser would."""
+        make = ADVERSARIAL_INPUTS[name]
+        small = _best_parse_time(make(2_000))
+        large = _best_parse_time(make(16_000))
+        # Timings under a millisecond are mostly noise
+        assert large < 20 * max(small, 1e-3), (small, large)
+        assert large < 0.5
+
+    def test_unclosed_brackets(self) -> None:
+        """Test brackets around a link are text, and links don't span a "["."""
+        doc = parse("[[a](b) and [x [y](z)")
+        assert doc[0].spans == (
+            Span("["),
+            Span("a", SpanType.LINK, url="b"),
+            Span(" and [x "),
+            Span("y", SpanType.LINK, url="z"),
+        )
+
+    def test_nesting_budget(self) -> None:
+        """Test blockquotes deeper than max_nesting are parsed as text."""
+        doc = MarkdownParser(max_nesting=2).parse("> a\n> > b\n> > > **c**")
+        inner = doc[0].blocks[1]
+        assert isinstance(inner, Blockquote)
+        assert inner.blocks[1] == Paragraph(
+            spans=(Span("> "), Span("c", SpanType.BOLD)),
+        )
+        assert MarkdownParser(max_nesting=0).parse("> a")[0] == Paragraph(spans=(Span("> a"),))
+
+    def test_deep_nesting(self) -> None:
+        """Test very deep nesting doesn't exhaust the stack."""
+        doc = parse(">" * 50_000 + " x")
+        depth = 0
+        block = doc[0]
+        while isinstance(block, Blockquote):
+            depth += 1
+            block = block.blocks[0]
+        assert depth == MarkdownParser().max_nesting
+        assert isinstance(block, Paragraph)
+
+    def test_input_size_budget(self) -> None:
+        """Test inputs longer than max_input_size are rejected."""
+        parser = MarkdownParser(max_input_size=8)
+        assert len(parser.parse("12345678")) == 1
+        with pytest.raises(ValueError, match="max_input_size"):
+            parser.parse("123456789")
+        with pytest.raises(ValueError):
+            parser.reparse(parser.parse("1234"), "1234", TextEdit(4, 4, "56789"))
+        assert len(list(parser.parse_iter(["1234\n", "567"]))) == 1
+        stream = parser.parse_iter(["1234\n", "\n", "56\n", "\n", "78"])
+        assert next(stream) == Paragraph(spans=(Span("1234"),))
+        with pytest.raises(ValueError):
+            next(stream)
+        # A line is rejected while it is still being read
+        with pytest.raises(ValueError):
+            next(parser.parse_iter(itertools.repeat("x")))
+
+    def test_invalid_budgets(self) -> None:
+        """Test negative budgets are rejected."""
+        with pytest.raises(ValueError):
+            MarkdownParser(max_nesting=-1)
+        with pytest.raises(ValueError):
+            MarkdownParser(max_input_size=-1)
@@ -1,12 +1,18 @@
 """Tests for the SVG renderer."""
 
+import random
 
+import pytest
 from mdsvg import (
     DARK_THEME,
     GITHUB_THEME,
+    CharWidthTable,
     RenderResult,
     Size,
     Style,
+    WidthCache,
+    create_prefix_mapper,
+    get_default_width_cache,
     measure,
     parse,
     render,
@@ -14,6 +20,36 @@ from mdsvg import (
     render_content,
 )
 from mdsvg.renderer import SVGRenderer
+from mdsvg.types import Span, SpanType
+
+MIXED_DOCUMENT = """# A heading long enough to wrap at narrow widths
+
+Text with **bold**, *italic*, ***both***, `code` and a [link](https://example.com).
+Trailing spaces and  double  spaces **stay**  put.
+
+> Quoted text that goes on for a while
+>
+> > and a nested quote
+
+```python
+def function_with_a_long_line(argument_one, argument_two, argument_three):
+
+    return argument_one
+```
+
+1. First
+   - nested *item* that wraps around
+     - and deeper
+2. Second
+
+![Diagram](diagram.png){width=900 height=300}
+
+| A | B |
+|---|---|
+| 1 | 2 |
+
+---
+"""
 
 
 class TestBasicRendering:
@@ -169,6 +205,37 @@ class TestMeasure:
         long_size = measure("Hi\n\nThis is a much longer paragraph that will wrap.")
         assert long_size.height > short_size.height
 
+    @pytest.mark.parametrize("overflow", ["wrap", "show", "hide", "ellipsis"])
+    @pytest.mark.parametrize("width", [120, 400, 900])
+    def test_matches_rendered_height(self, overflow: str, width: int) -> None:
+        """Test measure() gives the height render_content() does, without rendering."""
+        blocks = parse(MIXED_DOCUMENT)
+        for style in (Style(code_block_overflow=overflow), GITHUB_THEME):
+            renderer = SVGRenderer(style=style)
+            size = renderer.measure(blocks, width=width, padding=10)
+            assert size.height == renderer.render_content(blocks, width, padding=10).height
+
+    def test_line_count_matches_wrapping(self) -> None:
+        """Test _break_lines() breaks lines in the same places without runs."""
+        rng = random.Random(0)
+        words = ["a", "word", "", "longerword", "x"]
+        span_types = [SpanType.TEXT, SpanType.BOLD, SpanType.BOLD_ITALIC, SpanType.CODE]
+        renderer = SVGRenderer()
+        for _ in range(500):
+            spans = []
+            for _ in range(rng.randint(1, 5)):
+                text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 6)))
+                span_type = rng.choice(span_types + [SpanType.LINK])
+                url = rng.choice(["a", "b"]) if span_type == SpanType.LINK else None
+                spans.append(Span(text + rng.choice(["", " "]), span_type, url))
+            width = rng.choice([5, 30, 80, 200])
+            lines = renderer._break_lines(spans, width, 14, {})
+            assert len(renderer._break_lines(spans, width, 14, {}, with_runs=False)) == len(lines)
+            assert all(lines)
+            assert "".join(text for line in lines for text, _, _ in line).replace(" ", "") == (
+                "".join(span.text for span in spans).replace(" ", "")
+            )
+
 
 class TestRenderBlocks:
     """Test render_blocks function."""
@@ -201,6 +268,119 @@ class TestSVGRenderer:
         assert size.width == 400
         assert size.height > 0
 
+    def test_positional_arguments(self) -> None:
+        """Test the original positional parameters keep their positions."""
+        mapper = create_prefix_mapper({"/a/": "https://cdn/"})
+        renderer = SVGRenderer(None, None, None, False, False, "/base", mapper, 5.0)
+        assert renderer._fetch_image_sizes is False
+        assert renderer._image_base_path == "/base"
+        assert renderer._image_url_mapper is mapper
+        assert renderer._image_timeout == 5.0
+        with pytest.raises(TypeError):
+            SVGRenderer(None, None, None, True, True, None, None, 10.0, "Bold.ttf")
+
+
+class StubMeasurer:
+    """A TextMeasurer charging 10px per character at any font size."""
+
+    def __init__(self, available: bool = True) -> None:
+        self.is_available = available
+        self.calls = 0
+
+    def measure(self, text: str, font_size: float, kerning: bool = False) -> float:
+        self.calls += 1
+        return len(text) * 10.0
+
+
+class TestCustomMeasurer:
+    """Test SVGRenderer(measurer=...) with a measurer that needs no fonts."""
+
+    @pytest.mark.parametrize("precise", [True, False])
+    def test_wrapping_uses_measurer(self, precise: bool) -> None:
+        """Test text wraps where the measurer's widths say, even without precise measurement."""
+        measurer = StubMeasurer()
+        renderer = SVGRenderer(
+            style=Style(text_width_scale=1.0),
+            use_precise_measurement=precise,
+            width_cache=WidthCache(),
+            measurer=measurer,
+        )
+        tree = renderer.layout(parse("aaaa bbbb cccc dddd"), width=100)
+        lines = tree.boxes[0].lines
+        assert [[run.text for run in line.runs] for line in lines] == [
+            ["aaaa bbbb"],
+            ["cccc dddd"],
+        ]
+        assert [line.width for line in lines] == [90.0, 90.0]
+        assert measurer.calls > 0
+        assert renderer.measure(parse("aaaa bbbb cccc dddd"), width=100).height == tree.height
+
+    def test_unavailable_measurer_falls_back(self) -> None:
+        """Test an unavailable measurer is skipped for the renderer's usual measurement."""
+        measurer = StubMeasurer(available=False)
+        cache = WidthCache()
+        with_measurer = SVGRenderer(
+            use_precise_measurement=False, width_cache=cache, measurer=measurer
+        )
+        without = SVGRenderer(use_precise_measurement=False, width_cache=cache)
+        assert with_measurer._measure_text("Hello", 14) == without._measure_text("Hello", 14)
+        assert measurer.calls == 0
+
+
+class TestWidthCaching:
+    """Test word-width caching in the renderer."""
+
+    def test_repeated_words_hit_cache(self) -> None:
+        """Test repeated words are measured once."""
+        cache = WidthCache()
+        renderer = SVGRenderer(width_cache=cache)
+        blocks = parse("the cat and the dog and the bird")
+        renderer.render(blocks)
+        # Repeats within a render are memoized before reaching the cache
+        info = cache.info()
+        assert info.misses == info.currsize == 6
+        renderer.render(blocks)
+        info = cache.info()
+        assert info.hits == 6
+        assert info.misses == info.currsize
+
+    def test_cache_shared_between_renderers(self) -> None:
+        """Test a second renderer with the same setup reuses cached widths."""
+        cache = WidthCache()
+        blocks = parse("Hello **world** with `code`")
+        first = SVGRenderer(width_cache=cache).render(blocks)
+        misses = cache.info().misses
+        second = SVGRenderer(width_cache=cache).render(blocks)
+        assert cache.info().misses == misses
+        assert first == second
+
+    def test_different_styles_do_not_collide(self) -> None:
+        """Test width ratios are part of the cache key."""
+        cache = WidthCache()
+        narrow = SVGRenderer(
+            style=Style(text_width_scale=1.0), width_cache=cache, use_precise_measurement=False
+        )
+        wide = SVGRenderer(
+            style=Style(text_width_scale=2.0), width_cache=cache, use_precise_measurement=False
+        )
+        assert wide._measure_text("word", 14) == 2 * narrow._measure_text("word", 14)
+
+    def test_char_width_table(self) -> None:
+        """Test a custom table is used for heuristic measurement and scopes the cache."""
+        cache = WidthCache()
+        table = CharWidthTable((1.0,) * 128, 1.0)
+        style = Style(text_width_scale=1.0)
+        plain = SVGRenderer(style=style, width_cache=cache, use_precise_measurement=False)
+        custom = SVGRenderer(
+            style=style, width_cache=cache, use_precise_measurement=False, char_width_table=table
+        )
+        assert plain._measure_text("word", 10) != 40.0
+        assert custom._measure_text("word", 10) == 40.0
+
+    def test_uses_default_cache(self) -> None:
+        """Test renderers share the process-wide cache by default."""
+        assert SVGRenderer()._width_cache is get_default_width_cache()
+
 
 class TestEscaping:
     """Test XML/SVG escaping."""
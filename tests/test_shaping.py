@@ -0,0 +1,104 @@
+"""Tests for HarfBuzz shaping measurement."""
+
+import os
+
+import pytest
+from mdsvg import Style, SVGRenderer, WidthCache
+from mdsvg.fonts import FontMeasurer, TextMeasurer
+from mdsvg.shaping import HarfBuzzMeasurer
+
+DEJAVU_SANS = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+ARABIC = "مرحبا بالعالم"
+
+
+@pytest.fixture
+def font_path() -> str:
+    """Get a font with Arabic coverage and kerning, or skip."""
+    pytest.importorskip("uharfbuzz")
+    if not os.path.exists(DEJAVU_SANS):
+        pytest.skip("DejaVu Sans not installed")
+    return DEJAVU_SANS
+
+
+class TestHarfBuzzMeasurer:
+    """Test measuring shaped text."""
+
+    def test_latin_matches_advances(self, font_path: str) -> None:
+        """Test text without ligatures or kerning measures like the advance sum."""
+        measurer = HarfBuzzMeasurer(font_path)
+        assert measurer.measure("Hello World", 14) == FontMeasurer(font_path).measure(
+            "Hello World", 14
+        )
+
+    def test_kerning(self, font_path: str) -> None:
+        """Test kerning is applied only when asked for, like FontMeasurer."""
+        measurer = HarfBuzzMeasurer(font_path)
+        font = FontMeasurer(font_path)
+        assert measurer.measure("AVAWAY", 14) == font.measure("AVAWAY", 14)
+        assert measurer.measure("AVAWAY", 14, kerning=True) == pytest.approx(
+            font.measure("AVAWAY", 14, kerning=True)
+        )
+
+    def test_contextual_forms(self, font_path: str) -> None:
+        """Test Arabic joining forms make shaped text narrower than isolated forms."""
+        shaped = HarfBuzzMeasurer(font_path).measure(ARABIC, 14)
+        assert shaped < FontMeasurer(font_path).measure(ARABIC, 14) * 0.8
+
+    def test_features(self, font_path: str) -> None:
+        """Test feature settings change shaping and are part of equality."""
+        default = HarfBuzzMeasurer(font_path)
+        no_ligatures = HarfBuzzMeasurer(font_path, features={"liga": False})
+        assert no_ligatures.measure("office", 14) > default.measure("office", 14)
+        assert no_ligatures == HarfBuzzMeasurer(font_path, features=(("liga", 0),))
+        assert no_ligatures != default
+        assert hash(no_ligatures) == hash(HarfBuzzMeasurer(font_path, features={"liga": 0}))
+
+    def test_shaped_runs_cached_across_sizes(self, font_path: str) -> None:
+        """Test each run is shaped once and scaled for other sizes."""
+        cache = WidthCache()
+        measurer = HarfBuzzMeasurer(font_path, cache=cache)
+        small = measurer.measure(ARABIC, 10)
+        large = measurer.measure(ARABIC, 20)
+        again = measurer.measure(ARABIC, 10)
+        assert large == pytest.approx(small * 2)
+        assert again == small
+        assert cache.info().misses == 1
+        assert cache.info().hits == 2
+
+    def test_empty_text(self, font_path: str) -> None:
+        """Test empty text has zero width."""
+        assert HarfBuzzMeasurer(font_path).measure("", 14) == 0.0
+
+    def test_missing_font(self) -> None:
+        """Test a font that can't be loaded reports unavailable."""
+        measurer = HarfBuzzMeasurer("/nonexistent/font.ttf")
+        assert not measurer.is_available
+        with pytest.raises(RuntimeError):
+            measurer.measure("Hello", 14)
+
+    def test_satisfies_protocol(self, font_path: str) -> None:
+        """Test HarfBuzzMeasurer can be used wherever a TextMeasurer is expected."""
+        measurer: TextMeasurer = HarfBuzzMeasurer(font_path)
+        assert measurer.is_available
+
+
+class TestRendererMeasurer:
+    """Test plugging a measurer into SVGRenderer."""
+
+    def test_renderer_uses_measurer(self, font_path: str) -> None:
+        """Test body text is measured with the given measurer."""
+        measurer = HarfBuzzMeasurer(font_path)
+        style = Style(text_width_scale=1.0)
+        renderer = SVGRenderer(style=style, measurer=measurer, width_cache=WidthCache())
+        assert renderer._measure_text(ARABIC, 14) == measurer.measure(ARABIC, 14)
+        bold = renderer._measure_text(ARABIC, 14, is_bold=True)
+        ratio = style.bold_char_width_ratio / style.char_width_ratio
+        assert bold == pytest.approx(measurer.measure(ARABIC, 14) * ratio)
+
+    def test_unavailable_measurer_falls_back(self) -> None:
+        """Test the renderer uses its usual fonts when the measurer can't load."""
+        measurer = HarfBuzzMeasurer("/nonexistent/font.ttf")
+        cache = WidthCache()
+        with_measurer = SVGRenderer(measurer=measurer, width_cache=cache)
+        without = SVGRenderer(width_cache=cache)
+        assert with_measurer._measure_text("Hello", 14) == without._measure_text("Hello", 14)
@@ -0,0 +1,225 @@
+"""Tests for font metrics shared between processes."""
+
+import os
+import pickle
+import subprocess
+import sys
+
+import mdsvg
+import pytest
+from mdsvg import fonts
+from mdsvg.fonts import FontFamilyMeasurer, FontMeasurer, FontRegistry
+from mdsvg.sharedmetrics import (
+    SharedMeasurer,
+    SharedMetrics,
+    SharedMetricsHandle,
+    publish_shared_metrics,
+)
+
+DEJAVU_DIR = "/usr/share/fonts/truetype/dejavu"
+SERIF = os.path.join(DEJAVU_DIR, "DejaVuSerif.ttf")
+MONO = os.path.join(DEJAVU_DIR, "DejaVuSansMono.ttf")
+SANS = os.path.join(DEJAVU_DIR, "DejaVuSans.ttf")
+SANS_BOLD = os.path.join(DEJAVU_DIR, "DejaVuSans-Bold.ttf")
+TEXT = "AVAWAY Typography — café"
+
+
+@pytest.fixture
+def published():
+    """Publish DejaVu Serif and Sans Mono into a shared memory block, or skip."""
+    pytest.importorskip("fontTools")
+    if not (os.path.exists(SERIF) and os.path.exists(MONO)):
+        pytest.skip("DejaVu fonts not installed")
+    shared = SharedMetrics.publish([SERIF, MONO])
+    yield shared
+    shared.close()
+    shared.unlink()
+
+
+class TestSharedMetrics:
+    """Test publishing and attaching metric tables."""
+
+    def test_attach_reads_published_tables(self, published: SharedMetrics) -> None:
+        """Test attached tables are identical to the fonts' own tables."""
+        attached = SharedMetrics.attach(published.handle)
+        try:
+            assert len(attached) == 2
+            font = FontMeasurer(SERIF, use_metrics_cache=False)
+            assert attached.table(SERIF).to_bytes() == font.table.to_bytes()
+            assert attached.kerning(SERIF).pairs == font.kerning.pairs
+            measurer = attached.measurer(SERIF)
+            assert measurer.measure(TEXT, 14) == font.measure(TEXT, 14)
+            assert measurer.measure(TEXT, 14, kerning=True) == font.measure(TEXT, 14, kerning=True)
+        finally:
+            attached.close()
+
+    def test_tables_are_read_only(self, published: SharedMetrics) -> None:
+        """Test shared tables can't be written through."""
+        table = published.table(MONO)
+        with pytest.raises(TypeError):
+            table.advances[0] = 1.0
+
+    def test_unpublished_font_loads_from_file(self, published: SharedMetrics) -> None:
+        """Test a shared measurer for a font that wasn't published reads the font."""
+        sans = os.path.join(DEJAVU_DIR, "DejaVuSans.ttf")
+        assert published.table(sans) is None
+        expected = FontMeasurer(sans).measure(TEXT, 14)
+        assert published.measurer(sans).measure(TEXT, 14) == expected
+
+    def test_install_into_registry(self, published: SharedMetrics, monkeypatch) -> None:
+        """Test installed measurers measure without opening the font files."""
+
+        def fail(*args):
+            raise AssertionError("font file opened despite shared metrics")
+
+        registry = FontRegistry()
+        assert published.install(registry) == 2
+        monkeypatch.setattr(fonts, "_open_font", fail)
+        measurer = registry.get(MONO)
+        assert isinstance(measurer, SharedMeasurer)
+        assert measurer.measure("x = 1", 10, kerning=True) > 0
+
+        published.close()
+        assert len(registry) == 0
+
+    def test_file_backed(self, tmp_path) -> None:
+        """Test publishing into a file that workers memory-map."""
+        pytest.importorskip("fontTools")
+        if not os.path.exists(SERIF):
+            pytest.skip("DejaVu Serif not installed")
+        path = str(tmp_path / "metrics.bundle")
+        shared = SharedMetrics.publish([SERIF], path=path, kerning=False)
+        assert shared.handle == SharedMetricsHandle("file", path)
+        attached = SharedMetrics.attach(shared.handle)
+        assert attached.kerning(SERIF) is None
+        expected = FontMeasurer(SERIF).measure(TEXT, 14)
+        assert attached.measurer(SERIF).measure(TEXT, 14) == expected
+        attached.close()
+        shared.close()
+        shared.unlink()
+        assert not os.path.exists(path)
+
+    def test_without_shm_filesystem(self, tmp_path, monkeypatch) -> None:
+        """Test platforms without a shared memory filesystem publish into a temp file."""
+        pytest.importorskip("fontTools")
+        if not os.path.exists(MONO):
+            pytest.skip("DejaVu Sans Mono not installed")
+        monkeypatch.setattr("mdsvg.sharedmetrics._SHM_DIR", str(tmp_path / "missing"))
+        shared = SharedMetrics.publish([MONO])
+        assert shared.handle.kind == "file"
+        assert shared.measurer(MONO).measure(TEXT, 14) == FontMeasurer(MONO).measure(TEXT, 14)
+        shared.close()
+        shared.unlink()
+        assert not os.path.exists(shared.handle.name)
+
+    def test_incompatible_buffer(self, tmp_path) -> None:
+        """Test attaching to something that isn't shared metrics fails clearly."""
+        path = tmp_path / "junk"
+        path.write_bytes(b"not metrics at all")
+        with pytest.raises(ValueError):
+            SharedMetrics.attach(SharedMetricsHandle("file", str(path)))
+
+    def test_attach_after_unlink(self, published: SharedMetrics) -> None:
+        """Test attaching to an unlinked block raises FileNotFoundError."""
+        handle = published.handle
+        published.close()
+        published.unlink()
+        with pytest.raises(FileNotFoundError):
+            SharedMetrics.attach(handle)
+        # The fixture's teardown unlinks again
+        published.unlink = lambda: None
+
+    def test_family_reads_shared_tables(self, monkeypatch) -> None:
+        """Test faces published as a family are measured in place, without copies."""
+        pytest.importorskip("fontTools")
+        if not (os.path.exists(SANS) and os.path.exists(SANS_BOLD)):
+            pytest.skip("DejaVu Sans regular/bold not installed")
+        shared = SharedMetrics.publish([], families=[[SANS, SANS_BOLD]])
+        try:
+            regular, bold = shared.table(SANS), shared.table(SANS_BOLD)
+            assert regular.page_offsets == bold.page_offsets
+            font = FontMeasurer(SANS_BOLD, use_metrics_cache=False)
+            assert bold.total(TEXT) == font.table.total(TEXT)
+
+            registry = FontRegistry()
+            shared.install(registry)
+            monkeypatch.setattr(fonts, "_font_registry", registry)
+            family = FontFamilyMeasurer(SANS, bold=SANS_BOLD)
+            assert family.measure(TEXT, 14, bold=True) == font.measure(TEXT, 14)
+            for table in family._tables[::2]:
+                assert isinstance(table.advances, memoryview)
+        finally:
+            shared.close()
+            shared.unlink()
+
+    def test_handle_pickles(self, published: SharedMetrics) -> None:
+        """Test the handle survives being sent to a worker."""
+        assert pickle.loads(pickle.dumps(published.handle)) == published.handle
+
+
+class TestWorkerProcess:
+    """Test attaching from a separate worker process."""
+
+    def test_worker_measures_without_fonttools(self) -> None:
+        """Test a worker measures published fonts without importing fonttools."""
+        pytest.importorskip("fontTools")
+        if not os.path.exists(SERIF):
+            pytest.skip("DejaVu Serif not installed")
+        shared = publish_shared_metrics(SERIF)
+        try:
+            code = (
+                "import sys\n"
+                "from mdsvg import get_measurer\n"
+                "from mdsvg.sharedmetrics import SharedMetricsHandle, attach_shared_metrics\n"
+                "attach_shared_metrics(SharedMetricsHandle(*sys.argv[1:3]))\n"
+                "print(get_measurer(sys.argv[3]).measure(sys.argv[4], 14, kerning=True))\n"
+                "assert 'fontTools' not in sys.modules\n"
+            )
+            src_dir = os.path.dirname(os.path.dirname(mdsvg.__file__))
+            env = {**os.environ, "PYTHONPATH": src_dir}
+            result = subprocess.run(
+                [sys.executable, "-c", code, *shared.handle, SERIF, TEXT],
+                check=True,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            expected = FontMeasurer(SERIF).measure(TEXT, 14, kerning=True)
+            assert float(result.stdout) == pytest.approx(expected)
+            assert result.stderr == ""
+        finally:
+            shared.close()
+            shared.unlink()
+
+    def test_worker_family_uses_shared_tables(self) -> None:
+        """Test a worker's renderer measures body text faces from the shared block."""
+        pytest.importorskip("fontTools")
+        shared = publish_shared_metrics()
+        try:
+            code = (
+                "import sys\n"
+                "from mdsvg import SVGRenderer, WidthCache, parse\n"
+                "from mdsvg.sharedmetrics import SharedMetricsHandle, attach_shared_metrics\n"
+                "attach_shared_metrics(SharedMetricsHandle(*sys.argv[1:3]))\n"
+                "renderer = SVGRenderer(width_cache=WidthCache())\n"
+                "renderer.render(parse('Some **bold** text'))\n"
+                "family = renderer._family\n"
+                "tables = [t for t in family._tables if t is not None] if family else []\n"
+                "print(len(tables), all(isinstance(t.advances, memoryview) for t in tables))\n"
+            )
+            src_dir = os.path.dirname(os.path.dirname(mdsvg.__file__))
+            env = {**os.environ, "PYTHONPATH": src_dir}
+            result = subprocess.run(
+                [sys.executable, "-c", code, *shared.handle],
+                check=True,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            count, shared_only = result.stdout.split()
+            if count == "0":
+                pytest.skip("No installed family for the default font stack")
+            assert shared_only == "True"
+        finally:
+            shared.close()
+            shared.unlink()